@@ -0,0 +1,43 @@
+"""add transcript_chunks table for chunked media transcription
+
+Revision ID: z9c0d1e2f3a
+Revises: 419cd8df093a
+Create Date: 2026-10-18 21:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "z9c0d1e2f3a"
+down_revision: Union[str, Sequence[str], None] = "419cd8df093a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transcript_chunks",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("job_id", sa.Uuid(), nullable=False),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("start_s", sa.Float(), nullable=False),
+        sa.Column("end_s", sa.Float(), nullable=False),
+        sa.Column("segments", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["job_id"],
+            ["jobs.id"],
+            name="transcript_chunks_job_id_fkey",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("job_id", "chunk_index", name="unique_transcript_chunk"),
+    )
+    op.create_index(op.f("ix_transcript_chunks_job_id"), "transcript_chunks", ["job_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_transcript_chunks_job_id"), table_name="transcript_chunks")
+    op.drop_table("transcript_chunks")
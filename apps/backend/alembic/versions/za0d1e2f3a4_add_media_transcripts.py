@@ -0,0 +1,40 @@
+"""add media_transcripts table (workspace transcript cache by media hash)
+
+Revision ID: za0d1e2f3a4
+Revises: z9c0d1e2f3a
+Create Date: 2026-10-18 22:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "za0d1e2f3a4"
+down_revision: Union[str, Sequence[str], None] = "z9c0d1e2f3a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "media_transcripts",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("workspace_id", sa.Uuid(), nullable=False),
+        sa.Column("sha256", sa.String(), nullable=False),
+        sa.Column("model", sa.String(), nullable=True),
+        sa.Column("segments", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["workspace_id"],
+            ["workspaces.id"],
+            name="media_transcripts_workspace_id_fkey",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("workspace_id", "sha256", name="unique_media_transcript"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("media_transcripts")
@@ -0,0 +1,35 @@
+"""add youtube_cache table (captions + metadata by video id)
+
+Revision ID: zb1e2f3a4b5
+Revises: za0d1e2f3a4
+Create Date: 2026-10-18 22:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "zb1e2f3a4b5"
+down_revision: Union[str, Sequence[str], None] = "za0d1e2f3a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "youtube_cache",
+        sa.Column("video_id", sa.String(), nullable=False),
+        sa.Column("transcript", sa.JSON(), nullable=True),
+        sa.Column("title", sa.String(), nullable=True),
+        sa.Column("channel", sa.String(), nullable=True),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        sa.Column("last_used_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("video_id"),
+    )
+    op.create_index(op.f("ix_youtube_cache_last_used_at"), "youtube_cache", ["last_used_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_youtube_cache_last_used_at"), table_name="youtube_cache")
+    op.drop_table("youtube_cache")
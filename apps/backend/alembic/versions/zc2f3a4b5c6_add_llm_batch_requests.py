@@ -0,0 +1,58 @@
+"""add llm_batch_requests table (extraction chunks for the provider batch API)
+
+Revision ID: zc2f3a4b5c6
+Revises: zb1e2f3a4b5
+Create Date: 2026-10-18 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "zc2f3a4b5c6"
+down_revision: Union[str, Sequence[str], None] = "zb1e2f3a4b5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_batch_requests",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("job_id", sa.Uuid(), nullable=False),
+        sa.Column("source_doc_id", sa.Uuid(), nullable=False),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("chunk_text", sa.Text(), nullable=True),
+        sa.Column("body", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("batch_id", sa.String(), nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("submitted_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["job_id"],
+            ["jobs.id"],
+            name="llm_batch_requests_job_id_fkey",
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["source_doc_id"],
+            ["source_docs.id"],
+            name="llm_batch_requests_source_doc_id_fkey",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("job_id", "chunk_index", name="unique_llm_batch_request"),
+    )
+    op.create_index(op.f("ix_llm_batch_requests_job_id"), "llm_batch_requests", ["job_id"], unique=False)
+    op.create_index(op.f("ix_llm_batch_requests_status"), "llm_batch_requests", ["status"], unique=False)
+    op.create_index(op.f("ix_llm_batch_requests_batch_id"), "llm_batch_requests", ["batch_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_llm_batch_requests_batch_id"), table_name="llm_batch_requests")
+    op.drop_index(op.f("ix_llm_batch_requests_status"), table_name="llm_batch_requests")
+    op.drop_index(op.f("ix_llm_batch_requests_job_id"), table_name="llm_batch_requests")
+    op.drop_table("llm_batch_requests")
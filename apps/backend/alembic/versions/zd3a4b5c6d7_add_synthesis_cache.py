@@ -0,0 +1,39 @@
+"""add synthesis_cache table (reused synthesis outputs by fact-set hash)
+
+Revision ID: zd3a4b5c6d7
+Revises: zc2f3a4b5c6
+Create Date: 2026-10-18 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "zd3a4b5c6d7"
+down_revision: Union[str, Sequence[str], None] = "zc2f3a4b5c6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "synthesis_cache",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("project_id", sa.Uuid(), nullable=False),
+        sa.Column("output_id", sa.Uuid(), nullable=False),
+        sa.Column("clusters", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_used_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["project_id"], ["projects.id"], name="synthesis_cache_project_id_fkey", ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["output_id"], ["outputs.id"], name="synthesis_cache_output_id_fkey", ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(op.f("ix_synthesis_cache_project_id"), "synthesis_cache", ["project_id"], unique=False)
+    op.create_index(op.f("ix_synthesis_cache_last_used_at"), "synthesis_cache", ["last_used_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_synthesis_cache_last_used_at"), table_name="synthesis_cache")
+    op.drop_index(op.f("ix_synthesis_cache_project_id"), table_name="synthesis_cache")
+    op.drop_table("synthesis_cache")
@@ -0,0 +1,55 @@
+"""add indexes for ingest dedup, fact listing and source_doc_id lookups
+
+Revision ID: ze4b5c6d7e8
+Revises: zd3a4b5c6d7
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "ze4b5c6d7e8"
+down_revision: Union[str, Sequence[str], None] = "zd3a4b5c6d7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UNSUPPRESSED = sa.text("is_suppressed IS NOT true")
+
+
+def upgrade() -> None:
+    # Replaces idx_unique_project_url (dropped in 18f27fa55b35); not unique, dedup is done by the app
+    op.create_index("ix_source_docs_project_id_canonical_url", "source_docs", ["project_id", "canonical_url"], unique=False)
+    op.create_index("ix_source_docs_project_id_url", "source_docs", ["project_id", "url"], unique=False)
+    op.create_index(op.f("ix_research_nodes_source_doc_id"), "research_nodes", ["source_doc_id"], unique=False)
+    op.create_index(
+        "ix_research_nodes_listing_created_at",
+        "research_nodes",
+        ["project_id", "created_at"],
+        unique=False,
+        postgresql_where=UNSUPPRESSED,
+    )
+    op.create_index(
+        "ix_research_nodes_listing_review_status",
+        "research_nodes",
+        ["project_id", "review_status", "created_at"],
+        unique=False,
+        postgresql_where=UNSUPPRESSED,
+    )
+    op.create_index(
+        "ix_research_nodes_listing_confidence",
+        "research_nodes",
+        ["project_id", "confidence_score"],
+        unique=False,
+        postgresql_where=UNSUPPRESSED,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_research_nodes_listing_confidence", table_name="research_nodes")
+    op.drop_index("ix_research_nodes_listing_review_status", table_name="research_nodes")
+    op.drop_index("ix_research_nodes_listing_created_at", table_name="research_nodes")
+    op.drop_index(op.f("ix_research_nodes_source_doc_id"), table_name="research_nodes")
+    op.drop_index("ix_source_docs_project_id_url", table_name="source_docs")
+    op.drop_index("ix_source_docs_project_id_canonical_url", table_name="source_docs")
@@ -0,0 +1,36 @@
+"""add scheduling and lease columns to ingest_rules
+
+Revision ID: zf5c6d7e8f9
+Revises: ze4b5c6d7e8
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "zf5c6d7e8f9"
+down_revision: Union[str, Sequence[str], None] = "ze4b5c6d7e8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("ingest_rules", sa.Column("next_run_at", sa.DateTime(), nullable=True))
+    op.add_column("ingest_rules", sa.Column("last_run_at", sa.DateTime(), nullable=True))
+    op.add_column("ingest_rules", sa.Column("last_result", sa.JSON(), nullable=False, server_default=sa.text("'{}'")))
+    op.add_column("ingest_rules", sa.Column("lease_owner", sa.String(), nullable=True))
+    op.add_column("ingest_rules", sa.Column("lease_expires_at", sa.DateTime(), nullable=True))
+    op.create_index(op.f("ix_ingest_rules_next_run_at"), "ingest_rules", ["next_run_at"], unique=False)
+    # Existing scheduled rules run on the first tick
+    op.execute("UPDATE ingest_rules SET next_run_at = CURRENT_TIMESTAMP WHERE type = 'scheduled_url' AND enabled")
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_ingest_rules_next_run_at"), table_name="ingest_rules")
+    op.drop_column("ingest_rules", "lease_expires_at")
+    op.drop_column("ingest_rules", "lease_owner")
+    op.drop_column("ingest_rules", "last_result")
+    op.drop_column("ingest_rules", "last_run_at")
+    op.drop_column("ingest_rules", "next_run_at")
@@ -0,0 +1,33 @@
+"""add search_cache table (search provider results by normalized query)
+
+Revision ID: zg6d7e8f9a0
+Revises: zf5c6d7e8f9
+Create Date: 2026-10-19 14:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "zg6d7e8f9a0"
+down_revision: Union[str, Sequence[str], None] = "zf5c6d7e8f9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "search_cache",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("results", sa.JSON(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        sa.Column("last_used_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(op.f("ix_search_cache_last_used_at"), "search_cache", ["last_used_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_search_cache_last_used_at"), table_name="search_cache")
+    op.drop_table("search_cache")
@@ -0,0 +1,42 @@
+"""normalize legacy scheduled_url rule configs from url to urls
+
+Revision ID: zh7e8f9a0b1
+Revises: zg6d7e8f9a0
+Create Date: 2026-10-19 16:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "zh7e8f9a0b1"
+down_revision: Union[str, Sequence[str], None] = "zg6d7e8f9a0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ingest_rules = sa.table(
+    "ingest_rules",
+    sa.column("id", sa.Uuid()),
+    sa.column("type", sa.String()),
+    sa.column("config_json", sa.JSON()),
+)
+
+
+def upgrade() -> None:
+    # Rules created before scheduled_url took a list kept {"url": "..."}
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(ingest_rules.c.id, ingest_rules.c.config_json).where(ingest_rules.c.type == "scheduled_url")
+    ).all()
+    for rule_id, config in rows:
+        config = dict(config or {})
+        if config.get("urls") or not config.get("url"):
+            continue
+        config["urls"] = [config.pop("url")]
+        bind.execute(ingest_rules.update().where(ingest_rules.c.id == rule_id).values(config_json=config))
+
+
+def downgrade() -> None:
+    # urls is a superset of url; nothing to undo
+    pass
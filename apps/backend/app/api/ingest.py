@@ -1,7 +1,8 @@
 import os
 import uuid
 import requests
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 from sqlmodel import Session, select
 from sqlalchemy.exc import IntegrityError
@@ -9,7 +10,9 @@ from app.db.session import get_session
 from app.workers.celery_app import celery_app
 from app.models import Job, JobStatus, SourceDoc, Project
 from app.extractors import detect_source_type, normalize_url
-from app.services.scira import run_query_ingest, check_rate_limit
+from app.services.media_store import MAX_MEDIA_BYTES, MAX_MEDIA_MB, UnsupportedMediaError, UploadTooLargeError, store_upload
+from app.services.scira import run_query_ingest, check_rate_limit, release_rate_limit
+from app.search.brave import BraveSearchProvider
 from app.search.tavily import TavilySearchProvider
 from app.search.provider import SearchResult
 
@@ -26,19 +29,54 @@ def _scira_enabled() -> bool:
 SCIRA_USE_MOCK = os.environ.get("SCIRA_USE_MOCK_SEARCH", "false").lower() == "true"
 
 
+# Search backends by name -> (provider class, API key env var)
+SEARCH_PROVIDERS = {
+    "tavily": (TavilySearchProvider, "TAVILY_API_KEY"),
+    "brave": (BraveSearchProvider, "BRAVE_SEARCH_API_KEY"),
+}
+
+
 def get_search_provider():
-    """Return mock provider when SCIRA_USE_MOCK_SEARCH=true or no TAVILY_API_KEY; else Tavily."""
-    if SCIRA_USE_MOCK or not os.environ.get("TAVILY_API_KEY"):
+    """
+    Return mock provider when SCIRA_USE_MOCK_SEARCH=true or no search API key is set. Otherwise
+    the providers named in SEARCH_PROVIDERS (default: all) that have a key, fanned out in
+    parallel when there are several, behind the shared query cache (SEARCH_CACHE_ENABLED=false
+    to bypass).
+    """
+    names = [n.strip().lower() for n in os.environ.get("SEARCH_PROVIDERS", ",".join(SEARCH_PROVIDERS)).split(",")]
+    providers = [
+        SEARCH_PROVIDERS[n][0]()
+        for n in names
+        if n in SEARCH_PROVIDERS and os.environ.get(SEARCH_PROVIDERS[n][1])
+    ]
+    if SCIRA_USE_MOCK or not providers:
         from app.search.mock import MockSearchProvider
         return MockSearchProvider()
-    return TavilySearchProvider()
+    if len(providers) == 1:
+        provider = providers[0]
+    else:
+        from app.search.federated import FederatedSearchProvider
+        provider = FederatedSearchProvider(providers)
+    if os.environ.get("SEARCH_CACHE_ENABLED", "true").lower() == "true":
+        from app.search.cache import CachedSearchProvider
+        return CachedSearchProvider(provider)
+    return provider
 
 
 # Request schemas
+ExtractionMode = Literal["standard", "map_reduce", "batch"]
+
+
 class IngestURLRequest(BaseModel):
     project_id: str
     workspace_id: str
     url: str
+    extraction_mode: Optional[ExtractionMode] = None  # default: LLM_EXTRACTION_MODE
+
+
+class IngestBulkRequest(BaseModel):
+    urls: List[str]
+    extraction_mode: Optional[ExtractionMode] = None  # default: LLM_BULK_EXTRACTION_MODE
 
 
 class IngestQueryRequest(BaseModel):
@@ -127,7 +165,12 @@ def ingest_url(payload: IngestURLRequest, db: Session = Depends(get_session)):
             type="url_ingest",
             status=JobStatus.PENDING,
             idempotency_key=idempotency_key,
-            params={"url": payload.url, "source_type": source_type.value, "canonical_url": canonical}
+            params={
+                "url": payload.url,
+                "source_type": source_type.value,
+                "canonical_url": canonical,
+                **({"extraction_mode": payload.extraction_mode} if payload.extraction_mode else {}),
+            }
         )
         db.add(job)
         db.commit()
@@ -162,57 +205,122 @@ def ingest_url(payload: IngestURLRequest, db: Session = Depends(get_session)):
         print(f"Ingest error: {e}")
         raise HTTPException(status_code=500, detail="Failed to add source. Please try again.")
 
-MEDIA_EXTENSIONS = {".mp3", ".wav", ".m4a", ".webm", ".ogg", ".mp4", ".m4v", ".mov"}
-MAX_MEDIA_MB = int(os.environ.get("MAX_MEDIA_UPLOAD_MB", "100"))
+@router.post("/projects/{project_id}/ingest/bulk")
+def ingest_bulk(project_id: str, payload: IngestBulkRequest, db: Session = Depends(get_session)):
+    """
+    Queue url_ingest jobs for many URLs at once. Dedup against existing sources/jobs is
+    set-based, jobs are inserted in one statement, and each URL gets its own result
+    (queued / duplicate / invalid) in request order.
+    """
+    from app.services.llm import BULK_EXTRACTION_MODE
+    from app.services.url_ingest import BULK_INGEST_MAX_URLS, QUEUED, enqueue_urls
+    try:
+        project_uuid = uuid.UUID(project_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid project_id")
+    if not payload.urls:
+        raise HTTPException(status_code=400, detail="urls is required")
+    if len(payload.urls) > BULK_INGEST_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_INGEST_MAX_URLS} URLs per request")
+    project = db.get(Project, project_uuid)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    results = enqueue_urls(
+        db,
+        project_uuid,
+        project.workspace_id,
+        payload.urls,
+        extraction_mode=payload.extraction_mode or BULK_EXTRACTION_MODE,
+    )
+    return {
+        "queued": sum(1 for r in results if r["status"] == QUEUED),
+        "results": results,
+    }
+
 
+# Room for multipart boundaries and part headers when checking Content-Length up front
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
 
-def _is_media_file(filename: str) -> bool:
-    if not filename:
-        return False
-    parts = filename.rsplit(".", 1)
-    ext = ("." + parts[1].lower()) if len(parts) > 1 else ""
-    return ext in MEDIA_EXTENSIONS
+_FILE_UPLOAD_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+                "required": ["file"],
+            }
+        }
+    },
+}
 
 
-@router.post("/ingest/file")
+@router.post("/ingest/file", openapi_extra={"requestBody": _FILE_UPLOAD_BODY})
 async def ingest_file(
+    request: Request,
     project_id: str,
     workspace_id: str,
-    file: UploadFile = File(...),
+    extraction_mode: Optional[ExtractionMode] = None,
     db: Session = Depends(get_session)
 ):
-    """Create a job to ingest an uploaded file (audio/video → transcribe → facts)"""
+    """
+    Create a job to ingest an uploaded file (audio/video → transcribe → facts).
+    The multipart body is parsed as it arrives and the file streamed to content-addressed
+    storage; re-uploading the same bytes returns the existing job.
+    """
+    too_large = HTTPException(status_code=400, detail=f"File too large. Max {MAX_MEDIA_MB}MB.")
     try:
-        filename = file.filename or "upload"
-        if not _is_media_file(filename):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Media only. Supported: {', '.join(sorted(MEDIA_EXTENSIONS))}",
-            )
+        if int(request.headers.get("content-length") or 0) > MAX_MEDIA_BYTES + MULTIPART_OVERHEAD_BYTES:
+            raise too_large
+        try:
+            stored = await store_upload(request.stream(), request.headers.get("content-type", ""), MAX_MEDIA_BYTES)
+        except UploadTooLargeError:
+            raise too_large
+        except UnsupportedMediaError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        filename = stored.filename or "upload"
 
-        contents = await file.read()
-        size_mb = len(contents) / (1024 * 1024)
-        if size_mb > MAX_MEDIA_MB:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Max {MAX_MEDIA_MB}MB.",
+        project_uuid = uuid.UUID(project_id)
+        idempotency_key = f"{project_id}:file:{stored.sha256}"
+        existing_job = db.exec(
+            select(Job).where(
+                Job.project_id == project_uuid,
+                Job.idempotency_key == idempotency_key,
             )
-
-        upload_dir = "/tmp/research_uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        file_path = os.path.join(upload_dir, filename)
-
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        ).first()
+        if existing_job and existing_job.status == JobStatus.FAILED:
+            # Same bytes failed before: re-run that job (finished transcript chunks are kept)
+            existing_job.status = JobStatus.PENDING
+            existing_job.current_step = "QUEUED"
+            existing_job.result_summary = {}
+            existing_job.params = {**(existing_job.params or {}), "path": stored.path, "filename": filename}
+            db.add(existing_job)
+            db.commit()
+            db.refresh(existing_job)
+            celery_app.send_task("ingest_media", args=[str(existing_job.id)])
+            return existing_job
+        if existing_job:
+            return {
+                **existing_job.model_dump(),
+                "message": "This file has already been added to this project",
+                "is_duplicate": True,
+            }
 
         job = Job(
             id=uuid.uuid4(),
-            project_id=uuid.UUID(project_id),
+            project_id=project_uuid,
             workspace_id=uuid.UUID(workspace_id),
             type="file_ingest",
             status=JobStatus.PENDING,
-            idempotency_key=f"{project_id}:file:{filename}",
-            params={"filename": filename, "path": file_path, "source_type": "MEDIA"},
+            idempotency_key=idempotency_key,
+            params={
+                "filename": filename,
+                "path": stored.path,
+                "sha256": stored.sha256,
+                "size_bytes": stored.size_bytes,
+                "source_type": "MEDIA",
+                **({"extraction_mode": extraction_mode} if extraction_mode else {}),
+            },
         )
         db.add(job)
         db.commit()
@@ -256,9 +364,10 @@ def ingest_query(
         raise HTTPException(status_code=400, detail="query must be at most 500 characters")
     max_urls = max(1, min(payload.max_urls, 5))
     try:
-        check_rate_limit(project_uuid, db)
+        claimed_at = check_rate_limit(project_uuid, db)
     except ValueError as e:
         raise HTTPException(status_code=429, detail=str(e))
+    succeeded = False
     try:
         result = run_query_ingest(
             project_id=project_uuid,
@@ -268,6 +377,7 @@ def ingest_query(
             db=db,
             search_provider=search_provider,
         )
+        succeeded = True
         return result
     except ValueError as e:
         msg = str(e)
@@ -279,4 +389,9 @@ def ingest_query(
         raise HTTPException(
             status_code=503,
             detail="Search is temporarily unavailable. Try again later.",
-        )
\ No newline at end of file
+        )
+    finally:
+        if not succeeded:
+            # Whatever failed, the search did not happen: give the project its slot back
+            db.rollback()
+            release_rate_limit(project_uuid, claimed_at, db)
\ No newline at end of file
@@ -1,9 +1,10 @@
+import json
 import os
 import re
 import uuid
 from difflib import SequenceMatcher
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel import Session, select, desc, delete
 from typing import List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel
@@ -12,6 +13,8 @@ from datetime import datetime, timezone
 
 from app.db.session import get_session
 from app.models import Project, Job, ResearchNode, SourceDoc, Output, ReviewStatus, JobStatus, IngestRule
+from app.services.reanchor import ReanchorRequest
+from app.services.synthesis_cache import SynthesisCache, forget_output, synthesis_cache_enabled, synthesis_cache_key
 
 router = APIRouter()
 
@@ -35,9 +38,15 @@ class FactInput(BaseModel):
     section: Optional[str] = None
     review_status: Optional[str] = None  # For quality_stats computation
     is_pinned: Optional[bool] = None
+    # Priorities when a large selection must be trimmed to the synthesis token budget
+    is_key_claim: Optional[bool] = None
+    confidence_score: Optional[int] = None
 
 class SynthesisRequest(BaseModel):
-    facts: List[FactInput]
+    # Preferred: ids of facts in this project, hydrated server-side (see _hydrate_facts)
+    fact_ids: Optional[List[str]] = None
+    # Legacy: full fact payloads posted by the client
+    facts: List[FactInput] = []
     mode: str = "paragraph"
 
 class AnalysisResponse(BaseModel):
@@ -82,88 +91,160 @@ def update_project(project_id: str, update: ProjectUpdate, db: Session = Depends
     db.refresh(project)
     return project
 
-@router.get("/projects/{project_id}/export")
-def export_project(
-    project_id: str,
-    format: str = "markdown",
-    db: Session = Depends(get_session),
-):
-    """Export project facts as markdown, json, or csv. Deterministic with seeded data."""
-    p_uuid = UUID(project_id)
+# Rows fetched per round trip and written per chunk by the streaming export
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "markdown": "text/markdown; charset=utf-8",
+    "markdown_evidence": "text/markdown; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+    "csv_evidence": "text/csv; charset=utf-8",
+    "json": "application/json",
+}
+
+
+def _export_facts(db: Session, p_uuid: UUID):
+    """Unsuppressed facts of a project as export dicts, read through a server-side cursor joined to their source."""
     statement = (
-        select(ResearchNode)
-        .where(ResearchNode.project_id == p_uuid)
-        .order_by(ResearchNode.created_at.asc())
+        select(
+            ResearchNode.fact_text,
+            ResearchNode.confidence_score,
+            ResearchNode.is_key_claim,
+            ResearchNode.review_status,
+            ResearchNode.is_pinned,
+            ResearchNode.evidence_snippet,
+            ResearchNode.source_url,
+            SourceDoc.domain,
+            SourceDoc.url,
+        )
+        .join(SourceDoc, SourceDoc.id == ResearchNode.source_doc_id, isouter=True)
+        .where(ResearchNode.project_id == p_uuid, ResearchNode.is_suppressed.isnot(True))
+        .order_by(ResearchNode.created_at.asc(), ResearchNode.id.asc())
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
     )
-    nodes = db.exec(statement).all()
+    for row in db.exec(statement):
+        yield {
+            "source_domain": row.domain or "Unknown",
+            "source_url": row.source_url or row.url or "",
+            "fact_text": row.fact_text,
+            "confidence_score": row.confidence_score,
+            "is_key_claim": row.is_key_claim,
+            "review_status": str(row.review_status.value) if hasattr(row.review_status, "value") else str(row.review_status),
+            "is_pinned": row.is_pinned,
+            "evidence_snippet": row.evidence_snippet or "",
+        }
 
-    facts = []
-    for node in nodes:
-        if node.is_suppressed:
-            continue
-        source = db.get(SourceDoc, node.source_doc_id)
-        ev = getattr(node, "evidence_snippet", None) or ""
-        fact_url = getattr(node, "source_url", None) or (source.url if source else "")
-        facts.append({
-            "source_domain": source.domain if source else "Unknown",
-            "source_url": fact_url,
-            "fact_text": node.fact_text,
-            "confidence_score": node.confidence_score,
-            "is_key_claim": node.is_key_claim,
-            "review_status": str(node.review_status.value) if hasattr(node.review_status, "value") else str(node.review_status),
-            "is_pinned": node.is_pinned,
-            "evidence_snippet": ev,
-        })
 
-    if format == "markdown":
-        lines = []
-        for f in facts:
-            lines.append(f"### {f['source_domain']}\n> {f['fact_text']}\n*Confidence: {f['confidence_score']}/100 | Key Claim: {'Yes' if f['is_key_claim'] else 'No'}*")
-        content = "\n".join(lines)
-        return Response(content=content, media_type="text/markdown; charset=utf-8")
-    elif format == "markdown_evidence":
-        lines = []
-        for f in facts:
+def _batched_text(parts):
+    """Join rendered parts into chunks of EXPORT_BATCH_SIZE so the response is not one write per fact."""
+    buffer = []
+    for part in parts:
+        buffer.append(part)
+        if len(buffer) >= EXPORT_BATCH_SIZE:
+            yield "".join(buffer)
+            buffer.clear()
+    if buffer:
+        yield "".join(buffer)
+
+
+def _export_markdown(facts, evidence: bool):
+    for i, f in enumerate(facts):
+        if evidence:
             snippet = (f.get("evidence_snippet") or "").strip() or "No excerpt captured yet"
-            lines.append(f"### {f['source_domain']}\n**Fact**\n> {f['fact_text']}\n\n**Evidence**\n{snippet}\n\n**Source** {f['source_url']}\n*Confidence: {f['confidence_score']}/100 | Key Claim: {'Yes' if f['is_key_claim'] else 'No'}*")
-        content = "\n".join(lines)
-        return Response(content=content, media_type="text/markdown; charset=utf-8")
-    elif format == "csv":
-        import csv
-        import io
-        out = io.StringIO()
-        writer = csv.writer(out)
+            block = f"### {f['source_domain']}\n**Fact**\n> {f['fact_text']}\n\n**Evidence**\n{snippet}\n\n**Source** {f['source_url']}\n*Confidence: {f['confidence_score']}/100 | Key Claim: {'Yes' if f['is_key_claim'] else 'No'}*"
+        else:
+            block = f"### {f['source_domain']}\n> {f['fact_text']}\n*Confidence: {f['confidence_score']}/100 | Key Claim: {'Yes' if f['is_key_claim'] else 'No'}*"
+        yield block if i == 0 else "\n" + block
+
+
+def _export_csv(facts, evidence: bool):
+    import csv
+    import io
+    out = io.StringIO()
+    writer = csv.writer(out)
+
+    def flush() -> str:
+        text = out.getvalue()
+        out.seek(0)
+        out.truncate()
+        return text
+
+    if evidence:
+        writer.writerow(["source_domain", "source_url", "fact_text", "confidence_score", "is_key_claim", "review_status", "is_pinned", "evidence_snippet"])
+    else:
         writer.writerow(["Source", "Fact", "Confidence", "Key Claim"])
-        for f in facts:
+    yield flush()
+    for f in facts:
+        if evidence:
             writer.writerow([
                 f["source_domain"],
+                f["source_url"],
                 f["fact_text"],
                 f["confidence_score"],
                 "Yes" if f["is_key_claim"] else "No",
+                f.get("review_status", ""),
+                "Yes" if f.get("is_pinned") else "No",
+                ((f.get("evidence_snippet") or "").strip() or "No excerpt captured yet").replace("\n", " ").replace('"', '""'),
             ])
-        return Response(content=out.getvalue(), media_type="text/csv; charset=utf-8")
-    elif format == "csv_evidence":
-        import csv
-        import io
-        out = io.StringIO()
-        writer = csv.writer(out)
-        writer.writerow(["source_domain", "source_url", "fact_text", "confidence_score", "is_key_claim", "review_status", "is_pinned", "evidence_snippet"])
-        for f in facts:
+        else:
             writer.writerow([
                 f["source_domain"],
-                f["source_url"],
                 f["fact_text"],
                 f["confidence_score"],
                 "Yes" if f["is_key_claim"] else "No",
-                f.get("review_status", ""),
-                "Yes" if f.get("is_pinned") else "No",
-                ((f.get("evidence_snippet") or "").strip() or "No excerpt captured yet").replace("\n", " ").replace('"', '""'),
             ])
-        return Response(content=out.getvalue(), media_type="text/csv; charset=utf-8")
-    elif format == "json":
-        return JSONResponse(content=facts)
-    else:
+        yield flush()
+
+
+def _export_json(facts):
+    # Same encoding as JSONResponse, one array element at a time
+    yield "["
+    for i, f in enumerate(facts):
+        encoded = json.dumps(f, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+        yield encoded if i == 0 else "," + encoded
+    yield "]"
+
+
+@router.get("/projects/{project_id}/export")
+def export_project(
+    project_id: str,
+    format: str = "markdown",
+    table: str = "facts",
+    db: Session = Depends(get_session),
+):
+    """
+    Export project facts as markdown, json, or csv. Deterministic with seeded data.
+    Streamed: facts are read in EXPORT_BATCH_SIZE batches and written as they are rendered,
+    so memory stays flat and the first bytes go out before the last fact is read.
+    format=parquet|arrow exports one typed table (facts, sources or outputs) for analytics.
+    """
+    from app.services import columnar_export
+
+    if format in columnar_export.COLUMNAR_FORMATS:
+        if table not in columnar_export.EXPORT_TABLES:
+            raise HTTPException(status_code=400, detail=f"Invalid table: {table}")
+        if not columnar_export.columnar_available():
+            return JSONResponse(
+                status_code=501,
+                content={"detail": "Parquet/Arrow export is not available on this server (pyarrow not installed)"},
+                headers={"X-Error-Code": "EXPORT_FORMAT_UNAVAILABLE"},
+            )
+        ext, media_type = columnar_export.COLUMNAR_FORMATS[format]
+        return StreamingResponse(
+            columnar_export.iter_table_bytes(db, table, format, project_id=UUID(project_id)),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{table}-{project_id}{ext}"'},
+        )
+    if format not in EXPORT_MEDIA_TYPES:
         raise HTTPException(status_code=400, detail=f"Invalid format: {format}")
+    facts = _export_facts(db, UUID(project_id))
+    if format in ("markdown", "markdown_evidence"):
+        parts = _export_markdown(facts, evidence=format == "markdown_evidence")
+    elif format in ("csv", "csv_evidence"):
+        parts = _export_csv(facts, evidence=format == "csv_evidence")
+    else:
+        parts = _export_json(facts)
+    return StreamingResponse(_batched_text(parts), media_type=EXPORT_MEDIA_TYPES[format])
 
 # --- Ingest Rules (V4a) ---
 
@@ -178,6 +259,17 @@ class IngestRuleRead(BaseModel):
     config_json: Dict[str, Any]
     enabled: bool
     created_at: Any
+    next_run_at: Any = None
+    last_run_at: Any = None
+    last_result: Dict[str, Any] = {}
+
+
+def _ingest_rule_read(r: IngestRule) -> Dict[str, Any]:
+    return {
+        "id": str(r.id), "project_id": str(r.project_id), "type": r.type, "config_json": r.config_json or {},
+        "enabled": r.enabled, "created_at": r.created_at,
+        "next_run_at": r.next_run_at, "last_run_at": r.last_run_at, "last_result": r.last_result or {},
+    }
 
 @router.get("/projects/{project_id}/ingest-rules")
 def list_ingest_rules(project_id: str, db: Session = Depends(get_session)):
@@ -191,7 +283,7 @@ def list_ingest_rules(project_id: str, db: Session = Depends(get_session)):
         raise HTTPException(status_code=404, detail="Project not found")
     rules = db.exec(select(IngestRule).where(IngestRule.project_id == p_uuid).order_by(IngestRule.created_at)).all()
     return [
-        {"id": str(r.id), "project_id": str(r.project_id), "type": r.type, "config_json": r.config_json or {}, "enabled": r.enabled, "created_at": r.created_at}
+        _ingest_rule_read(r)
         for r in rules
     ]
 
@@ -204,19 +296,25 @@ def create_ingest_rule(project_id: str, body: IngestRuleCreate, db: Session = De
         raise HTTPException(status_code=400, detail="Invalid UUID")
     if body.type not in ("folder_watch", "rss_ingest", "scheduled_url"):
         raise HTTPException(status_code=400, detail="type must be folder_watch, rss_ingest, or scheduled_url")
+    from app.services.ingest_rules import initial_next_run, validate_rule_config
+    try:
+        config = validate_rule_config(body.type, body.config_json)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     project = db.get(Project, p_uuid)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     rule = IngestRule(
         project_id=p_uuid,
         type=body.type,
-        config_json=body.config_json or {},
+        config_json=config,
         enabled=True,
+        next_run_at=initial_next_run(body.type),
     )
     db.add(rule)
     db.commit()
     db.refresh(rule)
-    return {"id": str(rule.id), "project_id": str(rule.project_id), "type": rule.type, "config_json": rule.config_json or {}, "enabled": rule.enabled, "created_at": rule.created_at}
+    return _ingest_rule_read(rule)
 
 @router.delete("/projects/{project_id}/ingest-rules/{rule_id}")
 def delete_ingest_rule(project_id: str, rule_id: str, db: Session = Depends(get_session)):
@@ -665,6 +763,26 @@ def capture_excerpt(
     }
 
 
+@router.post("/projects/{project_id}/facts/reanchor")
+def reanchor_project_facts(project_id: str, body: ReanchorRequest = ReanchorRequest(), db: Session = Depends(get_session)):
+    """
+    Queue a background job that recomputes evidence offsets for all facts in the project.
+    Each source document is loaded once; progress is reported on the returned Job.
+    """
+    from app.services.reanchor import create_reanchor_job
+    from app.workers.celery_app import celery_app
+    try:
+        p_uuid = UUID(project_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid project UUID")
+    project = db.get(Project, p_uuid)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    job = create_reanchor_job(db, project.workspace_id, project_id=p_uuid, only_missing=body.only_missing)
+    celery_app.send_task("reanchor_evidence", args=[str(job.id)])
+    return job
+
+
 @router.get("/projects/{project_id}/sources/summary")
 def get_sources_summary(project_id: str, db: Session = Depends(get_session)):
     """Per-source summary: status, facts_total, key_claims, needs_review, pinned, last_error."""
@@ -821,8 +939,69 @@ def delete_job(project_id: str, job_id: str, delete_facts: bool = False, db: Ses
 
 # --- AI ENDPOINTS (Moved here from main.py) ---
 
+def _hydrate_facts(db: Session, project_id: str, fact_ids: List[str]) -> List[FactInput]:
+    """
+    FactInputs for fact_ids from one query over the fact + source columns synthesis uses,
+    in request order. 404 FACTS_NOT_FOUND if any id is not a fact of this project.
+    """
+    try:
+        pid = UUID(project_id)
+        ids = list(dict.fromkeys(UUID(fid) for fid in fact_ids))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid project or fact id", headers={"X-Error-Code": "INVALID_FACT_ID"})
+    if not ids:
+        return []
+
+    rows = db.exec(
+        select(
+            ResearchNode.id,
+            ResearchNode.fact_text,
+            ResearchNode.source_url,
+            ResearchNode.section_context,
+            ResearchNode.review_status,
+            ResearchNode.is_pinned,
+            ResearchNode.is_key_claim,
+            ResearchNode.confidence_score,
+            SourceDoc.domain,
+            SourceDoc.url,
+        )
+        .join(SourceDoc, SourceDoc.id == ResearchNode.source_doc_id, isouter=True)
+        .where(ResearchNode.project_id == pid, ResearchNode.id.in_(ids))
+    ).all()
+    by_id = {
+        row.id: FactInput(
+            id=str(row.id),
+            text=row.fact_text,
+            title=row.domain or "Unknown",
+            url=row.source_url or row.url or "",
+            section=row.section_context,
+            review_status=row.review_status.value if hasattr(row.review_status, "value") else str(row.review_status),
+            is_pinned=row.is_pinned,
+            is_key_claim=row.is_key_claim,
+            confidence_score=row.confidence_score,
+        )
+        for row in rows
+    }
+    missing = [str(fid) for fid in ids if fid not in by_id]
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"{len(missing)} fact(s) not found in project: {', '.join(missing[:5])}",
+            headers={"X-Error-Code": "FACTS_NOT_FOUND"},
+        )
+    return [by_id[fid] for fid in ids]
+
+
+def _hydrated(db: Session, project_id: str, payload: SynthesisRequest) -> SynthesisRequest:
+    """payload with facts loaded from the database when the client sent fact_ids."""
+    if payload.fact_ids is None:
+        return payload
+    return payload.model_copy(update={"facts": _hydrate_facts(db, project_id, payload.fact_ids)})
+
+
 @router.post("/projects/{project_id}/analyze")
-def analyze_facts(project_id: str, payload: SynthesisRequest):
+def analyze_facts(project_id: str, payload: SynthesisRequest, db: Session = Depends(get_session)):
+    payload = _hydrated(db, project_id, payload)
     try:
         fact_dicts = [f.model_dump() for f in payload.facts]
         from app.services.llm import analyze_selection
@@ -879,12 +1058,123 @@ def _build_e2e_synthesis(payload: SynthesisRequest) -> str:
     return "\n".join(lines)
 
 
+def _synthesis_llm_mode(payload: SynthesisRequest) -> str:
+    llm_mode = (payload.mode or "paragraph").lower()
+    if llm_mode == "research_brief":
+        return "brief"
+    if llm_mode == "script_outline":
+        return "outline"
+    return llm_mode
+
+
+def _save_synthesis_output(db: Session, project_id: str, payload: SynthesisRequest, synthesis_text: str) -> Output:
+    """Persist a finished synthesis as an Output (title, type and quality stats from the request)."""
+    mode_titles = {
+        "paragraph": "Synthesis",
+        "outline": "Script Outline",
+        "script_outline": "Script Outline",
+        "brief": "Research Brief",
+        "research_brief": "Research Brief",
+        "split": "Separate Sections",
+    }
+    raw_mode = (payload.mode or "paragraph").lower()
+    mode_key = "research_brief" if raw_mode == "brief" else "script_outline" if raw_mode == "outline" else raw_mode
+    title = f"{mode_titles.get(mode_key, mode_titles.get(raw_mode, 'Output'))} - {datetime.now(timezone.utc).strftime('%b %d, %Y at %I:%M %p')}"
+    output_type = "synthesis"
+    if mode_key in ("outline", "script_outline"):
+        output_type = "script_outline"
+    elif mode_key in ("brief", "research_brief"):
+        output_type = "research_brief"
+    elif mode_key == "split":
+        output_type = "split_sections"
+    persist_mode = "paragraph" if mode_key == "paragraph" else "research_brief" if output_type == "research_brief" else "script_outline" if output_type == "script_outline" else "split"
+
+    # Compute quality_stats from facts passed
+    approved = sum(1 for f in payload.facts if getattr(f, "review_status", None) == "APPROVED")
+    needs_review = sum(1 for f in payload.facts if getattr(f, "review_status", None) == "NEEDS_REVIEW")
+    flagged = sum(1 for f in payload.facts if getattr(f, "review_status", None) == "FLAGGED")
+    rejected = sum(1 for f in payload.facts if getattr(f, "review_status", None) == "REJECTED")
+    pinned = sum(1 for f in payload.facts if getattr(f, "is_pinned", False))
+    quality_stats = {
+        "total": len(payload.facts),
+        "approved": approved,
+        "needs_review": needs_review,
+        "flagged": flagged,
+        "rejected": rejected,
+        "pinned": pinned,
+    }
+
+    output = Output(
+        project_id=UUID(project_id),
+        title=title,
+        content=synthesis_text,
+        output_type=output_type,
+        mode=persist_mode,
+        fact_ids=[f.id for f in payload.facts],
+        source_count=len(set(f.url for f in payload.facts if f.url)),
+        quality_stats=quality_stats,
+    )
+    db.add(output)
+    db.commit()
+    db.refresh(output)
+    return output
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stream_synthesis_events(
+    db: Session,
+    project_id: str,
+    payload: SynthesisRequest,
+    e2e: bool,
+    cache: Optional[SynthesisCache] = None,
+    cache_key: Optional[str] = None,
+):
+    """
+    SSE body for ?stream=true: "clusters", one "section" per generated section (markdown with
+    its [n] citation markers), then "done" with the same fields as the JSON response once the
+    Output is saved, or a single "error" event ({detail, code}).
+    """
+    try:
+        if e2e:
+            synthesis_text = _build_e2e_synthesis(payload)
+            yield _sse("clusters", {"clusters": []})
+            yield _sse("section", {"index": 0, "title": "Synthesis", "fact_ids": [f.id for f in payload.facts], "markdown": synthesis_text})
+            result = {"synthesis": synthesis_text, "clusters": []}
+        else:
+            from app.services.llm import stream_synthesis
+            result = {}
+            for event, data in stream_synthesis([f.model_dump() for f in payload.facts], _synthesis_llm_mode(payload)):
+                if event == "complete":
+                    result = data
+                else:
+                    yield _sse(event, data)
+
+        synthesis_text = result.get("synthesis", "")
+        if not synthesis_text.strip():
+            yield _sse("error", {"detail": "LLM returned empty synthesis", "code": "EMPTY_SYNTHESIS"})
+            return
+        output = _save_synthesis_output(db, project_id, payload, synthesis_text)
+        if cache:
+            cache.put(db, cache_key, output, result.get("clusters", []))
+        yield _sse("done", {"synthesis": synthesis_text, "output_id": str(output.id), "clusters": result.get("clusters", []), "cached": False})
+    except Exception as e:
+        print(f"Synthesis Error: {e}")
+        import traceback
+        traceback.print_exc()
+        yield _sse("error", {"detail": f"Synthesis generation failed: {str(e)}", "code": "SYNTHESIS_EXCEPTION"})
+
+
 @router.post("/projects/{project_id}/synthesize")
 def synthesize_project_facts(
     project_id: str,
     payload: SynthesisRequest,
     request: Request,
     force_error: bool = False,
+    stream: bool = False,
+    cache: bool = True,
     db: Session = Depends(get_session),
 ):
     """
@@ -892,13 +1182,25 @@ def synthesize_project_facts(
 
     CANONICAL RESPONSE CONTRACT:
     Success: {"synthesis": str, "output_id": str (UUID), "clusters": Optional[list]}
-    Error: 502 with body {detail: str, code: "EMPTY_SYNTHESIS"} or 500 for other errors
+    Error: 502 with body {detail: str, code: "EMPTY_SYNTHESIS"} or 500 for other errors;
+    404 FACTS_NOT_FOUND when fact_ids include facts outside this project
+
+    Request: {"fact_ids": [...], "mode"} (facts are read server-side), or legacy {"facts": [...]}.
+
+    CACHE: an identical selection (fact ids + texts) and mode returns the Output generated for
+    it earlier with "cached": true, without calling the LLM. ?cache=false regenerates (and
+    replaces the cached Output).
+
+    STREAMING (?stream=true): text/event-stream of "clusters", "section" (one per generated
+    section, citation markers included) and a final "done" carrying the contract above, or
+    "error" with {detail, code}. The Output is saved when the stream completes.
 
     E2E TEST MODE (ARTIFACT_E2E_MODE or ARTIFACT_ENABLE_TEST_SEED):
     Returns deterministic synthesis without calling external LLM.
     Query param force_error=true (E2E only) simulates empty synthesis for error-handling tests.
     """
     try:
+        payload = _hydrated(db, project_id, payload)
         fact_dicts = [f.model_dump() for f in payload.facts]
         e2e = _e2e_mode_enabled()
         
@@ -914,17 +1216,33 @@ def synthesize_project_facts(
                 headers={"X-Error-Code": "EMPTY_SYNTHESIS"},
             )
 
+        synthesis_cache = SynthesisCache() if not e2e and synthesis_cache_enabled() else None
+        cache_key = synthesis_cache_key(UUID(project_id), fact_dicts, _synthesis_llm_mode(payload)) if synthesis_cache else None
+        hit = synthesis_cache.get(db, cache_key) if synthesis_cache and cache else None
+        if hit:
+            output, clusters = hit
+            cached = {"synthesis": output.content, "output_id": str(output.id), "clusters": clusters, "cached": True}
+            if stream:
+                return StreamingResponse(
+                    iter([_sse("done", cached)]),
+                    media_type="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                )
+            return cached
+
+        if stream:
+            return StreamingResponse(
+                _stream_synthesis_events(db, project_id, payload, e2e, synthesis_cache, cache_key),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
         if e2e:
             synthesis_text = _build_e2e_synthesis(payload)
             result = {"synthesis": synthesis_text, "clusters": []}
         else:
             from app.services.llm import synthesize_facts as llm_synthesize
-            llm_mode = (payload.mode or "paragraph").lower()
-            if llm_mode == "research_brief":
-                llm_mode = "brief"
-            elif llm_mode == "script_outline":
-                llm_mode = "outline"
-            result = llm_synthesize(fact_dicts, llm_mode)
+            result = llm_synthesize(fact_dicts, _synthesis_llm_mode(payload))
 
         synthesis_raw = result.get("synthesis", "")
         if isinstance(synthesis_raw, list):
@@ -941,59 +1259,15 @@ def synthesize_project_facts(
                 headers={"X-Error-Code": "EMPTY_SYNTHESIS"},
             )
 
-        mode_titles = {
-            "paragraph": "Synthesis",
-            "outline": "Script Outline",
-            "script_outline": "Script Outline",
-            "brief": "Research Brief",
-            "research_brief": "Research Brief",
-            "split": "Separate Sections",
-        }
-        raw_mode = (payload.mode or "paragraph").lower()
-        mode_key = "research_brief" if raw_mode == "brief" else "script_outline" if raw_mode == "outline" else raw_mode
-        title = f"{mode_titles.get(mode_key, mode_titles.get(raw_mode, 'Output'))} - {datetime.now(timezone.utc).strftime('%b %d, %Y at %I:%M %p')}"
-        output_type = "synthesis"
-        if mode_key in ("outline", "script_outline"):
-            output_type = "script_outline"
-        elif mode_key in ("brief", "research_brief"):
-            output_type = "research_brief"
-        elif mode_key == "split":
-            output_type = "split_sections"
-        persist_mode = "paragraph" if mode_key == "paragraph" else "research_brief" if output_type == "research_brief" else "script_outline" if output_type == "script_outline" else "split"
-
-        # Compute quality_stats from facts passed
-        approved = sum(1 for f in payload.facts if getattr(f, "review_status", None) == "APPROVED")
-        needs_review = sum(1 for f in payload.facts if getattr(f, "review_status", None) == "NEEDS_REVIEW")
-        flagged = sum(1 for f in payload.facts if getattr(f, "review_status", None) == "FLAGGED")
-        rejected = sum(1 for f in payload.facts if getattr(f, "review_status", None) == "REJECTED")
-        pinned = sum(1 for f in payload.facts if getattr(f, "is_pinned", False))
-        quality_stats = {
-            "total": len(payload.facts),
-            "approved": approved,
-            "needs_review": needs_review,
-            "flagged": flagged,
-            "rejected": rejected,
-            "pinned": pinned,
-        }
-
-        output = Output(
-            project_id=UUID(project_id),
-            title=title,
-            content=synthesis_text,
-            output_type=output_type,
-            mode=persist_mode,
-            fact_ids=[f.id for f in payload.facts],
-            source_count=len(set(f.url for f in payload.facts if f.url)),
-            quality_stats=quality_stats,
-        )
-        db.add(output)
-        db.commit()
-        db.refresh(output)
+        output = _save_synthesis_output(db, project_id, payload, synthesis_text)
+        if synthesis_cache:
+            synthesis_cache.put(db, cache_key, output, result.get("clusters", []))
 
         return {
             "synthesis": synthesis_text,
             "output_id": str(output.id),
             "clusters": result.get("clusters", []),
+            "cached": False,
         }
 
     except HTTPException:
@@ -1202,6 +1476,7 @@ def delete_output(output_id: str, db: Session = Depends(get_session)):
     output = db.get(Output, UUID(output_id))
     if not output:
         raise HTTPException(status_code=404, detail="Output not found")
+    forget_output(db, output.id)
     db.delete(output)
     db.commit()
     return {"status": "ok", "message": "Output deleted"}
\ No newline at end of file
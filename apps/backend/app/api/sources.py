@@ -1,8 +1,17 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, Response
 from sqlmodel import Session, select
-from app.db.session import engine
+from app.db.session import engine, get_session
 from app.models import SourceDoc, ResearchNode
 from app.utils.content_formatter import format_for_reader
+from app.utils.content_range import (
+    DEFAULT_RANGE_CHARS,
+    MAX_RANGE_CHARS,
+    compute_section_spans,
+    content_etag,
+    etag_matches,
+    resolve_range,
+)
 from typing import Literal, Optional
 import uuid
 import bleach
@@ -46,6 +55,37 @@ def sanitize_html(html: Optional[str]) -> Optional[str]:
         print(f"⚠️ HTML sanitization failed: {e}")
         return None
 
+def _find_source_doc(db: Session, project_id: str, url: str) -> SourceDoc:
+    """Resolve a project's SourceDoc by URL (strict match, then via fact linkage). Raises 400/404."""
+    try:
+        p_uuid = uuid.UUID(project_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Project UUID")
+
+    # Strategy 1: Strict Lookup (Project + URL)
+    statement = select(SourceDoc).where(
+        SourceDoc.project_id == p_uuid,
+        SourceDoc.url == url
+    )
+    doc = db.exec(statement).first()
+
+    # Strategy 2: Fallback - Find via Fact Linkage
+    if not doc:
+        print(f"⚠️ Strict lookup failed for {url}. Trying linkage lookup...")
+
+        linked_statement = (
+            select(SourceDoc)
+            .join(ResearchNode, ResearchNode.source_doc_id == SourceDoc.id)
+            .where(ResearchNode.project_id == p_uuid)
+            .where(SourceDoc.url == url)
+        )
+        doc = db.exec(linked_statement).first()
+
+    if not doc:
+        print(f"❌ Document truly not found for URL: {url}")
+        raise HTTPException(status_code=404, detail="Source document not found")
+    return doc
+
 @router.get("/projects/{project_id}/sources/content")
 def get_source_content(
     project_id: str, 
@@ -77,34 +117,8 @@ def get_source_content(
         }
     """
     with Session(engine) as db:
-        try:
-            p_uuid = uuid.UUID(project_id)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid Project UUID")
-
-        # Strategy 1: Strict Lookup (Project + URL)
-        statement = select(SourceDoc).where(
-            SourceDoc.project_id == p_uuid,
-            SourceDoc.url == url
-        )
-        doc = db.exec(statement).first()
-
-        # Strategy 2: Fallback - Find via Fact Linkage
-        if not doc:
-            print(f"⚠️ Strict lookup failed for {url}. Trying linkage lookup...")
-            
-            linked_statement = (
-                select(SourceDoc)
-                .join(ResearchNode, ResearchNode.source_doc_id == SourceDoc.id)
-                .where(ResearchNode.project_id == p_uuid)
-                .where(SourceDoc.url == url)
-            )
-            doc = db.exec(linked_statement).first()
-
-        if not doc:
-            print(f"❌ Document truly not found for URL: {url}")
-            raise HTTPException(status_code=404, detail="Source document not found")
-        
+        doc = _find_source_doc(db, project_id, url)
+
         # Get all available formats
         text_content = doc.content_text_raw or doc.content_text
         markdown_content = doc.content_markdown
@@ -169,4 +183,88 @@ def get_source_content(
             "title": doc.title,
             "url": doc.url,
             "domain": doc.domain
-        }
\ No newline at end of file
+        }
+
+
+def _select_representation(doc: SourceDoc, fmt: str) -> tuple:
+    """Return (content, format_used) for a single representation, falling back to raw text."""
+    text_content = doc.content_text_raw or doc.content_text
+    if fmt == "markdown" and doc.content_markdown:
+        return doc.content_markdown, "markdown"
+    if fmt == "reader":
+        base = doc.content_markdown or text_content
+        if base:
+            return format_for_reader(base), "reader"
+    if fmt == "html" and doc.content_html_clean:
+        html_content = sanitize_html(doc.content_html_clean)
+        if html_content:
+            return html_content, "html"
+    return text_content or "", "text"
+
+
+@router.get("/projects/{project_id}/sources/content/range")
+def get_source_content_range(
+    project_id: str,
+    url: str = Query(...),
+    format: Literal["text", "markdown", "reader", "html"] = Query(default="text"),
+    start: Optional[int] = Query(default=None, ge=0),
+    length: int = Query(default=DEFAULT_RANGE_CHARS, ge=1, le=MAX_RANGE_CHARS),
+    around: Optional[int] = Query(default=None, ge=0),
+    section: Optional[int] = Query(default=None, ge=0),
+    include_sections: bool = Query(default=False),
+    if_none_match: Optional[str] = Header(default=None),
+    db: Session = Depends(get_session),
+):
+    """
+    Get one slice of one content representation.
+
+    Offsets are character offsets into the selected representation, matching
+    evidence_start_char_raw (format=text) and evidence_start_char_md (format=markdown).
+    Select the slice with start/length, a window centred on `around`, or a `section` index.
+    Responses carry an ETag keyed by content_hash; If-None-Match returns 304.
+
+    Returns:
+        {
+            "content": str,              # Slice of the representation
+            "format": str,               # Actual format returned ("text"|"markdown"|"reader"|"html")
+            "start": int, "end": int,    # Char range of the slice
+            "total_length": int,         # Length of the full representation
+            "has_more": bool,
+            "next_start": int | None,    # Start of the following slice
+            "prev_start": int | None,    # Start of the preceding slice
+            "sections": list | None,     # [{index, title, start, end}] when include_sections=true
+            "content_hash": str | None,
+            "title": str | None, "url": str, "domain": str
+        }
+    """
+    doc = _find_source_doc(db, project_id, url)
+    content, format_used = _select_representation(doc, format)
+
+    # Validate the range first: an invalid request is a 400 even with a matching ETag
+    try:
+        begin, end = resolve_range(content, start=start, length=length, around=around, section=section)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    etag = content_etag(doc.content_hash, content, format_used, start, length, around, section, include_sections)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    total = len(content)
+    body = {
+        "content": content[begin:end],
+        "format": format_used,
+        "start": begin,
+        "end": end,
+        "total_length": total,
+        "has_more": end < total,
+        "next_start": end if end < total else None,
+        "prev_start": max(0, begin - length) if begin > 0 else None,
+        "sections": compute_section_spans(content) if include_sections else None,
+        "content_hash": doc.content_hash,
+        "title": doc.title,
+        "url": doc.url,
+        "domain": doc.domain,
+    }
+    return JSONResponse(content=body, headers=headers)
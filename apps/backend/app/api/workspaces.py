@@ -11,7 +11,8 @@ from pydantic import BaseModel, ConfigDict
 from sqlmodel import Session, select
 
 from app.db.session import get_session
-from app.models import Workspace, Project, UserPreference
+from app.models import Job, JobStatus, Workspace, Project, UserPreference
+from app.services.reanchor import ReanchorRequest
 
 router = APIRouter()
 
@@ -147,3 +148,83 @@ def put_preference(
         db.add(pref)
     db.commit()
     return {"ok": "true"}
+
+
+@router.post("/workspaces/{workspace_id}/facts/reanchor")
+def reanchor_workspace_facts(
+    workspace_id: str,
+    body: ReanchorRequest = ReanchorRequest(),
+    db: Session = Depends(get_session),
+):
+    """Queue a background job that recomputes evidence offsets for all facts in the workspace."""
+    from app.services.reanchor import create_reanchor_job
+    from app.workers.celery_app import celery_app
+    try:
+        ws_uuid = UUID(workspace_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid workspace UUID")
+    workspace = db.get(Workspace, ws_uuid)
+    if not workspace:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    job = create_reanchor_job(db, ws_uuid, project_id=None, only_missing=body.only_missing)
+    celery_app.send_task("reanchor_evidence", args=[str(job.id)])
+    return job
+
+
+@router.post("/workspaces/{workspace_id}/export")
+def export_workspace(
+    workspace_id: str,
+    format: str = "parquet",
+    db: Session = Depends(get_session),
+):
+    """Queue a background job that writes facts, sources and outputs of every project as Parquet/Arrow files in one zip."""
+    from app.services.columnar_export import COLUMNAR_FORMATS, columnar_available, create_bulk_export_job
+    from app.workers.celery_app import celery_app
+    try:
+        ws_uuid = UUID(workspace_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid workspace UUID")
+    if format not in COLUMNAR_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format: {format}")
+    if not columnar_available():
+        raise HTTPException(
+            status_code=501,
+            detail="Parquet/Arrow export is not available on this server (pyarrow not installed)",
+            headers={"X-Error-Code": "EXPORT_FORMAT_UNAVAILABLE"},
+        )
+    workspace = db.get(Workspace, ws_uuid)
+    if not workspace:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    job = create_bulk_export_job(db, ws_uuid, format)
+    celery_app.send_task("bulk_export", args=[str(job.id)])
+    return job
+
+
+@router.get("/workspaces/{workspace_id}/export/{job_id}")
+def download_workspace_export(
+    workspace_id: str,
+    job_id: str,
+    db: Session = Depends(get_session),
+):
+    """Download the zip written by a completed bulk export job."""
+    from fastapi.responses import FileResponse
+    from app.services.columnar_export import JOB_TYPE_BULK_EXPORT, artifact_path
+    try:
+        ws_uuid = UUID(workspace_id)
+        job_uuid = UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid workspace or job UUID")
+    job = db.get(Job, job_uuid)
+    if not job or job.workspace_id != ws_uuid or job.type != JOB_TYPE_BULK_EXPORT:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job.status != JobStatus.COMPLETED:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Export is {job.status.value if hasattr(job.status, 'value') else job.status}",
+            headers={"X-Error-Code": "EXPORT_NOT_READY"},
+        )
+    path = artifact_path(job.id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Export artifact has expired")
+    filename = (job.result_summary or {}).get("artifact_filename") or f"{job.id}.zip"
+    return FileResponse(path, media_type="application/zip", filename=filename)
@@ -13,7 +13,13 @@ if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
 # 4. Create SYNC Engine (Correct for psycopg2)
-engine = create_engine(DATABASE_URL, echo=False)
+# Gevent workers run many tasks per process; size the pool to their concurrency (DB_POOL_SIZE)
+_pool_options = {
+    key: int(os.environ[env])
+    for key, env in (("pool_size", "DB_POOL_SIZE"), ("max_overflow", "DB_MAX_OVERFLOW"))
+    if os.environ.get(env)
+}
+engine = create_engine(DATABASE_URL, echo=False, **_pool_options)
 
 # 5. Dependency for FastAPI
 def get_session():
@@ -1,16 +1,55 @@
 """
 Reddit thread extraction: OP + top comments (id, author, score, body, permalink).
-Uses Reddit's public .json endpoint (no API key).
+Uses Reddit's public .json endpoint (no API key). "more" stubs are expanded via
+/api/morechildren (concurrent, rate-limited) until the comment budget is reached.
 """
-from typing import Dict, Any, List
+import heapq
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
 import requests
 
+HEADERS = {"User-Agent": "ArtifactOS/1.0 (research)"}
+MORECHILDREN_URL = "https://www.reddit.com/api/morechildren.json"
+# Reddit accepts at most 100 ids per morechildren call
+MORECHILDREN_BATCH = 100
 
-def extract_reddit(url: str) -> Dict[str, Any]:
+
+def _comment_budget() -> int:
+    """Max comments collected per thread, including expanded "more" stubs (REDDIT_COMMENT_BUDGET)."""
+    return int(os.environ.get("REDDIT_COMMENT_BUDGET", "500"))
+
+
+def _top_comments() -> int:
+    """Comments kept for extraction, highest score first, out of those collected (REDDIT_TOP_COMMENTS)."""
+    return int(os.environ.get("REDDIT_TOP_COMMENTS", "100"))
+
+
+class _RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate_per_s: float):
+        self.interval = 1.0 / rate_per_s if rate_per_s > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def extract_reddit(url: str, comment_budget: Optional[int] = None, top_n: Optional[int] = None) -> Dict[str, Any]:
     """
     Fetch thread via Reddit JSON and return structured data.
     Returns: title, op_text, comments[] (id, author, score, body, permalink), thread_url.
+    comments holds the top_n (REDDIT_TOP_COMMENTS) by score out of up to comment_budget collected.
     """
     result: Dict[str, Any] = {
         "title": "",
@@ -18,13 +57,14 @@ def extract_reddit(url: str) -> Dict[str, Any]:
         "comments": [],
         "thread_url": _normalize_reddit_url(url),
     }
+    budget = comment_budget if comment_budget is not None else _comment_budget()
+    top_n = top_n if top_n is not None else _top_comments()
     json_url = url.rstrip("/") + ".json" if "?.json" not in url else url
     if not json_url.endswith(".json"):
         json_url = json_url + ".json"
 
     try:
-        headers = {"User-Agent": "ArtifactOS/1.0 (research)"}
-        resp = requests.get(json_url, headers=headers, timeout=15)
+        resp = requests.get(json_url, headers=HEADERS, params={"limit": min(budget, 500)}, timeout=15)
         resp.raise_for_status()
         data = resp.json()
     except Exception as e:
@@ -45,10 +85,14 @@ def extract_reddit(url: str) -> Dict[str, Any]:
         # Comments: second item in list is comment tree
         if len(data) > 1:
             comment_children = data[1].get("data", {}).get("children", [])
-            comments_flat = _flatten_comments(comment_children, result["thread_url"])
+            comments_flat, more_ids = _walk_comments(comment_children, result["thread_url"])
+            if more_ids and len(comments_flat) < budget and op.get("name"):
+                comments_flat.extend(
+                    _expand_more(op["name"], more_ids, result["thread_url"], budget - len(comments_flat))
+                )
+            comments_flat = comments_flat[:budget]
             # Top N by score
-            comments_flat.sort(key=lambda c: c.get("score", 0), reverse=True)
-            result["comments"] = comments_flat[:20]
+            result["comments"] = heapq.nlargest(top_n, comments_flat, key=lambda c: c.get("score", 0))
     except Exception as e:
         print(f"⚠️ Reddit parse failed: {e}")
 
@@ -78,24 +122,87 @@ def _normalize_reddit_url(url: str) -> str:
     return url
 
 
-def _flatten_comments(children: List[Dict], thread_url: str) -> List[Dict[str, Any]]:
+def _comment_record(data: Dict[str, Any], thread_url: str) -> Dict[str, Any]:
+    link = data.get("permalink", "")
+    full_url = ("https://www.reddit.com" + link) if link.startswith("/") else link
+    return {
+        "id": data.get("id", ""),
+        "author": data.get("author", ""),
+        "score": data.get("score", 0),
+        "body": (data.get("body") or "").strip(),
+        "permalink": full_url or thread_url,
+    }
+
+
+def _walk_comments(children: List[Dict], thread_url: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Iteratively flatten a comment tree (depth-first, document order; no recursion limit).
+    Returns (comments, ids of unexpanded "more" children).
+    """
     out: List[Dict[str, Any]] = []
-    for node in children:
+    more_ids: List[str] = []
+    stack = list(reversed(children))
+    while stack:
+        node = stack.pop()
         kind = node.get("kind")
         data = node.get("data", {})
+        if kind == "more":
+            more_ids.extend(data.get("children") or [])
+            continue
         if kind == "t1" and data.get("body"):
-            link = data.get("permalink", "")
-            full_url = ("https://www.reddit.com" + link) if link.startswith("/") else link
-            out.append({
-                "id": data.get("id", ""),
-                "author": data.get("author", ""),
-                "score": data.get("score", 0),
-                "body": (data.get("body") or "").strip(),
-                "permalink": full_url or thread_url,
-            })
+            out.append(_comment_record(data, thread_url))
         replies = data.get("replies")
         if isinstance(replies, dict) and "data" in replies:
-            out.extend(_flatten_comments(replies["data"].get("children", []), thread_url))
+            stack.extend(reversed(replies["data"].get("children", [])))
         elif isinstance(replies, list):
-            out.extend(_flatten_comments(replies, thread_url))
+            stack.extend(reversed(replies))
+    return out, more_ids
+
+
+def _flatten_comments(children: List[Dict], thread_url: str) -> List[Dict[str, Any]]:
+    return _walk_comments(children, thread_url)[0]
+
+
+def _fetch_more_children(link_name: str, ids: List[str], limiter: _RateLimiter) -> List[Dict]:
+    """One /api/morechildren call; returns flat things (t1 comments and nested "more" stubs)."""
+    limiter.wait()
+    try:
+        resp = requests.get(
+            MORECHILDREN_URL,
+            headers=HEADERS,
+            params={"api_type": "json", "link_id": link_name, "children": ",".join(ids)},
+            timeout=15,
+        )
+        resp.raise_for_status()
+        return resp.json().get("json", {}).get("data", {}).get("things", []) or []
+    except Exception as e:
+        print(f"⚠️ Reddit morechildren failed: {e}")
+        return []
+
+
+def _expand_more(link_name: str, more_ids: List[str], thread_url: str, budget: int) -> List[Dict[str, Any]]:
+    """
+    Expand "more" stubs breadth-first, up to budget comments. Each round fetches its
+    batches concurrently (REDDIT_MORE_CONCURRENCY threads) under a shared rate limit
+    (REDDIT_REQUESTS_PER_SECOND); stubs returned by a round feed the next one.
+    """
+    concurrency = int(os.environ.get("REDDIT_MORE_CONCURRENCY", "4"))
+    limiter = _RateLimiter(float(os.environ.get("REDDIT_REQUESTS_PER_SECOND", "1")))
+    out: List[Dict[str, Any]] = []
+    seen = set()
+    pending = list(more_ids)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while pending and len(out) < budget:
+            # Request no more ids than the remaining budget can hold
+            ids = [i for i in dict.fromkeys(pending) if i not in seen][: budget - len(out)]
+            seen.update(ids)
+            batches = [ids[i:i + MORECHILDREN_BATCH] for i in range(0, len(ids), MORECHILDREN_BATCH)]
+            pending = []
+            for things in pool.map(lambda batch: _fetch_more_children(link_name, batch, limiter), batches):
+                for thing in things:
+                    data = thing.get("data", {})
+                    if thing.get("kind") == "more":
+                        pending.extend(data.get("children") or [])
+                    elif thing.get("kind") == "t1" and data.get("body") and len(out) < budget:
+                        out.append(_comment_record(data, thread_url))
     return out
@@ -3,6 +3,7 @@ YouTube transcript extraction: title, channel, segments (start_s, end_s, text),
 Uses youtube-transcript-api when available (no API key). Captions-only; no audio download.
 Tests must use a fixture-based provider; do not rely on live YouTube (see .cursorrules).
 """
+import os
 from typing import Any, Dict, List, Optional, Protocol, runtime_checkable
 
 from urllib.parse import urlparse, parse_qs
@@ -10,13 +11,29 @@ from urllib.parse import urlparse, parse_qs
 
 @runtime_checkable
 class YouTubeTranscriptProvider(Protocol):
-    """Interface for transcript fetching. Default = real API; tests = fixture-based (no network)."""
+    """
+    Interface for transcript fetching. Default = real API; tests = fixture-based (no network).
+    Providers may also implement get_metadata(video_id) -> {title, channel}; otherwise oEmbed is used.
+    """
 
     def get_transcript(self, video_id: str) -> Optional[List[Dict[str, Any]]]:
         """Return raw segments [{start, duration, text}] or None if captions unavailable."""
         ...
 
 
+def fetch_oembed_metadata(video_url: str) -> Dict[str, str]:
+    """Title/channel from YouTube oEmbed (no key). Empty strings when unavailable."""
+    try:
+        import requests
+        r = requests.get(f"https://www.youtube.com/oembed?url={video_url}", timeout=5)
+        if r.ok:
+            j = r.json()
+            return {"title": j.get("title", ""), "channel": j.get("author_name", "")}
+    except Exception:
+        pass
+    return {"title": "", "channel": ""}
+
+
 class DefaultTranscriptProvider:
     """Real captions fetcher (youtube-transcript-api). Use in production only."""
 
@@ -28,15 +45,24 @@ class DefaultTranscriptProvider:
             print(f"⚠️ YouTube transcript failed: {e}")
             return None
 
+    def get_metadata(self, video_id: str) -> Dict[str, str]:
+        return fetch_oembed_metadata(f"https://www.youtube.com/watch?v={video_id}")
+
 
 _default_provider: Optional[YouTubeTranscriptProvider] = None
 
 
 def get_default_transcript_provider() -> YouTubeTranscriptProvider:
-    """Default provider = real captions fetcher. Tests must inject a fixture-based provider."""
+    """
+    Default provider = real captions fetcher behind the shared video-id cache
+    (YOUTUBE_CACHE_ENABLED=false to bypass). Tests must inject a fixture-based provider.
+    """
     global _default_provider
     if _default_provider is None:
         _default_provider = DefaultTranscriptProvider()
+        if os.environ.get("YOUTUBE_CACHE_ENABLED", "true").lower() == "true":
+            from app.extractors.youtube_cache import CachedTranscriptProvider
+            _default_provider = CachedTranscriptProvider(_default_provider)
     return _default_provider
 
 
@@ -75,17 +101,11 @@ def extract_youtube(
         })
     result["transcript"] = segments
 
-    # Optional: fetch title/channel from oEmbed or page (no key)
-    try:
-        import requests
-        oembed_url = f"https://www.youtube.com/oembed?url={result['video_url']}"
-        r = requests.get(oembed_url, timeout=5)
-        if r.ok:
-            j = r.json()
-            result["title"] = j.get("title", "")
-            result["channel"] = j.get("author_name", "")
-    except Exception:
-        pass
+    # Title/channel: provider may serve cached metadata; otherwise oEmbed (no key)
+    get_metadata = getattr(provider, "get_metadata", None)
+    metadata = get_metadata(video_id) if callable(get_metadata) else fetch_oembed_metadata(result["video_url"])
+    result["title"] = metadata.get("title", "")
+    result["channel"] = metadata.get("channel", "")
 
     if not result["title"]:
         result["title"] = f"YouTube video {video_id}"
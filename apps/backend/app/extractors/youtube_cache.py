@@ -0,0 +1,95 @@
+"""
+Shared YouTube captions/metadata cache keyed by video id (youtube_cache table).
+Wraps any YouTubeTranscriptProvider, so a video ingested in one project is not
+fetched again for another. Entries expire after a TTL; the table is capped at
+max_entries by evicting the least recently used rows.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlmodel import Session
+
+from app.extractors.youtube import YouTubeTranscriptProvider, fetch_oembed_metadata
+from app.models import YouTubeCacheEntry
+from app.utils.table_cache import is_fresh, save_entry, touch_entry
+
+DEFAULT_TTL_HOURS = 24 * 7
+DEFAULT_MAX_ENTRIES = 5000
+
+
+class CachedTranscriptProvider:
+    """YouTubeTranscriptProvider backed by the youtube_cache table; misses go to the wrapped provider."""
+
+    def __init__(
+        self,
+        inner: YouTubeTranscriptProvider,
+        ttl: Optional[timedelta] = None,
+        max_entries: Optional[int] = None,
+        engine=None,
+    ):
+        self.inner = inner
+        if ttl is None:
+            ttl = timedelta(hours=float(os.environ.get("YOUTUBE_CACHE_TTL_HOURS", DEFAULT_TTL_HOURS)))
+        if max_entries is None:
+            max_entries = int(os.environ.get("YOUTUBE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._engine = engine
+
+    def _session(self) -> Session:
+        if self._engine is None:
+            from app.db.session import engine
+            self._engine = engine
+        return Session(self._engine)
+
+    def _fresh_entry(self, db: Session, video_id: str) -> Optional[YouTubeCacheEntry]:
+        entry = db.get(YouTubeCacheEntry, video_id)
+        if entry and is_fresh(entry.fetched_at, self.ttl):
+            return entry
+        return None
+
+    def get_transcript(self, video_id: str) -> Optional[List[Dict[str, Any]]]:
+        with self._session() as db:
+            entry = self._fresh_entry(db, video_id)
+            if entry and entry.transcript:
+                transcript = entry.transcript
+                touch_entry(db, entry)
+                return transcript
+
+        transcript = self.inner.get_transcript(video_id)
+        if transcript:
+            # Refetched captions restart the TTL; stale metadata is dropped with them
+            self._store(video_id, transcript=transcript, title=None, channel=None)
+        return transcript
+
+    def get_metadata(self, video_id: str) -> Dict[str, str]:
+        with self._session() as db:
+            entry = self._fresh_entry(db, video_id)
+            if entry and entry.title:
+                metadata = {"title": entry.title, "channel": entry.channel or ""}
+                touch_entry(db, entry)
+                return metadata
+
+        get_metadata = getattr(self.inner, "get_metadata", None)
+        metadata = (
+            get_metadata(video_id) if callable(get_metadata)
+            else fetch_oembed_metadata(f"https://www.youtube.com/watch?v={video_id}")
+        )
+        if metadata.get("title"):
+            self._store(video_id, title=metadata["title"], channel=metadata.get("channel", ""))
+        return metadata
+
+    def _store(self, video_id: str, **fields: Any) -> None:
+        now = datetime.now(timezone.utc)
+        with self._session() as db:
+            entry = db.get(YouTubeCacheEntry, video_id)
+            if entry is None:
+                entry = YouTubeCacheEntry(video_id=video_id, fetched_at=now)
+            elif "transcript" in fields:
+                entry.fetched_at = now
+            for key, value in fields.items():
+                setattr(entry, key, value)
+            entry.last_used_at = now
+            # If another worker cached the same video first, its entry is kept
+            save_entry(db, entry, self.max_entries)
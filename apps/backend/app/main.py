@@ -3,12 +3,14 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 from typing import Optional, List
 from sqlmodel import Session, select, SQLModel
 from app.api import ingest, projects, sources, test_helpers, workspaces
 from app.models import ResearchNode, ReviewStatus, Job, Workspace, SciraUsage
 from app.db.session import engine
+from app.services.media_store import MEDIA_UPLOAD_DIR
 import os
 import uuid
 import json
@@ -49,8 +51,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# --- COMPRESSION ---
+# Large JSON bodies (source content, facts lists, exports) are gzip-compressed when the client accepts it
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # --- GLOBAL ERROR LOGGING ---
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -79,8 +86,8 @@ app.include_router(sources.router,  prefix="/api/v1", tags=["Sources"])
 app.include_router(test_helpers.router, prefix="/api/v1", tags=["Test Helpers"])
 app.include_router(workspaces.router, prefix="/api/v1", tags=["Workspaces"])
 
-# Ensure temp directory exists
-UPLOAD_DIR = "/tmp/research_uploads"
+# Ensure upload directory exists
+UPLOAD_DIR = MEDIA_UPLOAD_DIR
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 # --- GLOBAL SCHEMAS ---
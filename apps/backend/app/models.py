@@ -3,7 +3,7 @@ from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
 from enum import Enum
 from sqlmodel import SQLModel, Field, Relationship, JSON, UniqueConstraint
-from sqlalchemy import Text, Column, ForeignKey
+from sqlalchemy import Text, Column, ForeignKey, Index, column
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
 # --- Enums ---
@@ -65,6 +65,11 @@ class Project(SQLModel, table=True):
 
 class SourceDoc(SQLModel, table=True):
     __tablename__ = "source_docs"
+    __table_args__ = (
+        # Ingest dedup: (project_id, canonical_url) then (project_id, url)
+        Index("ix_source_docs_project_id_canonical_url", "project_id", "canonical_url"),
+        Index("ix_source_docs_project_id_url", "project_id", "url"),
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     project_id: uuid.UUID = Field(foreign_key="projects.id", index=True)
     workspace_id: uuid.UUID = Field(foreign_key="workspaces.id")
@@ -93,11 +98,24 @@ class SourceDoc(SQLModel, table=True):
     
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+# Fact listings only read unsuppressed facts unless asked otherwise
+_UNSUPPRESSED = column("is_suppressed").is_not(True)
+
+
 class ResearchNode(SQLModel, table=True):
     __tablename__ = "research_nodes"
+    __table_args__ = (
+        # Partial indexes for the fact list: filter by project (+ review status), sort by date or confidence
+        Index("ix_research_nodes_listing_created_at", "project_id", "created_at",
+              postgresql_where=_UNSUPPRESSED, sqlite_where=_UNSUPPRESSED),
+        Index("ix_research_nodes_listing_review_status", "project_id", "review_status", "created_at",
+              postgresql_where=_UNSUPPRESSED, sqlite_where=_UNSUPPRESSED),
+        Index("ix_research_nodes_listing_confidence", "project_id", "confidence_score",
+              postgresql_where=_UNSUPPRESSED, sqlite_where=_UNSUPPRESSED),
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     project_id: uuid.UUID = Field(foreign_key="projects.id", index=True)
-    source_doc_id: uuid.UUID = Field(foreign_key="source_docs.id")
+    source_doc_id: uuid.UUID = Field(foreign_key="source_docs.id", index=True)
     
     type: NodeType = Field(default=NodeType.FACT)
     
@@ -173,6 +191,131 @@ class Job(SQLModel, table=True):
     
     project: Optional[Project] = Relationship(back_populates="jobs")
 
+class TranscriptChunk(SQLModel, table=True):
+    """Transcript of one silence-bounded chunk of an uploaded media file (resume point for long media)."""
+    __tablename__ = "transcript_chunks"
+    __table_args__ = (UniqueConstraint("job_id", "chunk_index", name="unique_transcript_chunk"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    job_id: uuid.UUID = Field(
+        sa_column=Column(
+            PG_UUID(as_uuid=True),
+            ForeignKey("jobs.id", ondelete="CASCADE", name="transcript_chunks_job_id_fkey"),
+            nullable=False,
+            index=True,
+        ),
+    )
+    chunk_index: int
+    start_s: float
+    end_s: float
+    # [{start_s, end_s, text}] with timestamps already offset to the full file
+    segments: List[Dict[str, Any]] = Field(default_factory=list, sa_type=JSON)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class MediaTranscript(SQLModel, table=True):
+    """Workspace-wide transcript cache keyed by the SHA-256 of the raw media bytes."""
+    __tablename__ = "media_transcripts"
+    __table_args__ = (UniqueConstraint("workspace_id", "sha256", name="unique_media_transcript"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    workspace_id: uuid.UUID = Field(
+        sa_column=Column(
+            PG_UUID(as_uuid=True),
+            ForeignKey("workspaces.id", ondelete="CASCADE", name="media_transcripts_workspace_id_fkey"),
+            nullable=False,
+        ),
+    )
+    sha256: str
+    model: Optional[str] = None  # Whisper model that produced the transcript
+    segments: List[Dict[str, Any]] = Field(default_factory=list, sa_type=JSON)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class LLMBatchRequest(SQLModel, table=True):
+    """One extraction chunk queued for (or answered by) a provider batch; jobs with extraction_mode="batch"."""
+    __tablename__ = "llm_batch_requests"
+    __table_args__ = (UniqueConstraint("job_id", "chunk_index", name="unique_llm_batch_request"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)  # batch custom_id
+    job_id: uuid.UUID = Field(
+        sa_column=Column(
+            PG_UUID(as_uuid=True),
+            ForeignKey("jobs.id", ondelete="CASCADE", name="llm_batch_requests_job_id_fkey"),
+            nullable=False,
+            index=True,
+        ),
+    )
+    source_doc_id: uuid.UUID = Field(
+        sa_column=Column(
+            PG_UUID(as_uuid=True),
+            ForeignKey("source_docs.id", ondelete="CASCADE", name="llm_batch_requests_source_doc_id_fkey"),
+            nullable=False,
+        ),
+    )
+    chunk_index: int
+    chunk_text: str = Field(sa_column=Column(Text))  # for quote checks when the reply arrives
+    body: Dict[str, Any] = Field(default_factory=dict, sa_type=JSON)  # chat completion request
+    status: str = Field(default="PENDING", index=True)  # PENDING | SUBMITTED | DONE | FAILED
+    batch_id: Optional[str] = Field(default=None, index=True)
+    # {"facts": [ExtractedFact...], "summary_brief": [...]} once DONE
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_type=JSON)
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    submitted_at: Optional[datetime] = None
+
+
+class YouTubeCacheEntry(SQLModel, table=True):
+    """Captions + oEmbed metadata by video id, shared across projects (TTL + LRU-bounded)."""
+    __tablename__ = "youtube_cache"
+
+    video_id: str = Field(primary_key=True)
+    # Raw provider segments [{start, duration, text}]
+    transcript: Optional[List[Dict[str, Any]]] = Field(default=None, sa_type=JSON)
+    title: Optional[str] = None
+    channel: Optional[str] = None
+    fetched_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_used_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
+
+
+class SynthesisCacheEntry(SQLModel, table=True):
+    """Synthesis Output reused for an identical fact selection + mode (TTL + LRU-bounded)."""
+    __tablename__ = "synthesis_cache"
+
+    # sha256 of project, sorted fact ids/texts, mode and prompt version
+    key: str = Field(primary_key=True)
+    project_id: uuid.UUID = Field(
+        sa_column=Column(
+            PG_UUID(as_uuid=True),
+            ForeignKey("projects.id", ondelete="CASCADE", name="synthesis_cache_project_id_fkey"),
+            nullable=False,
+            index=True,
+        ),
+    )
+    output_id: uuid.UUID = Field(
+        sa_column=Column(
+            PG_UUID(as_uuid=True),
+            ForeignKey("outputs.id", ondelete="CASCADE", name="synthesis_cache_output_id_fkey"),
+            nullable=False,
+        ),
+    )
+    clusters: Optional[List[Dict[str, Any]]] = Field(default=None, sa_type=JSON)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_used_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
+
+
+class SearchCacheEntry(SQLModel, table=True):
+    """Search provider results by normalized query, shared across projects (TTL + LRU-bounded)."""
+    __tablename__ = "search_cache"
+
+    # sha256 of provider, normalized query and limit
+    key: str = Field(primary_key=True)
+    # [{url, title, snippet}] in provider order
+    results: List[Dict[str, Any]] = Field(default_factory=list, sa_type=JSON)
+    fetched_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_used_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
+
+
 class SciraUsage(SQLModel, table=True):
     """Per-project rate limit for Scira query ingest (one row per project)."""
     __tablename__ = "scira_usage"
@@ -187,7 +330,12 @@ class SciraUsage(SQLModel, table=True):
 
 
 class IngestRule(SQLModel, table=True):
-    """Auto-ingest rules (V4): folder_watch, rss_ingest, scheduled_url. Worker picks up in V4b."""
+    """
+    Auto-ingest rules (V4): folder_watch, rss_ingest, scheduled_url.
+    scheduled_url rules run from celery beat when next_run_at is due; folder_watch rules are
+    held by a watcher process (app/workers/folder_watch.py). Either way a rule is leased
+    (lease_owner until lease_expires_at) so two nodes never run it at once.
+    """
     __tablename__ = "ingest_rules"
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     project_id: uuid.UUID = Field(foreign_key="projects.id", index=True)
@@ -195,6 +343,11 @@ class IngestRule(SQLModel, table=True):
     config_json: Dict[str, Any] = Field(default_factory=dict, sa_type=JSON)
     enabled: bool = Field(default=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    next_run_at: Optional[datetime] = Field(default=None, index=True)
+    last_run_at: Optional[datetime] = None
+    last_result: Dict[str, Any] = Field(default_factory=dict, sa_type=JSON)
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
 
 
 class UserPreference(SQLModel, table=True):
@@ -0,0 +1,45 @@
+"""Brave Search provider (production). Uses requests; no extra dependency."""
+import os
+import requests
+from requests.adapters import HTTPAdapter
+from app.search.provider import SearchResult
+
+# One pooled session per process: keep-alive connections to the API are reused across searches
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+
+
+def _get_api_key() -> str | None:
+    return os.environ.get("BRAVE_SEARCH_API_KEY")
+
+
+class BraveSearchProvider:
+    """Web search via Brave Search API (GET https://api.search.brave.com/res/v1/web/search)."""
+    name = "brave"
+
+    def __init__(self, api_key: str | None = None, base_url: str = "https://api.search.brave.com"):
+        self.api_key = api_key or _get_api_key()
+        self.base_url = base_url.rstrip("/")
+
+    def search(self, query: str, limit: int = 5) -> list[SearchResult]:
+        if not self.api_key:
+            raise ValueError("BRAVE_SEARCH_API_KEY is not set")
+        limit = max(1, min(limit, 20))
+        resp = _http.get(
+            f"{self.base_url}/res/v1/web/search",
+            headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
+            params={"q": query, "count": limit},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        results = (data.get("web") or {}).get("results") or []
+        return [
+            SearchResult(
+                url=item.get("url", ""),
+                title=item.get("title"),
+                snippet=item.get("description"),
+            )
+            for item in results[:limit]
+            if item.get("url")
+        ]
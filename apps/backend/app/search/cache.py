@@ -0,0 +1,79 @@
+"""
+Shared search results cache keyed by normalized query (search_cache table). Wraps any
+SearchProvider, so the same query from several projects or a retried request does not hit
+the search API again. Entries expire after a TTL; the table is capped at max_entries by
+evicting the least recently used rows.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlmodel import Session
+
+from app.models import SearchCacheEntry
+from app.search.provider import SearchProvider, SearchResult
+from app.utils.table_cache import is_fresh, save_entry, touch_entry
+
+DEFAULT_TTL_HOURS = 6
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query."""
+    return " ".join((query or "").lower().split())
+
+
+def search_cache_key(provider: str, query: str, limit: int) -> str:
+    payload = json.dumps({"provider": provider, "query": normalize_query(query), "limit": limit}, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedSearchProvider:
+    """SearchProvider backed by the search_cache table; misses go to the wrapped provider."""
+
+    def __init__(
+        self,
+        inner: SearchProvider,
+        ttl: Optional[timedelta] = None,
+        max_entries: Optional[int] = None,
+        engine=None,
+    ):
+        self.inner = inner
+        if ttl is None:
+            ttl = timedelta(hours=float(os.environ.get("SEARCH_CACHE_TTL_HOURS", DEFAULT_TTL_HOURS)))
+        if max_entries is None:
+            max_entries = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._engine = engine
+
+    def _session(self) -> Session:
+        if self._engine is None:
+            from app.db.session import engine
+            self._engine = engine
+        return Session(self._engine)
+
+    def search(self, query: str, limit: int = 5) -> list[SearchResult]:
+        key = search_cache_key(getattr(self.inner, "name", type(self.inner).__name__), query, limit)
+        with self._session() as db:
+            entry = db.get(SearchCacheEntry, key)
+            if entry and is_fresh(entry.fetched_at, self.ttl):
+                results = [SearchResult(**item) for item in entry.results]
+                touch_entry(db, entry)
+                return results
+
+        results = self.inner.search(query, limit=limit)
+        self._store(key, results)
+        return results
+
+    def _store(self, key: str, results: list[SearchResult]) -> None:
+        now = datetime.now(timezone.utc)
+        with self._session() as db:
+            entry = db.get(SearchCacheEntry, key) or SearchCacheEntry(key=key)
+            entry.results = [{"url": r.url, "title": r.title, "snippet": r.snippet} for r in results]
+            entry.fetched_at = now
+            entry.last_used_at = now
+            # If another request cached the same query first, its entry is kept
+            save_entry(db, entry, self.max_entries)
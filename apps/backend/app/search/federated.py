@@ -0,0 +1,116 @@
+"""
+Federated search: one query fanned out to several SearchProviders at once. Each provider
+gets its own timeout; a slow or failing provider is dropped instead of holding up the rest.
+Results are merged by rank (round-robin in provider order) and deduplicated by the
+normalized URL. Once the finished providers cover the limit the search returns early, but
+only after a second provider has answered (or failed/timed out) or a short grace period has
+passed: one fast provider alone easily fills a small limit, and the merged results are cached.
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Sequence
+
+import requests
+
+from app.extractors import detect_source_type, normalize_url
+from app.search.provider import SearchProvider, SearchResult
+
+DEFAULT_PROVIDER_TIMEOUT_SECONDS = float(os.environ.get("SEARCH_PROVIDER_TIMEOUT_SECONDS", "8"))
+# How long the other providers still get once the first responders cover the limit
+DEFAULT_GRACE_SECONDS = float(os.environ.get("SEARCH_FEDERATED_GRACE_SECONDS", "1.5"))
+
+# Shared across searches so a provider that outlives its timeout finishes in the background
+# instead of blocking the request on executor shutdown
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="search")
+
+
+def _provider_name(provider: SearchProvider) -> str:
+    return getattr(provider, "name", type(provider).__name__)
+
+
+def merge_results(ranked: Sequence[List[SearchResult]], limit: int) -> List[SearchResult]:
+    """Interleave result lists by rank, keeping the first result per normalized URL."""
+    merged: List[SearchResult] = []
+    seen: set[str] = set()
+    for rank in range(max((len(r) for r in ranked), default=0)):
+        for results in ranked:
+            if rank >= len(results) or not results[rank].url:
+                continue
+            url = results[rank].url
+            key = normalize_url(url, detect_source_type(url))
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(results[rank])
+            if len(merged) >= limit:
+                return merged
+    return merged
+
+
+class FederatedSearchProvider:
+    """SearchProvider that queries `providers` concurrently and merges their results."""
+
+    def __init__(
+        self,
+        providers: Sequence[SearchProvider],
+        timeout_s: float = DEFAULT_PROVIDER_TIMEOUT_SECONDS,
+        timeouts: Optional[Dict[str, float]] = None,
+        grace_s: float = DEFAULT_GRACE_SECONDS,
+    ):
+        if not providers:
+            raise ValueError("FederatedSearchProvider needs at least one provider")
+        self.providers = list(providers)
+        self.timeout_s = timeout_s
+        # Per-provider overrides by provider name
+        self.timeouts = timeouts or {}
+        self.grace_s = grace_s
+        self.name = "federated:" + ",".join(_provider_name(p) for p in self.providers)
+
+    def search(self, query: str, limit: int = 5) -> list[SearchResult]:
+        start = time.monotonic()
+        futures: Dict[Future, int] = {}
+        deadlines: Dict[Future, float] = {}
+        for i, provider in enumerate(self.providers):
+            future = _executor.submit(provider.search, query, limit)
+            futures[future] = i
+            deadlines[future] = start + self.timeouts.get(_provider_name(provider), self.timeout_s)
+
+        ranked: List[List[SearchResult]] = [[] for _ in self.providers]
+        errors: List[Exception] = []
+        succeeded = 0
+        pending = set(futures)
+        # Set once the results cover the limit; the rest get until covered_at + grace_s
+        covered_at: Optional[float] = None
+        while pending:
+            now = time.monotonic()
+            expired = {f for f in pending if deadlines[f] <= now}
+            for future in expired:
+                future.cancel()
+                print(f"Search provider {_provider_name(self.providers[futures[future]])} timed out")
+            pending -= expired
+            if not pending:
+                break
+            wake_at = min(deadlines[f] for f in pending)
+            if covered_at is not None:
+                if now >= covered_at + self.grace_s:
+                    break
+                wake_at = min(wake_at, covered_at + self.grace_s)
+            done, pending = wait(pending, timeout=wake_at - now, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    ranked[futures[future]] = future.result()
+                    succeeded += 1
+                except Exception as e:
+                    print(f"Search provider {_provider_name(self.providers[futures[future]])} failed: {e}")
+                    errors.append(e)
+            if len(merge_results(ranked, limit)) >= limit:
+                if len(self.providers) - len(pending) >= min(2, len(self.providers)):
+                    break
+                covered_at = covered_at or time.monotonic()
+
+        if not succeeded:
+            if errors:
+                raise errors[-1]
+            raise requests.exceptions.Timeout("All search providers timed out")
+        return merge_results(ranked, limit)
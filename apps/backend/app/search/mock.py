@@ -12,6 +12,7 @@ MOCK_SEARCH_URLS = [
 
 class MockSearchProvider:
     """Returns a fixed list of URLs; no network calls."""
+    name = "mock"
 
     def __init__(self, urls: list[str] | None = None):
         self.urls = urls or MOCK_SEARCH_URLS.copy()
@@ -1,8 +1,13 @@
 """Tavily search provider (production). Uses requests; no extra dependency."""
 import os
 import requests
+from requests.adapters import HTTPAdapter
 from app.search.provider import SearchResult
 
+# One pooled session per process: keep-alive connections to the API are reused across searches
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+
 
 def _get_api_key() -> str | None:
     return os.environ.get("TAVILY_API_KEY")
@@ -10,6 +15,8 @@ def _get_api_key() -> str | None:
 
 class TavilySearchProvider:
     """Production search via Tavily API (POST https://api.tavily.com/search)."""
+    name = "tavily"
+
     def __init__(self, api_key: str | None = None, base_url: str = "https://api.tavily.com"):
         self.api_key = api_key or _get_api_key()
         self.base_url = base_url.rstrip("/")
@@ -18,7 +25,7 @@ class TavilySearchProvider:
         if not self.api_key:
             raise ValueError("TAVILY_API_KEY is not set")
         limit = max(1, min(limit, 20))
-        resp = requests.post(
+        resp = _http.post(
             f"{self.base_url}/search",
             headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key}"},
             json={"query": query, "max_results": limit, "search_depth": "basic"},
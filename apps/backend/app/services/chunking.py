@@ -0,0 +1,103 @@
+"""
+Token-aware document chunking for LLM extraction.
+Chunks are contiguous spans of the source (no overlap, nothing dropped) cut at the
+coarsest boundary that fits: section heading (incl. ## [OP] / ## [Comment: ...] /
+## [start-end] markers) > paragraph > line > sentence > hard split.
+"""
+import math
+import os
+import re
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+# Default chunk budget; gpt-4o-mini has room for far more, but per-chunk fact recall drops on huge inputs
+CHUNK_TOKENS = int(os.environ.get("LLM_CHUNK_TOKENS", "4000"))
+TOKEN_ENCODING = "o200k_base"  # gpt-4o family
+
+# Boundaries, coarsest first; a match position is where a new piece starts
+_BOUNDARIES = [
+    re.compile(r"^(?=#{1,6} )", re.M),   # markdown headings and ## [...] markers
+    re.compile(r"(?<=\n)\s*\n"),          # blank line (paragraph)
+    re.compile(r"(?<=\n)"),               # line (keeps table rows whole)
+    re.compile(r"(?<=[.!?])\s+"),         # sentence
+]
+
+Span = Tuple[int, int]
+
+
+@lru_cache(maxsize=1)
+def _encoder():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(TOKEN_ENCODING)
+    except Exception as e:
+        print(f"⚠️ tiktoken unavailable, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Token count for the extraction model (tiktoken); ~4 chars/token when tiktoken is missing."""
+    enc = _encoder()
+    if enc is None:
+        return math.ceil(len(text) / 4)
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def _cut(text: str, start: int, end: int, pattern: re.Pattern) -> List[Span]:
+    cuts = sorted({m.end() if m.end() > m.start() else m.start() for m in pattern.finditer(text, start, end)})
+    bounds = [start] + [c for c in cuts if start < c < end] + [end]
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def _hard_split(text: str, start: int, end: int, max_tokens: int, count: Callable[[str], int]) -> List[Span]:
+    spans = []
+    while start < end:
+        # Shrink the window by the observed chars/token until it fits
+        size = min(end - start, max_tokens * 4)
+        while size > 1 and count(text[start:start + size]) > max_tokens:
+            size = max(1, int(size * max_tokens / count(text[start:start + size]) * 0.95))
+        spans.append((start, start + size))
+        start += size
+    return spans
+
+
+def _pieces(text: str, start: int, end: int, max_tokens: int, count: Callable[[str], int], level: int = 0) -> List[Tuple[int, int, int]]:
+    """(start, end, tokens) pieces covering [start, end), each within max_tokens."""
+    tokens = count(text[start:end])
+    if tokens <= max_tokens:
+        return [(start, end, tokens)]
+    if level >= len(_BOUNDARIES):
+        return [(a, b, count(text[a:b])) for a, b in _hard_split(text, start, end, max_tokens, count)]
+    spans = _cut(text, start, end, _BOUNDARIES[level])
+    if len(spans) == 1:
+        return _pieces(text, start, end, max_tokens, count, level + 1)
+    out = []
+    for a, b in spans:
+        out.extend(_pieces(text, a, b, max_tokens, count, level + 1))
+    return out
+
+
+def chunk_spans(text: str, max_tokens: Optional[int] = None, count: Optional[Callable[[str], int]] = None) -> List[Span]:
+    """
+    Split text into contiguous (start, end) spans of at most max_tokens each.
+    Pieces are packed greedily, so chunk boundaries fall on the coarsest fitting boundary.
+    """
+    if not text:
+        return []
+    max_tokens = max_tokens or CHUNK_TOKENS
+    count = count or count_tokens
+    chunks: List[Span] = []
+    cur_start, cur_end, cur_tokens = 0, 0, 0
+    for start, end, tokens in _pieces(text, 0, len(text), max_tokens, count):
+        if cur_end > cur_start and cur_tokens + tokens > max_tokens:
+            chunks.append((cur_start, cur_end))
+            cur_start, cur_tokens = start, 0
+        cur_end = end
+        cur_tokens += tokens
+    chunks.append((cur_start, cur_end))
+    return chunks
+
+
+def chunk_markdown(text: str, max_tokens: Optional[int] = None, count: Optional[Callable[[str], int]] = None) -> List[str]:
+    """Chunk texts for extraction; "".join(chunks) == text."""
+    return [text[a:b] for a, b in chunk_spans(text, max_tokens, count)]
@@ -0,0 +1,308 @@
+"""
+Columnar exports (Parquet / Arrow IPC) of facts, sources and outputs for analytics.
+Rows are read through a server-side cursor and written as typed record batches, so a
+project or a whole workspace is exported with bounded memory. The workspace-wide bulk
+export runs as a Job (app/workers/export_task.py) and leaves a zip with one file per
+table under EXPORT_DIR. pyarrow is optional: only these formats need it.
+"""
+import io
+import os
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from app.models import Job, JobStatus, Output, Project, ResearchNode, SourceDoc
+
+COLUMNAR_FORMATS = {
+    # format -> (file extension, media type)
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file"),
+}
+EXPORT_TABLES = ("facts", "sources", "outputs")
+
+# Rows per record batch (= Parquet row group)
+RECORD_BATCH_ROWS = 10_000
+
+# Shared by the export worker (writes artifacts) and the API (serves them)
+EXPORT_DIR = os.environ.get("EXPORT_DIR", "/tmp/research_exports")
+
+JOB_TYPE_BULK_EXPORT = "bulk_export"
+JOB_STEP_EXPORTING = "EXPORTING"
+JOB_STEP_DONE = "DONE"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "pyarrow is required for parquet/arrow export. "
+            "Install with: pip install pyarrow"
+        )
+    return pyarrow
+
+
+def columnar_available() -> bool:
+    try:
+        _pyarrow()
+    except ImportError:
+        return False
+    return True
+
+
+def _enum_value(v: Any) -> Optional[str]:
+    return None if v is None else str(v.value if hasattr(v, "value") else v)
+
+
+def _str(v: Any) -> Optional[str]:
+    return None if v is None else str(v)
+
+
+def _utc(v: Optional[datetime]) -> Optional[datetime]:
+    # sqlite hands back naive datetimes
+    return v if v is None or v.tzinfo else v.replace(tzinfo=timezone.utc)
+
+
+# table -> [(column, SQL expression, arrow type, value converter)]
+def _columns(table: str) -> List[Tuple[str, Any, str, Callable[[Any], Any]]]:
+    same = lambda v: v  # noqa: E731
+    if table == "facts":
+        return [
+            ("id", ResearchNode.id, "string", _str),
+            ("project_id", ResearchNode.project_id, "string", _str),
+            ("source_doc_id", ResearchNode.source_doc_id, "string", _str),
+            ("source_domain", SourceDoc.domain, "string", same),
+            ("source_url", ResearchNode.source_url, "string", same),
+            ("fact_text", ResearchNode.fact_text, "string", same),
+            ("quote_text_raw", ResearchNode.quote_text_raw, "string", same),
+            ("evidence_snippet", ResearchNode.evidence_snippet, "string", same),
+            ("section_context", ResearchNode.section_context, "string", same),
+            ("tags", ResearchNode.tags, "list<string>", lambda v: [str(t) for t in v or []]),
+            ("confidence_score", ResearchNode.confidence_score, "int32", same),
+            ("is_key_claim", ResearchNode.is_key_claim, "bool", same),
+            ("review_status", ResearchNode.review_status, "string", _enum_value),
+            ("is_pinned", ResearchNode.is_pinned, "bool", same),
+            ("is_suppressed", ResearchNode.is_suppressed, "bool", same),
+            ("created_at", ResearchNode.created_at, "timestamp", _utc),
+        ]
+    if table == "sources":
+        return [
+            ("id", SourceDoc.id, "string", _str),
+            ("project_id", SourceDoc.project_id, "string", _str),
+            ("url", SourceDoc.url, "string", same),
+            ("canonical_url", SourceDoc.canonical_url, "string", same),
+            ("domain", SourceDoc.domain, "string", same),
+            ("title", SourceDoc.title, "string", same),
+            ("source_type", SourceDoc.source_type, "string", _enum_value),
+            ("content_hash", SourceDoc.content_hash, "string", same),
+            ("created_at", SourceDoc.created_at, "timestamp", _utc),
+        ]
+    if table == "outputs":
+        return [
+            ("id", Output.id, "string", _str),
+            ("project_id", Output.project_id, "string", _str),
+            ("title", Output.title, "string", same),
+            ("output_type", Output.output_type, "string", same),
+            ("mode", Output.mode, "string", same),
+            ("content", Output.content, "string", same),
+            ("fact_ids", Output.fact_ids, "list<string>", lambda v: [str(i) for i in v or []]),
+            ("source_count", Output.source_count, "int32", same),
+            ("is_pinned", Output.is_pinned, "bool", same),
+            ("created_at", Output.created_at, "timestamp", _utc),
+        ]
+    raise ValueError(f"Unknown export table: {table}")
+
+
+def _arrow_type(pa, name: str):
+    return {
+        "string": pa.string(),
+        "int32": pa.int32(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+        "list<string>": pa.list_(pa.string()),
+    }[name]
+
+
+def table_schema(table: str):
+    pa = _pyarrow()
+    return pa.schema([(name, _arrow_type(pa, kind)) for name, _, kind, _ in _columns(table)])
+
+
+def _statement(table: str, project_id: Optional[uuid.UUID], workspace_id: Optional[uuid.UUID]):
+    columns = _columns(table)
+    model = {"facts": ResearchNode, "sources": SourceDoc, "outputs": Output}[table]
+    statement = select(*[expr for _, expr, _, _ in columns])
+    if table == "facts":
+        statement = statement.join(SourceDoc, SourceDoc.id == ResearchNode.source_doc_id, isouter=True)
+    if project_id:
+        statement = statement.where(model.project_id == project_id)
+    else:
+        statement = statement.join(Project, Project.id == model.project_id).where(Project.workspace_id == workspace_id)
+    return statement.order_by(model.created_at.asc(), model.id.asc()).execution_options(yield_per=RECORD_BATCH_ROWS)
+
+
+def iter_record_batches(
+    db: Session,
+    table: str,
+    project_id: Optional[uuid.UUID] = None,
+    workspace_id: Optional[uuid.UUID] = None,
+):
+    """Typed record batches of one table for a project (or every project of a workspace)."""
+    pa = _pyarrow()
+    schema = table_schema(table)
+    converters = [convert for _, _, _, convert in _columns(table)]
+    buffers: List[List[Any]] = [[] for _ in converters]
+
+    def flush():
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(buffers, schema)], schema=schema
+        )
+        for values in buffers:
+            values.clear()
+        return batch
+
+    for row in db.exec(_statement(table, project_id, workspace_id)):
+        for values, convert, value in zip(buffers, converters, row):
+            values.append(convert(value))
+        if len(buffers[0]) >= RECORD_BATCH_ROWS:
+            yield flush()
+    if buffers[0]:
+        yield flush()
+
+
+class _Sink(io.RawIOBase):
+    """Write-only stream for pyarrow writers: forwards bytes to write_fn and reports the position."""
+
+    def __init__(self, write_fn: Callable[[bytes], Any]):
+        self._write_fn = write_fn
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        self._write_fn(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+
+def _open_writer(sink: _Sink, fmt: str, schema):
+    pa = _pyarrow()
+    if fmt == "parquet":
+        return pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    if fmt == "arrow":
+        return pa.ipc.new_file(sink, schema)
+    raise ValueError(f"Unknown columnar format: {fmt}")
+
+
+def iter_table_bytes(
+    db: Session,
+    table: str,
+    fmt: str,
+    project_id: Optional[uuid.UUID] = None,
+    workspace_id: Optional[uuid.UUID] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Iterator[bytes]:
+    """
+    One table as a Parquet or Arrow IPC file, yielded as it is written (a chunk per record
+    batch). stats[table] is set to the row count once the file is complete.
+    """
+    chunks: List[bytes] = []
+    sink = _Sink(chunks.append)
+    rows = 0
+
+    def drain() -> bytes:
+        data = b"".join(chunks)
+        chunks.clear()
+        return data
+
+    writer = _open_writer(sink, fmt, table_schema(table))
+    try:
+        for batch in iter_record_batches(db, table, project_id=project_id, workspace_id=workspace_id):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+            if chunks:
+                yield drain()
+    finally:
+        writer.close()
+    if stats is not None:
+        stats[table] = rows
+    if chunks:
+        yield drain()
+
+
+# --- Workspace bulk export job ---
+
+def artifact_path(job_id: uuid.UUID, root: Optional[str] = None) -> str:
+    return os.path.join(root or EXPORT_DIR, f"{job_id}.zip")
+
+
+def create_bulk_export_job(db: Session, workspace_id: uuid.UUID, fmt: str) -> Job:
+    """Create a PENDING workspace-wide columnar export Job."""
+    job = Job(
+        id=uuid.uuid4(),
+        workspace_id=workspace_id,
+        project_id=None,
+        type=JOB_TYPE_BULK_EXPORT,
+        status=JobStatus.PENDING,
+        idempotency_key=f"workspace:{workspace_id}:export:{uuid.uuid4()}",
+        current_step="QUEUED",
+        steps_completed=0,
+        steps_total=len(EXPORT_TABLES),
+        params={"workspace_id": str(workspace_id), "format": fmt},
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def run_bulk_export_job(db: Session, job: Job, root: Optional[str] = None) -> None:
+    """Write every table of the job's workspace into one zip artifact, committing progress per table."""
+    params = job.params or {}
+    workspace_id = uuid.UUID(params.get("workspace_id") or str(job.workspace_id))
+    fmt = params.get("format", "parquet")
+    ext = COLUMNAR_FORMATS[fmt][0]
+
+    job.status = JobStatus.RUNNING
+    job.current_step = JOB_STEP_EXPORTING
+    job.started_at = datetime.now(timezone.utc)
+    db.add(job)
+    db.commit()
+
+    path = artifact_path(job.id, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.part"
+    rows: Dict[str, int] = {}
+    # Parquet/Arrow are already compressed; store members as-is
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for table in EXPORT_TABLES:
+            with zf.open(f"{table}{ext}", "w", force_zip64=True) as member:
+                for chunk in iter_table_bytes(db, table, fmt, workspace_id=workspace_id, stats=rows):
+                    member.write(chunk)
+            job.steps_completed += 1
+            job.result_summary = {"rows": dict(rows)}
+            db.add(job)
+            db.commit()
+    os.replace(tmp_path, path)
+
+    job.status = JobStatus.COMPLETED
+    job.current_step = JOB_STEP_DONE
+    job.completed_at = datetime.now(timezone.utc)
+    job.result_summary = {
+        "rows": rows,
+        "format": fmt,
+        "artifact_filename": f"workspace-{workspace_id}-{fmt}.zip",
+        "artifact_bytes": os.path.getsize(path),
+    }
+    db.add(job)
+    db.commit()
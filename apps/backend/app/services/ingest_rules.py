@@ -0,0 +1,222 @@
+"""
+Ingest rule execution (V4b). scheduled_url rules are run by the run_due_ingest_rules beat task
+when next_run_at is due; folder_watch rules are held by the watcher process
+(app/workers/folder_watch.py). Rules are claimed with a lease in one conditional UPDATE, so
+several beat/worker/watcher nodes never run the same rule at once. New items go through the
+normal ingest pipeline, at most max_concurrent_jobs unfinished jobs per rule.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models import IngestRule, Job, JobStatus, Project
+from app.services.llm import BULK_EXTRACTION_MODE
+from app.services.media_store import MAX_MEDIA_BYTES, MAX_MEDIA_MB, is_media_file, store_file
+from app.services.url_ingest import BULK_INGEST_MAX_URLS, enqueue_urls, is_http_url
+from app.workers.celery_app import celery_app
+
+RULE_SCHEDULED_URL = "scheduled_url"
+RULE_FOLDER_WATCH = "folder_watch"
+
+# How long a claim is held before another node may take the rule over
+LEASE_SECONDS = int(os.getenv("INGEST_RULE_LEASE_SECONDS", "300"))
+# Unfinished jobs a single rule may have in flight; new items wait for the next run
+DEFAULT_MAX_CONCURRENT_JOBS = int(os.getenv("INGEST_RULE_MAX_CONCURRENT_JOBS", "5"))
+DEFAULT_INTERVAL_MINUTES = 60
+MIN_INTERVAL_MINUTES = 5
+# Rules claimed per beat tick
+CLAIM_BATCH = 50
+# folder_watch paths must resolve inside this directory
+WATCH_ROOT = os.getenv("INGEST_WATCH_ROOT", "/data/watch")
+
+
+def rule_urls(config: Dict[str, Any]) -> List[str]:
+    """scheduled_url targets: config["urls"], or the single "url" of rules created before it was a list."""
+    config = config or {}
+    return config.get("urls") or ([config["url"]] if config.get("url") else [])
+
+
+def validate_rule_config(rule_type: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalized config for a new rule; ValueError with a user-facing message if invalid."""
+    config = dict(config or {})
+    if "max_concurrent_jobs" in config:
+        if not isinstance(config["max_concurrent_jobs"], int) or config["max_concurrent_jobs"] < 1:
+            raise ValueError("max_concurrent_jobs must be a positive integer")
+    if rule_type == RULE_SCHEDULED_URL:
+        urls = rule_urls(config)
+        if not urls or not all(isinstance(u, str) and is_http_url(u.strip()) for u in urls):
+            raise ValueError("scheduled_url needs urls: a list of http(s) URLs")
+        if len(urls) > BULK_INGEST_MAX_URLS:
+            raise ValueError(f"scheduled_url takes at most {BULK_INGEST_MAX_URLS} URLs")
+        interval = config.get("interval_minutes", DEFAULT_INTERVAL_MINUTES)
+        if not isinstance(interval, int) or interval < MIN_INTERVAL_MINUTES:
+            raise ValueError(f"interval_minutes must be an integer >= {MIN_INTERVAL_MINUTES}")
+        config.pop("url", None)
+        config.update(urls=[u.strip() for u in urls], interval_minutes=interval)
+    elif rule_type == RULE_FOLDER_WATCH:
+        path = config.get("path")
+        if not isinstance(path, str) or not path.strip():
+            raise ValueError("folder_watch needs path: a folder under the watch root")
+        root = os.path.realpath(WATCH_ROOT)
+        resolved = os.path.realpath(os.path.join(root, path.strip()))
+        if resolved != root and not resolved.startswith(root + os.sep):
+            raise ValueError("folder_watch path must be inside the watch root")
+        config["path"] = resolved
+    return config
+
+
+def initial_next_run(rule_type: str) -> Optional[datetime]:
+    """Scheduled rules are due right away; watched folders are not scheduled."""
+    return datetime.now(timezone.utc) if rule_type == RULE_SCHEDULED_URL else None
+
+
+def claim_rules(
+    db: Session,
+    rule_type: str,
+    owner: str,
+    due_only: bool = True,
+    limit: int = CLAIM_BATCH,
+) -> List[IngestRule]:
+    """
+    Lease enabled rules of a type (due ones only, if due_only) that are unleased, expired or
+    already ours, and return them. The lease is taken by one UPDATE guarded on the same
+    conditions, so a rule claimed concurrently by another node is simply not returned.
+    """
+    now = datetime.now(timezone.utc)
+    free = or_(IngestRule.lease_owner.is_(None), IngestRule.lease_expires_at < now, IngestRule.lease_owner == owner)
+    conditions = [IngestRule.enabled, IngestRule.type == rule_type, free]
+    if due_only:
+        conditions.append(IngestRule.next_run_at <= now)
+    ids = select(IngestRule.id).where(*conditions).order_by(IngestRule.next_run_at, IngestRule.id).limit(limit)
+    db.exec(
+        update(IngestRule)
+        .where(IngestRule.id.in_(ids), *conditions)
+        .values(lease_owner=owner, lease_expires_at=now + timedelta(seconds=LEASE_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return list(db.exec(select(IngestRule).where(IngestRule.lease_owner == owner, IngestRule.type == rule_type)).all())
+
+
+def release_rule(db: Session, rule: IngestRule) -> None:
+    rule.lease_owner = None
+    rule.lease_expires_at = None
+    db.add(rule)
+    db.commit()
+
+
+def active_rule_jobs(db: Session, rule: IngestRule) -> int:
+    """Jobs created by this rule that have not finished yet."""
+    return db.exec(
+        select(func.count()).select_from(Job).where(
+            Job.project_id == rule.project_id,
+            Job.status.in_([JobStatus.PENDING, JobStatus.RUNNING]),
+            Job.params["rule_id"].as_string() == str(rule.id),
+        )
+    ).one()
+
+
+def rule_capacity(db: Session, rule: IngestRule) -> int:
+    limit = (rule.config_json or {}).get("max_concurrent_jobs") or DEFAULT_MAX_CONCURRENT_JOBS
+    return max(0, limit - active_rule_jobs(db, rule))
+
+
+def run_scheduled_url_rule(db: Session, rule: IngestRule) -> Dict[str, int]:
+    """Queue the rule's URLs not yet in the project (up to its capacity); returns counts by status."""
+    project = db.get(Project, rule.project_id)
+    results = enqueue_urls(
+        db,
+        rule.project_id,
+        project.workspace_id,
+        rule_urls(rule.config_json),
+        extraction_mode=BULK_EXTRACTION_MODE,
+        extra_params={"rule_id": str(rule.id)},
+        max_new=rule_capacity(db, rule),
+    )
+    counts: Dict[str, int] = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return counts
+
+
+def run_due_rules(db: Session, owner: Optional[str] = None) -> int:
+    """Claim and run every due scheduled_url rule, then reschedule it; returns how many ran."""
+    owner = owner or f"beat:{uuid.uuid4()}"
+    rules = claim_rules(db, RULE_SCHEDULED_URL, owner)
+    for rule in rules:
+        now = datetime.now(timezone.utc)
+        try:
+            rule.last_result = run_scheduled_url_rule(db, rule)
+        except Exception as e:
+            db.rollback()
+            rule = db.get(IngestRule, rule.id)
+            rule.last_result = {"error": str(e)[:200]}
+        interval = (rule.config_json or {}).get("interval_minutes") or DEFAULT_INTERVAL_MINUTES
+        rule.last_run_at = now
+        rule.next_run_at = now + timedelta(minutes=interval)
+        release_rule(db, rule)
+    return len(rules)
+
+
+def ingest_watched_file(db: Session, rule: IngestRule, path: str) -> Optional[Dict[str, Any]]:
+    """
+    Queue a settled file from a watched folder through the media pipeline. The file is copied
+    to content-addressed storage; a file with the same bytes already in the project is a
+    duplicate, unless its job failed, which is re-queued (as POST /ingest/file does).
+    Files over MAX_MEDIA_UPLOAD_MB are skipped. Returns None when the rule is at its
+    concurrency cap (retry later).
+    """
+    if not is_media_file(path) or not os.path.isfile(path):
+        return {"status": "skipped"}
+    if os.path.getsize(path) > MAX_MEDIA_BYTES:
+        print(f"⚠️ Skipping {path}: larger than {MAX_MEDIA_MB}MB")
+        return {"status": "too_large"}
+    if rule_capacity(db, rule) <= 0:
+        return None
+    stored = store_file(path)
+    idempotency_key = f"{rule.project_id}:file:{stored.sha256}"
+    existing = db.exec(
+        select(Job).where(Job.project_id == rule.project_id, Job.idempotency_key == idempotency_key)
+    ).first()
+    if existing and existing.status == JobStatus.FAILED:
+        # Same bytes failed before: re-run that job (finished transcript chunks are kept)
+        existing.status = JobStatus.PENDING
+        existing.current_step = "QUEUED"
+        existing.result_summary = {}
+        existing.params = {**(existing.params or {}), "path": stored.path, "filename": os.path.basename(path)}
+        db.add(existing)
+        db.commit()
+        celery_app.send_task("ingest_media", args=[str(existing.id)])
+        return {"status": "queued", "job_id": str(existing.id)}
+    if existing:
+        return {"status": "duplicate", "job_id": str(existing.id)}
+    project = db.get(Project, rule.project_id)
+    job = Job(
+        project_id=rule.project_id,
+        workspace_id=project.workspace_id,
+        type="file_ingest",
+        status=JobStatus.PENDING,
+        idempotency_key=idempotency_key,
+        params={
+            "filename": os.path.basename(path),
+            "path": stored.path,
+            "sha256": stored.sha256,
+            "size_bytes": stored.size_bytes,
+            "source_type": "MEDIA",
+            "rule_id": str(rule.id),
+        },
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Same bytes uploaded to the project meanwhile
+        db.rollback()
+        return {"status": "duplicate"}
+    celery_app.send_task("ingest_media", args=[str(job.id)])
+    return {"status": "queued", "job_id": str(job.id)}
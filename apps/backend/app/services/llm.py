@@ -1,18 +1,24 @@
 import os
+import re
 import json
-import time
 import math
-from typing import List, Any
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Tuple
+from celery.exceptions import SoftTimeLimitExceeded
 from pydantic import BaseModel, Field, field_validator
 from openai import OpenAI
+from app.services.chunking import chunk_markdown, count_tokens
+from app.services.llm_gateway import call_with_budget, estimate_tokens
 
 # --- CONFIGURATION ---
 MODEL_FAST = "gpt-4o-mini"
 EMBEDDING_MODEL = "text-embedding-3-small"
-MAX_RETRIES = 3
+EMBEDDING_BATCH_SIZE = 1000
 
+# Retries and 429 backoff live in the gateway (shared per-model budget), not the SDK
 try:
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
 except Exception:
     client = None
     print("⚠️ OpenAI Client failed to initialize. Check API KEY.")
@@ -37,6 +43,7 @@ class ExtractedFact(BaseModel):
 class ExtractionResult(BaseModel):
     facts: List[ExtractedFact]
     summary_brief: List[str]
+    chunks_skipped: int = 0  # chunks past LLM_EXTRACTION_MAX_CHUNKS, not extracted
 
 class SynthesisSection(BaseModel):
     title: str = Field(description="Section header")
@@ -47,6 +54,9 @@ class SynthesisResponse(BaseModel):
     sections: List[SynthesisSection]
     unsupported_requests: List[str] = Field(description="User questions that could not be answered by facts")
 
+class SynthesisError(RuntimeError):
+    """Synthesis could not be generated (single-pass or hierarchical); nothing should be saved."""
+
 # --- MATH HELPERS ---
 
 def get_embeddings(texts: List[str]) -> List[List[float]]:
@@ -54,8 +64,17 @@ def get_embeddings(texts: List[str]) -> List[List[float]]:
         return []
     try:
         clean_texts = [t.replace("\n", " ") for t in texts]
-        resp = client.embeddings.create(input=clean_texts, model=EMBEDDING_MODEL)
-        return [d.embedding for d in resp.data]
+        vectors: List[List[float]] = []
+        # The embeddings endpoint caps inputs per request
+        for start in range(0, len(clean_texts), EMBEDDING_BATCH_SIZE):
+            batch = clean_texts[start:start + EMBEDDING_BATCH_SIZE]
+            resp = call_with_budget(
+                EMBEDDING_MODEL,
+                estimate_tokens(batch, output_tokens=0),
+                lambda: client.embeddings.with_raw_response.create(input=batch, model=EMBEDDING_MODEL),
+            )
+            vectors.extend(d.embedding for d in resp.data)
+        return vectors
     except Exception as e:
         print(f"Embedding Error: {e}")
         return []
@@ -68,17 +87,6 @@ def cosine_similarity(v1: List[float], v2: List[float]) -> float:
         return 0.0
     return dot_product / (norm_a * norm_b)
 
-def chunk_text(text: str, chunk_size: int = 12000, overlap: int = 500) -> List[str]:
-    if len(text) <= chunk_size:
-        return [text]
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = start + chunk_size
-        chunks.append(text[start:end])
-        start += (chunk_size - overlap)
-    return chunks
-
 def verify_quote_integrity(content: str, quote: str) -> str:
     norm_content = " ".join(content.split())
     norm_quote = " ".join(quote.split())
@@ -87,25 +95,30 @@ def verify_quote_integrity(content: str, quote: str) -> str:
 # --- LLM WRAPPER ---
 
 def call_llm(messages: list, response_format=None, model=MODEL_FAST) -> Any:
+    """Chat completion within the shared rate-limit budget; None on failure."""
     if not client:
         return None
-    for attempt in range(MAX_RETRIES):
-        try:
-            return client.chat.completions.create(
+    try:
+        return call_with_budget(
+            model,
+            estimate_tokens(messages),
+            lambda: client.chat.completions.with_raw_response.create(
                 model=model,
                 messages=messages,
                 temperature=0.1,
                 response_format=response_format
-            )
-        except Exception as e:
-            if attempt == MAX_RETRIES - 1:
-                print(f"❌ LLM Failed: {e}")
-                return None
-            time.sleep(1 * (2 ** attempt))
+            ),
+        )
+    except SoftTimeLimitExceeded:
+        raise
+    except Exception as e:
+        print(f"❌ LLM Failed: {e}")
+        return None
 
 # --- CORE LOGIC ---
 
-def cluster_facts_adaptive(facts: list[dict]) -> list[dict]:
+def cluster_facts_adaptive(facts: list[dict], max_clusters: Optional[int] = None) -> list[dict]:
+    """Greedy centroid clustering on embeddings; once max_clusters exist, facts join the nearest one."""
     if not facts:
         return []
     if not client:
@@ -137,7 +150,7 @@ def cluster_facts_adaptive(facts: list[dict]) -> list[dict]:
                 best_score = score
                 best_idx = c_idx
 
-        if best_score > SIMILARITY_THRESHOLD:
+        if best_score > SIMILARITY_THRESHOLD or (max_clusters and len(clusters) >= max_clusters):
             clusters[best_idx]['facts'].append(fact)
             n = len(clusters[best_idx]['facts'])
             prev_centroid = clusters[best_idx]['centroid']
@@ -165,25 +178,15 @@ def cluster_facts_adaptive(facts: list[dict]) -> list[dict]:
 def analyze_selection(facts: list[dict]) -> list[dict]:
     return cluster_facts_adaptive(facts)
 
-def synthesize_facts(facts: list[dict], mode: str = "paragraph") -> dict:
-    if not client:
-        return {"synthesis": "Error: OpenAI API Key missing.", "clusters": []}
+# Bump when the synthesis prompt or citation rendering changes; cached outputs keyed on the old version stop matching
+SYNTHESIS_PROMPT_VERSION = 2
 
-    clusters = cluster_facts_adaptive(facts)
-    
-    context_block = ""
-    # Look up map for quick access later
-    fact_lookup = {f['id']: f for f in facts}
+# Fact lines per synthesis prompt; larger selections go through per-cluster partials + a merge pass
+SYNTHESIS_CONTEXT_TOKENS = int(os.getenv("LLM_SYNTHESIS_CONTEXT_TOKENS", "12000"))
+# Upper bound on clusters (= partial calls) for a large selection, so synthesis time stays bounded
+SYNTHESIS_MAX_PARTIALS = int(os.getenv("LLM_SYNTHESIS_MAX_PARTIALS", "12"))
 
-    for c in clusters:
-        context_block += f"\n## Semantic Group: {c['label']}\n"
-        for f in c['facts']:
-            fid = f.get('id', 'unknown')
-            text = f.get('text') or f.get('fact_text') or ""
-            source = f.get('title', 'Unknown')
-            context_block += f"[FACT id={fid}] {text} (Source: {source})\n"
-
-    system_prompt = """You are a rigorous research assistant. 
+SYNTHESIS_RULES = """You are a rigorous research assistant. 
     RULES:
     1. Use ONLY the provided facts. Do not use external knowledge.
     2. If facts are insufficient, state that in 'unsupported_requests'.
@@ -191,6 +194,9 @@ def synthesize_facts(facts: list[dict], mode: str = "paragraph") -> dict:
     4. Maintain the tone of a professional researcher.
     5. Return the output as valid JSON matching the schema."""
 
+
+def _synthesis_system_prompt(mode: str) -> str:
+    system_prompt = SYNTHESIS_RULES
     if mode == "outline":
         system_prompt += " Output a structured video script outline."
     elif mode == "brief":
@@ -199,89 +205,309 @@ def synthesize_facts(facts: list[dict], mode: str = "paragraph") -> dict:
         system_prompt += " Output as separate sections. Use markdown heading '## Section N: Title' for each section (one section per semantic group)."
     else:
         system_prompt += " Output a coherent synthesis paragraph."
+    return system_prompt
 
+
+def _fact_line(f: dict) -> str:
+    fid = f.get('id', 'unknown')
+    text = f.get('text') or f.get('fact_text') or ""
+    source = f.get('title', 'Unknown')
+    return f"[FACT id={fid}] {text} (Source: {source})\n"
+
+
+def _fact_context(clusters: list[dict]) -> str:
+    context_block = ""
+    for c in clusters:
+        context_block += f"\n## Semantic Group: {c['label']}\n"
+        for f in c['facts']:
+            context_block += _fact_line(f)
+    return context_block
+
+
+def _synthesis_priority(indexed: Tuple[int, dict]) -> tuple:
+    """Same order as canonical facts: pinned, then key claims, then higher confidence, then selection order."""
+    i, f = indexed
+    return (
+        0 if f.get('is_pinned') else 1,
+        0 if f.get('is_key_claim') else 1,
+        -(f.get('confidence_score') or 0),
+        i,
+    )
+
+
+def budget_facts(facts: list[dict], max_tokens: Optional[int] = None) -> list[dict]:
+    """Highest-priority facts whose prompt lines fit in max_tokens (SYNTHESIS_CONTEXT_TOKENS), kept in their original order."""
+    if max_tokens is None:
+        max_tokens = SYNTHESIS_CONTEXT_TOKENS
+    kept, used = [], 0
+    for i, f in sorted(enumerate(facts), key=_synthesis_priority):
+        tokens = count_tokens(_fact_line(f))
+        if used + tokens > max_tokens:
+            continue  # a shorter, lower-priority fact may still fit
+        kept.append(i)
+        used += tokens
+    return [facts[i] for i in sorted(kept)]
+
+
+def _partial_synthesis(cluster: dict, mode: str) -> Optional[dict]:
+    """Sections for one cluster of a large selection (input to the merge pass); None on failure."""
+    group = {**cluster, "facts": budget_facts(cluster['facts'])}
+    messages = [
+        {"role": "system", "content": _synthesis_system_prompt(mode) + " This is one group of a larger selection: cover it in 1-3 sections, each with the FACT IDs it uses."},
+        {"role": "user", "content": f"Context:\n{_fact_context([group])}\n\nTask: Synthesize this group."},
+    ]
     try:
-        resp = call_llm(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Context:\n{context_block}\n\nTask: Synthesize this selection."}
-            ],
-            response_format={"type": "json_object"} 
-        )
-        
+        resp = call_llm(messages=messages, response_format={"type": "json_object"})
         if not resp:
-            raise Exception("LLM returned None")
-        
+            return None
         data = json.loads(resp.choices[0].message.content)
-        
-        # --- ✅ NEW: CITATION INJECTION LOGIC ---
-        final_markdown = ""
-        sections = data.get("sections", [])
-        
-        used_facts_map = {} # {fact_id: citation_index}
-        citation_counter = 1
-        
-        # 1. Build Sections with Markers
-        for sec in sections:
-            title = sec.get("title", "Section")
-            content = sec.get("content", "")
-            fids = sec.get("fact_ids", [])
-            
-            # Generate [1][2] markers
-            markers = []
-            for fid in fids:
-                if fid not in used_facts_map:
-                    used_facts_map[fid] = citation_counter
-                    citation_counter += 1
-                markers.append(f"[{used_facts_map[fid]}]")
-            
-            # Append markers to title or content end
-            marker_str = " " + "".join(markers)
-            
-            final_markdown += f"### {title}\n{content}{marker_str}\n\n"
-        
-        # 2. Append Reference List
-        if used_facts_map:
-            final_markdown += "---\n### Sources\n"
-            # Sort by citation index
-            sorted_citations = sorted(used_facts_map.items(), key=lambda x: x[1])
-            
-            for fid, idx in sorted_citations:
-                fact_data = fact_lookup.get(fid)
+    except Exception as e:
+        print(f"Partial synthesis failed for '{cluster['label']}': {e}")
+        return None
+    # Only ids that were in this group's prompt can be cited
+    known = {f['id'] for f in group['facts']}
+    for sec in data.get("sections", []):
+        sec["fact_ids"] = [fid for fid in sec.get("fact_ids", []) if fid in known]
+    return {"label": cluster['label'], **data}
+
+
+def _merge_messages(partials: list[dict], mode: str) -> List[Dict[str, str]]:
+    context_block = ""
+    unsupported: List[str] = []
+    for p in partials:
+        context_block += f"\n## Semantic Group: {p['label']}\n"
+        for sec in p.get("sections", []):
+            context_block += f"### {sec.get('title', 'Section')} [FACT ids={','.join(sec.get('fact_ids', []))}]\n{sec.get('content', '')}\n"
+        unsupported.extend(u for u in p.get("unsupported_requests", []) if u not in unsupported)
+    if unsupported:
+        context_block += "\nUnsupported requests noted so far:\n" + "".join(f"- {u}\n" for u in unsupported)
+    system_prompt = _synthesis_system_prompt(mode) + (
+        " You are given partial syntheses of groups of facts. Combine them into the final output;"
+        " each section's fact_ids must be taken from the [FACT ids=...] of the partial sections it draws on."
+    )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"Partial syntheses:\n{context_block}\n\nTask: Merge these into one synthesis."},
+    ]
+
+
+def _synthesis_messages(facts: list[dict], mode: str) -> Tuple[List[Dict[str, str]], list[dict]]:
+    """
+    Messages for the final synthesis call; returns (messages, clusters). Selections that fit
+    SYNTHESIS_CONTEXT_TOKENS get one clustered fact prompt. Larger ones are clustered into at
+    most SYNTHESIS_MAX_PARTIALS groups, each group is synthesized in parallel from its
+    highest-priority facts, and the messages merge those partials (citations stay fact ids).
+    """
+    if sum(count_tokens(_fact_line(f)) for f in facts) <= SYNTHESIS_CONTEXT_TOKENS:
+        clusters = cluster_facts_adaptive(facts)
+        return _single_pass_messages(clusters, mode), clusters
+
+    clusters = cluster_facts_adaptive(facts, max_clusters=SYNTHESIS_MAX_PARTIALS)
+    if len(clusters) == 1:
+        group = [{**clusters[0], "facts": budget_facts(clusters[0]['facts'])}]
+        return _single_pass_messages(group, mode), clusters
+
+    print(f"Hierarchical synthesis: {len(facts)} facts in {len(clusters)} groups")
+    with ThreadPoolExecutor(max_workers=min(MAP_CONCURRENCY, len(clusters))) as pool:
+        partials = [p for p in pool.map(lambda c: _partial_synthesis(c, mode), clusters) if p]
+    if not partials:
+        raise RuntimeError("All partial syntheses failed")
+    return _merge_messages(partials, mode), clusters
+
+
+def _single_pass_messages(clusters: list[dict], mode: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": _synthesis_system_prompt(mode)},
+        {"role": "user", "content": f"Context:\n{_fact_context(clusters)}\n\nTask: Synthesize this selection."}
+    ]
+
+
+class SynthesisCitations:
+    """Turns synthesized sections into markdown with [n] citation markers and a Sources list."""
+
+    def __init__(self, facts: list[dict]):
+        # Look up map for quick access later
+        self.fact_lookup = {f['id']: f for f in facts}
+        self.used_facts_map: Dict[str, int] = {}  # {fact_id: citation_index}
+
+    def section_markdown(self, sec: dict) -> str:
+        title = sec.get("title", "Section")
+        content = sec.get("content", "")
+        # Generate [1][2] markers
+        markers = []
+        for fid in sec.get("fact_ids", []):
+            if fid not in self.fact_lookup:
+                continue  # an id the model made up has no source to cite
+            if fid not in self.used_facts_map:
+                self.used_facts_map[fid] = len(self.used_facts_map) + 1
+            markers.append(f"[{self.used_facts_map[fid]}]")
+        # Append markers to content end
+        marker_str = " " + "".join(markers)
+        return f"### {title}\n{content}{marker_str}\n\n"
+
+    def footer_markdown(self, unsupported: List[str]) -> str:
+        footer = ""
+        # Reference list, sorted by citation index
+        if self.used_facts_map:
+            footer += "---\n### Sources\n"
+            for fid, idx in sorted(self.used_facts_map.items(), key=lambda x: x[1]):
+                fact_data = self.fact_lookup.get(fid)
                 if fact_data:
                     source_domain = fact_data.get('title') or fact_data.get('source_domain') or "Unknown"
                     # We use a markdown footnote style
-                    final_markdown += f"**[{idx}]** {source_domain}: _{fact_data.get('text', '')[:100]}..._\n"
-
-        # 3. Handle Unsupported
-        unsupported = data.get("unsupported_requests", [])
+                    footer += f"**[{idx}]** {source_domain}: _{fact_data.get('text', '')[:100]}..._\n"
         if unsupported:
-            final_markdown += "\n> **Missing Data:**\n"
+            footer += "\n> **Missing Data:**\n"
             for u in unsupported:
-                final_markdown += f"> - {u}\n"
+                footer += f"> - {u}\n"
+        return footer
 
-        return {
-            "synthesis": final_markdown.strip(),
-            "clusters": [{"label": c['label'], "count": len(c['facts'])} for c in clusters]
-        }
 
-    except Exception as e:
-        print(f"Synthesis Error: {e}")
-        return {"synthesis": f"Generation failed: {str(e)}", "clusters": []}
-
-def extract_facts_from_markdown(content: str) -> ExtractionResult:
-    # [Extraction logic remains unchanged from previous step]
-    # Copy the extract_facts_from_markdown function from the previous turn if needed
-    # Or I can provide the full file if you prefer (it is large).
-    # Since I overwrote the file above, I will include the extraction logic here for completeness:
+def _cluster_summary(clusters: list[dict]) -> list[dict]:
+    return [{"label": c['label'], "count": len(c['facts'])} for c in clusters]
+
+
+def _prepare_synthesis(facts: list[dict], mode: str) -> Tuple[List[Dict[str, str]], list[dict]]:
+    """_synthesis_messages with every failure (missing key, embeddings, partials) as SynthesisError."""
     if not client:
-        return ExtractionResult(facts=[], summary_brief=["Error: Client not init"])
+        raise SynthesisError("OpenAI API Key missing.")
+    try:
+        return _synthesis_messages(facts, mode)
+    except Exception as e:
+        raise SynthesisError(str(e)) from e
+
+
+def synthesize_facts(facts: list[dict], mode: str = "paragraph") -> dict:
+    """{"synthesis", "clusters"} for the selection. Raises SynthesisError on failure, so a failure is never saved or cached."""
+    messages, clusters = _prepare_synthesis(facts, mode)
+
+    resp = call_llm(messages=messages, response_format={"type": "json_object"})
+    if not resp:
+        raise SynthesisError("LLM returned None")
+    try:
+        data = json.loads(resp.choices[0].message.content)
+    except json.JSONDecodeError as e:
+        raise SynthesisError(f"LLM returned malformed JSON: {e}") from e
+
+    citations = SynthesisCitations(facts)
+    final_markdown = "".join(citations.section_markdown(sec) for sec in data.get("sections", []))
+    final_markdown += citations.footer_markdown(data.get("unsupported_requests", []))
+
+    return {
+        "synthesis": final_markdown.strip(),
+        "clusters": _cluster_summary(clusters)
+    }
+
+
+class SectionStream:
+    """
+    Incremental reader for a streamed {"sections": [{...}, ...], ...} JSON reply:
+    feed() returns each section object as soon as its closing brace arrives.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0            # next char to scan
+        self._in_array = False   # inside the "sections" array
+        self._done = False       # array closed
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._obj_start = 0
+
+    def feed(self, delta: str) -> List[dict]:
+        self.text += delta
+        sections: List[dict] = []
+        if not self._in_array and not self._done:
+            m = re.search(r'"sections"\s*:\s*\[', self.text)
+            if not m:
+                return sections
+            self._in_array = True
+            self._pos = m.end()
+        while self._in_array and self._pos < len(self.text):
+            ch = self.text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if self._depth == 0:
+                    self._obj_start = self._pos
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0:  # the sections array itself closed
+                    self._in_array = False
+                    self._done = True
+                else:
+                    self._depth -= 1
+                    if self._depth == 0 and ch == "}":
+                        try:
+                            sections.append(json.loads(self.text[self._obj_start:self._pos + 1]))
+                        except json.JSONDecodeError:
+                            pass  # malformed section; the final parse still sees the full reply
+            self._pos += 1
+        return sections
+
+
+def stream_llm(messages: list, response_format=None, model=MODEL_FAST) -> Iterator[str]:
+    """Stream a chat completion's content deltas (same shared budget as call_llm)."""
+    stream = call_with_budget(
+        model,
+        estimate_tokens(messages),
+        lambda: client.chat.completions.with_raw_response.create(
+            model=model,
+            messages=messages,
+            temperature=0.1,
+            response_format=response_format,
+            stream=True,
+        ),
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def stream_synthesis(facts: list[dict], mode: str = "paragraph") -> Iterator[Tuple[str, dict]]:
+    """
+    synthesize_facts as it is generated: yields ("clusters", {...}), then ("section", {...})
+    per section with its citation markers, then ("complete", {"synthesis", "clusters"}).
+    Raises on LLM failure (SynthesisError before anything is yielded).
+    """
+    messages, clusters = _prepare_synthesis(facts, mode)
+    cluster_summary = _cluster_summary(clusters)
+    yield "clusters", {"clusters": cluster_summary}
+
+    citations = SynthesisCitations(facts)
+    reader = SectionStream()
+    parts: List[str] = []
+
+    def emit(sec: dict) -> Tuple[str, dict]:
+        markdown = citations.section_markdown(sec)
+        parts.append(markdown)
+        return "section", {
+            "index": len(parts) - 1,
+            "title": sec.get("title", "Section"),
+            "fact_ids": sec.get("fact_ids", []),
+            "markdown": markdown,
+        }
+
+    for delta in stream_llm(messages, response_format={"type": "json_object"}):
+        for sec in reader.feed(delta):
+            yield emit(sec)
 
-    chunks = chunk_text(content, chunk_size=12000)
-    all_facts = []
-    combined_summary = []
+    data = json.loads(reader.text)
+    # Sections the incremental reader could not split out (e.g. unusual formatting)
+    for sec in data.get("sections", [])[len(parts):]:
+        yield emit(sec)
+    final_markdown = "".join(parts) + citations.footer_markdown(data.get("unsupported_requests", []))
+    yield "complete", {"synthesis": final_markdown.strip(), "clusters": cluster_summary}
 
-    system_prompt = """You are a fact extraction engine.
+EXTRACTION_SYSTEM_PROMPT = """You are a fact extraction engine.
     Extract atomic, high-value facts. 
     If a fact has a direct quote, include it in 'quote_span' EXACTLY as it appears.
     Classify confidence: HIGH (explicit), MEDIUM (implied), LOW (ambiguous).
@@ -301,51 +527,179 @@ def extract_facts_from_markdown(content: str) -> ExtractionResult:
         "summary_brief": ["Summary point 1"]
     }"""
 
-    for i, chunk in enumerate(chunks):
+# standard = one chunk after another; map_reduce = chunks in parallel + merge + summary pass;
+# batch = chunks queued for the provider's batch API (see app/services/llm_batch.py)
+EXTRACTION_MODES = ("standard", "map_reduce", "batch")
+DEFAULT_EXTRACTION_MODE = os.getenv("LLM_EXTRACTION_MODE", "standard")
+# Mode for jobs created by bulk ingest (query ingest, rules); unset = DEFAULT_EXTRACTION_MODE
+BULK_EXTRACTION_MODE = os.getenv("LLM_BULK_EXTRACTION_MODE") or None
+MAP_CONCURRENCY = int(os.getenv("LLM_MAP_CONCURRENCY", "4"))
+# Standard mode runs documents longer than this many chunks as map_reduce so they fit the task time limit
+STANDARD_MAX_CHUNKS = int(os.getenv("LLM_STANDARD_MAX_CHUNKS", "4"))
+# Chunks extracted interactively per document; the rest is skipped (use batch mode for whole books)
+EXTRACTION_MAX_CHUNKS = int(os.getenv("LLM_EXTRACTION_MAX_CHUNKS", "32"))
+# Ingest jobs send documents over EXTRACTION_MAX_CHUNKS to batch mode whole instead of skipping chunks
+OVERSIZE_TO_BATCH = os.getenv("LLM_OVERSIZE_TO_BATCH", "true").lower() == "true"
+SUMMARY_MAX_POINTS = 5
+# Chunk summary points fed to the final summary pass (bounds its prompt on huge inputs)
+SUMMARY_INPUT_POINTS = 60
+
+CONFIDENCE_RANK = {"HIGH": 3, "MEDIUM": 2, "LOW": 1}
+
+
+def extraction_messages(i: int, chunk: str) -> List[Dict[str, str]]:
+    """Chat messages for extracting chunk i (shared by interactive and batch extraction)."""
+    return [
+        {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Extract from part {i+1}:\n\n{chunk}"}
+    ]
+
+
+def parse_extraction_content(i: int, chunk: str, raw_content: str) -> Tuple[List[ExtractedFact], List[str]]:
+    """Validated facts + summary points from one chunk's JSON reply; quotes not found in the chunk are flagged."""
+    facts: List[ExtractedFact] = []
+    try:
+        data = json.loads(raw_content)
+    except (json.JSONDecodeError, TypeError):
+        print(f"❌ Chunk {i} returned invalid JSON")
+        return facts, []
+
+    for f_data in data.get("facts", []):
         try:
-            print(f"📡 Processing chunk {i+1}/{len(chunks)}...")
-            resp = call_llm(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Extract from part {i+1}:\n\n{chunk}"}
-                ],
-                response_format={"type": "json_object"}
-            )
-            
-            if resp:
-                raw_content = resp.choices[0].message.content
-                try:
-                    data = json.loads(raw_content)
-                except json.JSONDecodeError:
-                    print(f"❌ Chunk {i} returned invalid JSON")
-                    continue
-
-                raw_facts = data.get("facts", [])
-                
-                for f_data in raw_facts:
-                    try:
-                        if "quote_span" in f_data and f_data["quote_span"]:
-                            integrity = verify_quote_integrity(chunk, f_data["quote_span"])
-                            if integrity == "LOW":
-                                f_data["confidence"] = "LOW"
-                                f_data["tags"] = (f_data.get("tags") or []) + ["fuzzy-quote"]
-                        
-                        valid_fact = ExtractedFact(**f_data)
-                        all_facts.append(valid_fact)
-                    except Exception as val_e:
-                        print(f"⚠️ Skipping invalid fact in chunk {i}: {val_e}")
-
-                combined_summary.extend(data.get("summary_brief", []))
-
-        except Exception as e:
-            print(f"❌ Chunk {i} failed completely: {e}")
+            if "quote_span" in f_data and f_data["quote_span"]:
+                integrity = verify_quote_integrity(chunk, f_data["quote_span"])
+                if integrity == "LOW":
+                    f_data["confidence"] = "LOW"
+                    f_data["tags"] = (f_data.get("tags") or []) + ["fuzzy-quote"]
+            facts.append(ExtractedFact(**f_data))
+        except Exception as val_e:
+            print(f"⚠️ Skipping invalid fact in chunk {i}: {val_e}")
+    return facts, list(data.get("summary_brief", []))
+
+
+def _extract_chunk(i: int, total: int, chunk: str) -> Tuple[List[ExtractedFact], List[str]]:
+    """
+    Extract facts + summary points from one chunk. Failures yield nothing rather than
+    raising, except the task's soft time limit, which must reach the job's failure handling.
+    """
+    try:
+        print(f"📡 Processing chunk {i+1}/{total}...")
+        resp = call_llm(
+            messages=extraction_messages(i, chunk),
+            response_format={"type": "json_object"}
+        )
+        if not resp:
+            return [], []
+        return parse_extraction_content(i, chunk, resp.choices[0].message.content)
+    except SoftTimeLimitExceeded:
+        raise
+    except Exception as e:
+        print(f"❌ Chunk {i} failed completely: {e}")
+        return [], []
+
+
+def fact_key(fact_text: str) -> str:
+    """Dedup key: hash of the casefolded fact text with punctuation and spacing normalized."""
+    normalized = " ".join(re.sub(r"[^\w\s%$.-]", " ", fact_text.casefold()).split()).rstrip(".")
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def merge_facts(facts: Iterable[ExtractedFact]) -> List[ExtractedFact]:
+    """
+    Reduce step: collapse duplicate facts (same fact_key) in first-seen order.
+    The merged fact keeps the highest confidence (with its quote), is a key claim
+    if any duplicate was, and carries the union of tags.
+    """
+    merged: Dict[str, ExtractedFact] = {}
+    for fact in facts:
+        key = fact_key(fact.fact_text)
+        current = merged.get(key)
+        if current is None:
+            merged[key] = fact.model_copy()
             continue
+        best = current
+        if CONFIDENCE_RANK.get(fact.confidence, 0) > CONFIDENCE_RANK.get(current.confidence, 0):
+            best = fact.model_copy()
+        best.is_key_claim = current.is_key_claim or fact.is_key_claim
+        best.tags = list(dict.fromkeys([*current.tags, *fact.tags]))
+        merged[key] = best
+    return list(merged.values())
+
+
+def summarize_points(points: List[str]) -> List[str]:
+    """Bounded final summary: condense chunk summary points into at most SUMMARY_MAX_POINTS."""
+    points = [p for p in points if p]
+    if len(points) <= SUMMARY_MAX_POINTS:
+        return points
+    bullets = "\n".join(f"- {p}" for p in points[:SUMMARY_INPUT_POINTS])
+    resp = call_llm(
+        messages=[
+            {
+                "role": "system",
+                "content": f'Merge these notes from consecutive parts of one document into at most {SUMMARY_MAX_POINTS} summary points. Return JSON: {{"summary_brief": ["..."]}}',
+            },
+            {"role": "user", "content": bullets},
+        ],
+        response_format={"type": "json_object"},
+    )
+    if resp:
+        try:
+            merged = json.loads(resp.choices[0].message.content).get("summary_brief") or []
+            if merged:
+                return [str(p) for p in merged[:SUMMARY_MAX_POINTS]]
+        except (json.JSONDecodeError, AttributeError):
+            pass
+    return points[:SUMMARY_MAX_POINTS]
+
+
+def extract_facts_from_markdown(
+    content: str,
+    mode: str = DEFAULT_EXTRACTION_MODE,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> ExtractionResult:
+    """
+    Extract facts from the whole document, chunk by chunk.
+    mode="map_reduce" runs chunks concurrently (LLM_MAP_CONCURRENCY) and condenses the
+    summary in a final pass. Standard-mode documents over LLM_STANDARD_MAX_CHUNKS run as
+    map_reduce, and only the first LLM_EXTRACTION_MAX_CHUNKS chunks are extracted, so one
+    document stays within the ingest task's time limit; the rest is counted in chunks_skipped.
+    on_progress(done, total) is called in the caller's thread as each chunk finishes.
+    """
+    if not client:
+        return ExtractionResult(facts=[], summary_brief=["Error: Client not init"])
+
+    # Token-sized chunks on section/paragraph boundaries; together they cover the whole document
+    chunks = chunk_markdown(content)
+    chunks_skipped = max(len(chunks) - EXTRACTION_MAX_CHUNKS, 0)
+    if chunks_skipped:
+        print(f"⚠️ Extracting the first {EXTRACTION_MAX_CHUNKS} of {len(chunks)} chunks")
+        chunks = chunks[:EXTRACTION_MAX_CHUNKS]
+    if mode == "standard" and len(chunks) > STANDARD_MAX_CHUNKS:
+        mode = "map_reduce"
+    results: List[Tuple[List[ExtractedFact], List[str]]] = [([], [])] * len(chunks)
+
+    if mode == "map_reduce" and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=min(MAP_CONCURRENCY, len(chunks))) as pool:
+            futures = {pool.submit(_extract_chunk, i, len(chunks), chunk): i for i, chunk in enumerate(chunks)}
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    results[futures[future]] = future.result()
+                    if on_progress:
+                        on_progress(done, len(chunks))
+            except BaseException:
+                # Time limit (soft, or gevent's hard Timeout): don't start queued chunks while the task unwinds
+                for future in futures:
+                    future.cancel()
+                raise
+    else:
+        for i, chunk in enumerate(chunks):
+            results[i] = _extract_chunk(i, len(chunks), chunk)
+            if on_progress:
+                on_progress(i + 1, len(chunks))
+
+    unique_facts = merge_facts(f for facts, _ in results for f in facts)
+    points = [p for _, summary in results for p in summary]
+    summary_brief = summarize_points(points) if mode == "map_reduce" else points[:SUMMARY_MAX_POINTS]
 
-    unique_facts = {}
-    for f in all_facts:
-        key = f.fact_text.lower().strip()
-        if key not in unique_facts:
-            unique_facts[key] = f
-    
     print(f"✅ Extracted {len(unique_facts)} unique facts.")
-    return ExtractionResult(facts=list(unique_facts.values()), summary_brief=combined_summary[:5])
\ No newline at end of file
+    return ExtractionResult(facts=unique_facts, summary_brief=summary_brief, chunks_skipped=chunks_skipped)
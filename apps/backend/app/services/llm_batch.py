@@ -0,0 +1,229 @@
+"""
+Batch-API extraction for non-interactive bulk ingestion (extraction_mode="batch").
+Chunk requests from many jobs collect in llm_batch_requests and go to the provider as
+one batch once the oldest has waited LLM_BATCH_WINDOW_SECONDS; the batch is polled
+until it finishes and each reply is parsed into facts on its request row. The Celery
+side (submit/poll tasks, fan-out into ResearchNode rows) is app/workers/llm_batch_task.py.
+"""
+import json
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+
+from app.models import Job, LLMBatchRequest
+from app.services.chunking import chunk_markdown
+from app.services.llm import MODEL_FAST, extraction_messages, parse_extraction_content
+from app.utils.table_cache import as_utc
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+# Requests wait this long for others to share their batch
+BATCH_WINDOW_S = float(os.getenv("LLM_BATCH_WINDOW_SECONDS", "300"))
+BATCH_POLL_S = float(os.getenv("LLM_BATCH_POLL_SECONDS", "300"))
+# Requests still unanswered this long after being queued fail their jobs (BATCH_FAILED)
+BATCH_MAX_AGE_S = float(os.getenv("LLM_BATCH_MAX_AGE_SECONDS", str(48 * 3600)))
+BATCH_MAX_REQUESTS = 50_000  # provider limit per batch
+
+REQUEST_PENDING = "PENDING"
+REQUEST_SUBMITTED = "SUBMITTED"
+REQUEST_DONE = "DONE"
+REQUEST_FAILED = "FAILED"
+
+# Provider batch states
+BATCH_IN_PROGRESS = ("validating", "in_progress", "finalizing", "cancelling")
+
+
+@dataclass
+class BatchPoll:
+    state: str  # provider status: in_progress, completed, failed, expired, cancelled, ...
+    # custom_id -> output line ({"response": {...}} or {"error": {...}}); empty until finished
+    results: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @property
+    def finished(self) -> bool:
+        return self.state not in BATCH_IN_PROGRESS
+
+
+class OpenAIBatchProvider:
+    """OpenAI Files + Batches API. LLM_BATCH_BASE_URL points it at another endpoint (e.g. a local stub)."""
+
+    def __init__(self, client=None):
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=os.getenv("LLM_BATCH_BASE_URL") or None,
+            )
+        self.client = client
+
+    def submit(self, requests: List[Dict[str, Any]]) -> str:
+        """Upload [{custom_id, body}] as a JSONL batch; returns the provider batch id."""
+        lines = "\n".join(
+            json.dumps({"custom_id": r["custom_id"], "method": "POST", "url": BATCH_ENDPOINT, "body": r["body"]})
+            for r in requests
+        )
+        upload = self.client.files.create(file=("extraction.jsonl", lines.encode("utf-8")), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=upload.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW,
+        )
+        return batch.id
+
+    def poll(self, batch_id: str) -> BatchPoll:
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in BATCH_IN_PROGRESS:
+            return BatchPoll(state=batch.status)
+        results: Dict[str, Dict[str, Any]] = {}
+        # Expired/cancelled batches still carry the replies that finished
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    item = json.loads(line)
+                    results[item["custom_id"]] = item
+        return BatchPoll(state=batch.status, results=results)
+
+
+def get_batch_provider() -> OpenAIBatchProvider:
+    return OpenAIBatchProvider()
+
+
+def enqueue_extraction(db: Session, job: Job, source_doc_id: uuid.UUID, content: str, model: str = MODEL_FAST) -> int:
+    """Queue one batch request per chunk of content for job; returns the number of chunks."""
+    chunks = chunk_markdown(content)
+    for i, chunk in enumerate(chunks):
+        db.add(LLMBatchRequest(
+            job_id=job.id,
+            source_doc_id=source_doc_id,
+            chunk_index=i,
+            chunk_text=chunk,
+            body={
+                "model": model,
+                "messages": extraction_messages(i, chunk),
+                "temperature": 0.1,
+                "response_format": {"type": "json_object"},
+            },
+        ))
+    db.commit()
+    return len(chunks)
+
+
+def claim_pending(db: Session, force: bool = False) -> List[LLMBatchRequest]:
+    """
+    Claim pending requests for one batch, or [] if the oldest is younger than the batch
+    window (a later flush picks them up) unless force. Claimed rows are SUBMITTED under a
+    provisional batch id so concurrent flushes never send a request twice.
+    """
+    oldest, pending = db.exec(
+        select(func.min(LLMBatchRequest.created_at), func.count()).where(LLMBatchRequest.status == REQUEST_PENDING)
+    ).one()
+    if not pending:
+        return []
+    age = datetime.now(timezone.utc) - as_utc(oldest)
+    if not force and age < timedelta(seconds=BATCH_WINDOW_S) and pending < BATCH_MAX_REQUESTS:
+        return []
+
+    claim = f"claim:{uuid.uuid4()}"
+    ids = select(LLMBatchRequest.id).where(LLMBatchRequest.status == REQUEST_PENDING).order_by(
+        LLMBatchRequest.created_at, LLMBatchRequest.chunk_index
+    ).limit(BATCH_MAX_REQUESTS)
+    db.exec(
+        update(LLMBatchRequest)
+        .where(LLMBatchRequest.id.in_(ids), LLMBatchRequest.status == REQUEST_PENDING)
+        .values(status=REQUEST_SUBMITTED, batch_id=claim, submitted_at=datetime.now(timezone.utc))
+    )
+    db.commit()
+    return list(db.exec(select(LLMBatchRequest).where(LLMBatchRequest.batch_id == claim)).all())
+
+
+def submit_claimed(db: Session, requests: List[LLMBatchRequest], provider) -> str:
+    """Send claimed requests as one provider batch; on failure they go back to PENDING."""
+    try:
+        batch_id = provider.submit([{"custom_id": str(r.id), "body": r.body} for r in requests])
+    except Exception:
+        for r in requests:
+            r.status = REQUEST_PENDING
+            r.batch_id = None
+            r.submitted_at = None
+            db.add(r)
+        db.commit()
+        raise
+    for r in requests:
+        r.batch_id = batch_id
+        db.add(r)
+    db.commit()
+    return batch_id
+
+
+def expire_pending(db: Session) -> List[uuid.UUID]:
+    """Fail pending requests queued longer than BATCH_MAX_AGE_S (submission keeps failing); returns the affected job ids."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=BATCH_MAX_AGE_S)
+    requests = db.exec(
+        select(LLMBatchRequest).where(LLMBatchRequest.status == REQUEST_PENDING, LLMBatchRequest.created_at <= cutoff)
+    ).all()
+    job_ids: List[uuid.UUID] = []
+    for r in requests:
+        r.status = REQUEST_FAILED
+        r.error = f"not submitted within {BATCH_MAX_AGE_S:.0f}s"
+        db.add(r)
+        if r.job_id not in job_ids:
+            job_ids.append(r.job_id)
+    db.commit()
+    return job_ids
+
+
+def batch_is_stale(db: Session, batch_id: str) -> bool:
+    """True once the oldest request of a submitted batch has waited longer than BATCH_MAX_AGE_S."""
+    oldest = db.exec(select(func.min(LLMBatchRequest.created_at)).where(LLMBatchRequest.batch_id == batch_id)).one()
+    return oldest is not None and datetime.now(timezone.utc) - as_utc(oldest) >= timedelta(seconds=BATCH_MAX_AGE_S)
+
+
+def _reply_content(item: Optional[Dict[str, Any]]) -> Optional[str]:
+    response = (item or {}).get("response") or {}
+    if response.get("status_code") != 200:
+        return None
+    choices = (response.get("body") or {}).get("choices") or []
+    return choices[0]["message"]["content"] if choices else None
+
+
+def _reply_error(item: Optional[Dict[str, Any]], state: str) -> str:
+    if item is None:
+        return f"no reply (batch {state})"
+    error = item.get("error") or ((item.get("response") or {}).get("body") or {}).get("error") or {}
+    return str(error.get("message") or error or "empty reply")[:500]
+
+
+def apply_batch_results(db: Session, batch_id: str, poll: BatchPoll) -> List[uuid.UUID]:
+    """Store parsed facts (or the error) on each request of a finished batch; returns the affected job ids."""
+    requests = db.exec(select(LLMBatchRequest).where(LLMBatchRequest.batch_id == batch_id)).all()
+    job_ids: List[uuid.UUID] = []
+    for r in requests:
+        if r.status != REQUEST_SUBMITTED:
+            continue
+        item = poll.results.get(str(r.id))
+        content = _reply_content(item)
+        if content is None:
+            r.status = REQUEST_FAILED
+            r.error = _reply_error(item, poll.state)
+        else:
+            facts, summary = parse_extraction_content(r.chunk_index, r.chunk_text or "", content)
+            r.status = REQUEST_DONE
+            r.result = {"facts": [f.model_dump() for f in facts], "summary_brief": summary}
+        db.add(r)
+        if r.job_id not in job_ids:
+            job_ids.append(r.job_id)
+    db.commit()
+    return job_ids
+
+
+def job_requests(db: Session, job_id: uuid.UUID) -> List[LLMBatchRequest]:
+    return list(db.exec(
+        select(LLMBatchRequest).where(LLMBatchRequest.job_id == job_id).order_by(LLMBatchRequest.chunk_index)
+    ).all())
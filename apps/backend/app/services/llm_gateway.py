@@ -0,0 +1,348 @@
+"""
+LLM gateway: every OpenAI call (API processes and all Celery workers) draws from one
+request/token budget per model, kept in Redis as a pair of token buckets (RPM and TPM).
+Callers wait in line for budget instead of failing; the buckets learn the real limits
+from the x-ratelimit-* response headers and pause for Retry-After on a 429.
+Without Redis the budget is per process.
+"""
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from celery.exceptions import SoftTimeLimitExceeded
+
+from app.services.chunking import count_tokens
+
+# Budget until the provider's headers tell us the real limits (gpt-4o-mini, tier 1)
+DEFAULT_RPM = int(os.getenv("LLM_RPM_LIMIT", "500"))
+DEFAULT_TPM = int(os.getenv("LLM_TPM_LIMIT", "200000"))
+# Completion tokens counted against TPM before the response says otherwise
+OUTPUT_TOKENS_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKENS_ESTIMATE", "1000"))
+# Longest a call waits for budget (keep under the Celery soft time limit)
+QUEUE_TIMEOUT_S = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "120"))
+MAX_RETRIES = 3
+BUCKET_TTL_S = 3600
+SHARED_RETRY_S = 30.0  # after a Redis error, use the local budget this long before trying again
+_MAX_SLEEP_S = 5.0  # re-check the shared bucket at least this often while queued
+
+
+class LLMQueueTimeout(Exception):
+    """No budget became available within LLM_QUEUE_TIMEOUT_SECONDS."""
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """OpenAI reset durations ("20ms", "1s", "6m0s", "1h2m3.5s", or bare seconds) -> seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(n) * scale[unit] for n, unit in parts)
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    try:
+        return int(float(headers[name]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RateLimitHeaders:
+    limit_requests: Optional[int] = None
+    limit_tokens: Optional[int] = None
+    remaining_requests: Optional[int] = None
+    remaining_tokens: Optional[int] = None
+    reset_requests: Optional[float] = None
+    reset_tokens: Optional[float] = None
+    retry_after: Optional[float] = None
+
+    @classmethod
+    def from_headers(cls, headers: Optional[Mapping[str, str]]) -> "RateLimitHeaders":
+        if not headers:
+            return cls()
+        return cls(
+            limit_requests=_int_header(headers, "x-ratelimit-limit-requests"),
+            limit_tokens=_int_header(headers, "x-ratelimit-limit-tokens"),
+            remaining_requests=_int_header(headers, "x-ratelimit-remaining-requests"),
+            remaining_tokens=_int_header(headers, "x-ratelimit-remaining-tokens"),
+            reset_requests=parse_reset(headers.get("x-ratelimit-reset-requests")),
+            reset_tokens=parse_reset(headers.get("x-ratelimit-reset-tokens")),
+            retry_after=parse_reset(headers.get("retry-after")),
+        )
+
+    def blocked_for(self) -> float:
+        """Seconds the provider has told us to stay away (Retry-After, or an exhausted window)."""
+        waits = [self.retry_after or 0.0]
+        if self.remaining_requests == 0 and self.reset_requests:
+            waits.append(self.reset_requests)
+        if self.remaining_tokens == 0 and self.reset_tokens:
+            waits.append(self.reset_tokens)
+        return max(waits)
+
+
+# --- Buckets ---
+# State per model: rpm/tpm capacity (refilled linearly over a minute), available requests
+# and tokens, last refill time, and blocked_until. The Lua scripts and LocalBucketStore
+# implement the same arithmetic.
+
+_REFILL_LUA = """
+local b = redis.call('HMGET', KEYS[1], 'rpm', 'tpm', 'requests', 'tokens', 'ts', 'blocked_until')
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rpm = tonumber(b[1]) or tonumber(ARGV[1])
+local tpm = tonumber(b[2]) or tonumber(ARGV[2])
+local requests = tonumber(b[3]) or rpm
+local tokens = tonumber(b[4]) or tpm
+local elapsed = math.max(0, now - (tonumber(b[5]) or now))
+local blocked = tonumber(b[6]) or 0
+requests = math.min(rpm, requests + elapsed * rpm / 60)
+tokens = math.min(tpm, tokens + elapsed * tpm / 60)
+"""
+
+_SAVE_LUA = """
+redis.call('HSET', KEYS[1], 'rpm', rpm, 'tpm', tpm, 'requests', requests, 'tokens', tokens, 'ts', now, 'blocked_until', blocked)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+"""
+
+# ARGV: default rpm, default tpm, ttl, requests needed, tokens needed -> seconds to wait (0 = granted)
+ACQUIRE_LUA = _REFILL_LUA + """
+local need_r = tonumber(ARGV[4])
+local need_t = math.min(tonumber(ARGV[5]), tpm)
+local wait = math.max(0, blocked - now)
+if requests < need_r then wait = math.max(wait, (need_r - requests) * 60 / rpm) end
+if tokens < need_t then wait = math.max(wait, (need_t - tokens) * 60 / tpm) end
+if wait == 0 then
+  requests = requests - need_r
+  tokens = tokens - need_t
+end
+""" + _SAVE_LUA + """
+return tostring(wait)
+"""
+
+# ARGV: default rpm, default tpm, ttl, limit_r, limit_t, remaining_r, remaining_t, blocked_for ("" = unknown)
+OBSERVE_LUA = _REFILL_LUA + """
+if ARGV[4] ~= '' then rpm = tonumber(ARGV[4]) end
+if ARGV[5] ~= '' then tpm = tonumber(ARGV[5]) end
+if ARGV[6] ~= '' then requests = math.min(requests, tonumber(ARGV[6])) end
+if ARGV[7] ~= '' then tokens = math.min(tokens, tonumber(ARGV[7])) end
+requests = math.min(requests, rpm)
+tokens = math.min(tokens, tpm)
+if ARGV[8] ~= '' then blocked = math.max(blocked, now + tonumber(ARGV[8])) end
+""" + _SAVE_LUA + """
+return 1
+"""
+
+
+def _arg(value: Optional[float]) -> str:
+    return "" if value is None else str(value)
+
+
+class RedisBucketStore:
+    """Buckets shared by every process using the same Redis (key llm:ratelimit:{model})."""
+
+    def __init__(self, redis_client, default_rpm: int = DEFAULT_RPM, default_tpm: int = DEFAULT_TPM):
+        self.redis = redis_client
+        self.defaults = (default_rpm, default_tpm, BUCKET_TTL_S)
+        self._acquire = redis_client.register_script(ACQUIRE_LUA)
+        self._observe = redis_client.register_script(OBSERVE_LUA)
+
+    @staticmethod
+    def key(model: str) -> str:
+        return f"llm:ratelimit:{model}"
+
+    def acquire(self, model: str, tokens: int) -> float:
+        return float(self._acquire(keys=[self.key(model)], args=[*self.defaults, 1, tokens]))
+
+    def observe(self, model: str, limits: RateLimitHeaders) -> None:
+        blocked_for = limits.blocked_for()
+        self._observe(
+            keys=[self.key(model)],
+            args=[
+                *self.defaults,
+                _arg(limits.limit_requests),
+                _arg(limits.limit_tokens),
+                _arg(limits.remaining_requests),
+                _arg(limits.remaining_tokens),
+                _arg(blocked_for or None),
+            ],
+        )
+
+
+@dataclass
+class _Bucket:
+    rpm: float
+    tpm: float
+    requests: float
+    tokens: float
+    ts: float
+    blocked_until: float = 0.0
+
+
+class LocalBucketStore:
+    """In-process buckets with the same arithmetic as the Redis scripts (no Redis, or tests)."""
+
+    def __init__(self, default_rpm: int = DEFAULT_RPM, default_tpm: int = DEFAULT_TPM, clock: Callable[[], float] = time.monotonic):
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.clock = clock
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def _refill(self, model: str) -> _Bucket:
+        now = self.clock()
+        b = self._buckets.get(model)
+        if b is None:
+            b = self._buckets[model] = _Bucket(self.default_rpm, self.default_tpm, self.default_rpm, self.default_tpm, now)
+        elapsed = max(0.0, now - b.ts)
+        b.requests = min(b.rpm, b.requests + elapsed * b.rpm / 60)
+        b.tokens = min(b.tpm, b.tokens + elapsed * b.tpm / 60)
+        b.ts = now
+        return b
+
+    def acquire(self, model: str, tokens: int) -> float:
+        with self._lock:
+            b = self._refill(model)
+            need_t = min(tokens, b.tpm)
+            wait = max(0.0, b.blocked_until - b.ts)
+            if b.requests < 1:
+                wait = max(wait, (1 - b.requests) * 60 / b.rpm)
+            if b.tokens < need_t:
+                wait = max(wait, (need_t - b.tokens) * 60 / b.tpm)
+            if wait == 0:
+                b.requests -= 1
+                b.tokens -= need_t
+            return wait
+
+    def observe(self, model: str, limits: RateLimitHeaders) -> None:
+        with self._lock:
+            b = self._refill(model)
+            if limits.limit_requests is not None:
+                b.rpm = limits.limit_requests
+            if limits.limit_tokens is not None:
+                b.tpm = limits.limit_tokens
+            if limits.remaining_requests is not None:
+                b.requests = min(b.requests, limits.remaining_requests)
+            if limits.remaining_tokens is not None:
+                b.tokens = min(b.tokens, limits.remaining_tokens)
+            b.requests = min(b.requests, b.rpm)
+            b.tokens = min(b.tokens, b.tpm)
+            blocked_for = limits.blocked_for()
+            if blocked_for:
+                b.blocked_until = max(b.blocked_until, b.ts + blocked_for)
+
+
+class RateLimiter:
+    """Shared budget via Redis; falls back to a per-process budget if Redis is unreachable."""
+
+    def __init__(self, shared: Optional[RedisBucketStore] = None, local: Optional[LocalBucketStore] = None):
+        self.shared = shared
+        self.local = local or LocalBucketStore()
+        self._shared_down_until = 0.0
+
+    def _run(self, method: str, *args):
+        if self.shared is not None and time.monotonic() >= self._shared_down_until:
+            try:
+                return getattr(self.shared, method)(*args)
+            except Exception as e:
+                print(f"⚠️ LLM rate limit store unavailable, using per-process budget: {e}")
+                self._shared_down_until = time.monotonic() + SHARED_RETRY_S
+        return getattr(self.local, method)(*args)
+
+    def acquire(self, model: str, tokens: int) -> float:
+        return self._run("acquire", model, tokens)
+
+    def observe(self, model: str, limits: RateLimitHeaders) -> None:
+        self._run("observe", model, limits)
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    if os.getenv("LLM_RATE_LIMIT_ENABLED", "true").lower() != "true":
+        return RateLimiter(local=LocalBucketStore(default_rpm=10**9, default_tpm=10**12))
+    try:
+        import redis
+        client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://redis:6379/0"), socket_timeout=2)
+        return RateLimiter(shared=RedisBucketStore(client))
+    except Exception as e:
+        print(f"⚠️ Redis unavailable for LLM rate limits, using per-process budget: {e}")
+        return RateLimiter()
+
+
+# --- Calls ---
+
+def estimate_tokens(payload: Any, output_tokens: Optional[int] = None) -> int:
+    """Prompt tokens plus expected completion tokens, as the provider counts them against TPM."""
+    text = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False, default=str)
+    return count_tokens(text) + (OUTPUT_TOKENS_ESTIMATE if output_tokens is None else output_tokens)
+
+
+def _is_rate_limited(exc: Exception) -> bool:
+    return getattr(exc, "status_code", None) == 429
+
+
+def _error_headers(exc: Exception) -> Optional[Mapping[str, str]]:
+    response = getattr(exc, "response", None)
+    return getattr(response, "headers", None)
+
+
+def _parse(raw: Any) -> Any:
+    # with_raw_response results; plain responses (e.g. test doubles) pass through
+    return raw.parse() if hasattr(raw, "parse") else raw
+
+
+def call_with_budget(
+    model: str,
+    tokens: int,
+    request: Callable[[], Any],
+    limiter: Optional[RateLimiter] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Any:
+    """
+    Run request() (an OpenAI with_raw_response call) once budget is available.
+    429s put the caller back in the queue; other errors are retried MAX_RETRIES times
+    (a Celery soft time limit is never retried). Raises LLMQueueTimeout if no budget frees up within QUEUE_TIMEOUT_S.
+    """
+    limiter = limiter or get_rate_limiter()
+    deadline = time.monotonic() + QUEUE_TIMEOUT_S
+    attempt = 0
+    while True:
+        wait = limiter.acquire(model, tokens)
+        if wait > 0:
+            if time.monotonic() + wait > deadline:
+                raise LLMQueueTimeout(f"{model}: no budget within {QUEUE_TIMEOUT_S:.0f}s")
+            sleep(min(wait, _MAX_SLEEP_S))
+            continue
+        try:
+            raw = request()
+        except SoftTimeLimitExceeded:
+            raise
+        except Exception as e:
+            if _is_rate_limited(e):
+                limits = RateLimitHeaders.from_headers(_error_headers(e))
+                if not limits.blocked_for():
+                    limits.retry_after = 1.0
+                limiter.observe(model, limits)
+                continue
+            attempt += 1
+            if attempt >= MAX_RETRIES:
+                raise
+            sleep(2 ** (attempt - 1))
+            continue
+        limiter.observe(model, RateLimitHeaders.from_headers(getattr(raw, "headers", None)))
+        return _parse(raw)
+
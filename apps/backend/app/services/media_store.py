@@ -0,0 +1,194 @@
+"""Content-addressed storage for uploaded media files."""
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+# Shared by the API (writes uploads) and the transcribe worker (reads them)
+MEDIA_UPLOAD_DIR = os.environ.get("MEDIA_UPLOAD_DIR", "/tmp/research_uploads")
+# Bytes copied per read; bounds API memory per upload regardless of file size
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Largest media file accepted, uploaded or picked up from a watched folder
+MAX_MEDIA_MB = int(os.environ.get("MAX_MEDIA_UPLOAD_MB", "100"))
+MAX_MEDIA_BYTES = MAX_MEDIA_MB * 1024 * 1024
+
+MEDIA_EXTENSIONS = {".mp3", ".wav", ".m4a", ".webm", ".ogg", ".mp4", ".m4v", ".mov"}
+
+
+class UploadTooLargeError(Exception):
+    """Upload exceeded the size limit; nothing was kept on disk."""
+
+
+class UnsupportedMediaError(ValueError):
+    """Upload has no media file part (wrong extension, missing field or not multipart)."""
+
+
+@dataclass
+class StoredMedia:
+    path: str
+    sha256: str
+    size_bytes: int
+    filename: str = ""
+
+
+def is_media_file(filename: str) -> bool:
+    if not filename:
+        return False
+    parts = filename.rsplit(".", 1)
+    ext = ("." + parts[1].lower()) if len(parts) > 1 else ""
+    return ext in MEDIA_EXTENSIONS
+
+
+def media_path(sha256: str, ext: str, root: Optional[str] = None) -> str:
+    """Storage path for media with this digest: {root}/ab/abcdef....mp3"""
+    return os.path.join(root or MEDIA_UPLOAD_DIR, sha256[:2], f"{sha256}{ext.lower()}")
+
+
+def chunk_dir(job_id: uuid.UUID, root: Optional[str] = None) -> str:
+    """Per-job scratch dir for transcription chunks (stored media may be shared by several jobs)."""
+    return os.path.join(root or MEDIA_UPLOAD_DIR, "chunks", str(job_id))
+
+
+class _FilePartReader:
+    """MultipartParser callbacks that keep the data of one file field and drop every other part."""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.filename: Optional[str] = None
+        self.pending: List[bytes] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_file = False
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": self._header_field_data,
+            "on_header_value": self._header_value_data,
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        }
+
+    def take(self) -> List[bytes]:
+        pending, self.pending = self.pending, []
+        return pending
+
+    def _part_begin(self) -> None:
+        self._headers = {}
+
+    def _header_field_data(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _header_value_data(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._in_file = (
+            self.filename is None and options.get(b"name") == self.field.encode() and b"filename" in options
+        )
+        if self._in_file:
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+
+    def _part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self.pending.append(data[start:end])
+
+    def _part_end(self) -> None:
+        self._in_file = False
+
+
+async def store_upload(
+    body: AsyncIterator[bytes],
+    content_type: str,
+    max_bytes: int,
+    field: str = "file",
+    root: Optional[str] = None,
+) -> StoredMedia:
+    """
+    Parse a multipart/form-data request body as it arrives and stream its `field` file part
+    to disk, hashing as it goes. The request is never spooled first, so the bytes are written
+    once and an oversize upload stops as soon as max_bytes is exceeded (UploadTooLargeError).
+    UnsupportedMediaError if there is no media file part. The file lands at its
+    content-addressed path; an identical file already stored is reused.
+    """
+    root = root or MEDIA_UPLOAD_DIR
+    mime, options = parse_options_header(content_type)
+    if mime != b"multipart/form-data" or not options.get(b"boundary"):
+        raise UnsupportedMediaError("Expected a multipart/form-data upload")
+    reader = _FilePartReader(field)
+    parser = MultipartParser(options[b"boundary"], callbacks=reader.callbacks())
+
+    incoming_dir = os.path.join(root, "incoming")
+    os.makedirs(incoming_dir, exist_ok=True)
+    tmp_path = os.path.join(incoming_dir, f"{uuid.uuid4()}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as out:
+            async for data in body:
+                parser.write(data)
+                if reader.filename is not None and not is_media_file(reader.filename):
+                    raise UnsupportedMediaError(f"Media only. Supported: {', '.join(sorted(MEDIA_EXTENSIONS))}")
+                for piece in reader.take():
+                    size += len(piece)
+                    if size > max_bytes:
+                        raise UploadTooLargeError(f"more than {max_bytes} bytes")
+                    digest.update(piece)
+                    await run_in_threadpool(out.write, piece)
+            parser.finalize()
+        if reader.filename is None:
+            raise UnsupportedMediaError(f"No file in the '{field}' field")
+
+        sha256 = digest.hexdigest()
+        _, ext = os.path.splitext(reader.filename)
+        path = media_path(sha256, ext, root)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.isfile(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        return StoredMedia(path=path, sha256=sha256, size_bytes=size, filename=reader.filename)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def store_file(src_path: str, root: Optional[str] = None) -> StoredMedia:
+    """Copy a local file into content-addressed storage (same layout as store_upload), hashing as it goes."""
+    root = root or MEDIA_UPLOAD_DIR
+    incoming_dir = os.path.join(root, "incoming")
+    os.makedirs(incoming_dir, exist_ok=True)
+    tmp_path = os.path.join(incoming_dir, f"{uuid.uuid4()}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(src_path, "rb") as src, open(tmp_path, "wb") as out:
+            while chunk := src.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                digest.update(chunk)
+                out.write(chunk)
+
+        sha256 = digest.hexdigest()
+        _, ext = os.path.splitext(src_path)
+        path = media_path(sha256, ext, root)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.isfile(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        return StoredMedia(path=path, sha256=sha256, size_bytes=size, filename=os.path.basename(src_path))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,162 @@
+"""Batch re-anchoring of fact evidence offsets (project- or workspace-wide)."""
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.models import Job, JobStatus, Project, ResearchNode, SourceDoc
+from app.utils.anchoring import AnchorIndex
+
+JOB_TYPE_REANCHOR = "reanchor_evidence"
+JOB_STEP_REANCHORING = "REANCHORING"
+JOB_STEP_DONE = "DONE"
+
+# Facts fetched per round trip while streaming one source
+FACT_BATCH_SIZE = 500
+
+
+class ReanchorRequest(BaseModel):
+    """Body of the project and workspace re-anchor endpoints."""
+    only_missing: bool = False  # True: only facts without raw offsets
+
+
+def create_reanchor_job(
+    db: Session,
+    workspace_id: uuid.UUID,
+    project_id: Optional[uuid.UUID] = None,
+    only_missing: bool = False,
+) -> Job:
+    """Create a PENDING re-anchor Job. Scope is one project, or the whole workspace when project_id is None."""
+    scope = str(project_id) if project_id else f"workspace:{workspace_id}"
+    job = Job(
+        id=uuid.uuid4(),
+        workspace_id=workspace_id,
+        project_id=project_id,
+        type=JOB_TYPE_REANCHOR,
+        status=JobStatus.PENDING,
+        idempotency_key=f"{scope}:reanchor:{uuid.uuid4()}",
+        current_step="QUEUED",
+        steps_completed=0,
+        steps_total=0,
+        params={
+            "workspace_id": str(workspace_id),
+            "project_id": str(project_id) if project_id else None,
+            "only_missing": only_missing,
+        },
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _source_ids_for_scope(db: Session, workspace_id: uuid.UUID, project_id: Optional[uuid.UUID]) -> List[uuid.UUID]:
+    if project_id:
+        statement = select(SourceDoc.id).where(SourceDoc.project_id == project_id)
+    else:
+        statement = (
+            select(SourceDoc.id)
+            .join(Project, Project.id == SourceDoc.project_id)
+            .where(Project.workspace_id == workspace_id)
+        )
+    return list(db.exec(statement.order_by(SourceDoc.created_at)).all())
+
+
+def reanchor_source(db: Session, source_id: uuid.UUID, only_missing: bool = False) -> Dict[str, int]:
+    """
+    Recompute raw/markdown evidence offsets for every fact of one source.
+    Loads the document once, streams facts in batches, bulk-updates changed rows.
+    Returns {"facts": n, "updated": n, "unanchored": n}.
+    """
+    row = db.exec(
+        select(SourceDoc.content_text_raw, SourceDoc.content_text, SourceDoc.content_markdown)
+        .where(SourceDoc.id == source_id)
+    ).first()
+    stats = {"facts": 0, "updated": 0, "unanchored": 0}
+    if not row:
+        return stats
+    raw_content = row[0] or row[1]
+    raw_index = AnchorIndex(raw_content)
+    md_index = AnchorIndex(row[2]) if row[2] and row[2] != raw_content else raw_index
+
+    statement = select(
+        ResearchNode.id,
+        ResearchNode.quote_text_raw,
+        ResearchNode.evidence_snippet,
+        ResearchNode.evidence_start_char_raw,
+        ResearchNode.evidence_end_char_raw,
+        ResearchNode.evidence_start_char_md,
+        ResearchNode.evidence_end_char_md,
+    ).where(ResearchNode.source_doc_id == source_id)
+    if only_missing:
+        statement = statement.where(ResearchNode.evidence_start_char_raw.is_(None))
+
+    updates: List[Dict[str, Any]] = []
+    for fact_id, quote, snippet, s_raw, e_raw, s_md, e_md in db.exec(
+        statement.execution_options(yield_per=FACT_BATCH_SIZE)
+    ):
+        stats["facts"] += 1
+        anchor_text = quote or snippet
+        new_raw = raw_index.find(anchor_text)
+        new_md = md_index.find(anchor_text) if row[2] else (None, None)
+        if new_raw == (None, None) and new_md == (None, None):
+            stats["unanchored"] += 1
+        if new_raw != (s_raw, e_raw) or new_md != (s_md, e_md):
+            updates.append({
+                "id": fact_id,
+                "evidence_start_char_raw": new_raw[0],
+                "evidence_end_char_raw": new_raw[1],
+                "evidence_start_char_md": new_md[0],
+                "evidence_end_char_md": new_md[1],
+            })
+
+    for i in range(0, len(updates), FACT_BATCH_SIZE):
+        db.exec(update(ResearchNode), params=updates[i:i + FACT_BATCH_SIZE])
+    stats["updated"] = len(updates)
+    return stats
+
+
+def run_reanchor_job(db: Session, job: Job) -> None:
+    """Re-anchor all sources in the job's scope, committing progress to the Job after each source."""
+    params = job.params or {}
+    workspace_id = uuid.UUID(params.get("workspace_id") or str(job.workspace_id))
+    project_id = uuid.UUID(params["project_id"]) if params.get("project_id") else None
+    only_missing = params.get("only_missing") is True
+
+    source_ids = _source_ids_for_scope(db, workspace_id, project_id)
+    summary = {
+        "sources_total": len(source_ids),
+        "sources_processed": 0,
+        "facts_total": 0,
+        "facts_updated": 0,
+        "facts_unanchored": 0,
+    }
+    job.status = JobStatus.RUNNING
+    job.current_step = JOB_STEP_REANCHORING
+    job.started_at = datetime.now(timezone.utc)
+    job.steps_completed = 0
+    job.steps_total = len(source_ids)
+    job.result_summary = dict(summary)
+    db.add(job)
+    db.commit()
+
+    for source_id in source_ids:
+        stats = reanchor_source(db, source_id, only_missing=only_missing)
+        summary["sources_processed"] += 1
+        summary["facts_total"] += stats["facts"]
+        summary["facts_updated"] += stats["updated"]
+        summary["facts_unanchored"] += stats["unanchored"]
+        job.steps_completed = summary["sources_processed"]
+        job.result_summary = dict(summary)
+        db.add(job)
+        db.commit()
+
+    job.status = JobStatus.COMPLETED
+    job.current_step = JOB_STEP_DONE
+    job.completed_at = datetime.now(timezone.utc)
+    job.result_summary = dict(summary)
+    db.add(job)
+    db.commit()
@@ -1,14 +1,15 @@
-"""Scira query ingest: search → dedup → enqueue URL jobs."""
+"""Scira query ingest: search → set-based dedup → one insert + enqueue of URL jobs."""
 import os
 import uuid
 from datetime import datetime, timezone, timedelta
 from typing import Any
 
+from sqlalchemy import delete
 from sqlmodel import Session, select
 
-from app.models import Job, JobStatus, SourceDoc, SciraUsage
-from app.extractors import detect_source_type, normalize_url
-from app.workers.celery_app import celery_app
+from app.models import Job, SciraUsage
+from app.services.llm import BULK_EXTRACTION_MODE
+from app.services.url_ingest import DUPLICATE, QUEUED, enqueue_urls
 from app.search.provider import SearchResult
 
 JOB_STEP_DONE = "DONE"
@@ -45,7 +46,8 @@ def run_query_ingest(
     search_provider: Any,
 ) -> dict[str, Any]:
     """
-    Execute search, dedup URLs, enqueue one url_ingest job per new URL.
+    Execute search, dedup URLs, enqueue one url_ingest job per new URL (created in one
+    insert and published over one broker connection).
     Caller must check feature flag and rate limit before calling.
     """
     query = (query or "").strip()
@@ -62,64 +64,13 @@ def run_query_ingest(
         urls = [u for u in urls if _domain_allowed(u, allowlist)]
     urls_found = len(urls)
 
+    enqueued = enqueue_urls(db, project_id, workspace_id, urls, extraction_mode=BULK_EXTRACTION_MODE)
+    queued_ids = [uuid.UUID(r["job_id"]) for r in enqueued if r["status"] == QUEUED]
     jobs_created: list[Job] = []
-    skipped = 0
-    for url in urls:
-        source_type = detect_source_type(url)
-        canonical = normalize_url(url, source_type)
-        idempotency_key = f"{str(project_id)}:{canonical}"
-
-        existing_doc = db.exec(
-            select(SourceDoc).where(
-                SourceDoc.project_id == project_id,
-                SourceDoc.canonical_url == canonical,
-            )
-        ).first()
-        if not existing_doc:
-            existing_doc = db.exec(
-                select(SourceDoc).where(
-                    SourceDoc.project_id == project_id,
-                    SourceDoc.url == canonical,
-                )
-            ).first()
-        if existing_doc:
-            skipped += 1
-            continue
-
-        existing_job = db.exec(
-            select(Job).where(
-                Job.project_id == project_id,
-                Job.idempotency_key == idempotency_key,
-            )
-        ).first()
-        if existing_job:
-            skipped += 1
-            continue
-
-        job = Job(
-            id=uuid.uuid4(),
-            project_id=project_id,
-            workspace_id=workspace_id,
-            type="url_ingest",
-            status=JobStatus.PENDING,
-            idempotency_key=idempotency_key,
-            params={"url": url, "source_type": source_type.value, "canonical_url": canonical},
-        )
-        db.add(job)
-        db.commit()
-        db.refresh(job)
-        jobs_created.append(job)
-        celery_app.send_task("ingest_url", args=[str(job.id), url])
-
-    # Update rate limit
-    usage = db.get(SciraUsage, project_id)
-    if not usage:
-        usage = SciraUsage(project_id=project_id, last_used_at=datetime.now(timezone.utc))
-        db.add(usage)
-    else:
-        usage.last_used_at = datetime.now(timezone.utc)
-        db.add(usage)
-    db.commit()
+    if queued_ids:
+        jobs_by_id = {j.id: j for j in db.exec(select(Job).where(Job.id.in_(queued_ids))).all()}
+        jobs_created = [jobs_by_id[job_id] for job_id in queued_ids]
+    skipped = sum(1 for r in enqueued if r["status"] == DUPLICATE)
 
     return {
         "query": query,
@@ -131,14 +82,41 @@ def run_query_ingest(
     }
 
 
-def check_rate_limit(project_id: uuid.UUID, db: Session) -> None:
-    """Raise ValueError with message if project is rate-limited."""
-    usage = db.get(SciraUsage, project_id)
-    if not usage:
-        return
-    last = usage.last_used_at
-    if last.tzinfo is None:
-        last = last.replace(tzinfo=timezone.utc)
-    delta = datetime.now(timezone.utc) - last
-    if delta < timedelta(minutes=SCIRA_RATE_LIMIT_MINUTES):
+def _dialect_insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Scira rate limiting is not supported on {dialect}")
+    return insert
+
+
+def check_rate_limit(project_id: uuid.UUID, db: Session) -> datetime:
+    """
+    Take the project's search slot, or raise ValueError with a message if it was used within
+    SCIRA_RATE_LIMIT_MINUTES. One INSERT ... ON CONFLICT DO UPDATE guarded on the last use,
+    so of two concurrent requests only one gets the slot. Returns the claim time.
+    """
+    now = datetime.now(timezone.utc)
+    insert = _dialect_insert(db)
+    statement = insert(SciraUsage).values(project_id=project_id, last_used_at=now)
+    statement = statement.on_conflict_do_update(
+        index_elements=["project_id"],
+        set_={"last_used_at": now},
+        where=SciraUsage.last_used_at < now - timedelta(minutes=SCIRA_RATE_LIMIT_MINUTES),
+    ).returning(SciraUsage.project_id)
+    claimed = db.exec(statement).first()
+    db.commit()
+    if claimed is None:
         raise ValueError("Too many searches. Try again in a few minutes.")
+    return now
+
+
+def release_rate_limit(project_id: uuid.UUID, claimed_at: datetime, db: Session) -> None:
+    """Give the slot back when the search itself failed (only if no newer claim took it)."""
+    db.exec(
+        delete(SciraUsage).where(SciraUsage.project_id == project_id, SciraUsage.last_used_at == claimed_at)
+    )
+    db.commit()
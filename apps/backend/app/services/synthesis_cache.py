@@ -0,0 +1,78 @@
+"""
+Synthesis cache (synthesis_cache table): an identical fact selection + mode in the same
+project returns the Output already generated for it instead of re-running clustering and
+the LLM. Keys hash the sorted fact ids and texts, the mode and SYNTHESIS_PROMPT_VERSION,
+so edited facts or a new prompt miss. Entries expire after a TTL; the table is capped at
+max_entries by evicting the least recently used rows.
+"""
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete
+from sqlmodel import Session
+
+from app.models import Output, SynthesisCacheEntry
+from app.services.llm import SYNTHESIS_PROMPT_VERSION
+from app.utils.table_cache import is_fresh, save_entry, touch_entry
+
+DEFAULT_TTL_HOURS = 24
+DEFAULT_MAX_ENTRIES = 1000
+
+
+def synthesis_cache_enabled() -> bool:
+    return os.environ.get("SYNTHESIS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def synthesis_cache_key(project_id: uuid.UUID, facts: Iterable[Dict[str, Any]], mode: str) -> str:
+    """Order-independent hash of the selection: [(id, text)] sorted by id, plus mode and prompt version."""
+    pairs = sorted((str(f.get("id")), f.get("text") or f.get("fact_text") or "") for f in facts)
+    payload = json.dumps(
+        {"project": str(project_id), "facts": pairs, "mode": mode, "prompt": SYNTHESIS_PROMPT_VERSION},
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SynthesisCache:
+    def __init__(self, ttl: Optional[timedelta] = None, max_entries: Optional[int] = None):
+        if ttl is None:
+            ttl = timedelta(hours=float(os.environ.get("SYNTHESIS_CACHE_TTL_HOURS", DEFAULT_TTL_HOURS)))
+        if max_entries is None:
+            max_entries = int(os.environ.get("SYNTHESIS_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def get(self, db: Session, key: str) -> Optional[Tuple[Output, List[Dict[str, Any]]]]:
+        """(Output, clusters) for a fresh entry whose Output still exists, else None."""
+        entry = db.get(SynthesisCacheEntry, key)
+        if entry is None:
+            return None
+        output = db.get(Output, entry.output_id)
+        if output is None or not is_fresh(entry.created_at, self.ttl):
+            db.delete(entry)
+            db.commit()
+            return None
+        touch_entry(db, entry)
+        return output, entry.clusters or []
+
+    def put(self, db: Session, key: str, output: Output, clusters: Optional[List[Dict[str, Any]]] = None) -> None:
+        now = datetime.now(timezone.utc)
+        entry = db.get(SynthesisCacheEntry, key)
+        if entry is None:
+            entry = SynthesisCacheEntry(key=key, project_id=output.project_id, output_id=output.id)
+        # A regenerated (bypassed or expired) synthesis replaces the previous one
+        entry.output_id = output.id
+        entry.clusters = clusters or []
+        entry.created_at = now
+        entry.last_used_at = now
+        # If another request cached the same selection first, its entry is kept
+        save_entry(db, entry, self.max_entries)
+
+
+def forget_output(db: Session, output_id: uuid.UUID) -> None:
+    """Drop cache entries pointing at a deleted Output (sqlite does not enforce the FK cascade)."""
+    db.exec(delete(SynthesisCacheEntry).where(SynthesisCacheEntry.output_id == output_id))
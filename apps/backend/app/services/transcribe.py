@@ -1,16 +1,34 @@
 """Self-hosted Whisper transcription for audio/video files."""
 import os
-from typing import List, Dict, Any
+import threading
+import wave
+from array import array
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 
+# Process-level model cache: weights are loaded once per worker process, not per file.
+# Key = (model_name, device, compute_type, cpu_threads, num_workers)
+_MODEL_CACHE: Dict[Tuple[str, str, str, int, int], Any] = {}
+_MODEL_LOCK = threading.Lock()
+
+# faster-whisper decodes to 16 kHz mono float32; chunk WAVs are written at the same rate.
+SAMPLE_RATE = 16000
+# Pad each chunk into the surrounding silence so word onsets/offsets aren't clipped.
+CHUNK_PAD_S = 0.2
 
-def transcribe_audio(path: str) -> List[Dict[str, Any]]:
-    """
-    Transcribe audio/video file to segments.
-    Returns list of { start_s, end_s, text }.
-    """
-    if not path or not os.path.isfile(path):
-        raise FileNotFoundError(f"File not found: {path}")
 
+def _model_config() -> Tuple[str, str, str, int, int]:
+    """Whisper settings from env (WHISPER_MODEL, WHISPER_DEVICE, WHISPER_COMPUTE_TYPE, WHISPER_CPU_THREADS, WHISPER_NUM_WORKERS)."""
+    return (
+        os.environ.get("WHISPER_MODEL", "base"),
+        os.environ.get("WHISPER_DEVICE", "cpu"),
+        os.environ.get("WHISPER_COMPUTE_TYPE", "int8"),
+        int(os.environ.get("WHISPER_CPU_THREADS", "0")),  # 0 = library default
+        int(os.environ.get("WHISPER_NUM_WORKERS", "1")),
+    )
+
+
+def get_whisper_model(model_name: Optional[str] = None) -> Any:
+    """Return the cached WhisperModel for the current settings, loading it on first use."""
     try:
         from faster_whisper import WhisperModel
     except ImportError:
@@ -19,8 +37,51 @@ def transcribe_audio(path: str) -> List[Dict[str, Any]]:
             "Install with: pip install faster-whisper"
         )
 
-    model_name = os.environ.get("WHISPER_MODEL", "base")
-    model = WhisperModel(model_name, device="cpu", compute_type="int8")
+    name, device, compute_type, cpu_threads, num_workers = _model_config()
+    key = (model_name or name, device, compute_type, cpu_threads, num_workers)
+    model = _MODEL_CACHE.get(key)
+    if model is not None:
+        return model
+    with _MODEL_LOCK:
+        model = _MODEL_CACHE.get(key)
+        if model is None:
+            print(f"🎙️ Loading Whisper model '{key[0]}' ({device}/{compute_type}, cpu_threads={cpu_threads})...")
+            model = WhisperModel(
+                key[0],
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers,
+            )
+            _MODEL_CACHE[key] = model
+    return model
+
+
+def warm_up() -> bool:
+    """Load the configured model ahead of the first task (called at worker process start). Returns True if loaded."""
+    try:
+        get_whisper_model()
+        return True
+    except Exception as e:
+        print(f"⚠️ Whisper warm-up failed: {e}")
+        return False
+
+
+def clear_model_cache() -> None:
+    """Drop cached models (tests / settings change)."""
+    with _MODEL_LOCK:
+        _MODEL_CACHE.clear()
+
+
+def transcribe_audio(path: str) -> List[Dict[str, Any]]:
+    """
+    Transcribe audio/video file to segments.
+    Returns list of { start_s, end_s, text }.
+    """
+    if not path or not os.path.isfile(path):
+        raise FileNotFoundError(f"File not found: {path}")
+
+    model = get_whisper_model()
     segments, _ = model.transcribe(path, beam_size=1)
 
     result = []
@@ -31,3 +92,116 @@ def transcribe_audio(path: str) -> List[Dict[str, Any]]:
             "text": (seg.text or "").strip(),
         })
     return result
+
+
+def _chunk_seconds() -> float:
+    """Maximum chunk length in seconds (WHISPER_CHUNK_SECONDS, default 180)."""
+    return float(os.environ.get("WHISPER_CHUNK_SECONDS", "180"))
+
+
+def plan_chunks(
+    speech_spans: Sequence[Tuple[float, float]],
+    max_chunk_s: Optional[float] = None,
+    pad_s: float = CHUNK_PAD_S,
+) -> List[Tuple[float, float]]:
+    """
+    Group sorted VAD speech spans (seconds) into chunks of at most max_chunk_s.
+    Chunks are cut only in silence between spans; a single span longer than
+    max_chunk_s is split at fixed length. Padding never crosses into a neighbour.
+    """
+    max_chunk_s = max_chunk_s or _chunk_seconds()
+    chunks: List[Tuple[float, float]] = []
+    cur_start: Optional[float] = None
+    cur_end = 0.0
+    for start, end in speech_spans:
+        if cur_start is not None and end - cur_start > max_chunk_s:
+            chunks.append((cur_start, cur_end))
+            cur_start = None
+        while end - start > max_chunk_s:
+            chunks.append((start, start + max_chunk_s))
+            start += max_chunk_s
+        if cur_start is None:
+            cur_start = start
+        cur_end = end
+    if cur_start is not None:
+        chunks.append((cur_start, cur_end))
+
+    padded: List[Tuple[float, float]] = []
+    for i, (start, end) in enumerate(chunks):
+        lo = start - pad_s if i == 0 else max(start - pad_s, (chunks[i - 1][1] + start) / 2)
+        hi = end + pad_s if i == len(chunks) - 1 else min(end + pad_s, (end + chunks[i + 1][0]) / 2)
+        padded.append((round(max(0.0, lo), 3), round(hi, 3)))
+    return padded
+
+
+def detect_speech_spans(audio: Sequence[float]) -> List[Tuple[float, float]]:
+    """Speech spans (seconds) via faster-whisper's Silero VAD; whole clip if VAD is unavailable."""
+    try:
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+    except ImportError:
+        return [(0.0, len(audio) / SAMPLE_RATE)] if len(audio) else []
+    stamps = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=500))
+    return [(t["start"] / SAMPLE_RATE, t["end"] / SAMPLE_RATE) for t in stamps]
+
+
+def _pcm16(samples: Sequence[float]) -> bytes:
+    if hasattr(samples, "astype"):  # numpy array from decode_audio
+        import numpy as np
+        return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    return array("h", (int(max(-1.0, min(1.0, v)) * 32767) for v in samples)).tobytes()
+
+
+def _write_wav(path: str, samples: Sequence[float]) -> None:
+    """Write mono 16-bit PCM atomically (a half-written chunk is never picked up on resume)."""
+    tmp_path = f"{path}.part"
+    with wave.open(tmp_path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(_pcm16(samples))
+    os.replace(tmp_path, path)
+
+
+def split_media(path: str, out_dir: str, max_chunk_s: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Decode a media file, find speech with VAD and write silence-bounded chunk WAVs to out_dir.
+    Returns [{index, start_s, end_s, path}]; empty when no speech is detected.
+    """
+    if not path or not os.path.isfile(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    try:
+        from faster_whisper.audio import decode_audio
+    except ImportError:
+        raise ImportError(
+            "faster-whisper is required for media transcription. "
+            "Install with: pip install faster-whisper"
+        )
+
+    audio = decode_audio(path, sampling_rate=SAMPLE_RATE)
+    plan = plan_chunks(detect_speech_spans(audio), max_chunk_s)
+    os.makedirs(out_dir, exist_ok=True)
+    chunks = []
+    for index, (start_s, end_s) in enumerate(plan):
+        chunk_path = os.path.join(out_dir, f"{index:04d}.wav")
+        _write_wav(chunk_path, audio[int(start_s * SAMPLE_RATE):int(end_s * SAMPLE_RATE)])
+        chunks.append({"index": index, "start_s": start_s, "end_s": end_s, "path": chunk_path})
+    return chunks
+
+
+def transcribe_chunk(path: str, offset_s: float) -> List[Dict[str, Any]]:
+    """Transcribe one chunk WAV; timestamps are shifted by offset_s onto the full file's timeline."""
+    return [
+        {
+            "start_s": round(seg["start_s"] + offset_s, 2),
+            "end_s": round(seg["end_s"] + offset_s, 2),
+            "text": seg["text"],
+        }
+        for seg in transcribe_audio(path)
+        if seg["text"]
+    ]
+
+
+def stitch_segments(chunk_segments: Sequence[Sequence[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Concatenate per-chunk segments (in chunk order) into one transcript sorted by start time."""
+    segments = [seg for chunk in chunk_segments for seg in chunk]
+    return sorted(segments, key=lambda seg: (seg["start_s"], seg["end_s"]))
@@ -0,0 +1,166 @@
+"""
+Set-based URL ingest: normalize a list of URLs, dedup them against the project's sources
+and jobs in two queries, insert the new url_ingest Jobs in one statement and publish their
+tasks over one broker connection. Used by POST /projects/{id}/ingest/bulk and scheduled_url
+ingest rules.
+"""
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from sqlalchemy import or_
+from sqlmodel import Session, select
+
+from app.extractors import detect_source_type, normalize_url
+from app.models import Job, JobStatus, SourceDoc
+from app.workers.celery_app import celery_app
+
+BULK_INGEST_MAX_URLS = 500
+
+# Per-URL result statuses
+QUEUED = "queued"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+DEFERRED = "deferred"
+
+
+def is_http_url(url: str) -> bool:
+    parsed = urlparse(url)
+    return parsed.scheme in ("http", "https") and bool(parsed.netloc)
+
+
+def _insert_ignoring_duplicates(db: Session, rows: List[Dict[str, Any]]) -> set:
+    """INSERT ... ON CONFLICT DO NOTHING for job rows; returns the ids actually inserted."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Bulk ingest is not supported on {dialect}")
+    statement = (
+        insert(Job)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["project_id", "idempotency_key"])
+        .returning(Job.id)
+    )
+    return set(db.exec(statement).scalars())
+
+
+def enqueue_tasks(jobs: Iterable[Dict[str, Any]]) -> None:
+    """Publish ingest_url for each job row, sharing one producer (broker connection)."""
+    with celery_app.producer_or_acquire() as producer:
+        for job in jobs:
+            celery_app.send_task("ingest_url", args=[str(job["id"]), job["params"]["url"]], producer=producer)
+
+
+def enqueue_urls(
+    db: Session,
+    project_id: uuid.UUID,
+    workspace_id: uuid.UUID,
+    urls: List[str],
+    extraction_mode: Optional[str] = None,
+    extra_params: Optional[Dict[str, Any]] = None,
+    max_new: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Create and queue url_ingest Jobs for the URLs not yet in the project. Returns one result
+    per input URL, in order: queued (job_id), duplicate (source_id or job_id) or invalid.
+    A URL counts as a duplicate of an existing source, an existing job with the same
+    canonical URL, or an earlier URL in the same list. With max_new, new URLs past that
+    many are left unqueued as deferred. extra_params are added to each job's params.
+    """
+    results: List[Dict[str, Any]] = []
+    for raw in urls:
+        url = (raw or "").strip()
+        if not is_http_url(url):
+            results.append({"url": raw, "status": INVALID, "message": "Not an http(s) URL"})
+            continue
+        source_type = detect_source_type(url)
+        canonical = normalize_url(url, source_type)
+        results.append({
+            "url": url,
+            "canonical_url": canonical,
+            "source_type": source_type.value,
+            "idempotency_key": f"{project_id}:{canonical}",
+        })
+    candidates = [r for r in results if "canonical_url" in r]
+    if not candidates:
+        return results
+
+    canonicals = {r["canonical_url"] for r in candidates}
+    docs = db.exec(
+        select(SourceDoc.id, SourceDoc.canonical_url, SourceDoc.url).where(
+            SourceDoc.project_id == project_id,
+            or_(
+                SourceDoc.canonical_url.in_(canonicals),
+                SourceDoc.url.in_(canonicals | {r["url"] for r in candidates}),
+            ),
+        )
+    ).all()
+    doc_by_url: Dict[str, uuid.UUID] = {}
+    for doc_id, doc_canonical, doc_url in docs:
+        for key in (doc_canonical, doc_url):
+            if key:
+                doc_by_url.setdefault(key, doc_id)
+    existing_jobs = dict(db.exec(
+        select(Job.idempotency_key, Job.id).where(
+            Job.project_id == project_id,
+            Job.idempotency_key.in_({r["idempotency_key"] for r in candidates}),
+        )
+    ).all())
+
+    rows: List[Dict[str, Any]] = []
+    seen: Dict[str, uuid.UUID] = {}
+    for r in candidates:
+        key = r["idempotency_key"]
+        source_id = doc_by_url.get(r["canonical_url"]) or doc_by_url.get(r["url"])
+        job_id = existing_jobs.get(key) or seen.get(key)
+        if source_id or job_id:
+            r.update(status=DUPLICATE, message="This source has already been added to this project")
+            if source_id:
+                r["source_id"] = str(source_id)
+            else:
+                r["job_id"] = str(job_id)
+            continue
+        if max_new is not None and len(rows) >= max_new:
+            r.update(status=DEFERRED)
+            continue
+        job = Job(
+            project_id=project_id,
+            workspace_id=workspace_id,
+            type="url_ingest",
+            status=JobStatus.PENDING,
+            idempotency_key=key,
+            params={
+                "url": r["url"],
+                "source_type": r["source_type"],
+                "canonical_url": r["canonical_url"],
+                **({"extraction_mode": extraction_mode} if extraction_mode else {}),
+                **(extra_params or {}),
+            },
+        )
+        seen[key] = job.id
+        rows.append(job.model_dump())
+        r.update(status=QUEUED, job_id=str(job.id))
+
+    if rows:
+        inserted = _insert_ignoring_duplicates(db, rows)
+        db.commit()
+        if len(inserted) < len(rows):
+            # Another request queued some of these between our lookup and the insert
+            raced = {row["idempotency_key"] for row in rows if row["id"] not in inserted}
+            winners = dict(db.exec(
+                select(Job.idempotency_key, Job.id).where(
+                    Job.project_id == project_id, Job.idempotency_key.in_(raced)
+                )
+            ).all())
+            for r in candidates:
+                if r.get("status") == QUEUED and r["idempotency_key"] in raced:
+                    r.update(status=DUPLICATE, job_id=str(winners.get(r["idempotency_key"], r["job_id"])),
+                             message="This source has already been added to this project")
+        enqueue_tasks(row for row in rows if row["id"] in inserted)
+
+    for r in results:
+        r.pop("idempotency_key", None)
+    return results
@@ -0,0 +1,158 @@
+"""
+Quote anchoring: locate fact quotes in source content with offsets into the ORIGINAL text.
+
+AnchorIndex is built once per document and reused for every fact of that source:
+- normalized text (casefolded, whitespace runs collapsed, typographic quotes/dashes
+  folded to ASCII) plus a per-character map back to original offsets, so a
+  normalized match always yields exact original offsets;
+- a word 3-gram index (built lazily) for fuzzy location when the LLM quote
+  differs from the source by a few words.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_CHAR_FOLD = {
+    "‘": "'", "’": "'", "‚": "'", "‛": "'",
+    "“": '"', "”": '"', "„": '"', "‟": '"',
+    "–": "-", "—": "-", "−": "-",
+    " ": " ", "…": "...",
+}
+
+_TOKEN_RE = re.compile(r"\w+")
+
+NGRAM_SIZE = 3
+# Fuzzy match must share at least this fraction of the quote's n-grams
+FUZZY_MIN_COVERAGE = 0.5
+# Quotes shorter than this (in tokens) are too ambiguous for fuzzy matching
+FUZZY_MIN_TOKENS = 4
+# Allowed alignment drift (in tokens) when collecting n-gram hits for one candidate
+_FUZZY_DRIFT = 3
+
+
+@dataclass(frozen=True)
+class Anchor:
+    """Located quote: [start, end) in the original content. kind: exact | normalized | fuzzy."""
+    start: int
+    end: int
+    kind: str
+
+
+def _normalize_with_map(text: str) -> Tuple[str, List[int]]:
+    """Normalize text and return (normalized, offsets) with offsets[i] = original index of normalized[i]."""
+    out: List[str] = []
+    offsets: List[int] = []
+    in_space = False
+    for i, ch in enumerate(text):
+        if ch.isspace():
+            if not in_space and out:
+                out.append(" ")
+                offsets.append(i)
+            in_space = True
+            continue
+        in_space = False
+        folded = _CHAR_FOLD.get(ch, ch).lower()
+        for c in folded:
+            out.append(c)
+            offsets.append(i)
+    if out and out[-1] == " ":
+        out.pop()
+        offsets.pop()
+    return "".join(out), offsets
+
+
+def normalize_quote(quote: str) -> str:
+    """Normalize a quote the same way AnchorIndex normalizes content."""
+    return _normalize_with_map(quote or "")[0]
+
+
+class AnchorIndex:
+    """Per-document index for locating many quotes in one pass."""
+
+    def __init__(self, content: Optional[str]):
+        self.content = content or ""
+        self._lower = self.content.lower()
+        self.normalized, self._offsets = _normalize_with_map(self.content)
+        self._tokens: Optional[List[Tuple[str, int, int]]] = None
+        self._ngrams: Optional[Dict[Tuple[str, ...], List[int]]] = None
+
+    def _span_to_original(self, norm_start: int, norm_end: int) -> Tuple[int, int]:
+        return self._offsets[norm_start], self._offsets[norm_end - 1] + 1
+
+    def _build_ngrams(self) -> None:
+        self._tokens = [(m.group(0), m.start(), m.end()) for m in _TOKEN_RE.finditer(self.normalized)]
+        words = [t[0] for t in self._tokens]
+        index: Dict[Tuple[str, ...], List[int]] = {}
+        for i in range(len(words) - NGRAM_SIZE + 1):
+            index.setdefault(tuple(words[i:i + NGRAM_SIZE]), []).append(i)
+        self._ngrams = index
+
+    def _fuzzy(self, norm_quote: str) -> Optional[Tuple[int, int]]:
+        q_words = _TOKEN_RE.findall(norm_quote)
+        if len(q_words) < FUZZY_MIN_TOKENS:
+            return None
+        if self._ngrams is None:
+            self._build_ngrams()
+        shingles = [tuple(q_words[j:j + NGRAM_SIZE]) for j in range(len(q_words) - NGRAM_SIZE + 1)]
+
+        # Vote for the document token where the quote would start
+        votes: Dict[int, int] = {}
+        hits: List[Tuple[int, int]] = []  # (candidate_start, doc_token_index)
+        for j, sh in enumerate(shingles):
+            for t in self._ngrams.get(sh, ()):
+                cand = t - j
+                votes[cand] = votes.get(cand, 0) + 1
+                hits.append((cand, t))
+        if not votes:
+            return None
+
+        # Aggregate nearby candidates so small insertions/deletions don't split the vote
+        best_cand, best_score = None, 0
+        for cand in votes:
+            score = sum(votes.get(cand + d, 0) for d in range(-_FUZZY_DRIFT, _FUZZY_DRIFT + 1))
+            if score > best_score or (score == best_score and best_cand is not None and cand < best_cand):
+                best_cand, best_score = cand, score
+        if best_score < max(1, math.ceil(FUZZY_MIN_COVERAGE * len(shingles))):
+            return None
+
+        matched = [t for cand, t in hits if abs(cand - best_cand) <= _FUZZY_DRIFT]
+        first_tok, last_tok = min(matched), max(matched) + NGRAM_SIZE - 1
+        return self._tokens[first_tok][1], self._tokens[last_tok][2]
+
+    def locate(self, quote: Optional[str], fuzzy: bool = True) -> Optional[Anchor]:
+        """Locate quote: exact (case-insensitive) → whitespace/punctuation-normalized → fuzzy n-gram."""
+        if not self.content or not quote or not quote.strip():
+            return None
+
+        lower_quote = quote.lower()
+        start = self._lower.find(lower_quote)
+        if start != -1 and len(self._lower) == len(self.content):
+            return Anchor(start, start + len(lower_quote), "exact")
+
+        norm_quote = normalize_quote(quote)
+        if not norm_quote:
+            return None
+        norm_start = self.normalized.find(norm_quote)
+        if norm_start != -1:
+            s, e = self._span_to_original(norm_start, norm_start + len(norm_quote))
+            return Anchor(s, e, "normalized")
+
+        if fuzzy:
+            span = self._fuzzy(norm_quote)
+            if span:
+                s, e = self._span_to_original(*span)
+                return Anchor(s, e, "fuzzy")
+        return None
+
+    def find(self, quote: Optional[str], fuzzy: bool = True) -> Tuple[Optional[int], Optional[int]]:
+        """(start, end) offsets into the original content, or (None, None)."""
+        anchor = self.locate(quote, fuzzy=fuzzy)
+        return (anchor.start, anchor.end) if anchor else (None, None)
+
+
+def anchor_quotes(content: Optional[str], quotes: Sequence[Optional[str]], fuzzy: bool = True) -> List[Tuple[Optional[int], Optional[int]]]:
+    """Anchor all quotes of one source against content, building the index once."""
+    index = AnchorIndex(content)
+    return [index.find(q, fuzzy=fuzzy) for q in quotes]
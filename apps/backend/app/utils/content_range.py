@@ -0,0 +1,108 @@
+"""
+Ranged access to large source documents.
+
+Slices a single content representation by character offsets (the same unit
+as evidence_start_char_* / evidence_end_char_*), by section, or as a window
+centred on an evidence offset. Sections follow the markers the ingest
+pipeline writes: markdown headings, `## [OP]`, `## [Comment: id]`, `## [start-end]`.
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_RANGE_CHARS = 20000
+MAX_RANGE_CHARS = 200000
+
+# How far back a window start may move to land on a paragraph/line boundary
+_SNAP_WINDOW = 400
+
+_SECTION_RE = re.compile(r"^#{1,6}[ \t]+(.+?)[ \t]*#*[ \t]*$", re.MULTILINE)
+
+
+def compute_section_spans(content: str) -> List[Dict]:
+    """
+    Return [{index, title, start, end}] covering the whole content.
+    Text before the first heading becomes an untitled leading section.
+    """
+    if not content:
+        return []
+    starts: List[Tuple[int, str]] = [(m.start(), m.group(1).strip()) for m in _SECTION_RE.finditer(content)]
+    if not starts or starts[0][0] > 0:
+        starts.insert(0, (0, ""))
+    spans = []
+    for i, (start, title) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(content)
+        spans.append({"index": i, "title": title, "start": start, "end": end})
+    return spans
+
+
+def _snap_back(content: str, pos: int) -> int:
+    """Move pos back to the start of a paragraph (or line) if one is close by."""
+    if pos <= 0:
+        return 0
+    floor = max(0, pos - _SNAP_WINDOW)
+    para = content.rfind("\n\n", floor, pos)
+    if para != -1:
+        return para + 2
+    line = content.rfind("\n", floor, pos)
+    if line != -1:
+        return line + 1
+    return pos
+
+
+def resolve_range(
+    content: str,
+    start: Optional[int] = None,
+    length: Optional[int] = None,
+    around: Optional[int] = None,
+    section: Optional[int] = None,
+) -> Tuple[int, int]:
+    """
+    Resolve request parameters to a (start, end) char range within content.
+    Precedence: section > around > start. Length is clamped to MAX_RANGE_CHARS.
+    Raises ValueError for an unknown section index or negative offsets.
+    """
+    total = len(content or "")
+    size = DEFAULT_RANGE_CHARS if length is None else length
+    size = max(1, min(size, MAX_RANGE_CHARS))
+
+    if section is not None:
+        spans = compute_section_spans(content)
+        if section < 0 or section >= len(spans):
+            raise ValueError(f"section must be between 0 and {max(len(spans) - 1, 0)}")
+        span = spans[section]
+        return span["start"], min(span["end"], span["start"] + size)
+
+    if around is not None:
+        if around < 0:
+            raise ValueError("around must be >= 0")
+        centre = min(around, total)
+        begin = _snap_back(content, max(0, centre - size // 2))
+        return begin, min(total, begin + size)
+
+    begin = start or 0
+    if begin < 0:
+        raise ValueError("start must be >= 0")
+    begin = min(begin, total)
+    return begin, min(total, begin + size)
+
+
+def content_etag(content_hash: Optional[str], content: str, *parts: object) -> str:
+    """Strong ETag for one slice of one representation, keyed by the document content_hash."""
+    base = content_hash or hashlib.md5((content or "").encode("utf-8")).hexdigest()
+    key = ":".join([base, *(str(p) for p in parts)])
+    return '"' + hashlib.md5(key.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value matches etag (weak comparison, '*' allowed)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
@@ -0,0 +1,53 @@
+"""
+TTL + LRU helpers for database cache tables (search_cache, synthesis_cache, youtube_cache).
+Each row has a timestamp its TTL runs from and a last_used_at; a table is capped at
+max_entries by evicting the least recently used rows.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel, select
+
+
+def as_utc(dt: datetime) -> datetime:
+    """Aware UTC datetime (sqlite hands back naive ones)."""
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def is_fresh(stamp: datetime, ttl: timedelta, now: Optional[datetime] = None) -> bool:
+    return (now or datetime.now(timezone.utc)) - as_utc(stamp) < ttl
+
+
+def touch_entry(db: Session, entry: SQLModel) -> None:
+    """Mark a cache hit for LRU eviction."""
+    entry.last_used_at = datetime.now(timezone.utc)
+    db.add(entry)
+    db.commit()
+
+
+def save_entry(db: Session, entry: SQLModel, max_entries: int) -> bool:
+    """
+    Commit a new or updated cache row, then evict beyond max_entries.
+    False (rolled back) if a concurrent writer inserted the same key first.
+    """
+    db.add(entry)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    evict_lru(db, type(entry), max_entries)
+    return True
+
+
+def evict_lru(db: Session, model: type[SQLModel], max_entries: int) -> None:
+    """Drop the least recently used rows of model's table beyond max_entries."""
+    overflow = db.exec(select(func.count()).select_from(model)).one() - max_entries
+    if overflow <= 0:
+        return
+    key = inspect(model).primary_key[0]
+    oldest = select(key).order_by(model.last_used_at).limit(overflow)
+    db.exec(delete(model).where(key.in_(oldest)))
+    db.commit()
@@ -1,9 +1,55 @@
 import os
 from celery import Celery
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_process_init
+
+try:
+    from gevent import Timeout as _GeventTimeout
+except ImportError:
+    _GeventTimeout = None
 
 # Use Redis as Broker
 redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
 
+# One queue per workload so a slow task type can't starve the others. Each worker service
+# consumes its own queues with a pool suited to the work (see docker-compose.yml):
+#   ingest, llm  - URL fetch + extraction, provider batches: network-bound, gevent pool.
+#                  ingest_url also runs the LLM fact extraction inline: it waits on HTTP like the fetch
+#   transcribe   - Whisper: CPU-bound, prefork, one task per process
+#   bulk         - re-anchoring and exports: long-running, prefork, one task per process
+INGEST_QUEUE = os.getenv("CELERY_INGEST_QUEUE", "ingest")
+LLM_QUEUE = os.getenv("CELERY_LLM_QUEUE", "llm")
+TRANSCRIBE_QUEUE = os.getenv("CELERY_TRANSCRIBE_QUEUE", "transcribe")
+BULK_QUEUE = os.getenv("CELERY_BULK_QUEUE", "bulk")
+
+TASK_QUEUES = {
+    "ingest_url": INGEST_QUEUE,
+    "run_due_ingest_rules": INGEST_QUEUE,
+    "finalize_media_ingest": LLM_QUEUE,
+    "media_ingest_failed": LLM_QUEUE,
+    "submit_llm_batches": LLM_QUEUE,
+    "poll_llm_batch": LLM_QUEUE,
+    "ingest_media": TRANSCRIBE_QUEUE,
+    "transcribe_media_chunk": TRANSCRIBE_QUEUE,
+    "reanchor_evidence": BULK_QUEUE,
+    "bulk_export": BULK_QUEUE,
+}
+
+# Ack after the task finishes: a task on a worker that dies is redelivered, not lost
+ACKS_LATE = os.getenv("CELERY_ACKS_LATE", "true").lower() == "true"
+# Tasks reserved per worker process/greenlet beyond the running one
+PREFETCH_MULTIPLIER = int(os.getenv("CELERY_PREFETCH_MULTIPLIER", "1"))
+# Redis redelivers unacked tasks after this long; keep it above the longest task time limit
+VISIBILITY_TIMEOUT_S = int(os.getenv("CELERY_VISIBILITY_TIMEOUT_SECONDS", "7200"))
+
+# Raised inside a task that ran out of time. The gevent pool never delivers the soft limit and
+# enforces the hard one by raising gevent.Timeout in the task, a BaseException that
+# `except Exception` misses, so job failure handlers catch this tuple as well
+TIME_LIMIT_ERRORS = (SoftTimeLimitExceeded,) + ((_GeventTimeout,) if _GeventTimeout else ())
+
+# celery beat: how often due scheduled_url ingest rules are looked up (leases stop double runs)
+INGEST_RULES_TICK_S = int(os.getenv("INGEST_RULES_TICK_SECONDS", "60"))
+
 celery_app = Celery(
     "worker",
     broker=redis_url,
@@ -16,8 +62,45 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
-    task_soft_time_limit=300, 
+    task_soft_time_limit=300,
     task_time_limit=600,
+    task_default_queue=INGEST_QUEUE,
+    task_routes={name: {"queue": queue} for name, queue in TASK_QUEUES.items()},
+    task_acks_late=ACKS_LATE,
+    task_reject_on_worker_lost=ACKS_LATE,
+    worker_prefetch_multiplier=PREFETCH_MULTIPLIER,
+    broker_transport_options={"visibility_timeout": VISIBILITY_TIMEOUT_S},
+    beat_schedule={
+        "run-due-ingest-rules": {
+            "task": "run_due_ingest_rules",
+            "schedule": INGEST_RULES_TICK_S,
+            "options": {"expires": INGEST_RULES_TICK_S},
+        },
+    },
     # ✅ FIX: Explicitly tell Celery where your task function lives
-    imports=["app.workers.ingest_task"]
-)
\ No newline at end of file
+    imports=["app.workers.ingest_task", "app.workers.reanchor_task", "app.workers.llm_batch_task", "app.workers.export_task", "app.workers.ingest_rules_task"]
+)
+
+
+def _green_db_driver() -> None:
+    """Under a gevent pool (-P gevent), make psycopg2 wait on the hub instead of blocking every greenlet."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return
+    if not monkey.is_module_patched("socket"):
+        return
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+
+
+_green_db_driver()
+
+
+@worker_process_init.connect
+def _warm_whisper_model(**_kwargs) -> None:
+    """Load the Whisper model once per worker process (WHISPER_PRELOAD=true on the transcribe worker)."""
+    if os.getenv("WHISPER_PRELOAD", "false").lower() != "true":
+        return
+    from app.services.transcribe import warm_up
+    warm_up()
@@ -0,0 +1,36 @@
+import traceback
+
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.models import Job, JobStatus
+from app.services.columnar_export import JOB_TYPE_BULK_EXPORT, run_bulk_export_job
+from app.utils.ids import as_uuid
+from app.workers.celery_app import celery_app
+
+
+@celery_app.task(bind=True, name="bulk_export", soft_time_limit=3600, time_limit=3900)
+def bulk_export_task(self, job_id: str) -> None:
+    """Write the job's workspace (facts, sources, outputs) as Parquet/Arrow files into a zip artifact."""
+    job_id = as_uuid(job_id)
+    with Session(engine) as db:
+        job = db.get(Job, job_id)
+        if not job or job.type != JOB_TYPE_BULK_EXPORT:
+            return
+        try:
+            run_bulk_export_job(db, job)
+        except Exception as e:
+            db.rollback()
+            traceback.print_exc()
+            job = db.get(Job, job_id)
+            if not job:
+                return
+            job.status = JobStatus.FAILED
+            job.current_step = "FAILED"
+            job.result_summary = {
+                **(job.result_summary or {}),
+                "error_code": "EXPORT_FAILED",
+                "error_message": str(e)[:120],
+            }
+            db.add(job)
+            db.commit()
@@ -0,0 +1,156 @@
+"""
+Folder watcher for folder_watch ingest rules. Run one or more per deployment:
+
+    python -m app.workers.folder_watch
+
+Each process leases folder_watch rules (renewing while it runs), watches their folders with
+inotify via watchdog, and queues a file once it has had no write events for
+WATCH_DEBOUNCE_SECONDS. Files are deduplicated by content hash, so re-saves, renames, and
+files that were already there when the watch started are queued once.
+"""
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.models import IngestRule
+from app.services.ingest_rules import LEASE_SECONDS, RULE_FOLDER_WATCH, claim_rules, ingest_watched_file
+
+WATCH_DEBOUNCE_SECONDS = float(os.getenv("WATCH_DEBOUNCE_SECONDS", "5"))
+WATCH_TICK_SECONDS = 1.0
+
+
+def _watchdog():
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        raise ImportError(
+            "watchdog is required for folder_watch ingest rules. "
+            "Install with: pip install watchdog"
+        )
+    return Observer, FileSystemEventHandler
+
+
+class Debouncer:
+    """Pending (rule, path) pairs that are ready once no event has touched them for `quiet` seconds."""
+
+    def __init__(self, quiet: float = WATCH_DEBOUNCE_SECONDS):
+        self.quiet = quiet
+        self._last_event: Dict[Tuple[uuid.UUID, str], float] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, rule_id: uuid.UUID, path: str, now: Optional[float] = None) -> None:
+        with self._lock:
+            self._last_event[(rule_id, path)] = time.monotonic() if now is None else now
+
+    def settled(self, now: Optional[float] = None) -> List[Tuple[uuid.UUID, str]]:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            ready = [key for key, at in self._last_event.items() if now - at >= self.quiet]
+            for key in ready:
+                del self._last_event[key]
+        return ready
+
+    def forget(self, rule_id: uuid.UUID) -> None:
+        with self._lock:
+            for key in [k for k in self._last_event if k[0] == rule_id]:
+                del self._last_event[key]
+
+
+class FolderWatchService:
+    """Holds folder_watch leases for this process and turns settled files into ingest jobs."""
+
+    def __init__(self, owner: Optional[str] = None, debouncer: Optional[Debouncer] = None):
+        self.owner = owner or f"watch:{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.debouncer = debouncer or Debouncer()
+        self._watches: Dict[uuid.UUID, object] = {}
+        self._observer = None
+
+    def _handler(self, rule_id: uuid.UUID):
+        _, FileSystemEventHandler = _watchdog()
+        debouncer = self.debouncer
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory or event.event_type not in ("created", "modified", "moved", "closed"):
+                    return
+                debouncer.touch(rule_id, getattr(event, "dest_path", "") or event.src_path)
+
+        return Handler()
+
+    def _watch(self, rule: IngestRule) -> None:
+        path = (rule.config_json or {}).get("path")
+        if not path or not os.path.isdir(path):
+            print(f"folder_watch {rule.id}: {path!r} is not a directory")
+            self._watches.pop(rule.id, None)  # retried on the next sync
+            return
+        if self._observer is not None:
+            self._watches[rule.id] = self._observer.schedule(self._handler(rule.id), path, recursive=True)
+        # Files present before the watch started (hash dedup makes repeats harmless)
+        for dirpath, _, filenames in os.walk(path):
+            for name in filenames:
+                self.debouncer.touch(rule.id, os.path.join(dirpath, name))
+
+    def _unwatch(self, rule_id: uuid.UUID) -> None:
+        watch = self._watches.pop(rule_id, None)
+        if watch is not None and self._observer is not None:
+            self._observer.unschedule(watch)
+        self.debouncer.forget(rule_id)
+
+    def sync_rules(self, db: Session) -> None:
+        """Take or renew leases on folder_watch rules; start and stop watches to match."""
+        owned = {rule.id: rule for rule in claim_rules(db, RULE_FOLDER_WATCH, self.owner, due_only=False)}
+        for rule_id in set(self._watches) - set(owned):
+            self._unwatch(rule_id)
+        for rule_id, rule in owned.items():
+            if rule_id not in self._watches:
+                self._watches[rule_id] = None
+                self._watch(rule)
+
+    def process_settled(self, db: Session, now: Optional[float] = None) -> int:
+        """Queue files that stopped changing; files over a rule's cap are retried on a later tick."""
+        queued = 0
+        for rule_id, path in self.debouncer.settled(now):
+            rule = db.get(IngestRule, rule_id)
+            if not rule or rule.lease_owner != self.owner or not rule.enabled:
+                continue
+            try:
+                result = ingest_watched_file(db, rule, path)
+            except Exception:
+                db.rollback()
+                traceback.print_exc()
+                continue
+            if result is None:
+                self.debouncer.touch(rule_id, path, now)
+            elif result["status"] == "queued":
+                queued += 1
+        return queued
+
+    def run_forever(self) -> None:
+        Observer, _ = _watchdog()
+        self._observer = Observer()
+        self._observer.start()
+        print(f"📂 Folder watcher {self.owner} started")
+        next_sync = 0.0
+        try:
+            while True:
+                with Session(engine) as db:
+                    if time.monotonic() >= next_sync:
+                        self.sync_rules(db)
+                        next_sync = time.monotonic() + LEASE_SECONDS / 3
+                    self.process_settled(db)
+                time.sleep(WATCH_TICK_SECONDS)
+        finally:
+            self._observer.stop()
+            self._observer.join()
+
+
+if __name__ == "__main__":
+    FolderWatchService().run_forever()
@@ -0,0 +1,12 @@
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.services.ingest_rules import run_due_rules
+from app.workers.celery_app import celery_app
+
+
+@celery_app.task(name="run_due_ingest_rules")
+def run_due_ingest_rules_task() -> int:
+    """Beat tick: run scheduled_url rules whose next_run_at has passed (leased, so safe to run on many nodes)."""
+    with Session(engine) as db:
+        return run_due_rules(db)
@@ -1,13 +1,29 @@
+import os
 import uuid
 import hashlib
+import shutil
 import traceback
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+from celery import chord, group
+from sqlalchemy import and_, delete, or_
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 from app.db.session import engine
+from app.utils.anchoring import AnchorIndex
 from app.utils.ids import as_uuid
-from app.workers.celery_app import celery_app
-from app.models import Job, JobStatus, SourceDoc, ResearchNode, IntegrityStatus, ReviewStatus, SourceType, NodeType
-from app.services.llm import extract_facts_from_markdown
+from app.workers.celery_app import TIME_LIMIT_ERRORS, celery_app
+from app.models import Job, JobStatus, SourceDoc, ResearchNode, IntegrityStatus, ReviewStatus, SourceType, NodeType, TranscriptChunk, MediaTranscript
+from app.services.chunking import chunk_markdown
+from app.services.llm import (
+    DEFAULT_EXTRACTION_MODE,
+    EXTRACTION_MAX_CHUNKS,
+    OVERSIZE_TO_BATCH,
+    ExtractedFact,
+    ExtractionResult,
+    extract_facts_from_markdown,
+)
+from app.services.llm_batch import BATCH_WINDOW_S, enqueue_extraction
+from app.services.media_store import chunk_dir
 from app.extractors import detect_source_type, normalize_url, extract
 import requests
 from bs4 import BeautifulSoup
@@ -55,32 +71,9 @@ def find_quote_offsets(content: Optional[str], quote: str) -> Tuple[Optional[int
     """
     Find character offsets for a quote in content.
     Returns (start, end) or (None, None) if not found.
+    For many quotes against the same content, build one AnchorIndex instead.
     """
-    if not content or not quote:
-        return (None, None)
-    
-    # Try exact match (case-insensitive)
-    lower_content = content.lower()
-    lower_quote = quote.lower()
-    
-    start = lower_content.find(lower_quote)
-    if start != -1:
-        return (start, start + len(quote))
-    
-    # Try normalized whitespace match
-    def normalize(s: str) -> str:
-        return " ".join(s.split())
-
-    norm_content = normalize(lower_content)
-    norm_quote = normalize(lower_quote)
-    
-    start = norm_content.find(norm_quote)
-    if start != -1:
-        # Approximate mapping back to original
-        # This is a best-effort - may be off by a few chars
-        return (start, start + len(quote))
-    
-    return (None, None)
+    return AnchorIndex(content).find(quote)
 
 def clean_main_content(html_content: str, url: str) -> Dict[str, Optional[str]]:
     """
@@ -174,12 +167,6 @@ def clean_main_content(html_content: str, url: str) -> Dict[str, Optional[str]]:
     
     return result
 
-@celery_app.task(
-    bind=True,
-    name="ingest_url",  
-    soft_time_limit=300,
-    time_limit=600
-)
 def _resolve_fact_source_url(section_context: Optional[str], source_type: SourceType, metadata: Optional[dict], doc_url: str) -> tuple:
     """Return (section_context, source_url) for Reddit/YouTube facts."""
     if not metadata:
@@ -189,7 +176,6 @@ def _resolve_fact_source_url(section_context: Optional[str], source_type: Source
     if source_type == SourceType.REDDIT:
         if "[OP]" in ctx or (ctx.upper() == "OP") or ctx == "reddit:op":
             return ("reddit:op", metadata.get("thread_url") or doc_url)
-        import re
         m = re.search(r"\[Comment:\s*([^\]]+)\]|comment[:\s]+([a-z0-9]+)", ctx, re.I)
         if m:
             cid = (m.group(1) or m.group(2) or "").strip()
@@ -230,7 +216,8 @@ JOB_STEP_FACTING = "FACTING"
 JOB_STEP_DONE = "DONE"
 JOB_STEP_FAILED = "FAILED"
 
-ERROR_CODES = ("NETWORK", "RATE_LIMIT", "PAYWALL", "UNSUPPORTED", "EMPTY_CONTENT", "CAPTIONS_UNAVAILABLE", "TRANSCRIPT_DISABLED", "TRANSCRIPT_FAILED")
+ERROR_CODES = ("NETWORK", "RATE_LIMIT", "PAYWALL", "UNSUPPORTED", "EMPTY_CONTENT", "CAPTIONS_UNAVAILABLE", "TRANSCRIPT_DISABLED", "TRANSCRIPT_FAILED", "TIME_LIMIT", "BATCH_FAILED")
+TIME_LIMIT_MESSAGE = "Processing took longer than the task time limit"
 
 def _set_job_failed(job, error_code: str, error_message: str, result_summary: Optional[dict] = None):
     job.status = JobStatus.FAILED
@@ -240,6 +227,104 @@ def _set_job_failed(job, error_code: str, error_message: str, result_summary: Op
     job.result_summary["error_message"] = error_message
 
 
+def _extract_facts_for_job(db: Session, job: Job, text_content: str) -> ExtractionResult:
+    """Run fact extraction in the job's extraction_mode, recording per-chunk progress on the Job."""
+    mode = (job.params or {}).get("extraction_mode") or DEFAULT_EXTRACTION_MODE
+
+    def on_progress(done: int, total: int) -> None:
+        job.result_summary = {
+            **(job.result_summary or {}),
+            "extract_chunks_done": done,
+            "extract_chunks_total": total,
+        }
+        db.add(job)
+        db.commit()
+
+    return extract_facts_from_markdown(text_content, mode=mode, on_progress=on_progress)
+
+
+def _save_extracted_facts(
+    db: Session,
+    job: Job,
+    source_doc_id: uuid.UUID,
+    facts: List[ExtractedFact],
+    source_type: SourceType,
+    metadata_json: Optional[dict],
+    doc_url: str,
+    raw_index: AnchorIndex,
+    md_index: AnchorIndex,
+) -> Tuple[int, int]:
+    """Add a ResearchNode per extracted fact, anchored in the source; returns (saved, auto_flagged)."""
+    saved_count = 0
+    auto_flagged_count = 0
+    for fact_data in facts:
+        try:
+            confidence_score = 85 if fact_data.confidence == "HIGH" else (60 if fact_data.confidence == "MEDIUM" else 40)
+            review_status = ReviewStatus.PENDING if confidence_score >= 75 else ReviewStatus.NEEDS_REVIEW
+            if review_status == ReviewStatus.NEEDS_REVIEW:
+                auto_flagged_count += 1
+            quote = fact_data.quote_span
+            start_raw, end_raw = raw_index.find(quote)
+            start_md, end_md = md_index.find(quote)
+            evidence_snippet = quote[:500] if quote and len(quote) > 10 else None
+            if evidence_snippet and len(quote or "") > 500:
+                evidence_snippet = quote[:500]
+            sect_ctx, fact_source_url = _resolve_fact_source_url(
+                fact_data.section_context, source_type, metadata_json, doc_url
+            )
+            fact = ResearchNode(
+                id=uuid.uuid4(),
+                project_id=job.project_id,
+                source_doc_id=source_doc_id,
+                fact_text=fact_data.fact_text,
+                is_key_claim=fact_data.is_key_claim,
+                confidence_score=confidence_score,
+                section_context=sect_ctx or fact_data.section_context,
+                source_url=fact_source_url,
+                quote_text_raw=quote,
+                evidence_snippet=evidence_snippet,
+                evidence_start_char_raw=start_raw,
+                evidence_end_char_raw=end_raw,
+                evidence_start_char_md=start_md,
+                evidence_end_char_md=end_md,
+                tags=fact_data.tags or [],
+                review_status=review_status
+            )
+            db.add(fact)
+            saved_count += 1
+        except Exception as e:
+            print(f"⚠️ Failed to save fact '{fact_data.fact_text[:30]}...': {e}")
+            continue
+    return saved_count, auto_flagged_count
+
+
+def _defer_extraction_to_batch(
+    db: Session, job: Job, source_doc_id: uuid.UUID, text_content: str, result_summary: dict
+) -> bool:
+    """
+    extraction_mode="batch": queue the chunks for the provider batch API and leave the job
+    RUNNING at FACTING; app/workers/llm_batch_task.py completes it with result_summary
+    plus the fact counts. Documents over LLM_EXTRACTION_MAX_CHUNKS go the same way in any
+    mode (LLM_OVERSIZE_TO_BATCH) rather than losing their tail. Returns False (extract inline) otherwise.
+    """
+    mode = (job.params or {}).get("extraction_mode") or DEFAULT_EXTRACTION_MODE
+    if mode != "batch":
+        if not OVERSIZE_TO_BATCH or len(chunk_markdown(text_content)) <= EXTRACTION_MAX_CHUNKS:
+            return False
+        result_summary = {**result_summary, "extract_oversize": True}
+    chunks_total = enqueue_extraction(db, job, source_doc_id, text_content)
+    if not chunks_total:
+        return False
+    job.current_step = JOB_STEP_FACTING
+    job.steps_completed = 3
+    job.result_summary = {**result_summary, "awaiting_batch": True, "extract_chunks_total": chunks_total}
+    db.add(job)
+    db.commit()
+    # Every enqueue schedules a flush; flushes before the window has passed are no-ops
+    celery_app.send_task("submit_llm_batches", countdown=BATCH_WINDOW_S)
+    return True
+
+
 def ingest_url_task(self, job_id: str | uuid.UUID, url: str) -> None:
     job_id = as_uuid(job_id)
     with Session(engine) as db:
@@ -354,7 +439,7 @@ def ingest_url_task(self, job_id: str | uuid.UUID, url: str) -> None:
                 if source_type == SourceType.REDDIT:
                     page_title = extracted.get("title", "")
                     op_text = extracted.get("op_text", "")
-                    comments = extracted.get("comments", [])[:20]
+                    comments = extracted.get("comments", [])
                     parts = [f"## [OP]\n{op_text}"]
                     metadata_json = {"thread_url": extracted.get("thread_url", url), "comments": [{"id": c.get("id"), "permalink": c.get("permalink"), "author": c.get("author"), "score": c.get("score")} for c in comments]}
                     for c in comments:
@@ -443,73 +528,47 @@ def ingest_url_task(self, job_id: str | uuid.UUID, url: str) -> None:
             job.steps_completed = 3
             db.add(job)
             db.commit()
-            
-            extraction_result = extract_facts_from_markdown((text_content or "")[:25000])
+
+            source_summary = {
+                "source_title": page_title,
+                "source_type": source_type.value,
+                "content_formats": {
+                    "has_markdown": bool(content_formats.get("markdown")),
+                    "has_html": bool(content_formats.get("html_clean"))
+                }
+            }
+            if _defer_extraction_to_batch(db, job, source_doc.id, text_content or "", source_summary):
+                return
+
+            extraction_result = _extract_facts_for_job(db, job, text_content or "")
             
             job.current_step = JOB_STEP_FACTING
             job.steps_completed = 4
             db.add(job)
             db.commit()
             
-            saved_count = 0
-            auto_flagged_count = 0
-            for fact_data in extraction_result.facts:
-                try:
-                    confidence_score = 85 if fact_data.confidence == "HIGH" else (60 if fact_data.confidence == "MEDIUM" else 40)
-                    review_status = ReviewStatus.PENDING if confidence_score >= 75 else ReviewStatus.NEEDS_REVIEW
-                    if review_status == ReviewStatus.NEEDS_REVIEW:
-                        auto_flagged_count += 1
-                    quote = fact_data.quote_span
-                    start_raw, end_raw = find_quote_offsets(content_formats["text_raw"], quote)
-                    start_md, end_md = find_quote_offsets(content_formats.get("markdown"), quote)
-                    evidence_snippet = quote[:500] if quote and len(quote) > 10 else None
-                    if evidence_snippet and len(quote or "") > 500:
-                        evidence_snippet = quote[:500]
-                    sect_ctx, fact_source_url = _resolve_fact_source_url(
-                        fact_data.section_context, source_type, metadata_json, url
-                    )
-                    fact = ResearchNode(
-                        id=uuid.uuid4(),
-                        project_id=job.project_id,
-                        source_doc_id=source_doc.id,
-                        fact_text=fact_data.fact_text,
-                        is_key_claim=fact_data.is_key_claim,
-                        confidence_score=confidence_score,
-                        section_context=sect_ctx or fact_data.section_context,
-                        source_url=fact_source_url,
-                        quote_text_raw=quote,
-                        evidence_snippet=evidence_snippet,
-                        evidence_start_char_raw=start_raw,
-                        evidence_end_char_raw=end_raw,
-                        evidence_start_char_md=start_md,
-                        evidence_end_char_md=end_md,
-                        tags=fact_data.tags or [],
-                        review_status=review_status
-                    )
-                    db.add(fact)
-                    saved_count += 1
-                except Exception as e:
-                    print(f"⚠️ Failed to save fact '{fact_data.fact_text[:30]}...': {e}")
-                    continue
+            # Anchor all quotes of this source against one index per representation
+            raw_index = AnchorIndex(content_formats["text_raw"])
+            md_index = AnchorIndex(content_formats.get("markdown"))
+
+            saved_count, auto_flagged_count = _save_extracted_facts(
+                db, job, source_doc.id, extraction_result.facts, source_type, metadata_json, url, raw_index, md_index
+            )
 
             job.status = JobStatus.COMPLETED
             job.current_step = JOB_STEP_DONE
             job.steps_completed = 5
             job.result_summary = {
-                "source_title": page_title,
+                **source_summary,
                 "facts_count": saved_count,
                 "auto_flagged_count": auto_flagged_count,
                 "summary": extraction_result.summary_brief,
-                "source_type": source_type.value,
-                "content_formats": {
-                    "has_markdown": bool(content_formats.get("markdown")),
-                    "has_html": bool(content_formats.get("html_clean"))
-                }
+                "extract_chunks_skipped": extraction_result.chunks_skipped,
             }
             db.add(job)
             db.commit()
             
-        except Exception as e:
+        except (Exception, *TIME_LIMIT_ERRORS) as e:
             db.rollback()
             traceback.print_exc()
             job = db.get(Job, job_id)
@@ -517,7 +576,9 @@ def ingest_url_task(self, job_id: str | uuid.UUID, url: str) -> None:
                 return
             error_code = "UNSUPPORTED"
             err_msg = str(e).lower()
-            if "429" in err_msg or "rate limit" in err_msg:
+            if isinstance(e, TIME_LIMIT_ERRORS):
+                error_code = "TIME_LIMIT"
+            elif "429" in err_msg or "rate limit" in err_msg:
                 error_code = "RATE_LIMIT"
             elif "403" in err_msg or "401" in err_msg or "paywall" in err_msg or "forbidden" in err_msg:
                 error_code = "PAYWALL"
@@ -525,7 +586,7 @@ def ingest_url_task(self, job_id: str | uuid.UUID, url: str) -> None:
                 error_code = "NETWORK"
             elif "transcript" in err_msg or "captions" in err_msg or "disabled" in err_msg or "not available" in err_msg:
                 error_code = "CAPTIONS_UNAVAILABLE"
-            user_message = str(e)
+            user_message = TIME_LIMIT_MESSAGE if error_code == "TIME_LIMIT" else str(e)
             if len(user_message) > 120:
                 user_message = user_message[:117] + "..."
             _set_job_failed(job, error_code, user_message, getattr(job, "result_summary", None))
@@ -533,19 +594,332 @@ def ingest_url_task(self, job_id: str | uuid.UUID, url: str) -> None:
             db.commit()
 
 
+
+
+@celery_app.task(bind=True, name="ingest_url", soft_time_limit=300, time_limit=600)
+def ingest_url(self, job_id: str, url: str) -> None:
+    """Celery entry point for URL ingest (ingest_url_task stays directly callable)."""
+    ingest_url_task(self, job_id, url)
+
+
+def _media_failure_summary(job: Job) -> dict:
+    # Keep path/filename for the UI, not the chunk plan
+    return {k: v for k, v in (job.params or {}).items() if k != "chunks"}
+
+
+def _fail_media_job(db: Session, job_id: uuid.UUID, e: BaseException) -> None:
+    db.rollback()
+    traceback.print_exc()
+    job = db.get(Job, job_id)
+    if not job:
+        return
+    err_msg = str(e).lower()
+    error_code = "TRANSCRIPT_FAILED" if "transcribe" in err_msg or "whisper" in err_msg or "file" in err_msg else "UNSUPPORTED"
+    user_message = str(e)
+    if isinstance(e, TIME_LIMIT_ERRORS):
+        error_code, user_message = "TIME_LIMIT", TIME_LIMIT_MESSAGE
+    if len(user_message) > 120:
+        user_message = user_message[:117] + "..."
+    _set_job_failed(job, error_code, user_message, _media_failure_summary(job))
+    db.add(job)
+    db.commit()
+
+
+def _plan_media_chunks(db: Session, job: Job) -> List[dict]:
+    """
+    Split the upload into silence-bounded chunk WAVs once and remember the plan in job.params.
+    A retry reuses the stored plan as long as its chunk files are still on disk.
+    """
+    params = job.params or {}
+    chunks = params.get("chunks")
+    if chunks is not None and all(os.path.isfile(c["path"]) for c in chunks):
+        return chunks
+
+    from app.services.transcribe import split_media
+
+    chunks = split_media(params["path"], chunk_dir(job.id))
+    job.params = {**params, "chunks": chunks}
+    job.result_summary = {"chunks_total": len(chunks), "chunks_done": 0}
+    db.add(job)
+    db.commit()
+    return chunks
+
+
+def _done_chunk_indexes(db: Session, job_id: uuid.UUID) -> set:
+    return set(db.exec(select(TranscriptChunk.chunk_index).where(TranscriptChunk.job_id == job_id)).all())
+
+
+def _transcribe_media_chunk(db: Session, job_id: uuid.UUID, chunk: dict) -> None:
+    """Transcribe one chunk and persist it; already-persisted chunks are skipped (idempotent on retry)."""
+    if chunk["index"] in _done_chunk_indexes(db, job_id):
+        return
+
+    from app.services.transcribe import transcribe_chunk
+
+    segments = transcribe_chunk(chunk["path"], chunk["start_s"])
+    db.add(TranscriptChunk(
+        job_id=job_id,
+        chunk_index=chunk["index"],
+        start_s=chunk["start_s"],
+        end_s=chunk["end_s"],
+        segments=segments,
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        # A redelivered duplicate of this chunk finished first
+        db.rollback()
+        return
+
+    job = db.get(Job, job_id)
+    if job and job.status == JobStatus.RUNNING:
+        job.result_summary = {
+            **(job.result_summary or {}),
+            "chunks_done": len(_done_chunk_indexes(db, job_id)),
+        }
+        db.add(job)
+        db.commit()
+
+
+def _dispatch_media_chunks(job_id: uuid.UUID, chunks: List[dict]) -> None:
+    """Fan chunks out over the transcribe queue; finalize_media_ingest runs once all have landed."""
+    header = group(
+        celery_app.signature("transcribe_media_chunk", args=[str(job_id), c["index"]])
+        for c in chunks
+    )
+    callback = celery_app.signature("finalize_media_ingest", args=[str(job_id)], immutable=True)
+    callback.on_error(celery_app.signature("media_ingest_failed", args=[str(job_id)], immutable=True))
+    chord(header)(callback)
+
+
+def _whisper_model_name() -> str:
+    # Transcripts are reused only when made by the model currently configured
+    return os.environ.get("WHISPER_MODEL", "base")
+
+
+def _stitch_media_chunks(db: Session, job: Job) -> List[dict]:
+    """Full-file transcript from the persisted chunks; cached workspace-wide under the media hash."""
+    from app.services.transcribe import stitch_segments
+
+    params = job.params or {}
+    rows = db.exec(
+        select(TranscriptChunk).where(TranscriptChunk.job_id == job.id).order_by(TranscriptChunk.chunk_index)
+    ).all()
+    if len(rows) < len(params.get("chunks") or []):
+        raise RuntimeError(f"Transcribe incomplete: {len(rows)} of {len(params['chunks'])} chunks done")
+    segments = stitch_segments([row.segments for row in rows])
+    if params.get("sha256"):
+        # One row per media hash: a transcript from another Whisper model is replaced
+        cached = db.exec(
+            select(MediaTranscript).where(
+                MediaTranscript.workspace_id == job.workspace_id,
+                MediaTranscript.sha256 == params["sha256"],
+            )
+        ).first() or MediaTranscript(workspace_id=job.workspace_id, sha256=params["sha256"])
+        cached.model = _whisper_model_name()
+        cached.segments = segments
+        db.add(cached)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Same media transcribed concurrently elsewhere in the workspace
+            db.rollback()
+    return segments
+
+
+def _media_source_url(job: Job, transcript_text: str) -> str:
+    """media://{project}/{sha256 of the raw bytes}; legacy uploads without a hash key on the transcript."""
+    sha256 = (job.params or {}).get("sha256")
+    return f"media://{job.project_id}/{sha256 or hashlib.md5(transcript_text.encode('utf-8')).hexdigest()}"
+
+
+def _reuse_media_ingest(db: Session, job: Job) -> bool:
+    """
+    Short-circuit a media job whose bytes were seen before (media index = raw-byte SHA-256).
+    Same project: the job completes against the existing SourceDoc once that doc has facts
+    or a completed job; a doc left behind by a failed extraction is extracted again.
+    Same workspace: the cached transcript (same WHISPER_MODEL) is reused and only fact extraction runs.
+    Returns True when the job was handled.
+    """
+    sha256 = (job.params or {}).get("sha256")
+    if not sha256:
+        return False
+    existing_doc = db.exec(
+        select(SourceDoc).where(
+            SourceDoc.project_id == job.project_id,
+            SourceDoc.canonical_url == f"media://{job.project_id}/{sha256}",
+        )
+    ).first()
+    if existing_doc and not _media_doc_ingested(db, job, existing_doc):
+        _complete_media_ingest(
+            db, job, existing_doc.metadata_json.get("transcript") or [], transcript_reused=True, source_doc=existing_doc
+        )
+        return True
+    if existing_doc:
+        job.status = JobStatus.COMPLETED
+        job.current_step = JOB_STEP_DONE
+        job.steps_completed = 5
+        job.result_summary = {
+            "source_title": existing_doc.title,
+            "source_doc_id": str(existing_doc.id),
+            "facts_count": 0,
+            "source_type": "MEDIA",
+            "is_duplicate": True,
+        }
+        db.add(job)
+        db.commit()
+        return True
+
+    cached = db.exec(
+        select(MediaTranscript).where(
+            MediaTranscript.workspace_id == job.workspace_id,
+            MediaTranscript.sha256 == sha256,
+            MediaTranscript.model == _whisper_model_name(),
+        )
+    ).first()
+    if not cached:
+        return False
+    _complete_media_ingest(db, job, cached.segments, transcript_reused=True)
+    return True
+
+
+def _media_doc_ingested(db: Session, job: Job, doc: SourceDoc) -> bool:
+    """True once a media SourceDoc has facts or another job completed (or is batch-extracting) against it."""
+    if db.exec(select(ResearchNode.id).where(ResearchNode.source_doc_id == doc.id).limit(1)).first():
+        return True
+    return db.exec(
+        select(Job.id).where(
+            Job.project_id == job.project_id,
+            Job.id != job.id,
+            Job.type == "file_ingest",
+            Job.result_summary["source_doc_id"].as_string() == str(doc.id),
+            or_(
+                Job.status == JobStatus.COMPLETED,
+                and_(Job.status == JobStatus.RUNNING, Job.result_summary["awaiting_batch"].as_boolean()),
+            ),
+        ).limit(1)
+    ).first() is not None
+
+
+def _complete_media_ingest(
+    db: Session,
+    job: Job,
+    segments: List[dict],
+    transcript_reused: bool = False,
+    source_doc: Optional[SourceDoc] = None,
+) -> None:
+    """
+    Create the MEDIA SourceDoc from a full-file transcript and extract facts.
+    source_doc: a doc an earlier, failed job already created for this media; it is reused.
+    """
+    params = job.params or {}
+    file_path = params.get("path")
+    filename = params.get("filename", "media")
+
+    parts = [f"## [{s.get('start_s', 0)}-{s.get('end_s', 0)}]\n{s.get('text', '')}" for s in segments]
+    text_content = "\n\n".join(parts) if parts else ""
+
+    if not (text_content or "").strip():
+        _set_job_failed(job, "EMPTY_CONTENT", "No speech could be transcribed.", _media_failure_summary(job))
+        db.add(job)
+        db.commit()
+        return
+
+    content_formats = {"text_raw": text_content, "markdown": text_content, "html_clean": None}
+    metadata_json = {"filename": filename, "path": file_path, "transcript": segments}
+    content_hash = hashlib.md5((text_content or "").encode("utf-8")).hexdigest()
+    media_url = _media_source_url(job, text_content)
+    page_title = filename
+
+    source_doc = source_doc or SourceDoc(
+        id=uuid.uuid4(),
+        project_id=job.project_id,
+        workspace_id=job.workspace_id,
+        url=media_url,
+        domain="media",
+        title=page_title,
+        source_type=SourceType.MEDIA,
+        canonical_url=media_url,
+        metadata_json=metadata_json,
+        content_text=text_content,
+        content_text_raw=content_formats["text_raw"],
+        content_markdown=content_formats["markdown"],
+        content_html_clean=content_formats["html_clean"],
+        content_s3_path="",
+        content_hash=content_hash,
+    )
+    db.add(source_doc)
+    db.commit()
+    db.refresh(source_doc)
+
+    job.current_step = JOB_STEP_FACTING
+    job.steps_completed = 3
+    db.add(job)
+    db.commit()
+
+    source_summary = {
+        "source_title": page_title,
+        "source_doc_id": str(source_doc.id),
+        "source_type": "MEDIA",
+        "chunks_total": len(params.get("chunks") or []),
+        "transcript_reused": transcript_reused,
+    }
+    if _defer_extraction_to_batch(db, job, source_doc.id, text_content or "", source_summary):
+        _drop_media_chunks(db, job)
+        return
+
+    extraction_result = _extract_facts_for_job(db, job, text_content or "")
+
+    job.current_step = JOB_STEP_FACTING
+    job.steps_completed = 4
+    db.add(job)
+    db.commit()
+
+    # Transcript text doubles as markdown, so one index serves both offsets
+    raw_index = AnchorIndex(content_formats["text_raw"])
+    md_index = raw_index
+
+    saved_count, auto_flagged_count = _save_extracted_facts(
+        db, job, source_doc.id, extraction_result.facts, SourceType.MEDIA, metadata_json, media_url, raw_index, md_index
+    )
+
+    job.status = JobStatus.COMPLETED
+    job.current_step = JOB_STEP_DONE
+    job.steps_completed = 5
+    job.result_summary = {
+        **source_summary,
+        "facts_count": saved_count,
+        "auto_flagged_count": auto_flagged_count,
+        "summary": extraction_result.summary_brief,
+        "extract_chunks_skipped": extraction_result.chunks_skipped,
+    }
+    db.add(job)
+    db.commit()
+    _drop_media_chunks(db, job)
+
+
+def _drop_media_chunks(db: Session, job: Job) -> None:
+    """Transcript now lives on the SourceDoc; drop the resume state."""
+    db.exec(delete(TranscriptChunk).where(TranscriptChunk.job_id == job.id))
+    db.commit()
+    shutil.rmtree(chunk_dir(job.id), ignore_errors=True)
+
+
 @celery_app.task(bind=True, name="ingest_media", soft_time_limit=300, time_limit=600)
 def ingest_media_task(self, job_id: str) -> None:
-    """Transcribe uploaded audio/video and extract facts."""
+    """
+    Transcribe uploaded audio/video and extract facts.
+    The file is split at silences (VAD); long media fans chunks out in parallel
+    and finishes in finalize_media_ingest. Finished chunks persist, so a retry resumes.
+    """
     job_id = as_uuid(job_id)
     with Session(engine) as db:
         job = db.get(Job, job_id)
         if not job or job.type != "file_ingest":
             return
         params = job.params or {}
-        file_path = params.get("path")
-        filename = params.get("filename", "media")
 
-        if not file_path:
+        if not params.get("path"):
             _set_job_failed(job, "UNSUPPORTED", "Missing file path", params)
             db.add(job)
             db.commit()
@@ -557,122 +931,64 @@ def ingest_media_task(self, job_id: str) -> None:
             db.add(job)
             db.commit()
 
-            from app.services.transcribe import transcribe_audio
-
-            segments = transcribe_audio(file_path)
-            parts = [f"## [{s.get('start_s', 0)}-{s.get('end_s', 0)}]\n{s.get('text', '')}" for s in segments]
-            text_content = "\n\n".join(parts) if parts else ""
+            if _reuse_media_ingest(db, job):
+                return
 
-            if not (text_content or "").strip():
+            chunks = _plan_media_chunks(db, job)
+            if not chunks:
                 _set_job_failed(job, "EMPTY_CONTENT", "No speech could be transcribed.", params)
                 db.add(job)
                 db.commit()
                 return
 
-            content_formats = {"text_raw": text_content, "markdown": text_content, "html_clean": None}
-            metadata_json = {"filename": filename, "path": file_path, "transcript": segments}
-            content_hash = hashlib.md5((text_content or "").encode("utf-8")).hexdigest()
-            media_url = f"media://{job.project_id}/{content_hash}"
-            page_title = filename
+            done = _done_chunk_indexes(db, job_id)
+            pending = [c for c in chunks if c["index"] not in done]
+            if len(pending) > 1:
+                _dispatch_media_chunks(job_id, pending)
+                return
+            for chunk in pending:
+                _transcribe_media_chunk(db, job_id, chunk)
+            job = db.get(Job, job_id)
+            _complete_media_ingest(db, job, _stitch_media_chunks(db, job))
 
-            source_doc = SourceDoc(
-                id=uuid.uuid4(),
-                project_id=job.project_id,
-                workspace_id=job.workspace_id,
-                url=media_url,
-                domain="media",
-                title=page_title,
-                source_type=SourceType.MEDIA,
-                canonical_url=media_url,
-                metadata_json=metadata_json,
-                content_text=text_content,
-                content_text_raw=content_formats["text_raw"],
-                content_markdown=content_formats["markdown"],
-                content_html_clean=content_formats["html_clean"],
-                content_s3_path="",
-                content_hash=content_hash,
-            )
-            db.add(source_doc)
-            db.commit()
-            db.refresh(source_doc)
+        except (Exception, *TIME_LIMIT_ERRORS) as e:
+            _fail_media_job(db, job_id, e)
 
-            job.current_step = JOB_STEP_FACTING
-            job.steps_completed = 3
-            db.add(job)
-            db.commit()
 
-            extraction_result = extract_facts_from_markdown((text_content or "")[:25000])
+@celery_app.task(bind=True, name="transcribe_media_chunk", soft_time_limit=300, time_limit=600)
+def transcribe_media_chunk_task(self, job_id: str, chunk_index: int) -> None:
+    """Transcribe one planned chunk of a media job (chord header)."""
+    job_id = as_uuid(job_id)
+    with Session(engine) as db:
+        job = db.get(Job, job_id)
+        if not job or job.status != JobStatus.RUNNING:
+            return
+        chunk = next(c for c in job.params["chunks"] if c["index"] == chunk_index)
+        _transcribe_media_chunk(db, job_id, chunk)
 
-            job.current_step = JOB_STEP_FACTING
-            job.steps_completed = 4
-            db.add(job)
-            db.commit()
 
-            saved_count = 0
-            auto_flagged_count = 0
-            for fact_data in extraction_result.facts:
-                try:
-                    confidence_score = 85 if fact_data.confidence == "HIGH" else (60 if fact_data.confidence == "MEDIUM" else 40)
-                    review_status = ReviewStatus.PENDING if confidence_score >= 75 else ReviewStatus.NEEDS_REVIEW
-                    if review_status == ReviewStatus.NEEDS_REVIEW:
-                        auto_flagged_count += 1
-                    quote = fact_data.quote_span
-                    start_raw, end_raw = find_quote_offsets(content_formats["text_raw"], quote)
-                    start_md, end_md = find_quote_offsets(content_formats.get("markdown"), quote)
-                    evidence_snippet = quote[:500] if quote and len(quote) > 10 else None
-                    if evidence_snippet and len(quote or "") > 500:
-                        evidence_snippet = quote[:500]
-                    sect_ctx, fact_source_url = _resolve_fact_source_url(
-                        fact_data.section_context, SourceType.MEDIA, metadata_json, media_url
-                    )
-                    fact = ResearchNode(
-                        id=uuid.uuid4(),
-                        project_id=job.project_id,
-                        source_doc_id=source_doc.id,
-                        fact_text=fact_data.fact_text,
-                        is_key_claim=fact_data.is_key_claim,
-                        confidence_score=confidence_score,
-                        section_context=sect_ctx or fact_data.section_context,
-                        source_url=fact_source_url,
-                        quote_text_raw=quote,
-                        evidence_snippet=evidence_snippet,
-                        evidence_start_char_raw=start_raw,
-                        evidence_end_char_raw=end_raw,
-                        evidence_start_char_md=start_md,
-                        evidence_end_char_md=end_md,
-                        tags=fact_data.tags or [],
-                        review_status=review_status
-                    )
-                    db.add(fact)
-                    saved_count += 1
-                except Exception as e:
-                    print(f"⚠️ Failed to save fact '{fact_data.fact_text[:30]}...': {e}")
-                    continue
+@celery_app.task(bind=True, name="finalize_media_ingest", soft_time_limit=300, time_limit=600)
+def finalize_media_ingest_task(self, job_id: str) -> None:
+    """Stitch chunk transcripts and extract facts once every chunk task has finished (chord callback)."""
+    job_id = as_uuid(job_id)
+    with Session(engine) as db:
+        job = db.get(Job, job_id)
+        if not job or job.status != JobStatus.RUNNING:
+            return
+        try:
+            _complete_media_ingest(db, job, _stitch_media_chunks(db, job))
+        except (Exception, *TIME_LIMIT_ERRORS) as e:
+            _fail_media_job(db, job_id, e)
 
-            job.status = JobStatus.COMPLETED
-            job.current_step = JOB_STEP_DONE
-            job.steps_completed = 5
-            job.result_summary = {
-                "source_title": page_title,
-                "facts_count": saved_count,
-                "auto_flagged_count": auto_flagged_count,
-                "summary": extraction_result.summary_brief,
-                "source_type": "MEDIA",
-            }
-            db.add(job)
-            db.commit()
 
-        except Exception as e:
-            db.rollback()
-            traceback.print_exc()
-            job = db.get(Job, job_id)
-            if not job:
-                return
-            err_msg = str(e).lower()
-            error_code = "TRANSCRIPT_FAILED" if "transcribe" in err_msg or "whisper" in err_msg or "file" in err_msg else "UNSUPPORTED"
-            user_message = str(e)
-            if len(user_message) > 120:
-                user_message = user_message[:117] + "..."
-            _set_job_failed(job, error_code, user_message, params)
-            db.add(job)
-            db.commit()
\ No newline at end of file
+@celery_app.task(name="media_ingest_failed")
+def media_ingest_failed_task(job_id: str) -> None:
+    """Chord error callback: mark the job failed; persisted chunks stay for a resumed retry."""
+    job_id = as_uuid(job_id)
+    with Session(engine) as db:
+        job = db.get(Job, job_id)
+        if not job or job.status != JobStatus.RUNNING:
+            return
+        _set_job_failed(job, "TRANSCRIPT_FAILED", "Transcription of one or more chunks failed.", _media_failure_summary(job))
+        db.add(job)
+        db.commit()
@@ -0,0 +1,141 @@
+"""
+Celery side of batch extraction (app/services/llm_batch.py): submit queued chunk requests
+as provider batches, poll them, and fan the replies back into ResearchNode rows.
+"""
+import traceback
+import uuid
+from typing import Iterable
+
+from sqlalchemy import delete
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.models import Job, JobStatus, LLMBatchRequest, SourceDoc
+from app.services.llm import SUMMARY_MAX_POINTS, ExtractedFact, merge_facts
+from app.services.llm_batch import (
+    BATCH_POLL_S,
+    BATCH_WINDOW_S,
+    REQUEST_DONE,
+    REQUEST_FAILED,
+    BatchPoll,
+    apply_batch_results,
+    batch_is_stale,
+    claim_pending,
+    expire_pending,
+    get_batch_provider,
+    job_requests,
+    submit_claimed,
+)
+from app.utils.anchoring import AnchorIndex
+from app.utils.ids import as_uuid
+from app.workers.celery_app import TIME_LIMIT_ERRORS, celery_app
+from app.workers.ingest_task import JOB_STEP_DONE, TIME_LIMIT_MESSAGE, _save_extracted_facts, _set_job_failed
+
+
+def _fail_batch_job(db: Session, job_id: uuid.UUID, error_message: str) -> None:
+    """Mark a batch job FAILED (BATCH_FAILED) and drop its remaining requests."""
+    job = db.get(Job, job_id)
+    if job is not None:
+        summary = {k: v for k, v in (job.result_summary or {}).items() if k != "awaiting_batch"}
+        _set_job_failed(job, "BATCH_FAILED", error_message, summary)
+        db.add(job)
+    db.exec(delete(LLMBatchRequest).where(LLMBatchRequest.job_id == job_id))
+    db.commit()
+
+
+def _finalize_batch_job(db: Session, job_id: uuid.UUID) -> bool:
+    """Save the facts of a job whose batch requests have all finished; False while some are outstanding."""
+    job = db.get(Job, job_id)
+    requests = job_requests(db, job_id)
+    if job is None or not requests or any(r.status not in (REQUEST_DONE, REQUEST_FAILED) for r in requests):
+        return False
+
+    done = [r for r in requests if r.status == REQUEST_DONE]
+    if not done:
+        _fail_batch_job(db, job_id, requests[0].error or "Batch extraction failed")
+        return True
+
+    summary = {k: v for k, v in (job.result_summary or {}).items() if k != "awaiting_batch"}
+    source_doc = db.get(SourceDoc, requests[0].source_doc_id)
+    facts = merge_facts(ExtractedFact(**f) for r in done for f in (r.result or {}).get("facts", []))
+    points = [p for r in done for p in (r.result or {}).get("summary_brief", []) if p]
+    raw_index = AnchorIndex(source_doc.content_text_raw)
+    md_index = AnchorIndex(source_doc.content_markdown)
+    saved_count, auto_flagged_count = _save_extracted_facts(
+        db, job, source_doc.id, facts, source_doc.source_type, source_doc.metadata_json,
+        (job.params or {}).get("url") or source_doc.url, raw_index, md_index,
+    )
+    job.status = JobStatus.COMPLETED
+    job.current_step = JOB_STEP_DONE
+    job.steps_completed = 5
+    job.result_summary = {
+        **summary,
+        "facts_count": saved_count,
+        "auto_flagged_count": auto_flagged_count,
+        "summary": points[:SUMMARY_MAX_POINTS],
+        "extract_chunks_failed": len(requests) - len(done),
+    }
+    db.add(job)
+    db.exec(delete(LLMBatchRequest).where(LLMBatchRequest.job_id == job_id))
+    db.commit()
+    return True
+
+
+def _finalize_batch_jobs(db: Session, job_ids: Iterable[uuid.UUID]) -> None:
+    job_ids = list(job_ids)
+    for n, job_id in enumerate(job_ids):
+        try:
+            _finalize_batch_job(db, as_uuid(job_id))
+        except TIME_LIMIT_ERRORS:
+            # Out of time: jobs not finalized yet fail rather than stay RUNNING
+            db.rollback()
+            for rest in job_ids[n:]:
+                _fail_batch_job(db, as_uuid(rest), TIME_LIMIT_MESSAGE)
+            raise
+        except Exception as e:
+            # e.g. the SourceDoc was deleted while the batch ran: the job fails instead of waiting forever
+            db.rollback()
+            traceback.print_exc()
+            _fail_batch_job(db, as_uuid(job_id), f"Saving batch results failed: {e}")
+
+
+@celery_app.task(name="submit_llm_batches")
+def submit_llm_batches_task(force: bool = False) -> None:
+    """
+    Submit pending batch requests whose window has passed; schedules a poll per batch.
+    Requests still unsubmitted after BATCH_MAX_AGE_S fail their jobs.
+    """
+    provider = get_batch_provider()
+    with Session(engine) as db:
+        _finalize_batch_jobs(db, expire_pending(db))
+        while requests := claim_pending(db, force=force):
+            try:
+                batch_id = submit_claimed(db, requests, provider)
+            except Exception:
+                traceback.print_exc()
+                # Requests are PENDING again and past their window; the next flush resubmits them
+                celery_app.send_task("submit_llm_batches", countdown=BATCH_WINDOW_S)
+                return
+            print(f"📦 Submitted LLM batch {batch_id} ({len(requests)} requests)")
+            celery_app.send_task("poll_llm_batch", args=[batch_id], countdown=BATCH_POLL_S)
+
+
+@celery_app.task(name="poll_llm_batch")
+def poll_llm_batch_task(batch_id: str) -> None:
+    """
+    Check a submitted batch; when it has finished, store replies and complete the jobs they belong to.
+    A batch still unfinished (or unreachable) after BATCH_MAX_AGE_S is given up and its requests fail.
+    """
+    try:
+        poll = get_batch_provider().poll(batch_id)
+    except Exception:
+        traceback.print_exc()
+        poll = None
+    with Session(engine) as db:
+        if poll is None or not poll.finished:
+            if not batch_is_stale(db, batch_id):
+                celery_app.send_task("poll_llm_batch", args=[batch_id], countdown=BATCH_POLL_S)
+                return
+            print(f"⚠️ Giving up on LLM batch {batch_id}")
+            poll = BatchPoll(state="expired")
+        _finalize_batch_jobs(db, apply_batch_results(db, batch_id, poll))
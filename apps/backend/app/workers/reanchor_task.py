@@ -0,0 +1,36 @@
+import traceback
+
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.models import Job, JobStatus
+from app.services.reanchor import JOB_TYPE_REANCHOR, run_reanchor_job
+from app.utils.ids import as_uuid
+from app.workers.celery_app import celery_app
+
+
+@celery_app.task(bind=True, name="reanchor_evidence", soft_time_limit=1800, time_limit=2100)
+def reanchor_evidence_task(self, job_id: str) -> None:
+    """Recompute evidence offsets for all facts in the job's project/workspace scope."""
+    job_id = as_uuid(job_id)
+    with Session(engine) as db:
+        job = db.get(Job, job_id)
+        if not job or job.type != JOB_TYPE_REANCHOR:
+            return
+        try:
+            run_reanchor_job(db, job)
+        except Exception as e:
+            db.rollback()
+            traceback.print_exc()
+            job = db.get(Job, job_id)
+            if not job:
+                return
+            job.status = JobStatus.FAILED
+            job.current_step = "FAILED"
+            job.result_summary = {
+                **(job.result_summary or {}),
+                "error_code": "UNSUPPORTED",
+                "error_message": str(e)[:120],
+            }
+            db.add(job)
+            db.commit()
@@ -0,0 +1,72 @@
+"""
+Quote anchoring index: offsets must always point into the ORIGINAL content,
+including whitespace-normalized and fuzzy matches.
+"""
+
+from app.utils.anchoring import AnchorIndex, anchor_quotes
+from app.workers.ingest_task import find_quote_offsets
+
+CONTENT = (
+    "Introduction\n\n"
+    "The   Tacoma Narrows   Bridge\ncollapsed in 1940 due to aeroelastic flutter.\n\n"
+    "Engineers later said “the design was far too flexible” for the winds.\n\n"
+    "Modern suspension bridges use stiffening trusses and wind tunnel testing before construction begins."
+)
+
+
+def test_exact_case_insensitive():
+    idx = AnchorIndex(CONTENT)
+    anchor = idx.locate("modern suspension bridges")
+    assert anchor.kind == "exact"
+    assert CONTENT[anchor.start:anchor.end] == "Modern suspension bridges"
+
+
+def test_normalized_whitespace_maps_to_original_offsets():
+    """Old fallback returned offsets in the normalized string; now they map back exactly."""
+    quote = "The Tacoma Narrows Bridge collapsed in 1940"
+    idx = AnchorIndex(CONTENT)
+    anchor = idx.locate(quote)
+    assert anchor.kind == "normalized"
+    original = CONTENT[anchor.start:anchor.end]
+    assert original.startswith("The   Tacoma")
+    assert original.endswith("1940")
+    assert " ".join(original.split()) == quote
+
+
+def test_typographic_quotes_are_folded():
+    start, end = AnchorIndex(CONTENT).find('"the design was far too flexible"')
+    assert CONTENT[start:end] == "“the design was far too flexible”"
+
+
+def test_fuzzy_match_tolerates_changed_words():
+    """A quote with one word paraphrased still anchors to the right sentence."""
+    quote = "Modern suspension bridges rely on stiffening trusses and wind tunnel testing before construction"
+    anchor = AnchorIndex(CONTENT).locate(quote)
+    assert anchor is not None
+    assert anchor.kind == "fuzzy"
+    located = CONTENT[anchor.start:anchor.end]
+    assert located.startswith("Modern suspension bridges")
+    assert located.endswith("before construction")
+
+
+def test_fuzzy_can_be_disabled_and_rejects_unrelated_quotes():
+    idx = AnchorIndex(CONTENT)
+    quote = "Modern suspension bridges rely on stiffening trusses and wind tunnel testing"
+    assert idx.find(quote, fuzzy=False) == (None, None)
+    assert idx.find("Completely unrelated sentence about lithium mining output") == (None, None)
+    assert idx.find("") == (None, None)
+    assert AnchorIndex(None).find("anything") == (None, None)
+
+
+def test_anchor_quotes_one_pass():
+    quotes = ["aeroelastic flutter", "wind tunnel testing", None, "not present anywhere here"]
+    results = anchor_quotes(CONTENT, quotes)
+    assert CONTENT[results[0][0]:results[0][1]] == "aeroelastic flutter"
+    assert CONTENT[results[1][0]:results[1][1]] == "wind tunnel testing"
+    assert results[2] == (None, None)
+    assert results[3] == (None, None)
+
+
+def test_find_quote_offsets_uses_index():
+    start, end = find_quote_offsets(CONTENT, "tacoma narrows bridge collapsed")
+    assert " ".join(CONTENT[start:end].split()).lower() == "tacoma narrows bridge collapsed"
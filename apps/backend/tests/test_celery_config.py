@@ -0,0 +1,37 @@
+"""
+Celery routing and reliability settings: every task lands on its workload's queue, and tasks
+are acked late so a worker dying mid-task leaves them to be redelivered.
+"""
+
+from app.workers import celery_app as celery_module
+from app.workers.celery_app import celery_app
+
+
+def _registered_tasks():
+    celery_app.loader.import_default_modules()
+    return {name for name in celery_app.tasks if not name.startswith("celery.")}
+
+
+def _queue_for(name):
+    return celery_app.amqp.router.route({}, name)["queue"].name
+
+
+def test_every_task_is_routed_to_a_named_queue():
+    tasks = _registered_tasks()
+    assert tasks == set(celery_module.TASK_QUEUES)
+    assert _queue_for("ingest_url") == "ingest"
+    assert _queue_for("poll_llm_batch") == "llm"
+    assert _queue_for("finalize_media_ingest") == "llm"
+    assert _queue_for("transcribe_media_chunk") == "transcribe"
+    assert _queue_for("bulk_export") == "bulk"
+    assert _queue_for("reanchor_evidence") == "bulk"
+
+
+def test_tasks_ack_late_and_prefetch_one():
+    conf = celery_app.conf
+    assert conf.task_acks_late is True
+    assert conf.task_reject_on_worker_lost is True
+    assert conf.worker_prefetch_multiplier == 1
+    # Longest task (bulk_export, 3900s hard limit) finishes before Redis would redeliver it
+    longest = max(getattr(celery_app.tasks[name], "time_limit", None) or conf.task_time_limit for name in _registered_tasks())
+    assert conf.broker_transport_options["visibility_timeout"] > longest
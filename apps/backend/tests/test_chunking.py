@@ -0,0 +1,85 @@
+"""Token-aware chunker: full coverage, no overlap, cuts on the coarsest boundary that fits."""
+from unittest.mock import MagicMock, patch
+
+from app.services.chunking import chunk_markdown, chunk_spans, count_tokens
+
+
+def words(text):
+    return len(text.split())
+
+
+def _section(title, n_paragraphs, words_per_paragraph=10):
+    paras = [" ".join(f"{title.lower()}{p}w{i}" for i in range(words_per_paragraph)) + "." for p in range(n_paragraphs)]
+    return f"## {title}\n\n" + "\n\n".join(paras) + "\n\n"
+
+
+def test_chunks_cover_document_without_overlap():
+    text = "".join(_section(f"S{i}", 3) for i in range(12))
+    spans = chunk_spans(text, max_tokens=80, count=words)
+    assert spans[0][0] == 0 and spans[-1][1] == len(text)
+    assert all(a[1] == b[0] for a, b in zip(spans, spans[1:]))
+    assert "".join(chunk_markdown(text, max_tokens=80, count=words)) == text
+
+
+def test_whole_sections_are_packed_together():
+    text = "".join(_section(f"S{i}", 3) for i in range(6))  # 32 words per section
+    chunks = chunk_markdown(text, max_tokens=70, count=words)
+    assert len(chunks) == 3
+    assert all(c.startswith("## S") and c.count("## ") == 2 for c in chunks)
+
+
+def test_source_markers_are_section_boundaries():
+    reddit = "## [OP]\nHow do you store solar?\n\n" + "".join(
+        f"## [Comment: c{i}]\n" + " ".join(["battery"] * 20) + "\n\n" for i in range(5)
+    )
+    chunks = chunk_markdown(reddit, max_tokens=30, count=words)
+    assert chunks[0].startswith("## [OP]")
+    assert all(c.startswith("## [") for c in chunks)
+    transcript = "".join(f"## [{i * 5}.0-{i * 5 + 5}.0]\n" + " ".join(["word"] * 8) + "\n\n" for i in range(10))
+    for chunk in chunk_markdown(transcript, max_tokens=25, count=words):
+        assert chunk.startswith("## [") and chunk.count("## [") == 2
+
+
+def test_oversized_section_split_at_paragraphs_then_rows():
+    table = "\n".join(f"| row {i} | {i * 10} |" for i in range(30)) + "\n"
+    text = _section("Big", 6) + "## Table\n\n" + table
+    chunks = chunk_markdown(text, max_tokens=25, count=words)
+    assert "".join(chunks) == text
+    assert all(words(c) <= 25 for c in chunks)
+    # Paragraphs stay whole, table rows stay whole
+    for chunk in chunks:
+        for line in chunk.splitlines():
+            if line.startswith("big"):
+                assert line.endswith(".")
+            if line.startswith("|"):
+                assert line.endswith("|")
+
+
+def test_run_on_text_is_hard_split_within_budget():
+    text = " ".join(f"w{i}" for i in range(500))
+    chunks = chunk_markdown(text, max_tokens=64, count=words)
+    assert "".join(chunks) == text
+    assert all(words(c) <= 64 for c in chunks)
+
+
+def test_count_tokens_without_tiktoken_estimates_from_length():
+    with patch("app.services.chunking._encoder", return_value=None):
+        assert count_tokens("x" * 400) == 100
+
+
+def test_extraction_covers_full_document():
+    """No 25k-char truncation: every part of a long document reaches the LLM."""
+    text = "".join(_section(f"Part{i}", 40) for i in range(30))  # well past 25k chars
+    assert len(text) > 100_000
+    seen = []
+
+    def fake_call_llm(messages, response_format=None, model=None):
+        seen.append(messages[1]["content"].split("\n\n", 1)[1])
+        return None
+
+    from app.services import llm
+
+    with patch.object(llm, "client", MagicMock()), patch.object(llm, "call_llm", side_effect=fake_call_llm):
+        llm.extract_facts_from_markdown(text)
+    # Long documents run chunks in parallel: reassemble in document order
+    assert "".join(sorted(seen, key=text.index)) == text
@@ -0,0 +1,145 @@
+"""
+Columnar exports: facts, sources and outputs as typed Parquet / Arrow IPC tables, written in
+record batches from one cursor, per project over HTTP or per workspace as a bulk export Job.
+"""
+
+import io
+import uuid
+import zipfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.db.session import engine, get_session
+from app.main import app
+from app.models import Job, JobStatus, Output, Project, ResearchNode, ReviewStatus, SourceDoc, Workspace
+from app.services import columnar_export
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture
+def db_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db_session):
+    def override_get_session():
+        yield db_session
+
+    app.dependency_overrides[get_session] = override_get_session
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def workspace(db_session):
+    ws = Workspace(id=uuid.uuid4(), name="Test Workspace", settings={})
+    db_session.add(ws)
+    db_session.commit()
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    projects = []
+    for p in range(2):
+        proj = Project(id=uuid.uuid4(), workspace_id=ws.id, title=f"Project {p}", storage_path_root="test/columnar")
+        db_session.add(proj)
+        db_session.commit()
+        doc = SourceDoc(project_id=proj.id, workspace_id=ws.id, url=f"https://example.com/{p}", domain="example.com", title="Example")
+        db_session.add(doc)
+        db_session.commit()
+        db_session.add_all([
+            ResearchNode(
+                project_id=proj.id,
+                source_doc_id=doc.id,
+                fact_text=f"Fact {p}-{i}",
+                confidence_score=i,
+                is_key_claim=i == 0,
+                review_status=ReviewStatus.APPROVED,
+                tags=["energy"] if i % 2 else [],
+                created_at=t0 + timedelta(minutes=i),
+            )
+            for i in range(7)
+        ])
+        db_session.add(Output(project_id=proj.id, title="Brief", content="Summary", output_type="synthesis", mode="paragraph", fact_ids=["a", "b"], source_count=1))
+        db_session.commit()
+        projects.append(proj)
+    return ws, projects
+
+
+def test_project_facts_as_typed_parquet_in_batches(client, workspace, monkeypatch):
+    monkeypatch.setattr(columnar_export, "RECORD_BATCH_ROWS", 3)
+    _, projects = workspace
+    res = client.get(f"/api/v1/projects/{projects[0].id}/export?format=parquet")
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/vnd.apache.parquet"
+
+    parquet = pq.ParquetFile(io.BytesIO(res.content))
+    assert parquet.metadata.num_rows == 7
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.schema_arrow == columnar_export.table_schema("facts")
+    table = parquet.read()
+    assert table.schema.field("confidence_score").type == pa.int32()
+    assert table.schema.field("created_at").type == pa.timestamp("us", tz="UTC")
+    assert table.column("fact_text").to_pylist() == [f"Fact 0-{i}" for i in range(7)]
+    assert table.column("tags").to_pylist()[:2] == [[], ["energy"]]
+    assert table.column("review_status").to_pylist()[0] == "APPROVED"
+    assert table.column("source_domain").to_pylist()[0] == "example.com"
+
+
+def test_project_outputs_as_arrow_ipc(client, workspace):
+    _, projects = workspace
+    res = client.get(f"/api/v1/projects/{projects[1].id}/export?format=arrow&table=outputs")
+    assert res.status_code == 200
+    table = pa.ipc.open_file(pa.BufferReader(res.content)).read_all()
+    assert table.num_rows == 1
+    assert table.column("fact_ids").to_pylist() == [["a", "b"]]
+    assert table.column("project_id").to_pylist() == [str(projects[1].id)]
+
+    assert client.get(f"/api/v1/projects/{projects[1].id}/export?format=arrow&table=jobs").status_code == 400
+
+
+def test_columnar_export_without_pyarrow(client, workspace):
+    _, projects = workspace
+    with patch.object(columnar_export, "columnar_available", return_value=False):
+        res = client.get(f"/api/v1/projects/{projects[0].id}/export?format=parquet")
+    assert res.status_code == 501
+    assert res.headers["X-Error-Code"] == "EXPORT_FORMAT_UNAVAILABLE"
+
+
+def test_workspace_bulk_export_job(client, db_session, workspace, tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar_export, "EXPORT_DIR", str(tmp_path))
+    ws, _ = workspace
+    with patch("app.workers.celery_app.celery_app.send_task") as send_task:
+        res = client.post(f"/api/v1/workspaces/{ws.id}/export?format=parquet")
+    assert res.status_code == 200
+    job_id = res.json()["id"]
+    send_task.assert_called_once_with("bulk_export", args=[job_id])
+
+    assert client.get(f"/api/v1/workspaces/{ws.id}/export/{job_id}").status_code == 409
+
+    from app.workers.export_task import bulk_export_task
+    bulk_export_task.run(job_id)
+    job = db_session.get(Job, uuid.UUID(job_id))
+    db_session.refresh(job)
+    assert job.status == JobStatus.COMPLETED
+    assert job.steps_completed == 3
+    assert job.result_summary["rows"] == {"facts": 14, "sources": 2, "outputs": 2}
+
+    res = client.get(f"/api/v1/workspaces/{ws.id}/export/{job_id}")
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(res.content)) as zf:
+        assert sorted(zf.namelist()) == ["facts.parquet", "outputs.parquet", "sources.parquet"]
+        sources = pq.read_table(io.BytesIO(zf.read("sources.parquet")))
+    assert sources.num_rows == 2
+    assert sources.schema == columnar_export.table_schema("sources")
+
+    assert client.get(f"/api/v1/workspaces/{uuid.uuid4()}/export/{job_id}").status_code == 404
@@ -0,0 +1,127 @@
+"""
+Streaming project export: facts are read in batches through one joined query and written
+incrementally for every format; content matches the previous all-in-memory export.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.api import projects
+from app.db.session import engine, get_session
+from app.main import app
+from app.models import Project, ResearchNode, ReviewStatus, SourceDoc, Workspace
+
+
+@pytest.fixture
+def db_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db_session):
+    def override_get_session():
+        yield db_session
+
+    app.dependency_overrides[get_session] = override_get_session
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def export_project(db_session):
+    ws = Workspace(id=uuid.uuid4(), name="Test Workspace", settings={})
+    db_session.add(ws)
+    db_session.commit()
+    proj = Project(id=uuid.uuid4(), workspace_id=ws.id, title="Test Project", storage_path_root="test/export")
+    db_session.add(proj)
+    db_session.commit()
+    doc = SourceDoc(project_id=proj.id, workspace_id=ws.id, url="https://example.com/a", domain="example.com")
+    db_session.add(doc)
+    db_session.commit()
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    db_session.add_all([
+        ResearchNode(
+            project_id=proj.id,
+            # Every 10th fact points at a source that no longer exists
+            source_doc_id=doc.id if i % 10 else uuid.uuid4(),
+            fact_text=f'Fact "{i}", with comma',
+            confidence_score=i,
+            is_key_claim=i % 3 == 0,
+            is_pinned=i % 4 == 0,
+            is_suppressed=i == 5,
+            review_status=ReviewStatus.APPROVED,
+            evidence_snippet=f"line one\nline {i}" if i % 2 else None,
+            created_at=t0 + timedelta(minutes=i),
+        )
+        for i in range(25)
+    ])
+    db_session.commit()
+    return str(proj.id)
+
+
+def test_export_streams_in_batches_from_one_query(db_session, export_project, monkeypatch):
+    monkeypatch.setattr(projects, "EXPORT_BATCH_SIZE", 4)
+    selects = []
+
+    def count(conn, cursor, statement, *args):
+        if "research_nodes" in statement:
+            selects.append(statement)
+
+    async def read_body(response):
+        # TestClient buffers whole bodies, so read the StreamingResponse chunk by chunk
+        return [chunk async for chunk in response.body_iterator]
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = projects.export_project(export_project, format="json", db=db_session)
+        assert selects == []  # nothing is read until the body is iterated
+        chunks = asyncio.run(read_body(response))
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(selects) == 1
+    assert len(chunks) > 1
+    facts = json.loads("".join(chunks))
+    assert len(facts) == 24  # suppressed fact left out
+    assert facts[0]["source_domain"] == "Unknown" and facts[0]["source_url"] == ""
+    assert facts[1] == {
+        "source_domain": "example.com",
+        "source_url": "https://example.com/a",
+        "fact_text": 'Fact "1", with comma',
+        "confidence_score": 1,
+        "is_key_claim": False,
+        "review_status": "APPROVED",
+        "is_pinned": False,
+        "evidence_snippet": "line one\nline 1",
+    }
+
+
+def test_text_formats(client, export_project):
+    res = client.get(f"/api/v1/projects/{export_project}/export?format=markdown")
+    assert res.headers["content-type"] == "text/markdown; charset=utf-8"
+    blocks = res.text.split("\n### ")
+    assert len(blocks) == 24
+    assert res.text.startswith("### Unknown\n> Fact \"0\", with comma\n*Confidence: 0/100 | Key Claim: Yes*")
+    assert not res.text.endswith("\n")
+
+    res = client.get(f"/api/v1/projects/{export_project}/export?format=csv_evidence")
+    rows = list(csv.reader(io.StringIO(res.text)))
+    assert rows[0][0] == "source_domain"
+    assert len(rows) == 25
+    assert rows[2][2] == 'Fact "1", with comma'
+    assert rows[1][7] == "No excerpt captured yet"
+
+    assert client.get(f"/api/v1/projects/{export_project}/export?format=xml").status_code == 400
@@ -0,0 +1,355 @@
+"""
+Map-reduce fact extraction: chunks run in parallel, duplicate facts are merged,
+one bounded summary pass, per-chunk progress on the Job. No real LLM.
+"""
+
+import json
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from celery.exceptions import SoftTimeLimitExceeded
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.db.session import engine
+from app.main import app
+from app.models import Job, JobStatus, LLMBatchRequest, Project, Workspace
+from app.services import llm
+from app.services.llm import ExtractedFact, extract_facts_from_markdown, merge_facts, summarize_points
+from app.workers.ingest_task import _defer_extraction_to_batch, _extract_facts_for_job, ingest_url, ingest_url_task
+
+
+def _llm_response(payload):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(payload)))])
+
+
+def _document(n_parts):
+    return "".join(f"## Part {i}\n\nSolar output rose in region {i}.\n\n" for i in range(n_parts))
+
+
+def _one_chunk_per_part(text):
+    return [f"## Part {part}" for part in text.split("## Part ")[1:]]
+
+
+@pytest.fixture
+def fake_llm():
+    """Chunk calls return one fact per part plus a shared fact; records concurrency."""
+    state = {"active": 0, "max_active": 0, "summary_calls": []}
+    lock = threading.Lock()
+
+    def fake_call_llm(messages, response_format=None, model=None):
+        user = messages[1]["content"]
+        if not user.startswith("Extract from part"):
+            state["summary_calls"].append(user)
+            return _llm_response({"summary_brief": ["Merged summary"]})
+        with lock:
+            state["active"] += 1
+            state["max_active"] = max(state["max_active"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        part = user.split("## Part ", 1)[1].split("\n", 1)[0]
+        return _llm_response({
+            "facts": [
+                {"fact_text": f"Solar output rose in region {part}.", "confidence": "HIGH"},
+                {"fact_text": "Storage costs fell.", "confidence": "LOW" if part != "3" else "HIGH",
+                 "tags": [f"part-{part}"], "is_key_claim": part == "5"},
+            ],
+            "summary_brief": [f"Point {part}"],
+        })
+
+    with (
+        patch.object(llm, "client", MagicMock()),
+        patch.object(llm, "call_llm", side_effect=fake_call_llm),
+        patch("app.services.llm.chunk_markdown", side_effect=_one_chunk_per_part),
+    ):
+        yield state
+
+
+def test_merge_facts_keeps_best_confidence_and_unions_tags():
+    merged = merge_facts([
+        ExtractedFact(fact_text="Storage costs fell.", confidence="LOW", tags=["a"]),
+        ExtractedFact(fact_text="Other fact", confidence="MEDIUM"),
+        ExtractedFact(fact_text="storage  costs fell", confidence="HIGH", quote_span="costs fell", tags=["b"]),
+        ExtractedFact(fact_text="Storage costs fell!", confidence="MEDIUM", tags=["a"], is_key_claim=True),
+    ])
+    assert [f.fact_text for f in merged] == ["storage  costs fell", "Other fact"]
+    assert merged[0].confidence == "HIGH"
+    assert merged[0].quote_span == "costs fell"
+    assert merged[0].is_key_claim is True
+    assert merged[0].tags == ["a", "b"]
+
+
+def test_map_reduce_runs_chunks_in_parallel_and_reports_progress(fake_llm, monkeypatch):
+    monkeypatch.setattr(llm, "MAP_CONCURRENCY", 3)
+    progress = []
+    result = extract_facts_from_markdown(
+        _document(8), mode="map_reduce", on_progress=lambda done, total: progress.append((done, total))
+    )
+    assert progress == [(i, 8) for i in range(1, 9)]
+    assert 1 < fake_llm["max_active"] <= 3
+    # One fact per part plus the shared one, in document order
+    assert [f.fact_text for f in result.facts][:2] == ["Solar output rose in region 0.", "Storage costs fell."]
+    assert len(result.facts) == 9
+    shared = result.facts[1]
+    assert shared.confidence == "HIGH" and shared.is_key_claim is True
+    assert shared.tags == [f"part-{i}" for i in range(8)]
+    # Single bounded summary pass over the chunk points
+    assert result.summary_brief == ["Merged summary"]
+    assert len(fake_llm["summary_calls"]) == 1
+    assert fake_llm["summary_calls"][0].count("- Point") == 8
+
+
+def test_standard_mode_is_sequential(fake_llm, monkeypatch):
+    monkeypatch.setattr(llm, "STANDARD_MAX_CHUNKS", 6)
+    progress = []
+    result = extract_facts_from_markdown(
+        _document(6), mode="standard", on_progress=lambda done, total: progress.append(done)
+    )
+    assert progress == [1, 2, 3, 4, 5, 6]
+    assert fake_llm["max_active"] == 1
+    assert fake_llm["summary_calls"] == []
+    assert result.summary_brief == [f"Point {i}" for i in range(5)]
+    assert len(result.facts) == 7
+
+
+def test_long_documents_are_bounded(fake_llm, monkeypatch):
+    monkeypatch.setattr(llm, "STANDARD_MAX_CHUNKS", 3)
+    monkeypatch.setattr(llm, "EXTRACTION_MAX_CHUNKS", 5)
+    progress = []
+    result = extract_facts_from_markdown(
+        _document(8), mode="standard", on_progress=lambda done, total: progress.append((done, total))
+    )
+    # Over STANDARD_MAX_CHUNKS: runs as map_reduce; only the first EXTRACTION_MAX_CHUNKS chunks are extracted
+    assert progress == [(i, 5) for i in range(1, 6)]
+    assert fake_llm["max_active"] > 1
+    assert len(result.facts) == 6
+    assert result.chunks_skipped == 3
+    assert len(fake_llm["summary_calls"]) == 0
+
+
+def test_soft_time_limit_is_not_swallowed(monkeypatch):
+    monkeypatch.setattr(llm, "client", MagicMock())
+    monkeypatch.setattr("app.services.llm_gateway.MAX_RETRIES", 3)
+    calls = []
+
+    def request(*args, **kwargs):
+        calls.append(1)
+        raise SoftTimeLimitExceeded()
+
+    llm.client.chat.completions.with_raw_response.create.side_effect = request
+    with pytest.raises(SoftTimeLimitExceeded):
+        llm._extract_chunk(0, 1, "## Part 0")
+    # Not retried by the gateway either
+    assert len(calls) == 1
+
+
+def test_summary_pass_input_is_bounded(monkeypatch):
+    seen = []
+
+    def fake_call_llm(messages, response_format=None, model=None):
+        seen.append(messages[1]["content"])
+        return None  # LLM down: fall back to the first points
+
+    monkeypatch.setattr(llm, "call_llm", fake_call_llm)
+    points = [f"p{i}" for i in range(200)]
+    assert summarize_points(points) == points[: llm.SUMMARY_MAX_POINTS]
+    assert seen[0].count("\n") + 1 == llm.SUMMARY_INPUT_POINTS
+    assert summarize_points(["a", "", "b"]) == ["a", "b"]
+    assert len(seen) == 1
+
+
+@pytest.fixture
+def db_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def test_project(db_session):
+    ws = Workspace(id=uuid.uuid4(), name="Test Workspace", settings={})
+    db_session.add(ws)
+    db_session.commit()
+    proj = Project(id=uuid.uuid4(), workspace_id=ws.id, title="Test Project", storage_path_root="test/extract")
+    db_session.add(proj)
+    db_session.commit()
+    db_session.refresh(proj)
+    return proj
+
+
+def test_job_records_extraction_progress(fake_llm, db_session, test_project):
+    job = Job(
+        id=uuid.uuid4(),
+        project_id=test_project.id,
+        workspace_id=test_project.workspace_id,
+        type="url_ingest",
+        status=JobStatus.RUNNING,
+        idempotency_key=f"{test_project.id}:extract:{uuid.uuid4()}",
+        params={"extraction_mode": "map_reduce"},
+        result_summary={"source_title": "Report"},
+    )
+    db_session.add(job)
+    db_session.commit()
+
+    result = _extract_facts_for_job(db_session, job, _document(4))
+
+    db_session.refresh(job)
+    assert job.result_summary == {"source_title": "Report", "extract_chunks_done": 4, "extract_chunks_total": 4}
+    assert fake_llm["max_active"] > 1
+    assert len(result.facts) == 5
+    # Few enough points to keep as-is: no summary pass
+    assert result.summary_brief == [f"Point {i}" for i in range(4)]
+    assert fake_llm["summary_calls"] == []
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_ingest_url_stores_extraction_mode(mock_send_task, db_session, test_project):
+    def override_get_session():
+        yield db_session
+
+    from app.db.session import get_session
+    app.dependency_overrides[get_session] = override_get_session
+    try:
+        with TestClient(app) as client:
+            body = {"project_id": str(test_project.id), "workspace_id": str(test_project.workspace_id)}
+            r = client.post("/api/v1/ingest", json={**body, "url": "https://example.com/a", "extraction_mode": "map_reduce"})
+            assert r.status_code == 200
+            assert r.json()["params"]["extraction_mode"] == "map_reduce"
+            r = client.post("/api/v1/ingest", json={**body, "url": "https://example.com/b"})
+            assert "extraction_mode" not in r.json()["params"]
+            r = client.post("/api/v1/ingest", json={**body, "url": "https://example.com/c", "extraction_mode": "fast"})
+            assert r.status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+    assert mock_send_task.call_count == 2
+
+
+def test_ingest_url_fails_job_on_time_limit(db_session, test_project):
+    job = Job(
+        id=uuid.uuid4(),
+        project_id=test_project.id,
+        workspace_id=test_project.workspace_id,
+        type="url_ingest",
+        status=JobStatus.PENDING,
+        idempotency_key=f"{test_project.id}:extract:{uuid.uuid4()}",
+        params={"url": "https://example.com/long", "canonical_url": "https://example.com/long", "source_type": "WEB"},
+    )
+    db_session.add(job)
+    db_session.commit()
+
+    with (
+        patch("app.workers.ingest_task.requests.get", return_value=MagicMock(text="<p>Long.</p>")),
+        patch("app.workers.ingest_task.extract", return_value={"text_raw": "Long.", "markdown": "Long.", "title": "Long"}),
+        patch("app.workers.ingest_task.extract_facts_from_markdown", side_effect=SoftTimeLimitExceeded()),
+    ):
+        ingest_url_task(None, str(job.id), "https://example.com/long")
+
+    db_session.expire_all()
+    job = db_session.get(Job, job.id)
+    assert job.status == JobStatus.FAILED
+    assert job.result_summary["error_code"] == "TIME_LIMIT"
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_oversize_documents_go_to_batch_whole(mock_send_task, db_session, test_project, monkeypatch):
+    job = Job(
+        id=uuid.uuid4(),
+        project_id=test_project.id,
+        workspace_id=test_project.workspace_id,
+        type="url_ingest",
+        status=JobStatus.RUNNING,
+        idempotency_key=f"{test_project.id}:extract:{uuid.uuid4()}",
+        params={"extraction_mode": "map_reduce"},
+    )
+    db_session.add(job)
+    db_session.commit()
+    monkeypatch.setattr("app.workers.ingest_task.chunk_markdown", _one_chunk_per_part)
+    monkeypatch.setattr("app.services.llm_batch.chunk_markdown", _one_chunk_per_part)
+    monkeypatch.setattr("app.workers.ingest_task.EXTRACTION_MAX_CHUNKS", 3)
+
+    assert not _defer_extraction_to_batch(db_session, job, uuid.uuid4(), _document(3), {"source_title": "Short"})
+
+    monkeypatch.setattr("app.workers.ingest_task.OVERSIZE_TO_BATCH", False)
+    assert not _defer_extraction_to_batch(db_session, job, uuid.uuid4(), _document(5), {"source_title": "Book"})
+
+    monkeypatch.setattr("app.workers.ingest_task.OVERSIZE_TO_BATCH", True)
+    try:
+        assert _defer_extraction_to_batch(db_session, job, uuid.uuid4(), _document(5), {"source_title": "Book"})
+        db_session.refresh(job)
+        assert job.result_summary == {
+            "source_title": "Book", "extract_oversize": True, "awaiting_batch": True, "extract_chunks_total": 5,
+        }
+        assert len(db_session.exec(select(LLMBatchRequest).where(LLMBatchRequest.job_id == job.id)).all()) == 5
+        assert mock_send_task.call_args.args == ("submit_llm_batches",)
+    finally:
+        # Keep the queued requests out of later batch flushes
+        db_session.exec(delete(LLMBatchRequest).where(LLMBatchRequest.job_id == job.id))
+        job.status = JobStatus.FAILED
+        db_session.add(job)
+        db_session.commit()
+
+
+class HardTimeout(BaseException):
+    """Stand-in for gevent.Timeout, raised in the task when the gevent pool hits the hard time limit."""
+
+
+def test_ingest_url_fails_job_on_gevent_hard_time_limit(db_session, test_project, monkeypatch):
+    # Not an Exception: a plain `except Exception` would leave the job RUNNING
+    monkeypatch.setattr("app.workers.ingest_task.TIME_LIMIT_ERRORS", (SoftTimeLimitExceeded, HardTimeout))
+    url = f"https://example.com/slow-{uuid.uuid4()}"
+    job = Job(
+        id=uuid.uuid4(),
+        project_id=test_project.id,
+        workspace_id=test_project.workspace_id,
+        type="url_ingest",
+        status=JobStatus.PENDING,
+        idempotency_key=f"{test_project.id}:{url}",
+        params={"url": url, "canonical_url": url, "source_type": "WEB"},
+    )
+    db_session.add(job)
+    db_session.commit()
+
+    with (
+        patch("app.workers.ingest_task.requests.get", return_value=MagicMock(text="<p>Slow.</p>")),
+        patch("app.workers.ingest_task.extract", return_value={"text_raw": "Slow.", "markdown": "Slow.", "title": "Slow"}),
+        patch("app.workers.ingest_task.extract_facts_from_markdown", side_effect=HardTimeout()),
+    ):
+        ingest_url(str(job.id), url)
+
+    db_session.expire_all()
+    job = db_session.get(Job, job.id)
+    assert job.status == JobStatus.FAILED
+    assert job.result_summary["error_code"] == "TIME_LIMIT"
+
+
+def test_ingest_url_records_skipped_chunks(db_session, test_project):
+    url = f"https://example.com/book-{uuid.uuid4()}"
+    job = Job(
+        id=uuid.uuid4(),
+        project_id=test_project.id,
+        workspace_id=test_project.workspace_id,
+        type="url_ingest",
+        status=JobStatus.PENDING,
+        idempotency_key=f"{test_project.id}:{url}",
+        params={"url": url, "canonical_url": url, "source_type": "WEB"},
+    )
+    db_session.add(job)
+    db_session.commit()
+
+    with (
+        patch("app.workers.ingest_task.requests.get", return_value=MagicMock(text="<p>Book.</p>")),
+        patch("app.workers.ingest_task.extract", return_value={"text_raw": "Book.", "markdown": "Book.", "title": "Book"}),
+        patch("app.workers.ingest_task.extract_facts_from_markdown",
+              return_value=llm.ExtractionResult(facts=[], summary_brief=[], chunks_skipped=2)),
+    ):
+        ingest_url_task(None, str(job.id), url)
+
+    db_session.expire_all()
+    job = db_session.get(Job, job.id)
+    assert job.status == JobStatus.COMPLETED
+    assert job.result_summary["extract_chunks_skipped"] == 2
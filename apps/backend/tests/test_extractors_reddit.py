@@ -0,0 +1,189 @@
+"""
+Reddit extractor: iterative flattening, "more" expansion within a comment budget,
+top comments by score. Fake HTTP responses only (no live Reddit).
+"""
+import time
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlmodel import Session, select
+
+from app.db.session import engine
+from app.extractors import reddit
+from app.extractors.reddit import _RateLimiter, _walk_comments, extract_reddit
+from app.models import Job, JobStatus, Project, SourceDoc, Workspace
+from app.services.llm import ExtractionResult
+from app.workers.ingest_task import ingest_url_task
+
+THREAD_URL = "https://www.reddit.com/r/energy/comments/abc123/solar_storage/"
+
+
+def _comment(cid, score, replies=None):
+    return {
+        "kind": "t1",
+        "data": {
+            "id": cid,
+            "author": f"user_{cid}",
+            "score": score,
+            "body": f"comment {cid}",
+            "permalink": f"/r/energy/comments/abc123/solar_storage/{cid}/",
+            "replies": {"data": {"children": replies or []}} if replies else "",
+        },
+    }
+
+
+def _more(ids):
+    return {"kind": "more", "data": {"children": ids}}
+
+
+def _thread(comment_children):
+    return [
+        {"data": {"children": [{"data": {
+            "name": "t3_abc123",
+            "title": "Solar storage",
+            "selftext": "How do you store solar power?",
+            "permalink": "/r/energy/comments/abc123/solar_storage/",
+        }}]}},
+        {"data": {"children": comment_children}},
+    ]
+
+
+def _response(payload):
+    resp = MagicMock()
+    resp.raise_for_status = MagicMock()
+    resp.json.return_value = payload
+    return resp
+
+
+@pytest.fixture(autouse=True)
+def fast_rate_limit(monkeypatch):
+    monkeypatch.setenv("REDDIT_REQUESTS_PER_SECOND", "1000")
+
+
+def test_walk_comments_is_iterative_and_ordered():
+    deep = _comment("leaf", 1)
+    for i in range(3000):  # far past Python's recursion limit
+        deep = _comment(f"d{i}", 1, [deep])
+    comments, more_ids = _walk_comments([_comment("a", 5, [_comment("a1", 2), _more(["m1"])]), deep], THREAD_URL)
+    assert [c["id"] for c in comments[:3]] == ["a", "a1", "d2999"]
+    assert comments[-1]["id"] == "leaf"
+    assert len(comments) == 3003
+    assert more_ids == ["m1"]
+    assert comments[0]["permalink"] == "https://www.reddit.com/r/energy/comments/abc123/solar_storage/a/"
+
+
+def test_more_stubs_expanded_in_batches_and_rounds(monkeypatch):
+    monkeypatch.setenv("REDDIT_TOP_COMMENTS", "20")
+    more_ids = [f"x{i}" for i in range(150)]
+    calls = []
+    link_ids = set()
+
+    def fake_get(url, headers=None, params=None, timeout=None):
+        if url.endswith(".json") and "morechildren" not in url:
+            return _response(_thread([_comment("top", 3), _more(more_ids)]))
+        ids = params["children"].split(",")
+        calls.append(ids)
+        link_ids.add(params["link_id"])
+        things = [_comment(i, 1000 if i == "y1" else int(i[1:])) for i in ids]
+        if "x0" in ids:
+            things.append(_more(["y1"]))
+        return _response({"json": {"data": {"things": things}}})
+
+    with patch("app.extractors.reddit.requests.get", side_effect=fake_get):
+        out = extract_reddit(THREAD_URL, comment_budget=1000)
+
+    assert sorted(len(c) for c in calls) == [1, 50, 100]
+    assert calls[-1] == ["y1"]
+    assert link_ids == {"t3_abc123"}
+    # 1 top-level + 150 expanded + 1 from the nested stub, top 20 by score
+    assert len(out["comments"]) == 20
+    assert out["comments"][0]["id"] == "y1"
+    assert [c["score"] for c in out["comments"][1:4]] == [149, 148, 147]
+
+
+def test_comment_budget_limits_expansion():
+    calls = []
+
+    def fake_get(url, headers=None, params=None, timeout=None):
+        if "morechildren" not in url:
+            return _response(_thread([_comment("a", 1), _comment("b", 2), _more([f"x{i}" for i in range(300)])]))
+        ids = params["children"].split(",")
+        calls.append(ids)
+        return _response({"json": {"data": {"things": [_comment(i, 1) for i in ids]}}})
+
+    with patch("app.extractors.reddit.requests.get", side_effect=fake_get):
+        out = extract_reddit(THREAD_URL, comment_budget=10, top_n=100)
+
+    assert calls == [[f"x{i}" for i in range(8)]]
+    assert len(out["comments"]) == 10
+
+
+def test_top_comments_by_score_without_more(monkeypatch):
+    monkeypatch.setenv("REDDIT_TOP_COMMENTS", "20")
+    children = [_comment(f"c{i}", score) for i, score in enumerate([5, 50, 1, 30, 30, 7] * 5)]
+    with patch("app.extractors.reddit.requests.get", return_value=_response(_thread(children))):
+        out = extract_reddit(THREAD_URL)
+    scores = [c["score"] for c in out["comments"]]
+    assert len(scores) == 20
+    assert scores == sorted(scores, reverse=True)
+    assert scores[:5] == [50] * 5
+    assert out["title"] == "Solar storage"
+    assert out["thread_url"] == THREAD_URL
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = _RateLimiter(20)
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.wait()
+    assert time.monotonic() - start >= 0.14
+
+
+def test_expanded_comments_reach_formatted_content(monkeypatch):
+    """Comments behind "more" stubs are passed to extraction, not cut to a fixed top 20."""
+    monkeypatch.setenv("REDDIT_TOP_COMMENTS", "100")
+    more_ids = [f"x{i}" for i in range(30)]
+
+    def fake_get(url, headers=None, params=None, timeout=None):
+        if "morechildren" not in url:
+            return _response(_thread([_comment("top", 100), _more(more_ids)]))
+        return _response({"json": {"data": {"things": [_comment(i, int(i[1:])) for i in params["children"].split(",")]}}})
+
+    with Session(engine) as db:
+        ws = Workspace(id=uuid.uuid4(), name="Reddit Workspace", settings={})
+        project = Project(id=uuid.uuid4(), workspace_id=ws.id, title="Reddit Project", storage_path_root="test/reddit_ingest")
+        job = Job(
+            id=uuid.uuid4(),
+            project_id=project.id,
+            workspace_id=ws.id,
+            type="url_ingest",
+            status=JobStatus.PENDING,
+            idempotency_key=f"{project.id}:{THREAD_URL}",
+            params={"url": THREAD_URL, "canonical_url": THREAD_URL, "source_type": "REDDIT"},
+        )
+        db.add(ws)
+        db.add(project)
+        db.add(job)
+        db.commit()
+        job_id, project_id = job.id, project.id
+
+    seen = []
+
+    def fake_extract_facts(text, **kwargs):
+        seen.append(text)
+        return ExtractionResult(facts=[], summary_brief=["Summary"])
+
+    with (
+        patch("app.extractors.reddit.requests.get", side_effect=fake_get),
+        patch("app.workers.ingest_task.extract_facts_from_markdown", side_effect=fake_extract_facts),
+    ):
+        ingest_url_task(None, str(job_id), THREAD_URL)
+
+    with Session(engine) as db:
+        assert db.get(Job, job_id).status == JobStatus.COMPLETED
+        doc = db.exec(select(SourceDoc).where(SourceDoc.project_id == project_id)).one()
+        assert len(doc.metadata_json["comments"]) == 31
+    assert seen
+    for cid in ("top", "x0", "x25", "x29"):
+        assert f"## [Comment: {cid}]" in seen[0]
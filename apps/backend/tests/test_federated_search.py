@@ -0,0 +1,111 @@
+"""Federated search: parallel fan-out with per-provider timeouts, merge + dedup (mock providers, no network)."""
+import time
+
+import pytest
+import requests
+
+from app.search.federated import FederatedSearchProvider, merge_results
+from app.search.mock import MockSearchProvider
+from app.search.provider import SearchResult
+
+
+class SlowProvider(MockSearchProvider):
+    """Mock provider that answers after `delay` seconds (or raises `error`)."""
+
+    def __init__(self, name, urls, delay=0.0, error=None):
+        super().__init__(urls=urls)
+        self.name = name
+        self.delay = delay
+        self.error = error
+
+    def search(self, query, limit=5):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return super().search(query, limit)
+
+
+def test_merge_interleaves_by_rank_and_dedups_normalized_urls():
+    a = [SearchResult("https://youtu.be/abc123"), SearchResult("https://example.com/a")]
+    b = [SearchResult("https://www.youtube.com/watch?v=abc123"), SearchResult("https://example.com/b")]
+    merged = merge_results([a, b], limit=5)
+    assert [r.url for r in merged] == ["https://youtu.be/abc123", "https://example.com/a", "https://example.com/b"]
+    assert len(merge_results([a, b], limit=2)) == 2
+
+
+def test_queries_providers_in_parallel():
+    providers = [
+        SlowProvider("one", ["https://one.example/1", "https://shared.example/x"], delay=0.3),
+        SlowProvider("two", ["https://shared.example/x", "https://two.example/1"], delay=0.3),
+    ]
+    started = time.monotonic()
+    results = FederatedSearchProvider(providers, timeout_s=2).search("q", limit=5)
+    assert time.monotonic() - started < 0.55
+    assert [r.url for r in results] == ["https://one.example/1", "https://shared.example/x", "https://two.example/1"]
+
+
+def test_returns_once_enough_results_are_in():
+    providers = [
+        SlowProvider("slow", ["https://slow.example/1"], delay=1.5),
+        SlowProvider("fast", [f"https://fast.example/{i}" for i in range(3)]),
+    ]
+    started = time.monotonic()
+    results = FederatedSearchProvider(providers, timeout_s=5, grace_s=0.2).search("q", limit=3)
+    # The fast provider alone covers the limit; the slow one gets the grace period, not its timeout
+    assert 0.15 < time.monotonic() - started < 0.5
+    assert [r.url for r in results] == [f"https://fast.example/{i}" for i in range(3)]
+
+
+def test_first_responder_does_not_crowd_out_the_rest():
+    providers = [
+        SlowProvider("second", ["https://second.example/1"], delay=0.2),
+        SlowProvider("first", [f"https://first.example/{i}" for i in range(3)]),
+        SlowProvider("third", ["https://third.example/1"], delay=3),
+    ]
+    started = time.monotonic()
+    results = FederatedSearchProvider(providers, timeout_s=5, grace_s=1).search("q", limit=3)
+    # Returns once a second provider answers, without waiting out the grace period for the third
+    assert time.monotonic() - started < 0.6
+    assert [r.url for r in results] == ["https://second.example/1", "https://first.example/0", "https://first.example/1"]
+
+
+def test_slow_provider_is_dropped_at_its_timeout():
+    providers = [
+        SlowProvider("slow", ["https://slow.example/1"], delay=1.5),
+        SlowProvider("fast", ["https://fast.example/1"]),
+    ]
+    started = time.monotonic()
+    results = FederatedSearchProvider(providers, timeout_s=5, timeouts={"slow": 0.2}).search("q", limit=5)
+    assert 0.15 < time.monotonic() - started < 0.6
+    assert [r.url for r in results] == ["https://fast.example/1"]
+
+
+def test_failing_providers():
+    ok = SlowProvider("ok", ["https://ok.example/1"])
+    down = SlowProvider("down", [], error=requests.exceptions.ConnectionError("down"))
+    assert [r.url for r in FederatedSearchProvider([down, ok]).search("q")] == ["https://ok.example/1"]
+    with pytest.raises(requests.exceptions.ConnectionError):
+        FederatedSearchProvider([down]).search("q")
+    with pytest.raises(requests.exceptions.Timeout):
+        FederatedSearchProvider([SlowProvider("slow", ["https://slow.example/1"], delay=0.5)], timeout_s=0.1).search("q")
+
+
+def test_get_search_provider_federates_configured_backends(monkeypatch):
+    from app.api import ingest
+    from app.search.cache import CachedSearchProvider
+    from app.search.tavily import TavilySearchProvider
+
+    monkeypatch.delenv("SEARCH_PROVIDERS", raising=False)
+    monkeypatch.setenv("TAVILY_API_KEY", "t")
+    monkeypatch.setenv("BRAVE_SEARCH_API_KEY", "b")
+    provider = ingest.get_search_provider()
+    assert isinstance(provider, CachedSearchProvider)
+    assert isinstance(provider.inner, FederatedSearchProvider)
+    assert provider.inner.name == "federated:tavily,brave"
+
+    monkeypatch.setenv("SEARCH_PROVIDERS", "tavily")
+    monkeypatch.setenv("SEARCH_CACHE_ENABLED", "false")
+    assert isinstance(ingest.get_search_provider(), TavilySearchProvider)
+
+    monkeypatch.delenv("TAVILY_API_KEY")
+    assert isinstance(ingest.get_search_provider(), MockSearchProvider)
@@ -0,0 +1,121 @@
+"""
+Bulk URL ingest (POST /projects/{id}/ingest/bulk): set-based dedup against sources, jobs and
+the request itself, one INSERT for the new jobs, one result per URL. No broker (send_task patched).
+"""
+
+import uuid
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.db.session import engine, get_session
+from app.main import app
+from app.models import Job, JobStatus, Project, SourceDoc, Workspace
+
+
+@pytest.fixture
+def db_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db_session):
+    def override_get_session():
+        yield db_session
+
+    app.dependency_overrides[get_session] = override_get_session
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def test_project(db_session):
+    ws = Workspace(id=uuid.uuid4(), name="Test Workspace", settings={})
+    db_session.add(ws)
+    db_session.commit()
+    proj = Project(id=uuid.uuid4(), workspace_id=ws.id, title="Test Project", storage_path_root="test/bulk")
+    db_session.add(proj)
+    db_session.commit()
+    db_session.refresh(proj)
+    return proj
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_bulk_ingest_dedups_and_queues(mock_send_task, client, db_session, test_project):
+    doc = SourceDoc(project_id=test_project.id, workspace_id=test_project.workspace_id,
+                    url="https://example.com/known", canonical_url="https://example.com/known", domain="example.com")
+    queued = Job(project_id=test_project.id, workspace_id=test_project.workspace_id, type="url_ingest",
+                 idempotency_key=f"{test_project.id}:https://example.com/queued")
+    db_session.add_all([doc, queued])
+    db_session.commit()
+    project_id, doc_id, queued_id = str(test_project.id), str(doc.id), str(queued.id)
+
+    urls = [
+        "https://example.com/new-1",
+        "https://example.com/known",
+        "not a url",
+        "https://example.com/queued",
+        "https://example.com/new-2",
+        "https://example.com/new-1",
+    ] + [f"https://example.com/page/{i}" for i in range(50)]
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        res = client.post(f"/api/v1/projects/{project_id}/ingest/bulk", json={"urls": urls})
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert res.status_code == 200
+    body = res.json()
+    results = body["results"]
+    assert [r["url"] for r in results] == urls
+    assert [r["status"] for r in results[:6]] == ["queued", "duplicate", "invalid", "duplicate", "queued", "duplicate"]
+    assert results[1]["source_id"] == doc_id
+    assert results[3]["job_id"] == queued_id
+    assert results[5]["job_id"] == results[0]["job_id"]
+    assert body["queued"] == 52
+
+    # sources + jobs lookups (project is in the session), one INSERT for all new jobs
+    assert sum(s.lstrip().upper().startswith("INSERT INTO JOBS") for s in statements) == 1
+    assert sum(s.lstrip().upper().startswith("SELECT") for s in statements) == 2
+
+    assert mock_send_task.call_count == 52
+    assert mock_send_task.call_args_list[0].args == ("ingest_url",)
+    assert mock_send_task.call_args_list[0].kwargs["args"] == [results[0]["job_id"], "https://example.com/new-1"]
+
+    job = db_session.get(Job, uuid.UUID(results[0]["job_id"]))
+    assert job.status == JobStatus.PENDING
+    assert job.type == "url_ingest"
+    assert job.workspace_id == test_project.workspace_id
+    assert job.params["canonical_url"] == "https://example.com/new-1"
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_bulk_ingest_is_idempotent(mock_send_task, client, db_session, test_project):
+    urls = ["https://example.com/a", "https://example.com/b"]
+    first = client.post(f"/api/v1/projects/{test_project.id}/ingest/bulk", json={"urls": urls, "extraction_mode": "batch"}).json()
+    second = client.post(f"/api/v1/projects/{test_project.id}/ingest/bulk", json={"urls": urls}).json()
+    assert second["queued"] == 0
+    assert [r["job_id"] for r in second["results"]] == [r["job_id"] for r in first["results"]]
+    assert mock_send_task.call_count == 2
+    jobs = db_session.exec(select(Job).where(Job.project_id == test_project.id)).all()
+    assert len(jobs) == 2
+    assert {j.params["extraction_mode"] for j in jobs} == {"batch"}
+
+
+def test_bulk_ingest_validation(client, test_project):
+    assert client.post(f"/api/v1/projects/{test_project.id}/ingest/bulk", json={"urls": []}).status_code == 400
+    too_many = [f"https://example.com/{i}" for i in range(501)]
+    assert client.post(f"/api/v1/projects/{test_project.id}/ingest/bulk", json={"urls": too_many}).status_code == 400
+    assert client.post(f"/api/v1/projects/{uuid.uuid4()}/ingest/bulk", json={"urls": ["https://example.com"]}).status_code == 404
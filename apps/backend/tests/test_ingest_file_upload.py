@@ -0,0 +1,181 @@
+"""POST /ingest/file streams uploads to content-addressed storage with an incremental size limit."""
+
+import asyncio
+import hashlib
+import os
+import uuid
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.db.session import engine
+from app.main import app
+from app.models import Job, JobStatus, Project, Workspace
+from app.services.media_store import UnsupportedMediaError, UploadTooLargeError, store_upload
+
+
+@pytest.fixture
+def db_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db_session):
+    def override_get_session():
+        yield db_session
+
+    from app.db.session import get_session
+    app.dependency_overrides[get_session] = override_get_session
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def test_project(db_session):
+    ws = Workspace(id=uuid.uuid4(), name="Test Workspace", settings={})
+    db_session.add(ws)
+    db_session.commit()
+    proj = Project(id=uuid.uuid4(), workspace_id=ws.id, title="Test Project", storage_path_root="test/upload")
+    db_session.add(proj)
+    db_session.commit()
+    db_session.refresh(proj)
+    return proj
+
+
+@pytest.fixture
+def upload_root(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.media_store.MEDIA_UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr("app.services.media_store.UPLOAD_CHUNK_BYTES", 1024)
+    return tmp_path
+
+
+def _upload(client, project, name, data):
+    return client.post(
+        "/api/v1/ingest/file",
+        params={"project_id": str(project.id), "workspace_id": str(project.workspace_id)},
+        files={"file": (name, data, "audio/mpeg")},
+    )
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_upload_stored_by_content_hash(mock_send_task, client, test_project, upload_root):
+    data = os.urandom(5000)
+    r = _upload(client, test_project, "Talk.MP3", data)
+    assert r.status_code == 200
+    params = r.json()["params"]
+    sha = hashlib.sha256(data).hexdigest()
+    assert params["sha256"] == sha
+    assert params["size_bytes"] == 5000
+    assert params["path"] == str(upload_root / sha[:2] / f"{sha}.mp3")
+    with open(params["path"], "rb") as f:
+        assert f.read() == data
+    assert os.listdir(upload_root / "incoming") == []
+    mock_send_task.assert_called_once_with("ingest_media", args=[r.json()["id"]])
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_same_name_different_content_does_not_collide(mock_send_task, client, test_project, upload_root):
+    first = _upload(client, test_project, "clip.wav", b"first recording").json()
+    second = _upload(client, test_project, "clip.wav", b"second recording").json()
+    assert first["params"]["path"] != second["params"]["path"]
+    with open(first["params"]["path"], "rb") as f:
+        assert f.read() == b"first recording"
+    assert mock_send_task.call_count == 2
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_same_content_returns_existing_job(mock_send_task, client, test_project, upload_root):
+    first = _upload(client, test_project, "a.mp3", b"same bytes").json()
+    second = _upload(client, test_project, "renamed.mp3", b"same bytes").json()
+    assert second["is_duplicate"] is True
+    assert second["id"] == first["id"]
+    mock_send_task.assert_called_once()
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_reupload_after_failure_requeues_job(mock_send_task, client, db_session, test_project, upload_root):
+    first = _upload(client, test_project, "a.mp3", b"flaky bytes").json()
+    job = db_session.get(Job, uuid.UUID(first["id"]))
+    job.status = JobStatus.FAILED
+    job.result_summary = {"error_code": "TRANSCRIPT_FAILED"}
+    db_session.add(job)
+    db_session.commit()
+
+    second = _upload(client, test_project, "a.mp3", b"flaky bytes").json()
+    assert second["id"] == first["id"]
+    assert second["status"] == "PENDING"
+    assert second["result_summary"] == {}
+    assert mock_send_task.call_count == 2
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_oversized_upload_aborted(mock_send_task, client, db_session, test_project, upload_root, monkeypatch):
+    monkeypatch.setattr("app.api.ingest.MAX_MEDIA_BYTES", 4096)
+    r = _upload(client, test_project, "long.mp3", os.urandom(10000))
+    assert r.status_code == 400
+    assert "too large" in r.json()["detail"]
+    assert [p for p in upload_root.rglob("*") if p.is_file()] == []
+    assert db_session.exec(select(Job).where(Job.project_id == test_project.id)).all() == []
+    mock_send_task.assert_not_called()
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_declared_oversize_rejected_before_reading(mock_send_task, client, test_project, upload_root, monkeypatch):
+    monkeypatch.setattr("app.api.ingest.MAX_MEDIA_BYTES", 4096)
+    monkeypatch.setattr("app.api.ingest.MULTIPART_OVERHEAD_BYTES", 0)
+    r = _upload(client, test_project, "long.mp3", os.urandom(10000))
+    assert r.status_code == 400
+    assert not (upload_root / "incoming").exists()
+    mock_send_task.assert_not_called()
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_non_media_upload_rejected(mock_send_task, client, test_project, upload_root):
+    r = _upload(client, test_project, "notes.pdf", b"%PDF-1.7")
+    assert r.status_code == 400
+    assert "Media only" in r.json()["detail"]
+    assert [p for p in upload_root.rglob("*") if p.is_file()] == []
+    mock_send_task.assert_not_called()
+
+
+def _multipart_body(boundary, filename, data):
+    return (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="note"\r\n\r\nhello\r\n'
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: audio/mpeg\r\n\r\n"
+    ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+
+
+def test_store_upload_parses_stream_and_aborts_mid_stream(upload_root):
+    data = os.urandom(10000)
+    body = _multipart_body("xyz", "stream.mp3", data)
+    received = []
+
+    async def stream(piece=1000):
+        for i in range(0, len(body), piece):
+            received.append(i)
+            yield body[i:i + piece]
+
+    stored = asyncio.run(store_upload(stream(), "multipart/form-data; boundary=xyz", max_bytes=20000))
+    assert stored.filename == "stream.mp3"
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    with open(stored.path, "rb") as f:
+        assert f.read() == data
+
+    received.clear()
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(store_upload(stream(), "multipart/form-data; boundary=xyz", max_bytes=3000))
+    # Stopped at the piece that crossed the limit, partial file removed
+    assert len(received) == 4
+    assert [p for p in upload_root.rglob("*.part")] == []
+
+    with pytest.raises(UnsupportedMediaError):
+        asyncio.run(store_upload(stream(), "application/octet-stream", max_bytes=20000))
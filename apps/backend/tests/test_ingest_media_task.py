@@ -0,0 +1,319 @@
+"""
+Chunked media ingest: long files are split at silences, chunks fan out, transcripts are
+stitched on the file's timeline, and a retry resumes from persisted chunks. No real model.
+"""
+
+import os
+import sys
+import types
+import uuid
+from collections import namedtuple
+from unittest.mock import patch
+
+import pytest
+from celery.exceptions import SoftTimeLimitExceeded
+from sqlmodel import Session, select
+
+from app.db.session import engine
+from app.models import Job, JobStatus, MediaTranscript, Project, ResearchNode, SourceDoc, TranscriptChunk, Workspace
+from app.services import transcribe
+from app.services.media_store import chunk_dir
+from app.services.llm import ExtractionResult, ExtractedFact
+from app.workers.ingest_task import (
+    finalize_media_ingest_task,
+    ingest_media_task,
+    media_ingest_failed_task,
+    transcribe_media_chunk_task,
+)
+
+Segment = namedtuple("Segment", "start end text")
+
+
+class FakeWhisperModel:
+    transcribed = []
+
+    def __init__(self, name, **kwargs):
+        pass
+
+    def transcribe(self, path, beam_size=1):
+        FakeWhisperModel.transcribed.append(os.path.basename(path))
+        return iter([Segment(0.0, 1.0, f"part {os.path.basename(path)[:4]}")]), None
+
+
+@pytest.fixture(autouse=True)
+def fake_faster_whisper(monkeypatch):
+    module = types.ModuleType("faster_whisper")
+    module.WhisperModel = FakeWhisperModel
+    audio_mod = types.ModuleType("faster_whisper.audio")
+    audio_mod.decode_audio = lambda path, sampling_rate: [0.1] * (12 * sampling_rate)
+    vad_mod = types.ModuleType("faster_whisper.vad")
+    vad_mod.VadOptions = lambda **kw: kw
+    # Speech at 0.5-3.0s, 3.6-6.5s and 7.2-11.0s
+    vad_mod.get_speech_timestamps = lambda audio, options: [
+        {"start": 8000, "end": 48000}, {"start": 57600, "end": 104000}, {"start": 115200, "end": 176000},
+    ]
+    monkeypatch.setitem(sys.modules, "faster_whisper", module)
+    monkeypatch.setitem(sys.modules, "faster_whisper.audio", audio_mod)
+    monkeypatch.setitem(sys.modules, "faster_whisper.vad", vad_mod)
+    monkeypatch.setenv("WHISPER_CHUNK_SECONDS", "4")
+    FakeWhisperModel.transcribed = []
+    transcribe.clear_model_cache()
+    yield
+    transcribe.clear_model_cache()
+
+
+@pytest.fixture
+def db_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def test_project(db_session):
+    ws = Workspace(id=uuid.uuid4(), name="Test Workspace", settings={})
+    db_session.add(ws)
+    db_session.commit()
+    proj = Project(id=uuid.uuid4(), workspace_id=ws.id, title="Test Project", storage_path_root="test/media")
+    db_session.add(proj)
+    db_session.commit()
+    db_session.refresh(proj)
+    return proj
+
+
+@pytest.fixture
+def media_file(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.media_store.MEDIA_UPLOAD_DIR", str(tmp_path))
+    media = tmp_path / "talk.mp3"
+    media.write_bytes(b"ID3")
+    return str(media)
+
+
+def _make_job(db_session, project, path, sha256=None):
+    params = {"path": path, "filename": "talk.mp3"}
+    if sha256:
+        params["sha256"] = sha256
+    job = Job(
+        id=uuid.uuid4(),
+        project_id=project.id,
+        workspace_id=project.workspace_id,
+        type="file_ingest",
+        status=JobStatus.PENDING,
+        idempotency_key=f"{project.id}:media:{uuid.uuid4()}",
+        params=params,
+    )
+    db_session.add(job)
+    db_session.commit()
+    db_session.refresh(job)
+    return job
+
+
+@pytest.fixture
+def media_job(db_session, test_project, media_file):
+    return _make_job(db_session, test_project, media_file)
+
+
+def _extraction():
+    return ExtractionResult(
+        facts=[
+            ExtractedFact(
+                fact_text="The talk has a second part.",
+                quote_span="part 0001",
+                confidence="HIGH",
+                section_context="Transcript",
+                tags=[],
+                is_key_claim=False,
+            )
+        ],
+        summary_brief=["Summary"],
+    )
+
+
+def test_long_media_fans_out_and_resumes_after_failure(db_session, media_job):
+    job_id = str(media_job.id)
+    with patch("app.workers.ingest_task._dispatch_media_chunks") as mock_dispatch:
+        ingest_media_task(job_id)
+    pending = mock_dispatch.call_args[0][1]
+    assert [c["index"] for c in pending] == [0, 1, 2]
+
+    # Two chunk tasks land, the third fails and the chord error handler fires
+    transcribe_media_chunk_task(job_id, 0)
+    transcribe_media_chunk_task(job_id, 1)
+    media_ingest_failed_task(job_id)
+    db_session.expire_all()
+    job = db_session.get(Job, media_job.id)
+    assert job.status == JobStatus.FAILED
+    assert job.result_summary["error_code"] == "TRANSCRIPT_FAILED"
+    assert "chunks" not in job.result_summary
+
+    # Retry: only the missing chunk is transcribed, then the job finishes inline
+    with (
+        patch("app.workers.ingest_task._dispatch_media_chunks") as mock_dispatch,
+        patch("app.workers.ingest_task.extract_facts_from_markdown", return_value=_extraction()),
+    ):
+        ingest_media_task(job_id)
+    mock_dispatch.assert_not_called()
+    assert FakeWhisperModel.transcribed == ["0000.wav", "0001.wav", "0002.wav"]
+
+    db_session.expire_all()
+    job = db_session.get(Job, media_job.id)
+    assert job.status == JobStatus.COMPLETED
+    assert job.result_summary["chunks_total"] == 3
+    assert job.result_summary["facts_count"] == 1
+
+    doc = db_session.exec(select(SourceDoc).where(SourceDoc.project_id == media_job.project_id)).one()
+    transcript = doc.metadata_json["transcript"]
+    assert [(s["start_s"], s["end_s"]) for s in transcript] == [(0.3, 1.3), (3.4, 4.4), (7.0, 8.0)]
+    assert doc.content_text.startswith("## [0.3-1.3]\npart 0000")
+
+    fact = db_session.exec(select(ResearchNode).where(ResearchNode.source_doc_id == doc.id)).one()
+    assert doc.content_text[fact.evidence_start_char_raw:fact.evidence_end_char_raw] == "part 0001"
+
+    assert db_session.exec(select(TranscriptChunk).where(TranscriptChunk.job_id == media_job.id)).all() == []
+    assert not os.path.exists(chunk_dir(media_job.id))
+
+
+def test_chunk_task_is_idempotent(db_session, media_job):
+    job_id = str(media_job.id)
+    with patch("app.workers.ingest_task._dispatch_media_chunks"):
+        ingest_media_task(job_id)
+    transcribe_media_chunk_task(job_id, 2)
+    transcribe_media_chunk_task(job_id, 2)
+    assert FakeWhisperModel.transcribed == ["0002.wav"]
+
+    db_session.expire_all()
+    job = db_session.get(Job, media_job.id)
+    assert job.result_summary == {"chunks_total": 3, "chunks_done": 1}
+
+
+def test_silent_media_fails_empty_content(db_session, media_job):
+    sys.modules["faster_whisper.vad"].get_speech_timestamps = lambda audio, options: []
+    ingest_media_task(str(media_job.id))
+    db_session.expire_all()
+    job = db_session.get(Job, media_job.id)
+    assert job.status == JobStatus.FAILED
+    assert job.result_summary["error_code"] == "EMPTY_CONTENT"
+
+
+def test_same_media_in_workspace_reuses_transcript(db_session, test_project, media_file, monkeypatch):
+    monkeypatch.setenv("WHISPER_CHUNK_SECONDS", "60")
+    sha = "ab" * 32
+    other_project = Project(
+        id=uuid.uuid4(), workspace_id=test_project.workspace_id, title="Other", storage_path_root="test/media2"
+    )
+    db_session.add(other_project)
+    db_session.commit()
+
+    first = _make_job(db_session, test_project, media_file, sha)
+    second = _make_job(db_session, other_project, media_file, sha)
+    with patch("app.workers.ingest_task.extract_facts_from_markdown", return_value=_extraction()):
+        ingest_media_task(str(first.id))
+        ingest_media_task(str(second.id))
+    assert FakeWhisperModel.transcribed == ["0000.wav"]
+
+    db_session.expire_all()
+    summary = db_session.get(Job, second.id).result_summary
+    assert summary["transcript_reused"] is True
+    docs = {
+        d.project_id: d
+        for d in db_session.exec(select(SourceDoc).where(SourceDoc.project_id.in_([test_project.id, other_project.id])))
+    }
+    assert docs[other_project.id].url == f"media://{other_project.id}/{sha}"
+    assert docs[other_project.id].metadata_json["transcript"] == docs[test_project.id].metadata_json["transcript"]
+    cached = db_session.exec(
+        select(MediaTranscript).where(
+            MediaTranscript.workspace_id == test_project.workspace_id, MediaTranscript.sha256 == sha
+        )
+    ).one()
+    assert cached.model == "base"
+
+
+def test_same_media_in_project_short_circuits_to_source(db_session, test_project, media_file, monkeypatch):
+    monkeypatch.setenv("WHISPER_CHUNK_SECONDS", "60")
+    sha = "cd" * 32
+    first = _make_job(db_session, test_project, media_file, sha)
+    second = _make_job(db_session, test_project, media_file, sha)
+    with patch("app.workers.ingest_task.extract_facts_from_markdown", return_value=_extraction()) as mock_extract:
+        ingest_media_task(str(first.id))
+        ingest_media_task(str(second.id))
+    assert mock_extract.call_count == 1
+    assert FakeWhisperModel.transcribed == ["0000.wav"]
+
+    db_session.expire_all()
+    doc = db_session.exec(select(SourceDoc).where(SourceDoc.project_id == test_project.id)).one()
+    second = db_session.get(Job, second.id)
+    assert second.status == JobStatus.COMPLETED
+    assert second.result_summary["is_duplicate"] is True
+    assert second.result_summary["source_doc_id"] == str(doc.id)
+
+
+def test_failed_extraction_is_redone_not_treated_as_duplicate(db_session, test_project, media_file, monkeypatch):
+    monkeypatch.setenv("WHISPER_CHUNK_SECONDS", "60")
+    sha = "ef" * 32
+    job = _make_job(db_session, test_project, media_file, sha)
+    with patch("app.workers.ingest_task.extract_facts_from_markdown", side_effect=RuntimeError("LLM down")):
+        ingest_media_task(str(job.id))
+    db_session.expire_all()
+    assert db_session.get(Job, job.id).status == JobStatus.FAILED
+
+    # The requeued job extracts against the doc the failed attempt left behind
+    with patch("app.workers.ingest_task.extract_facts_from_markdown", return_value=_extraction()) as mock_extract:
+        ingest_media_task(str(job.id))
+    assert mock_extract.call_count == 1
+    assert FakeWhisperModel.transcribed == ["0000.wav"]
+
+    db_session.expire_all()
+    job = db_session.get(Job, job.id)
+    doc = db_session.exec(select(SourceDoc).where(SourceDoc.project_id == test_project.id)).one()
+    assert job.status == JobStatus.COMPLETED
+    assert job.result_summary.get("is_duplicate") is None
+    assert job.result_summary["facts_count"] == 1
+    assert job.result_summary["source_doc_id"] == str(doc.id)
+
+
+def test_transcript_from_another_model_is_not_reused(db_session, test_project, media_file, monkeypatch):
+    monkeypatch.setenv("WHISPER_CHUNK_SECONDS", "60")
+    sha = "12" * 32
+    other_project = Project(
+        id=uuid.uuid4(), workspace_id=test_project.workspace_id, title="Other", storage_path_root="test/media3"
+    )
+    db_session.add(other_project)
+    db_session.commit()
+
+    first = _make_job(db_session, test_project, media_file, sha)
+    second = _make_job(db_session, other_project, media_file, sha)
+    with patch("app.workers.ingest_task.extract_facts_from_markdown", return_value=_extraction()):
+        ingest_media_task(str(first.id))
+        monkeypatch.setenv("WHISPER_MODEL", "small")
+        ingest_media_task(str(second.id))
+    assert FakeWhisperModel.transcribed == ["0000.wav", "0000.wav"]
+
+    db_session.expire_all()
+    assert db_session.get(Job, second.id).result_summary["transcript_reused"] is False
+    cached = db_session.exec(
+        select(MediaTranscript).where(
+            MediaTranscript.workspace_id == test_project.workspace_id, MediaTranscript.sha256 == sha
+        )
+    ).one()
+    assert cached.model == "small"
+
+
+class HardTimeout(BaseException):
+    """Stand-in for gevent.Timeout, raised in the task when the gevent pool hits the hard time limit."""
+
+
+def test_hard_time_limit_in_finalize_fails_job(db_session, media_job, monkeypatch):
+    monkeypatch.setattr("app.workers.ingest_task.TIME_LIMIT_ERRORS", (SoftTimeLimitExceeded, HardTimeout))
+    job_id = str(media_job.id)
+    with patch("app.workers.ingest_task._dispatch_media_chunks"):
+        ingest_media_task(job_id)
+    for index in range(3):
+        transcribe_media_chunk_task(job_id, index)
+
+    with patch("app.workers.ingest_task.extract_facts_from_markdown", side_effect=HardTimeout()):
+        finalize_media_ingest_task(job_id)
+
+    db_session.expire_all()
+    job = db_session.get(Job, media_job.id)
+    assert job.status == JobStatus.FAILED
+    assert job.result_summary["error_code"] == "TIME_LIMIT"
+    assert job.result_summary["filename"] == "talk.mp3"
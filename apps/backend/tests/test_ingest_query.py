@@ -115,7 +115,7 @@ def test_ingest_query_rate_limited(client, test_project, db_session):
         os.environ.pop("SCIRA_QUERY_INGEST_ENABLED", None)
 
 
-@patch("app.services.scira.celery_app.send_task")
+@patch("app.workers.celery_app.celery_app.send_task")
 def test_ingest_query_success(mock_send_task, client, test_project):
     """With feature on and mock provider, returns 200 and enqueues jobs (no Redis)."""
     mock_send_task.return_value = None
@@ -146,7 +146,7 @@ def test_ingest_query_success(mock_send_task, client, test_project):
         os.environ.pop("SCIRA_QUERY_INGEST_ENABLED", None)
 
 
-@patch("app.services.scira.celery_app.send_task")
+@patch("app.workers.celery_app.celery_app.send_task")
 def test_ingest_query_max_urls_capped(mock_send_task, client, test_workspace, db_session):
     """max_urls is capped at 5 (use fresh project to avoid rate limit; no Redis)."""
     mock_send_task.return_value = None
@@ -175,3 +175,111 @@ def test_ingest_query_max_urls_capped(mock_send_task, client, test_workspace, db
         assert len(data["job_ids"]) <= 5
     finally:
         os.environ.pop("SCIRA_QUERY_INGEST_ENABLED", None)
+
+
+def test_rate_limit_slot_is_claimed_once(db_session, test_project):
+    """The UPSERT claim lets only the first of two back-to-back requests through."""
+    from app.services.scira import check_rate_limit, release_rate_limit
+
+    claimed_at = check_rate_limit(test_project.id, db_session)
+    with pytest.raises(ValueError):
+        check_rate_limit(test_project.id, db_session)
+    release_rate_limit(test_project.id, claimed_at, db_session)
+    check_rate_limit(test_project.id, db_session)
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_ingest_query_dedups_in_one_insert(mock_send_task, db_session, test_project):
+    """Existing sources and repeated result URLs are skipped; new jobs are inserted together."""
+    from sqlalchemy import event
+    from app.models import SourceDoc
+    from app.services.scira import run_query_ingest
+
+    db_session.add(SourceDoc(
+        project_id=test_project.id, workspace_id=test_project.workspace_id,
+        url="https://example.com/page1", canonical_url="https://example.com/page1", domain="example.com",
+    ))
+    db_session.commit()
+    provider = MockSearchProvider(urls=[
+        "https://example.com/page1", "https://example.com/page2", "https://example.com/page2", "https://example.org/doc",
+    ])
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("INSERT INTO JOBS"):
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_inserts)
+    try:
+        result = run_query_ingest(test_project.id, test_project.workspace_id, "q", 5, db_session, provider)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_inserts)
+    assert result["urls_found"] == 4
+    assert result["urls_enqueued"] == 2
+    assert result["urls_skipped_duplicate"] == 2
+    assert [j["params"]["url"] for j in result["jobs"]] == ["https://example.com/page2", "https://example.org/doc"]
+    assert len(inserts) == 1
+    assert mock_send_task.call_count == 2
+
+
+def test_provider_error_releases_rate_limit(client, test_project):
+    """A failed search does not use up the project's slot."""
+    import requests
+    from app.api import ingest
+
+    class FailingProvider:
+        def search(self, query, limit=5):
+            raise requests.exceptions.ConnectionError("down")
+
+    app.dependency_overrides[ingest.get_search_provider] = lambda: FailingProvider()
+    os.environ["SCIRA_QUERY_INGEST_ENABLED"] = "true"
+    try:
+        body = {"workspace_id": str(test_project.workspace_id), "query": "test"}
+        url = f"/api/v1/projects/{test_project.id}/ingest/query"
+        assert client.post(url, json=body).status_code == 503
+        assert client.post(url, json=body).status_code == 503
+    finally:
+        os.environ.pop("SCIRA_QUERY_INGEST_ENABLED", None)
+
+
+def test_unexpected_error_releases_rate_limit(client, test_project):
+    from app.api import ingest
+
+    class BrokenProvider:
+        def search(self, query, limit=5):
+            raise KeyError("results")
+
+    app.dependency_overrides[ingest.get_search_provider] = lambda: BrokenProvider()
+    os.environ["SCIRA_QUERY_INGEST_ENABLED"] = "true"
+    try:
+        body = {"workspace_id": str(test_project.workspace_id), "query": "test"}
+        url = f"/api/v1/projects/{test_project.id}/ingest/query"
+        # Not a 429 the second time: the first failure gave the slot back
+        for _ in range(2):
+            with pytest.raises(KeyError):
+                client.post(url, json=body)
+    finally:
+        os.environ.pop("SCIRA_QUERY_INGEST_ENABLED", None)
+
+
+def test_search_cache_reuses_results_by_normalized_query():
+    """Same query modulo case/whitespace is served from search_cache until the TTL passes."""
+    from app.search.cache import CachedSearchProvider
+
+    class CountingProvider(MockSearchProvider):
+        calls = 0
+
+        def search(self, query, limit=5):
+            CountingProvider.calls += 1
+            return super().search(query, limit)
+
+    query = f"cache test {uuid.uuid4()}"
+    cached = CachedSearchProvider(CountingProvider())
+    first = cached.search(query, limit=3)
+    again = cached.search(f"  {query.upper()} ", limit=3)
+    assert CountingProvider.calls == 1
+    assert [r.url for r in again] == [r.url for r in first]
+    assert again[0].title == first[0].title
+
+    CachedSearchProvider(CountingProvider(), ttl=timedelta(0)).search(query, limit=3)
+    assert CountingProvider.calls == 2
@@ -0,0 +1,244 @@
+"""
+Ingest rule execution (V4b): due scheduled_url rules are leased, run through the bulk URL
+ingest with a per-rule concurrency cap and rescheduled; folder_watch files are queued once
+they settle, deduplicated by content hash. No broker (send_task patched), no inotify needed.
+"""
+
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.db.session import engine, get_session
+from app.main import app
+from app.models import IngestRule, Job, JobStatus, Project, Workspace
+from app.services import ingest_rules
+from app.services.ingest_rules import claim_rules, run_due_rules
+from app.workers.folder_watch import Debouncer, FolderWatchService
+
+
+@pytest.fixture
+def db_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db_session):
+    def override_get_session():
+        yield db_session
+
+    app.dependency_overrides[get_session] = override_get_session
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def test_project(db_session):
+    ws = Workspace(id=uuid.uuid4(), name="Test Workspace", settings={})
+    db_session.add(ws)
+    db_session.commit()
+    proj = Project(id=uuid.uuid4(), workspace_id=ws.id, title="Test Project", storage_path_root="test/rules")
+    db_session.add(proj)
+    db_session.commit()
+    db_session.refresh(proj)
+    return proj
+
+
+@pytest.fixture
+def send_task():
+    with patch("app.workers.celery_app.celery_app.send_task") as mock:
+        yield mock
+
+
+def _scheduled_rule(db_session, project, urls, **config):
+    rule = IngestRule(
+        project_id=project.id,
+        type="scheduled_url",
+        config_json={"urls": urls, "interval_minutes": 30, **config},
+        next_run_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+    )
+    db_session.add(rule)
+    db_session.commit()
+    return rule
+
+
+def _release_leases(db_session):
+    # Other tests' rules share the database; only this test's rules should be due
+    for rule in db_session.exec(select(IngestRule).where(IngestRule.next_run_at.is_not(None))).all():
+        rule.next_run_at = datetime.now(timezone.utc) + timedelta(days=1)
+        db_session.add(rule)
+    db_session.commit()
+
+
+def test_due_rule_runs_once_with_concurrency_cap(db_session, test_project, send_task):
+    _release_leases(db_session)
+    urls = [f"https://example.com/rule/{uuid.uuid4()}/{i}" for i in range(5)]
+    rule = _scheduled_rule(db_session, test_project, urls, max_concurrent_jobs=3)
+    rule_id = rule.id
+
+    assert run_due_rules(db_session) == 1
+    rule = db_session.get(IngestRule, rule_id)
+    db_session.refresh(rule)
+    assert rule.last_result == {"queued": 3, "deferred": 2}
+    assert rule.lease_owner is None
+    assert rule.next_run_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc) + timedelta(minutes=29)
+    assert send_task.call_count == 3
+    jobs = db_session.exec(select(Job).where(Job.project_id == test_project.id)).all()
+    assert {j.params["rule_id"] for j in jobs} == {str(rule_id)}
+
+    # Not due again until next_run_at
+    assert run_due_rules(db_session) == 0
+
+    # Next run: the cap is still full until queued jobs finish
+    rule.next_run_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.add(rule)
+    db_session.commit()
+    run_due_rules(db_session)
+    db_session.refresh(rule)
+    assert rule.last_result == {"duplicate": 3, "deferred": 2}
+
+    for job in jobs:
+        job.status = JobStatus.COMPLETED
+        db_session.add(job)
+    rule.next_run_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.add(rule)
+    db_session.commit()
+    run_due_rules(db_session)
+    db_session.refresh(rule)
+    assert rule.last_result == {"duplicate": 3, "queued": 2}
+
+
+def test_legacy_single_url_rule_still_runs(db_session, test_project, send_task):
+    _release_leases(db_session)
+    rule = IngestRule(
+        project_id=test_project.id,
+        type="scheduled_url",
+        config_json={"url": f"https://example.com/legacy/{uuid.uuid4()}"},
+        next_run_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+    )
+    db_session.add(rule)
+    db_session.commit()
+
+    assert run_due_rules(db_session) == 1
+    db_session.refresh(rule)
+    assert rule.last_result == {"queued": 1}
+    assert send_task.call_count == 1
+
+
+def test_leased_rule_is_not_claimed_by_another_node(db_session, test_project, send_task):
+    _release_leases(db_session)
+    rule = _scheduled_rule(db_session, test_project, [f"https://example.com/{uuid.uuid4()}"])
+    node_a, node_b = f"node-a:{uuid.uuid4()}", f"node-b:{uuid.uuid4()}"
+    assert [r.id for r in claim_rules(db_session, "scheduled_url", node_a)] == [rule.id]
+    assert claim_rules(db_session, "scheduled_url", node_b) == []
+
+    # An expired lease can be taken over
+    rule.lease_expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.add(rule)
+    db_session.commit()
+    assert [r.id for r in claim_rules(db_session, "scheduled_url", node_b)] == [rule.id]
+
+
+def test_rule_config_is_validated(client, test_project, monkeypatch, tmp_path):
+    url = f"/api/v1/projects/{test_project.id}/ingest-rules"
+    assert client.post(url, json={"type": "scheduled_url", "config_json": {"urls": ["ftp://x"]}}).status_code == 400
+    assert client.post(url, json={"type": "scheduled_url", "config_json": {"urls": ["https://a.example"], "interval_minutes": 1}}).status_code == 400
+    res = client.post(url, json={"type": "scheduled_url", "config_json": {"url": "https://a.example"}})
+    assert res.status_code == 200
+    assert res.json()["config_json"] == {"urls": ["https://a.example"], "interval_minutes": 60}
+    assert res.json()["next_run_at"] is not None
+
+    monkeypatch.setattr(ingest_rules, "WATCH_ROOT", str(tmp_path))
+    assert client.post(url, json={"type": "folder_watch", "config_json": {"path": "../etc"}}).status_code == 400
+    res = client.post(url, json={"type": "folder_watch", "config_json": {"path": "inbox"}})
+    assert res.json()["config_json"]["path"] == os.path.join(os.path.realpath(tmp_path), "inbox")
+    assert res.json()["next_run_at"] is None
+
+
+def test_debouncer_waits_for_quiet_period():
+    debouncer = Debouncer(quiet=5)
+    rule_id = uuid.uuid4()
+    debouncer.touch(rule_id, "/w/a.mp3", now=0)
+    debouncer.touch(rule_id, "/w/a.mp3", now=4)
+    debouncer.touch(rule_id, "/w/b.mp3", now=1)
+    assert debouncer.settled(now=6) == [(rule_id, "/w/b.mp3")]
+    assert debouncer.settled(now=8) == []
+    assert debouncer.settled(now=9) == [(rule_id, "/w/a.mp3")]
+
+
+def test_folder_watch_queues_settled_files_once(db_session, test_project, send_task, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.media_store.MEDIA_UPLOAD_DIR", str(tmp_path / "media"))
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    (inbox / "talk.mp3").write_bytes(b"same audio bytes")
+    (inbox / "notes.txt").write_text("not media")
+    rule = IngestRule(project_id=test_project.id, type="folder_watch", config_json={"path": str(inbox), "max_concurrent_jobs": 1})
+    db_session.add(rule)
+    db_session.commit()
+
+    service = FolderWatchService(owner=f"watch-test:{uuid.uuid4()}", debouncer=Debouncer(quiet=5))
+    service.sync_rules(db_session)  # no observer: only the initial listing is queued for settling
+    assert service.process_settled(db_session, now=0) == 0  # not settled yet
+    assert service.process_settled(db_session, now=float("inf")) == 1
+    send_task.assert_called_once()
+    job = db_session.exec(select(Job).where(Job.project_id == test_project.id)).one()
+    assert job.type == "file_ingest"
+    assert job.params["filename"] == "talk.mp3"
+    assert job.params["rule_id"] == str(rule.id)
+    assert os.path.isfile(job.params["path"])
+
+    # A renamed copy with the same bytes is a duplicate; a new file waits for the cap
+    (inbox / "copy.mp3").write_bytes(b"same audio bytes")
+    (inbox / "other.mp3").write_bytes(b"different audio")
+    service.debouncer.touch(rule.id, str(inbox / "copy.mp3"), now=0)
+    service.debouncer.touch(rule.id, str(inbox / "other.mp3"), now=0)
+    assert service.process_settled(db_session, now=10) == 0
+    job.status = JobStatus.COMPLETED
+    db_session.add(job)
+    db_session.commit()
+    assert service.process_settled(db_session, now=20) == 1
+    assert send_task.call_count == 2
+
+
+def test_folder_watch_requeues_failed_and_skips_oversize(db_session, test_project, send_task, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.media_store.MEDIA_UPLOAD_DIR", str(tmp_path / "media"))
+    monkeypatch.setattr("app.services.ingest_rules.MAX_MEDIA_BYTES", 64)
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    (inbox / "talk.mp3").write_bytes(b"flaky audio bytes")
+    (inbox / "huge.mp3").write_bytes(b"x" * 65)
+    rule = IngestRule(project_id=test_project.id, type="folder_watch", config_json={"path": str(inbox)})
+    db_session.add(rule)
+    db_session.commit()
+
+    assert ingest_rules.ingest_watched_file(db_session, rule, str(inbox / "huge.mp3")) == {"status": "too_large"}
+    first = ingest_rules.ingest_watched_file(db_session, rule, str(inbox / "talk.mp3"))
+    assert first["status"] == "queued"
+
+    job = db_session.get(Job, uuid.UUID(first["job_id"]))
+    job.status = JobStatus.FAILED
+    job.result_summary = {"error_code": "TRANSCRIPT_FAILED"}
+    db_session.add(job)
+    db_session.commit()
+
+    again = ingest_rules.ingest_watched_file(db_session, rule, str(inbox / "talk.mp3"))
+    assert again == {"status": "queued", "job_id": first["job_id"]}
+    db_session.refresh(job)
+    assert job.status == JobStatus.PENDING
+    assert job.result_summary == {}
+    assert send_task.call_count == 2
+    # The oversize file was never copied into storage
+    assert [p.stat().st_size for p in (tmp_path / "media").rglob("*.mp3")] == [len(b"flaky audio bytes")]
+
+    # Keep later runs' folder watchers (shared test db) off this inbox
+    rule.enabled = False
+    db_session.add(rule)
+    db_session.commit()
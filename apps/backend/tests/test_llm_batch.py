@@ -0,0 +1,299 @@
+"""
+Batch extraction mode: chunk requests from several jobs go out as one provider batch,
+are polled to completion, and fan back into ResearchNode rows. The OpenAI SDK talks to a
+local stub of the Files/Batches endpoints (httpx MockTransport); no network.
+"""
+
+import json
+import re
+import uuid
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from openai import OpenAI
+from sqlmodel import Session, select
+
+from app.db.session import engine
+from app.models import Job, JobStatus, LLMBatchRequest, Project, ResearchNode, SourceDoc, Workspace
+from app.services import llm_batch
+from app.services.llm_batch import OpenAIBatchProvider, claim_pending, submit_claimed
+from app.workers.ingest_task import ingest_url_task
+from app.workers.llm_batch_task import poll_llm_batch_task, submit_llm_batches_task
+
+
+class BatchStub:
+    """Just enough of /v1/files and /v1/batches; replies to each chat request with one fact."""
+
+    def __init__(self, polls_until_done=1, fail_when=None):
+        self.files = {}
+        self.batches = {}
+        self.polls_until_done = polls_until_done
+        self.fail_when = fail_when or (lambda body: False)
+
+    def _file(self, file_id, content):
+        self.files[file_id] = content
+        return {"id": file_id, "object": "file", "bytes": len(content), "created_at": 0,
+                "filename": "extraction.jsonl", "purpose": "batch", "status": "processed"}
+
+    def _reply(self, line):
+        request = json.loads(line)
+        body = request["body"]
+        if self.fail_when(body):
+            return {"id": "r", "custom_id": request["custom_id"], "response": None,
+                    "error": {"code": "server_error", "message": "model overloaded"}}
+        chunk = body["messages"][1]["content"].split("\n\n", 1)[1]
+        quote = chunk.split("\n")[1][:40]
+        content = {
+            "facts": [{"fact_text": f"Fact about {quote}", "quote_span": quote, "confidence": "HIGH",
+                       "section_context": "Transcript", "tags": ["batch"]}],
+            "summary_brief": [f"Summary of {quote}"],
+        }
+        return {"id": "r", "custom_id": request["custom_id"], "error": None, "response": {
+            "status_code": 200, "request_id": "req",
+            "body": {"choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(content)}}]},
+        }}
+
+    def _batch(self, batch):
+        return {"object": "batch", "endpoint": "/v1/chat/completions", "completion_window": "24h",
+                "created_at": 0, **batch}
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.method == "POST" and path == "/v1/files":
+            lines = re.findall(rb'^\{"custom_id".*$', request.content, re.M)
+            return httpx.Response(200, json=self._file(f"file-in-{len(self.files)}", b"\n".join(lines)))
+        if request.method == "POST" and path == "/v1/batches":
+            payload = json.loads(request.content)
+            assert payload["endpoint"] == "/v1/chat/completions"
+            batch_id = f"batch_{len(self.batches)}"
+            self.batches[batch_id] = {"id": batch_id, "input_file_id": payload["input_file_id"], "status": "validating", "polls": 0}
+            return httpx.Response(200, json=self._batch(self.batches[batch_id]))
+        if request.method == "GET" and path.startswith("/v1/batches/"):
+            batch = self.batches[path.rsplit("/", 1)[1]]
+            batch["polls"] += 1
+            if batch["polls"] > self.polls_until_done and batch["status"] != "completed":
+                lines = self.files[batch["input_file_id"]].decode().splitlines()
+                replies = [self._reply(line) for line in lines]
+                self._file("file-out", "\n".join(json.dumps(r) for r in replies if r["response"]).encode())
+                self._file("file-err", "\n".join(json.dumps(r) for r in replies if r["error"]).encode())
+                batch.update(status="completed", output_file_id="file-out", error_file_id="file-err")
+            elif batch["status"] != "completed":
+                batch["status"] = "in_progress"
+            return httpx.Response(200, json=self._batch({k: v for k, v in batch.items() if k != "polls"}))
+        if request.method == "GET" and path.endswith("/content"):
+            return httpx.Response(200, content=self.files[path.split("/")[-2]])
+        return httpx.Response(404, json={"error": {"message": f"no stub for {request.method} {path}"}})
+
+
+def _provider(stub):
+    client = OpenAI(api_key="test", base_url="http://batch-stub.local/v1", max_retries=0,
+                    http_client=httpx.Client(transport=httpx.MockTransport(stub)))
+    return OpenAIBatchProvider(client)
+
+
+@pytest.fixture
+def db_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def test_project(db_session):
+    ws = Workspace(id=uuid.uuid4(), name="Test Workspace", settings={})
+    db_session.add(ws)
+    db_session.commit()
+    proj = Project(id=uuid.uuid4(), workspace_id=ws.id, title="Test Project", storage_path_root="test/batch")
+    db_session.add(proj)
+    db_session.commit()
+    db_session.refresh(proj)
+    return proj
+
+
+@pytest.fixture(autouse=True)
+def only_new_requests(db_session):
+    # Leftovers from earlier runs on a reused test db would join our batches
+    for r in db_session.exec(select(LLMBatchRequest)).all():
+        db_session.delete(r)
+    db_session.commit()
+
+
+def _batch_job(db_session, project, video_id):
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    job = Job(
+        id=uuid.uuid4(),
+        project_id=project.id,
+        workspace_id=project.workspace_id,
+        type="url_ingest",
+        status=JobStatus.PENDING,
+        idempotency_key=f"{project.id}:{url}",
+        params={"url": url, "canonical_url": url, "source_type": "YOUTUBE", "extraction_mode": "batch"},
+    )
+    db_session.add(job)
+    db_session.commit()
+    with patch("app.workers.ingest_task.extract") as mock_extract:
+        mock_extract.return_value = {
+            "title": f"Video {video_id}",
+            "video_url": url,
+            "transcript": [{"start_s": 0.0, "end_s": 5.0, "text": f"Grid storage in {video_id} doubled last year."}],
+        }
+        ingest_url_task(None, str(job.id), url)
+    return job
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_batch_jobs_submitted_together_and_fanned_back(mock_send_task, db_session, test_project, monkeypatch):
+    stub = BatchStub(polls_until_done=1, fail_when=lambda body: "vidBBBB" in body["messages"][1]["content"])
+    monkeypatch.setattr("app.workers.llm_batch_task.get_batch_provider", lambda: _provider(stub))
+    first = _batch_job(db_session, test_project, "vidAAAA")
+    second = _batch_job(db_session, test_project, "vidBBBB")
+
+    db_session.expire_all()
+    job = db_session.get(Job, first.id)
+    assert job.status == JobStatus.RUNNING
+    assert job.result_summary["awaiting_batch"] is True
+    assert job.result_summary["extract_chunks_total"] == 1
+    assert mock_send_task.call_args_list[0].args == ("submit_llm_batches",)
+
+    # Inside the batch window nothing is sent
+    submit_llm_batches_task()
+    assert stub.batches == {}
+
+    monkeypatch.setattr(llm_batch, "BATCH_WINDOW_S", 0)
+    submit_llm_batches_task()
+    assert list(stub.batches) == ["batch_0"]
+    assert len(stub.files["file-in-0"].splitlines()) == 2  # both jobs in one batch
+    mock_send_task.assert_called_with("poll_llm_batch", args=["batch_0"], countdown=llm_batch.BATCH_POLL_S)
+
+    poll_llm_batch_task("batch_0")  # still in progress: poll again later
+    db_session.expire_all()
+    assert db_session.get(Job, first.id).status == JobStatus.RUNNING
+    assert mock_send_task.call_args.args == ("poll_llm_batch",)
+
+    poll_llm_batch_task("batch_0")
+    db_session.expire_all()
+    job = db_session.get(Job, first.id)
+    assert job.status == JobStatus.COMPLETED
+    assert job.result_summary["facts_count"] == 1
+    assert job.result_summary["extract_chunks_failed"] == 0
+    assert job.result_summary["source_title"] == "Video vidAAAA"
+    assert "awaiting_batch" not in job.result_summary
+    doc = db_session.exec(select(SourceDoc).where(SourceDoc.project_id == test_project.id, SourceDoc.title == "Video vidAAAA")).one()
+    fact = db_session.exec(select(ResearchNode).where(ResearchNode.source_doc_id == doc.id)).one()
+    assert fact.tags == ["batch"]
+    assert fact.confidence_score == 85
+    assert fact.evidence_start_char_raw is not None
+
+    failed = db_session.get(Job, second.id)
+    assert failed.status == JobStatus.FAILED
+    assert failed.result_summary["error_code"] == "BATCH_FAILED"
+    assert "overloaded" in failed.result_summary["error_message"]
+    assert db_session.exec(select(LLMBatchRequest).where(LLMBatchRequest.job_id.in_([first.id, second.id]))).all() == []
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_failed_submit_returns_requests_to_queue(mock_send_task, db_session, test_project):
+    job = _batch_job(db_session, test_project, "vidCCCC")
+    requests = claim_pending(db_session, force=True)
+    assert [r.job_id for r in requests] == [job.id]
+    assert requests[0].status == "SUBMITTED"
+    # A concurrent flush finds nothing left to claim
+    assert claim_pending(db_session, force=True) == []
+
+    provider = MagicMock()
+    provider.submit.side_effect = RuntimeError("upload failed")
+    with pytest.raises(RuntimeError):
+        submit_claimed(db_session, requests, provider)
+    db_session.refresh(requests[0])
+    assert requests[0].status == "PENDING"
+    assert requests[0].batch_id is None
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_batch_past_max_age_fails_its_jobs(mock_send_task, db_session, test_project, monkeypatch):
+    provider = MagicMock()
+    provider.submit.side_effect = RuntimeError("upload failed")
+    monkeypatch.setattr("app.workers.llm_batch_task.get_batch_provider", lambda: provider)
+    monkeypatch.setattr(llm_batch, "BATCH_WINDOW_S", 0)
+    unsubmitted = _batch_job(db_session, test_project, "vidDDDD")
+
+    # Submission keeps failing: retried until the requests are older than the cap
+    submit_llm_batches_task()
+    db_session.expire_all()
+    assert db_session.get(Job, unsubmitted.id).status == JobStatus.RUNNING
+    monkeypatch.setattr(llm_batch, "BATCH_MAX_AGE_S", 0)
+    provider.submit.reset_mock(side_effect=True)
+    provider.submit.return_value = "batch_never"
+    submit_llm_batches_task()
+    db_session.expire_all()
+    job = db_session.get(Job, unsubmitted.id)
+    assert job.status == JobStatus.FAILED
+    assert job.result_summary["error_code"] == "BATCH_FAILED"
+    assert "not submitted" in job.result_summary["error_message"]
+    assert "awaiting_batch" not in job.result_summary
+    provider.submit.assert_not_called()
+
+    # A submitted batch the provider never finishes (or cannot be reached about) is given up
+    monkeypatch.setattr(llm_batch, "BATCH_MAX_AGE_S", 3600)
+    stuck = _batch_job(db_session, test_project, "vidEEEE")
+    submit_llm_batches_task()
+    provider.poll.side_effect = RuntimeError("provider unreachable")
+    poll_llm_batch_task("batch_never")
+    db_session.expire_all()
+    assert db_session.get(Job, stuck.id).status == JobStatus.RUNNING
+    assert mock_send_task.call_args.args == ("poll_llm_batch",)
+
+    mock_send_task.reset_mock()
+    monkeypatch.setattr(llm_batch, "BATCH_MAX_AGE_S", 0)
+    poll_llm_batch_task("batch_never")
+    db_session.expire_all()
+    job = db_session.get(Job, stuck.id)
+    assert job.status == JobStatus.FAILED
+    assert job.result_summary["error_code"] == "BATCH_FAILED"
+    assert "expired" in job.result_summary["error_message"]
+    mock_send_task.assert_not_called()
+    assert db_session.exec(select(LLMBatchRequest).where(LLMBatchRequest.job_id.in_([unsubmitted.id, stuck.id]))).all() == []
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_finalize_error_fails_the_job(mock_send_task, db_session, test_project, monkeypatch):
+    stub = BatchStub(polls_until_done=0)
+    monkeypatch.setattr("app.workers.llm_batch_task.get_batch_provider", lambda: _provider(stub))
+    job = _batch_job(db_session, test_project, "vidFFFF")
+    submit_llm_batches_task(force=True)
+
+    # e.g. the SourceDoc was deleted while the batch ran
+    with patch("app.workers.llm_batch_task._save_extracted_facts", side_effect=AttributeError("'NoneType' object has no attribute 'id'")):
+        poll_llm_batch_task("batch_0")
+    db_session.expire_all()
+    job = db_session.get(Job, job.id)
+    assert job.status == JobStatus.FAILED
+    assert job.result_summary["error_code"] == "BATCH_FAILED"
+    assert "Saving batch results failed" in job.result_summary["error_message"]
+    assert db_session.exec(select(LLMBatchRequest).where(LLMBatchRequest.job_id == job.id)).all() == []
+
+
+class HardTimeout(BaseException):
+    """Stand-in for gevent.Timeout, raised in the task when the gevent pool hits the hard time limit."""
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_time_limit_while_finalizing_fails_remaining_jobs(mock_send_task, db_session, test_project, monkeypatch):
+    stub = BatchStub(polls_until_done=0)
+    monkeypatch.setattr("app.workers.llm_batch_task.get_batch_provider", lambda: _provider(stub))
+    monkeypatch.setattr("app.workers.llm_batch_task.TIME_LIMIT_ERRORS", (HardTimeout,))
+    jobs = [_batch_job(db_session, test_project, video_id) for video_id in ("vidGGGG", "vidHHHH")]
+    submit_llm_batches_task(force=True)
+
+    with (
+        patch("app.workers.llm_batch_task._save_extracted_facts", side_effect=HardTimeout()),
+        pytest.raises(HardTimeout),
+    ):
+        poll_llm_batch_task("batch_0")
+    db_session.expire_all()
+    for job in jobs:
+        job = db_session.get(Job, job.id)
+        assert job.status == JobStatus.FAILED
+        assert job.result_summary["error_code"] == "BATCH_FAILED"
+        assert job.result_summary["error_message"] == "Processing took longer than the task time limit"
+    assert db_session.exec(select(LLMBatchRequest).where(LLMBatchRequest.job_id.in_([j.id for j in jobs]))).all() == []
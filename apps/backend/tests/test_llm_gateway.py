@@ -0,0 +1,188 @@
+"""
+LLM gateway: per-model RPM/TPM buckets learned from x-ratelimit-* headers, callers
+queue for budget, 429s wait out Retry-After instead of failing. Local store + fake clock.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services import llm, llm_gateway
+from app.services.llm_gateway import (
+    LLMQueueTimeout,
+    LocalBucketStore,
+    RateLimiter,
+    RateLimitHeaders,
+    call_with_budget,
+    parse_reset,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, headers):
+        super().__init__("429 Too Many Requests")
+        self.response = SimpleNamespace(headers=headers)
+
+
+def _raw(body, headers=None):
+    return SimpleNamespace(headers=headers or {}, parse=lambda: body)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_gateway.time, "monotonic", clock)
+    return clock
+
+
+def _limiter(clock, rpm=60, tpm=10_000):
+    return RateLimiter(local=LocalBucketStore(default_rpm=rpm, default_tpm=tpm, clock=clock))
+
+
+def test_parse_reset_durations():
+    assert parse_reset("20ms") == pytest.approx(0.02)
+    assert parse_reset("1s") == 1
+    assert parse_reset("6m0s") == 360
+    assert parse_reset("1h2m3.5s") == pytest.approx(3723.5)
+    assert parse_reset("2") == 2
+    assert parse_reset("") is None
+    assert parse_reset("soon") is None
+
+
+def test_headers_parsed_and_exhausted_window_blocks():
+    limits = RateLimitHeaders.from_headers({
+        "x-ratelimit-limit-requests": "5000",
+        "x-ratelimit-limit-tokens": "2000000",
+        "x-ratelimit-remaining-requests": "4999",
+        "x-ratelimit-remaining-tokens": "0",
+        "x-ratelimit-reset-requests": "12ms",
+        "x-ratelimit-reset-tokens": "1m30s",
+    })
+    assert (limits.limit_requests, limits.limit_tokens) == (5000, 2_000_000)
+    assert limits.remaining_requests == 4999
+    assert limits.blocked_for() == 90
+    assert RateLimitHeaders.from_headers(None).blocked_for() == 0
+
+
+def test_bucket_queues_requests_beyond_rpm(clock):
+    store = LocalBucketStore(default_rpm=2, default_tpm=10_000, clock=clock)
+    assert store.acquire("m", 10) == 0
+    assert store.acquire("m", 10) == 0
+    assert store.acquire("m", 10) == pytest.approx(30)  # one request refills every 60/rpm seconds
+    clock.sleep(30)
+    assert store.acquire("m", 10) == 0
+    # Buckets are per model
+    assert store.acquire("other", 10) == 0
+
+
+def test_bucket_waits_for_tokens_and_caps_oversized_requests(clock):
+    store = LocalBucketStore(default_rpm=100, default_tpm=600, clock=clock)
+    assert store.acquire("m", 500) == 0
+    assert store.acquire("m", 400) == pytest.approx(30)  # 300 tokens short at 10 tokens/s
+    clock.sleep(60)
+    # Larger than the whole TPM: waits for a full bucket rather than forever
+    assert store.acquire("m", 5000) == 0
+
+
+def test_observed_headers_tighten_shared_budget(clock):
+    store = LocalBucketStore(default_rpm=500, default_tpm=200_000, clock=clock)
+    store.observe("m", RateLimitHeaders(limit_requests=60, limit_tokens=6000, remaining_requests=1, remaining_tokens=5000))
+    assert store.acquire("m", 100) == 0
+    assert store.acquire("m", 100) == pytest.approx(1)  # learned rpm=60 -> 1 request/s
+    store.observe("m", RateLimitHeaders(retry_after=20))
+    assert store.acquire("m", 100) == pytest.approx(20)
+
+
+def test_rate_limited_call_waits_out_retry_after(clock):
+    limiter = _limiter(clock)
+    responses = [RateLimited({"retry-after": "7"}), _raw("ok", {"x-ratelimit-limit-requests": "30"})]
+    sleeps = []
+
+    def request():
+        item = responses.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock.sleep(seconds)
+
+    assert call_with_budget("m", 100, request, limiter=limiter, sleep=sleep) == "ok"
+    assert sum(sleeps) == pytest.approx(7)
+    assert limiter.local._buckets["m"].rpm == 30
+
+
+def test_other_errors_retried_then_raised(clock):
+    request = MagicMock(side_effect=RuntimeError("boom"))
+    with pytest.raises(RuntimeError):
+        call_with_budget("m", 100, request, limiter=_limiter(clock), sleep=clock.sleep)
+    assert request.call_count == llm_gateway.MAX_RETRIES
+
+
+def test_queue_timeout_when_budget_never_frees(clock, monkeypatch):
+    monkeypatch.setattr(llm_gateway, "QUEUE_TIMEOUT_S", 10)
+    limiter = _limiter(clock)
+    limiter.observe("m", RateLimitHeaders(retry_after=600))
+    request = MagicMock()
+    with pytest.raises(LLMQueueTimeout):
+        call_with_budget("m", 100, request, limiter=limiter, sleep=clock.sleep)
+    request.assert_not_called()
+
+
+def test_redis_errors_fall_back_to_local_budget(clock):
+    shared = MagicMock()
+    shared.acquire.side_effect = ConnectionError("redis down")
+    limiter = RateLimiter(shared=shared, local=LocalBucketStore(default_rpm=1, default_tpm=100, clock=clock))
+    assert limiter.acquire("m", 10) == 0
+    assert limiter.acquire("m", 10) == pytest.approx(60)
+    assert shared.acquire.call_count == 1  # not retried until SHARED_RETRY_S passes
+
+
+def test_call_llm_goes_through_gateway(clock):
+    limiter = _limiter(clock)
+    fake_client = MagicMock()
+    fake_client.chat.completions.with_raw_response.create.return_value = _raw(
+        "completion", {"x-ratelimit-limit-tokens": "4000", "x-ratelimit-remaining-tokens": "3000"}
+    )
+    with (
+        patch.object(llm, "client", fake_client),
+        patch("app.services.llm_gateway.get_rate_limiter", return_value=limiter),
+    ):
+        assert llm.call_llm([{"role": "user", "content": "hi"}]) == "completion"
+    bucket = limiter.local._buckets[llm.MODEL_FAST]
+    assert bucket.tpm == 4000
+    assert bucket.tokens <= 3000
+
+
+def test_redis_store_runs_scripts_on_model_key():
+    scripts = []
+
+    def register_script(source):
+        script = MagicMock(return_value="2.5")
+        scripts.append(script)
+        return script
+
+    store = llm_gateway.RedisBucketStore(MagicMock(register_script=register_script), default_rpm=500, default_tpm=9000)
+    acquire, observe = scripts
+    assert store.acquire("gpt-4o-mini", 123) == 2.5
+    acquire.assert_called_once_with(keys=["llm:ratelimit:gpt-4o-mini"], args=[500, 9000, llm_gateway.BUCKET_TTL_S, 1, 123])
+    store.observe("gpt-4o-mini", RateLimitHeaders(limit_tokens=4000, remaining_tokens=0, reset_tokens=6.0))
+    observe.assert_called_once_with(
+        keys=["llm:ratelimit:gpt-4o-mini"],
+        args=[500, 9000, llm_gateway.BUCKET_TTL_S, "", "4000", "", "0", "6.0"],
+    )
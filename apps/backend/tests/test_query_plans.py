@@ -0,0 +1,122 @@
+"""
+Query-plan regression: the ingest dedup lookups, the fact list and source_doc_id lookups are
+served by indexes (no full scans, no sort step for the default listings). Runs the real
+endpoint queries against a fresh sqlite schema from the models and EXPLAINs what they emit.
+"""
+
+import uuid
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, select
+
+from app.api.ingest import IngestURLRequest, ingest_url
+from app.api.projects import get_project_facts
+from app.models import Project, ResearchNode, ReviewStatus, SourceDoc, Workspace
+from app.services.url_ingest import enqueue_urls
+
+
+@pytest.fixture
+def plan_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def seeded(plan_engine):
+    with Session(plan_engine) as db:
+        ws = Workspace(id=uuid.uuid4(), name="Plans", settings={})
+        db.add(ws)
+        db.commit()
+        projects = [Project(id=uuid.uuid4(), workspace_id=ws.id, title=f"P{p}", storage_path_root="test/plans") for p in range(3)]
+        db.add_all(projects)
+        db.commit()
+        for proj in projects:
+            docs = [SourceDoc(project_id=proj.id, workspace_id=ws.id, url=f"https://example.com/{proj.id}/{i}",
+                              canonical_url=f"https://example.com/{proj.id}/{i}", domain="example.com") for i in range(20)]
+            db.add_all(docs)
+            db.commit()
+            db.add_all([
+                ResearchNode(project_id=proj.id, source_doc_id=docs[i % 20].id, fact_text=f"Fact {i}", confidence_score=i % 100,
+                             review_status=ReviewStatus.APPROVED if i % 3 else ReviewStatus.NEEDS_REVIEW, is_suppressed=i % 17 == 0)
+                for i in range(200)
+            ])
+            db.commit()
+        db.connection().exec_driver_sql("ANALYZE")
+        return ws.id, projects[0].id
+
+
+def _plans(engine, run):
+    """Run queries through run(db) and return [(sql, plan)] for every SELECT it issued."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with Session(engine) as db:
+            run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in captured:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            plans.append((statement, "\n".join(row[-1] for row in rows)))
+    return plans
+
+
+def _assert_no_full_scan(plans, table):
+    touched = [(sql, plan) for sql, plan in plans if f"FROM {table}" in sql]
+    assert touched
+    for sql, plan in touched:
+        assert f"SCAN {table}\n" not in plan + "\n", f"{sql}\n{plan}"
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_ingest_dedup_uses_project_url_indexes(mock_send_task, plan_engine, seeded):
+    ws_id, project_id = seeded
+
+    def run(db):
+        ingest_url(IngestURLRequest(project_id=str(project_id), workspace_id=str(ws_id), url="https://new.example.com/x"), db=db)
+        enqueue_urls(db, project_id, ws_id, [f"https://example.com/{project_id}/3", "https://other.example.com/y"])
+
+    plans = _plans(plan_engine, run)
+    _assert_no_full_scan(plans, "source_docs")
+    source_plans = "\n".join(plan for sql, plan in plans if "FROM source_docs" in sql)
+    assert "ix_source_docs_project_id_canonical_url" in source_plans
+    assert "ix_source_docs_project_id_url" in source_plans
+
+
+@pytest.mark.parametrize("params, index", [
+    ({}, "ix_research_nodes_listing_created_at"),
+    ({"order": "asc"}, "ix_research_nodes_listing_created_at"),
+    ({"sort": "confidence"}, "ix_research_nodes_listing_confidence"),
+    ({"filter": "approved"}, "ix_research_nodes_listing_review_status"),
+])
+def test_fact_listing_reads_partial_index_in_order(plan_engine, seeded, params, index):
+    _, project_id = seeded
+
+    def run(db):
+        get_project_facts(str(project_id), db=db, **{"sort": None, "filter": None, "order": "desc", **params})
+
+    plans = _plans(plan_engine, run)
+    sql, plan = plans[0]
+    assert "FROM research_nodes" in sql
+    assert index in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_facts_by_source_use_source_doc_index(plan_engine, seeded):
+    def run(db):
+        doc_id = db.exec(select(SourceDoc.id)).first()
+        db.exec(select(ResearchNode.id).where(ResearchNode.source_doc_id == doc_id)).all()
+
+    plans = _plans(plan_engine, run)
+    assert "ix_research_nodes_source_doc_id" in plans[-1][1]
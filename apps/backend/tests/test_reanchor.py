@@ -0,0 +1,150 @@
+"""Batch re-anchoring job: endpoint enqueues a Job; worker fixes stale offsets and reports progress."""
+
+import uuid
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.main import app
+from app.models import Job, JobStatus, Project, ResearchNode, SourceDoc, Workspace
+from app.workers.reanchor_task import reanchor_evidence_task
+
+RAW = "Intro line.\n\nSolar   panel output\nfell by 12% in winter.\n\nBatteries store the surplus for night use."
+MARKDOWN = "# Report\n\nIntro line.\n\nSolar panel output fell by 12% in winter.\n\nBatteries store the surplus for night use."
+
+
+@pytest.fixture
+def db_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db_session):
+    def override_get_session():
+        yield db_session
+
+    from app.db.session import get_session
+    app.dependency_overrides[get_session] = override_get_session
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def test_workspace(db_session):
+    ws = Workspace(id=uuid.uuid4(), name="Test Workspace", settings={})
+    db_session.add(ws)
+    db_session.commit()
+    db_session.refresh(ws)
+    return ws
+
+
+@pytest.fixture
+def test_project(db_session, test_workspace):
+    proj = Project(
+        id=uuid.uuid4(),
+        workspace_id=test_workspace.id,
+        title="Test Project",
+        storage_path_root="test/reanchor",
+    )
+    db_session.add(proj)
+    db_session.commit()
+    db_session.refresh(proj)
+    return proj
+
+
+@pytest.fixture
+def seeded_facts(db_session, test_project, test_workspace):
+    doc = SourceDoc(
+        id=uuid.uuid4(),
+        project_id=test_project.id,
+        workspace_id=test_workspace.id,
+        url="https://example.com/solar",
+        domain="example.com",
+        content_text_raw=RAW,
+        content_markdown=MARKDOWN,
+    )
+    db_session.add(doc)
+    db_session.commit()
+    facts = [
+        # Stale offsets from an older formatter
+        ResearchNode(
+            project_id=test_project.id,
+            source_doc_id=doc.id,
+            fact_text="Solar output fell 12% in winter.",
+            quote_text_raw="Solar panel output fell by 12% in winter",
+            evidence_start_char_raw=0,
+            evidence_end_char_raw=5,
+        ),
+        # Missing offsets, quote only in evidence_snippet
+        ResearchNode(
+            project_id=test_project.id,
+            source_doc_id=doc.id,
+            fact_text="Batteries store surplus.",
+            evidence_snippet="Batteries store the surplus",
+        ),
+        # Quote no longer present
+        ResearchNode(
+            project_id=test_project.id,
+            source_doc_id=doc.id,
+            fact_text="Gone.",
+            quote_text_raw="text that was removed by the extractor",
+            evidence_start_char_raw=3,
+            evidence_end_char_raw=9,
+        ),
+    ]
+    for f in facts:
+        db_session.add(f)
+    db_session.commit()
+    for f in facts:
+        db_session.refresh(f)
+    return facts
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_reanchor_endpoint_enqueues_job(mock_send_task, client, test_project):
+    r = client.post(f"/api/v1/projects/{test_project.id}/facts/reanchor", json={})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["type"] == "reanchor_evidence"
+    assert data["status"] == "PENDING"
+    assert data["params"]["project_id"] == str(test_project.id)
+    mock_send_task.assert_called_once_with("reanchor_evidence", args=[data["id"]])
+
+
+@patch("app.workers.celery_app.celery_app.send_task")
+def test_reanchor_workspace_endpoint(mock_send_task, client, test_workspace):
+    r = client.post(f"/api/v1/workspaces/{test_workspace.id}/facts/reanchor", json={"only_missing": True})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["project_id"] is None
+    assert data["params"]["only_missing"] is True
+    assert client.post(f"/api/v1/workspaces/{uuid.uuid4()}/facts/reanchor", json={}).status_code == 404
+
+
+def test_reanchor_task_updates_offsets(db_session, test_project, seeded_facts):
+    from app.services.reanchor import create_reanchor_job
+
+    job = create_reanchor_job(db_session, test_project.workspace_id, project_id=test_project.id)
+    reanchor_evidence_task(str(job.id))
+
+    db_session.expire_all()
+    job = db_session.get(Job, job.id)
+    assert job.status == JobStatus.COMPLETED
+    assert job.steps_total == 1 and job.steps_completed == 1
+    assert job.result_summary["facts_total"] == 3
+    assert job.result_summary["facts_updated"] == 3
+    assert job.result_summary["facts_unanchored"] == 1
+
+    stale, missing, gone = (db_session.get(ResearchNode, f.id) for f in seeded_facts)
+    raw_slice = RAW[stale.evidence_start_char_raw:stale.evidence_end_char_raw]
+    assert " ".join(raw_slice.split()) == "Solar panel output fell by 12% in winter"
+    assert MARKDOWN[stale.evidence_start_char_md:stale.evidence_end_char_md] == "Solar panel output fell by 12% in winter"
+    assert RAW[missing.evidence_start_char_raw:missing.evidence_end_char_raw] == "Batteries store the surplus"
+    assert gone.evidence_start_char_raw is None and gone.evidence_end_char_raw is None
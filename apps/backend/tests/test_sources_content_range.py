@@ -0,0 +1,185 @@
+"""Ranged source content API: slicing, sections, evidence windows, ETag/304 and gzip."""
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.main import app
+from app.models import Project, SourceDoc, Workspace
+
+SOURCE_URL = "https://example.com/long-report"
+PARAGRAPH = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4
+
+
+def _long_markdown() -> str:
+    parts = ["Preface paragraph."]
+    for i in range(30):
+        parts.append(f"## Section {i}\n\n{PARAGRAPH}\n\n{PARAGRAPH}")
+    return "\n\n".join(parts)
+
+
+@pytest.fixture
+def db_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db_session):
+    def override_get_session():
+        yield db_session
+
+    from app.db.session import get_session
+    app.dependency_overrides[get_session] = override_get_session
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def test_workspace(db_session):
+    ws = Workspace(id=uuid.uuid4(), name="Test Workspace", settings={})
+    db_session.add(ws)
+    db_session.commit()
+    db_session.refresh(ws)
+    return ws
+
+
+@pytest.fixture
+def test_project(db_session, test_workspace):
+    proj = Project(
+        id=uuid.uuid4(),
+        workspace_id=test_workspace.id,
+        title="Test Project",
+        storage_path_root="test/content_range",
+    )
+    db_session.add(proj)
+    db_session.commit()
+    db_session.refresh(proj)
+    return proj
+
+
+@pytest.fixture
+def test_source(db_session, test_project, test_workspace):
+    markdown = _long_markdown()
+    doc = SourceDoc(
+        id=uuid.uuid4(),
+        project_id=test_project.id,
+        workspace_id=test_workspace.id,
+        url=SOURCE_URL,
+        domain="example.com",
+        title="Long Report",
+        content_text_raw=markdown.replace("## ", ""),
+        content_markdown=markdown,
+        content_hash="abc123",
+    )
+    db_session.add(doc)
+    db_session.commit()
+    db_session.refresh(doc)
+    return doc
+
+
+def _get(client, project_id, **params):
+    return client.get(
+        f"/api/v1/projects/{project_id}/sources/content/range",
+        params={"url": SOURCE_URL, **params},
+    )
+
+
+def test_range_pages_through_single_format(client, test_project, test_source):
+    """start/length slice one representation; next_start chains pages to the end."""
+    r = _get(client, test_project.id, format="markdown", start=0, length=1000)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["format"] == "markdown"
+    assert data["start"] == 0 and data["end"] == 1000
+    assert data["total_length"] == len(test_source.content_markdown)
+    assert data["content"] == test_source.content_markdown[:1000]
+    assert data["has_more"] is True
+    assert "text" not in data and "html" not in data
+
+    pieces = [data["content"]]
+    next_start = data["next_start"]
+    while next_start is not None:
+        page = _get(client, test_project.id, format="markdown", start=next_start, length=5000).json()
+        pieces.append(page["content"])
+        next_start = page["next_start"]
+    assert "".join(pieces) == test_source.content_markdown
+
+
+def test_range_around_evidence_offset(client, test_project, test_source):
+    """around=offset returns a window containing the offset, snapped to a paragraph start."""
+    offset = test_source.content_text_raw.index("Section 17")
+    r = _get(client, test_project.id, format="text", around=offset, length=800)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["start"] <= offset < data["end"]
+    assert data["start"] == 0 or test_source.content_text_raw[data["start"] - 1] == "\n"
+
+
+def test_range_by_section(client, test_project, test_source):
+    """include_sections lists heading spans; section=N returns exactly that span."""
+    data = _get(client, test_project.id, format="markdown", length=10, include_sections=True).json()
+    sections = data["sections"]
+    assert sections[0]["title"] == ""
+    assert sections[1]["title"] == "Section 0"
+    assert len(sections) == 31
+
+    r = _get(client, test_project.id, format="markdown", section=5)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["content"].startswith("## Section 4")
+    assert body["start"] == sections[5]["start"]
+    assert body["end"] == sections[5]["end"]
+
+    assert _get(client, test_project.id, format="markdown", section=99).status_code == 400
+
+
+def test_range_etag_not_modified(client, test_project, test_source):
+    """ETag keyed by content_hash: If-None-Match on the same slice returns 304."""
+    r = _get(client, test_project.id, start=0, length=500)
+    etag = r.headers["etag"]
+    assert etag
+
+    r2 = client.get(
+        f"/api/v1/projects/{test_project.id}/sources/content/range",
+        params={"url": SOURCE_URL, "start": 0, "length": 500},
+        headers={"If-None-Match": etag},
+    )
+    assert r2.status_code == 304
+
+    other = _get(client, test_project.id, start=500, length=500)
+    assert other.headers["etag"] != etag
+
+    # An invalid range is rejected even when the ETag would match
+    bad = client.get(
+        f"/api/v1/projects/{test_project.id}/sources/content/range",
+        params={"url": SOURCE_URL, "format": "markdown", "section": 99},
+        headers={"If-None-Match": "*"},
+    )
+    assert bad.status_code == 400
+
+
+def test_range_gzip_and_fallback(client, test_project, test_source):
+    """Large slices are gzip-encoded; a missing html representation falls back to text."""
+    r = client.get(
+        f"/api/v1/projects/{test_project.id}/sources/content/range",
+        params={"url": SOURCE_URL, "format": "html", "length": 20000},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert r.status_code == 200
+    assert r.headers.get("content-encoding") == "gzip"
+    assert r.json()["format"] == "text"
+
+
+def test_range_unknown_source_404(client, test_project):
+    r = client.get(
+        f"/api/v1/projects/{test_project.id}/sources/content/range",
+        params={"url": "https://example.com/missing"},
+    )
+    assert r.status_code == 404
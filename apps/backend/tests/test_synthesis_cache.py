@@ -0,0 +1,179 @@
+"""
+Synthesis cache: the same fact selection + mode returns the earlier Output without an LLM
+call; ?cache=false, edited facts, another mode or an expired entry regenerate. Fake OpenAI
+client; no network.
+"""
+
+import json
+import uuid
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.db.session import engine, get_session
+from app.main import app
+from app.models import Output, Project, SynthesisCacheEntry, Workspace
+from app.services import llm
+from app.services.llm_gateway import LocalBucketStore, RateLimiter
+from app.services.synthesis_cache import SynthesisCache, synthesis_cache_key
+
+FACTS = [
+    {"id": "f1", "text": "Battery prices fell 20% in 2023.", "title": "Energy Report", "url": "https://a.example/1"},
+    {"id": "f2", "text": "Grid storage doubled year over year.", "title": "Grid Weekly", "url": "https://b.example/2"},
+]
+
+REPLY = json.dumps({"sections": [{"title": "Costs", "content": "Prices are falling.", "fact_ids": ["f1", "f2"]}]})
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    monkeypatch.delenv("ARTIFACT_E2E_MODE", raising=False)
+    monkeypatch.delenv("ARTIFACT_ENABLE_TEST_SEED", raising=False)
+    fake = MagicMock()
+    fake.chat.completions.with_raw_response.create.return_value = SimpleNamespace(
+        headers={}, parse=lambda: SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=REPLY))])
+    )
+    # No embeddings: every selection is one cluster
+    fake.embeddings.with_raw_response.create.return_value = SimpleNamespace(headers={}, parse=lambda: SimpleNamespace(data=[]))
+    limiter = RateLimiter(local=LocalBucketStore(default_rpm=10_000, default_tpm=10_000_000))
+    with (
+        patch.object(llm, "client", fake),
+        patch("app.services.llm_gateway.get_rate_limiter", return_value=limiter),
+    ):
+        yield fake.chat.completions.with_raw_response.create
+
+
+@pytest.fixture
+def db_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db_session):
+    def override_get_session():
+        yield db_session
+
+    app.dependency_overrides[get_session] = override_get_session
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def test_project(db_session):
+    ws = Workspace(id=uuid.uuid4(), name="Test Workspace", settings={})
+    db_session.add(ws)
+    db_session.commit()
+    proj = Project(id=uuid.uuid4(), workspace_id=ws.id, title="Test Project", storage_path_root="test/synth-cache")
+    db_session.add(proj)
+    db_session.commit()
+    db_session.refresh(proj)
+    return proj
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(db_session):
+    # Entries from earlier runs on a reused test db count toward max_entries
+    db_session.exec(delete(SynthesisCacheEntry))
+    db_session.commit()
+
+
+def _synthesize(client, project, facts=FACTS, mode="paragraph", query=""):
+    res = client.post(f"/api/v1/projects/{project.id}/synthesize{query}", json={"facts": facts, "mode": mode})
+    assert res.status_code == 200
+    return res.json()
+
+
+def test_key_ignores_order_but_not_text_mode_or_project():
+    pid = uuid.uuid4()
+    key = synthesis_cache_key(pid, FACTS, "brief")
+    assert synthesis_cache_key(pid, list(reversed(FACTS)), "brief") == key
+    assert synthesis_cache_key(pid, [{**FACTS[0], "text": "edited"}, FACTS[1]], "brief") != key
+    assert synthesis_cache_key(pid, FACTS, "outline") != key
+    assert synthesis_cache_key(uuid.uuid4(), FACTS, "brief") != key
+    with patch("app.services.synthesis_cache.SYNTHESIS_PROMPT_VERSION", 999):
+        assert synthesis_cache_key(pid, FACTS, "brief") != key
+
+
+def test_identical_selection_reuses_output(fake_client, client, test_project):
+    first = _synthesize(client, test_project)
+    assert first["cached"] is False
+    calls = fake_client.call_count
+
+    again = _synthesize(client, test_project, facts=list(reversed(FACTS)))
+    assert again["cached"] is True
+    assert again["output_id"] == first["output_id"]
+    assert again["synthesis"] == first["synthesis"]
+    assert fake_client.call_count == calls
+
+    # research_brief and brief are the same LLM mode; outline is not
+    brief = _synthesize(client, test_project, mode="research_brief")
+    assert _synthesize(client, test_project, mode="brief")["output_id"] == brief["output_id"]
+    assert _synthesize(client, test_project, mode="script_outline")["cached"] is False
+
+
+def test_bypass_regenerates_and_replaces_entry(fake_client, client, test_project):
+    first = _synthesize(client, test_project)
+    fresh = _synthesize(client, test_project, query="?cache=false")
+    assert fresh["cached"] is False
+    assert fresh["output_id"] != first["output_id"]
+    assert _synthesize(client, test_project)["output_id"] == fresh["output_id"]
+
+
+def test_streaming_hit_is_a_single_done_event(fake_client, client, test_project):
+    first = _synthesize(client, test_project)
+    res = client.post(f"/api/v1/projects/{test_project.id}/synthesize?stream=true", json={"facts": FACTS})
+    event, data = res.text.strip().split("\n")
+    assert event == "event: done"
+    assert json.loads(data.split(": ", 1)[1])["output_id"] == first["output_id"]
+
+
+def test_deleted_output_is_a_miss(fake_client, client, test_project):
+    first = _synthesize(client, test_project)
+    assert client.delete(f"/api/v1/outputs/{first['output_id']}").status_code == 200
+    assert _synthesize(client, test_project)["cached"] is False
+
+
+def test_ttl_and_lru_eviction(db_session, test_project):
+    outputs = []
+    for i in range(3):
+        out = Output(project_id=test_project.id, title=f"Out {i}", content=f"content {i}")
+        db_session.add(out)
+        outputs.append(out)
+    db_session.commit()
+
+    cache = SynthesisCache(ttl=timedelta(hours=1), max_entries=2)
+    cache.put(db_session, "k0", outputs[0])
+    cache.put(db_session, "k1", outputs[1])
+    # A hit refreshes recency, so k1 is the one evicted
+    assert cache.get(db_session, "k0")[0].id == outputs[0].id
+    cache.put(db_session, "k2", outputs[2])
+    assert cache.get(db_session, "k1") is None
+    assert cache.get(db_session, "k2") is not None
+
+    expired = SynthesisCache(ttl=timedelta(0), max_entries=100)
+    assert expired.get(db_session, "k0") is None
+    assert db_session.get(SynthesisCacheEntry, "k0") is None
+
+
+def test_failed_generation_is_not_saved_or_cached(fake_client, client, db_session, test_project):
+    fake_client.side_effect = RuntimeError("upstream down")
+    res = client.post(f"/api/v1/projects/{test_project.id}/synthesize", json={"facts": FACTS})
+    assert res.status_code == 500
+    assert res.headers["X-Error-Code"] == "SYNTHESIS_EXCEPTION"
+    assert db_session.exec(select(Output).where(Output.project_id == test_project.id)).all() == []
+    assert db_session.exec(select(SynthesisCacheEntry)).all() == []
+
+    # Once the LLM recovers the selection is generated, not served from a cached failure
+    fake_client.side_effect = None
+    recovered = _synthesize(client, test_project)
+    assert recovered["cached"] is False
+    assert "Prices are falling." in recovered["synthesis"]
@@ -0,0 +1,144 @@
+"""
+Hierarchical synthesis: selections over the prompt budget are clustered into a bounded
+number of groups, synthesized per group in parallel from their highest-priority facts, and
+merged with the fact-id citations intact. Fake embeddings/chat client; no network.
+"""
+
+import json
+import re
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services import llm
+from app.services.llm import budget_facts
+from app.services.llm_gateway import LocalBucketStore, RateLimiter
+
+TOPICS = ["Batteries", "Solar", "Wind"]
+
+
+def _facts(n, topics=TOPICS):
+    return [
+        {"id": f"f{i}", "text": f"{topics[i % len(topics)]} observation number {i} with some detail.", "title": topics[i % len(topics)],
+         "is_pinned": i == 7, "is_key_claim": i % 50 == 0, "confidence_score": i % 100}
+        for i in range(n)
+    ]
+
+
+class FakeOpenAI:
+    """Embeddings put each topic on its own axis; chat replies cite the ids found in the prompt."""
+
+    def __init__(self, topics=TOPICS):
+        self.topics = topics
+        self.calls = []
+        self.lock = threading.Lock()
+        self.client = MagicMock()
+        self.client.embeddings.with_raw_response.create.side_effect = self.embed
+        self.client.chat.completions.with_raw_response.create.side_effect = self.chat
+
+    def embed(self, input, model):
+        def vector(text):
+            axis = next(i for i, t in enumerate(self.topics) if text.startswith(t))
+            return [1.0 if d == axis else 0.0 for d in range(len(self.topics))]
+        return SimpleNamespace(headers={}, parse=lambda: SimpleNamespace(data=[SimpleNamespace(embedding=vector(t)) for t in input]))
+
+    def chat(self, messages, **kwargs):
+        system, user = messages[0]["content"], messages[1]["content"]
+        with self.lock:
+            self.calls.append((system, user))
+        if "partial syntheses" in system:
+            ids = [i for group in re.findall(r"\[FACT ids=([^\]]*)\]", user) for i in group.split(",") if i]
+            reply = {"sections": [{"title": "Merged", "content": "Everything together.", "fact_ids": ids[:5] + ["made-up"]}],
+                     "unsupported_requests": ["Costs in 2030"]}
+        else:
+            ids = re.findall(r"\[FACT id=([^\]]+)\]", user)
+            reply = {"sections": [{"title": "Group", "content": "Group summary.", "fact_ids": ids[:3]}],
+                     "unsupported_requests": ["Costs in 2030"]}
+        content = json.dumps(reply)
+        return SimpleNamespace(headers={}, parse=lambda: SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))]))
+
+
+@pytest.fixture
+def fake_openai():
+    fake = FakeOpenAI()
+    limiter = RateLimiter(local=LocalBucketStore(default_rpm=100_000, default_tpm=100_000_000))
+    with (
+        patch.object(llm, "client", fake.client),
+        patch("app.services.llm_gateway.get_rate_limiter", return_value=limiter),
+    ):
+        yield fake
+
+
+def test_budget_prefers_pinned_key_claims_then_confidence():
+    facts = [
+        {"id": "low", "text": "x" * 40, "confidence_score": 10},
+        {"id": "pinned", "text": "x" * 40, "confidence_score": 0, "is_pinned": True},
+        {"id": "high", "text": "x" * 40, "confidence_score": 95},
+        {"id": "key", "text": "x" * 40, "confidence_score": 5, "is_key_claim": True},
+    ]
+    line = llm.count_tokens(llm._fact_line(facts[0]))
+    assert [f["id"] for f in budget_facts(facts, max_tokens=line * 3)] == ["pinned", "high", "key"]
+    assert budget_facts(facts, max_tokens=line * 10) == facts
+
+
+def test_small_selection_stays_single_pass(fake_openai):
+    result = llm.synthesize_facts(_facts(6), "brief")
+    assert len(fake_openai.calls) == 1
+    assert "[FACT id=f5]" in fake_openai.calls[0][1]
+    assert result["synthesis"].startswith("### Group")
+
+
+def test_large_selection_merges_cluster_partials(fake_openai, monkeypatch):
+    monkeypatch.setattr(llm, "SYNTHESIS_CONTEXT_TOKENS", 2000)
+    facts = _facts(1200)
+    result = llm.synthesize_facts(facts, "paragraph")
+
+    partials = [user for system, user in fake_openai.calls if "one group of a larger selection" in system]
+    merges = [user for system, user in fake_openai.calls if "partial syntheses" in system]
+    assert len(partials) == 3 and len(merges) == 1
+    sent = set()
+    for user in partials:
+        assert llm.count_tokens(user) < 2000 + 100
+        sent.update(re.findall(r"\[FACT id=([^\]]+)\]", user))
+    # Trimmed groups keep pinned and key-claim facts first, then the most confident
+    assert {"f7"} | {f"f{i}" for i in range(0, 1200, 50)} <= sent
+    assert "f1" not in sent and "f99" in sent
+    assert len(fake_openai.client.embeddings.with_raw_response.create.call_args_list) == 2  # 1000-input batches
+
+    synthesis = result["synthesis"]
+    assert "[6]" not in synthesis  # the made-up id gets no citation
+    cited = re.findall(r"\*\*\[(\d+)\]\*\* (\w+):", synthesis)
+    assert [n for n, _ in cited] == ["1", "2", "3", "4", "5"]
+    assert {topic for _, topic in cited} <= set(TOPICS)
+    assert "Costs in 2030" in synthesis
+    assert sorted(c["count"] for c in result["clusters"]) == [400, 400, 400]
+
+
+def test_partial_count_is_capped(monkeypatch):
+    topics = [f"Topic{i:02d}" for i in range(40)]
+    fake = FakeOpenAI(topics)
+    monkeypatch.setattr(llm, "SYNTHESIS_CONTEXT_TOKENS", 500)
+    limiter = RateLimiter(local=LocalBucketStore(default_rpm=100_000, default_tpm=100_000_000))
+    with (
+        patch.object(llm, "client", fake.client),
+        patch("app.services.llm_gateway.get_rate_limiter", return_value=limiter),
+    ):
+        result = llm.synthesize_facts(_facts(400, topics), "split")
+    assert len(result["clusters"]) == llm.SYNTHESIS_MAX_PARTIALS
+    assert len(fake.calls) == llm.SYNTHESIS_MAX_PARTIALS + 1
+
+
+def test_failures_raise_synthesis_error_on_both_paths(fake_openai, monkeypatch):
+    monkeypatch.setattr("app.services.llm_gateway.MAX_RETRIES", 1)
+    fake_openai.client.chat.completions.with_raw_response.create.side_effect = RuntimeError("upstream down")
+    with pytest.raises(llm.SynthesisError):
+        llm.synthesize_facts(_facts(6), "brief")
+
+    # Hierarchical: every partial fails before the final call is made
+    monkeypatch.setattr(llm, "SYNTHESIS_CONTEXT_TOKENS", 2000)
+    with pytest.raises(llm.SynthesisError, match="All partial syntheses failed"):
+        llm.synthesize_facts(_facts(1200), "paragraph")
+    with pytest.raises(llm.SynthesisError):
+        next(llm.stream_synthesis(_facts(1200), "paragraph"))
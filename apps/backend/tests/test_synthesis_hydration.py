@@ -0,0 +1,131 @@
+"""
+Synthesize/analyze by fact id: the server reads fact text, source and review fields in one
+query and rejects ids outside the project. E2E mode keeps synthesis deterministic (no LLM).
+"""
+
+import uuid
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.api.projects import _hydrate_facts
+from app.db.session import engine, get_session
+from app.main import app
+from app.models import Output, Project, ResearchNode, ReviewStatus, SourceDoc, Workspace
+from app.services import llm
+
+
+@pytest.fixture
+def db_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db_session):
+    def override_get_session():
+        yield db_session
+
+    app.dependency_overrides[get_session] = override_get_session
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        app.dependency_overrides.clear()
+
+
+def _project_with_facts(db_session, n=3):
+    ws = Workspace(id=uuid.uuid4(), name="Test Workspace", settings={})
+    db_session.add(ws)
+    db_session.commit()
+    proj = Project(id=uuid.uuid4(), workspace_id=ws.id, title="Test Project", storage_path_root="test/hydrate")
+    db_session.add(proj)
+    db_session.commit()
+    doc = SourceDoc(project_id=proj.id, workspace_id=ws.id, url="https://example.com/a", domain="example.com", title="Example")
+    db_session.add(doc)
+    db_session.commit()
+    facts = [
+        ResearchNode(
+            project_id=proj.id,
+            source_doc_id=doc.id,
+            fact_text=f"Stored fact {i}",
+            confidence_score=60 + i,
+            is_key_claim=i == 0,
+            is_pinned=i == 1,
+            review_status=ReviewStatus.APPROVED if i < 2 else ReviewStatus.FLAGGED,
+            source_url="https://example.com/a#frag" if i == 2 else None,
+        )
+        for i in range(n)
+    ]
+    db_session.add_all(facts)
+    db_session.commit()
+    return proj, facts
+
+
+def test_hydrate_reads_facts_in_one_query(db_session):
+    proj, facts = _project_with_facts(db_session)
+    project_id = str(proj.id)
+    ids = [str(facts[2].id), str(facts[0].id), str(facts[2].id)]
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        hydrated = _hydrate_facts(db_session, project_id, ids)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(statements) == 1
+    assert [f.id for f in hydrated] == [str(facts[2].id), str(facts[0].id)]
+    assert hydrated[0].text == "Stored fact 2"
+    assert hydrated[0].title == "example.com"
+    assert hydrated[0].url == "https://example.com/a#frag"
+    assert hydrated[0].review_status == "FLAGGED"
+    assert hydrated[1].url == "https://example.com/a"
+    assert hydrated[1].is_key_claim is True and hydrated[1].confidence_score == 60
+
+
+def test_synthesize_by_ids_uses_stored_facts(client, db_session, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_E2E_MODE", "true")
+    proj, facts = _project_with_facts(db_session)
+    res = client.post(
+        f"/api/v1/projects/{proj.id}/synthesize",
+        json={"fact_ids": [str(f.id) for f in facts], "mode": "research_brief"},
+    )
+    assert res.status_code == 200
+    assert "Stored fact 0" in res.json()["synthesis"]
+    output = db_session.get(Output, uuid.UUID(res.json()["output_id"]))
+    assert output.fact_ids == [str(f.id) for f in facts]
+    assert output.quality_stats["approved"] == 2
+    assert output.quality_stats["flagged"] == 1
+    assert output.quality_stats["pinned"] == 1
+    assert output.source_count == 2
+
+
+def test_facts_from_another_project_are_rejected(client, db_session, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_E2E_MODE", "true")
+    proj, facts = _project_with_facts(db_session)
+    _, foreign = _project_with_facts(db_session, n=1)
+    res = client.post(
+        f"/api/v1/projects/{proj.id}/synthesize",
+        json={"fact_ids": [str(facts[0].id), str(foreign[0].id)]},
+    )
+    assert res.status_code == 404
+    assert res.headers["X-Error-Code"] == "FACTS_NOT_FOUND"
+    assert str(foreign[0].id) in res.json()["detail"]
+
+    res = client.post(f"/api/v1/projects/{proj.id}/analyze", json={"fact_ids": ["not-a-uuid"]})
+    assert res.status_code == 422
+
+
+def test_analyze_by_ids(client, db_session):
+    proj, facts = _project_with_facts(db_session)
+    with patch.object(llm, "client", None):
+        res = client.post(f"/api/v1/projects/{proj.id}/analyze", json={"fact_ids": [str(f.id) for f in facts]})
+    assert res.status_code == 200
+    assert res.json()["clusters"][0]["fact_ids"] == [str(f.id) for f in facts]
@@ -0,0 +1,147 @@
+"""
+Streaming synthesis (POST /projects/{id}/synthesize?stream=true): sections arrive as SSE
+events while the model is still writing, with the same citation markers as the JSON path.
+The OpenAI stream is faked as a list of content deltas; no network.
+"""
+
+import json
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.db.session import engine, get_session
+from app.main import app
+from app.models import Output, Project, Workspace
+from app.services import llm
+from app.services.llm import SectionStream
+from app.services.llm_gateway import LocalBucketStore, RateLimiter
+
+FACTS = [
+    {"id": "f1", "text": "Battery prices fell 20% in 2023.", "title": "Energy Report", "url": "https://a.example/1"},
+    {"id": "f2", "text": "Grid storage doubled year over year.", "title": "Grid Weekly", "url": "https://b.example/2"},
+    {"id": "f3", "text": "Lithium supply is concentrated.", "title": "Mining News", "url": "https://c.example/3"},
+]
+
+REPLY = json.dumps({
+    "sections": [
+        {"title": "Costs", "content": "Prices are falling {fast} \"quoted\".", "fact_ids": ["f1"]},
+        {"title": "Deployment", "content": "Storage [grows].", "fact_ids": ["f2", "f1"]},
+    ],
+    "unsupported_requests": ["2025 forecasts"],
+})
+
+
+def _deltas(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _fake_client(reply=REPLY):
+    chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=d))]) for d in _deltas(reply)]
+    fake = MagicMock()
+    fake.chat.completions.with_raw_response.create.side_effect = lambda **kw: SimpleNamespace(
+        headers={}, parse=lambda: iter(chunks) if kw.get("stream") else SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=reply))]
+        )
+    )
+    # No embeddings: every selection is one cluster
+    fake.embeddings.with_raw_response.create.return_value = SimpleNamespace(headers={}, parse=lambda: SimpleNamespace(data=[]))
+    return fake
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    monkeypatch.delenv("ARTIFACT_E2E_MODE", raising=False)
+    monkeypatch.delenv("ARTIFACT_ENABLE_TEST_SEED", raising=False)
+    limiter = RateLimiter(local=LocalBucketStore(default_rpm=10_000, default_tpm=10_000_000))
+    with (
+        patch.object(llm, "client", _fake_client()),
+        patch("app.services.llm_gateway.get_rate_limiter", return_value=limiter),
+    ):
+        yield
+
+
+@pytest.fixture
+def db_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db_session):
+    def override_get_session():
+        yield db_session
+
+    app.dependency_overrides[get_session] = override_get_session
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def test_project(db_session):
+    ws = Workspace(id=uuid.uuid4(), name="Test Workspace", settings={})
+    db_session.add(ws)
+    db_session.commit()
+    proj = Project(id=uuid.uuid4(), workspace_id=ws.id, title="Test Project", storage_path_root="test/synth")
+    db_session.add(proj)
+    db_session.commit()
+    db_session.refresh(proj)
+    return proj
+
+
+def _events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_section_stream_yields_sections_across_split_deltas():
+    reader = SectionStream()
+    seen = []
+    for delta in _deltas(REPLY, size=3):
+        seen.extend(reader.feed(delta))
+    assert [s["title"] for s in seen] == ["Costs", "Deployment"]
+    assert seen[0]["content"] == 'Prices are falling {fast} "quoted".'
+    assert reader.text == REPLY
+
+
+def test_stream_matches_non_streaming_citations(fake_llm):
+    events = list(llm.stream_synthesis(FACTS, "paragraph"))
+    assert [e for e, _ in events] == ["clusters", "section", "section", "complete"]
+    assert events[1][1]["markdown"].endswith("[1]\n\n")
+    assert events[2][1]["markdown"].endswith("[2][1]\n\n")
+    assert events[-1][1]["synthesis"] == llm.synthesize_facts(FACTS, "paragraph")["synthesis"]
+    assert "### Sources" in events[-1][1]["synthesis"]
+    assert "2025 forecasts" in events[-1][1]["synthesis"]
+
+
+def test_sse_endpoint_streams_sections_then_persists_output(fake_llm, client, db_session, test_project):
+    res = client.post(
+        f"/api/v1/projects/{test_project.id}/synthesize?stream=true",
+        json={"facts": FACTS, "mode": "research_brief"},
+    )
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+    events = _events(res.text)
+    assert [e for e, _ in events] == ["clusters", "section", "section", "done"]
+    done = events[-1][1]
+    output = db_session.get(Output, uuid.UUID(done["output_id"]))
+    assert output.content == done["synthesis"]
+    assert output.output_type == "research_brief"
+    assert output.fact_ids == ["f1", "f2", "f3"]
+
+
+def test_sse_endpoint_reports_failure_as_error_event(fake_llm, client, test_project):
+    with patch.object(llm, "client", _fake_client(reply='{"sections": [')):
+        res = client.post(f"/api/v1/projects/{test_project.id}/synthesize?stream=true", json={"facts": FACTS})
+    events = _events(res.text)
+    assert events[-1][0] == "error"
+    assert events[-1][1]["code"] == "SYNTHESIS_EXCEPTION"
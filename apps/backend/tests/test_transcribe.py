@@ -0,0 +1,129 @@
+"""Whisper model cache: weights load once per process, not per transcribed file. No real model."""
+
+import sys
+import types
+from collections import namedtuple
+
+import pytest
+
+from app.services import transcribe
+
+Segment = namedtuple("Segment", "start end text")
+
+
+class FakeWhisperModel:
+    instances = []
+
+    def __init__(self, name, device="cpu", compute_type="default", cpu_threads=0, num_workers=1):
+        self.name = name
+        self.cpu_threads = cpu_threads
+        FakeWhisperModel.instances.append(self)
+
+    def transcribe(self, path, beam_size=1):
+        return iter([Segment(0.0, 1.5, " hello "), Segment(1.5, 3.0, "world")]), None
+
+
+@pytest.fixture(autouse=True)
+def fake_faster_whisper(monkeypatch):
+    module = types.ModuleType("faster_whisper")
+    module.WhisperModel = FakeWhisperModel
+    monkeypatch.setitem(sys.modules, "faster_whisper", module)
+    FakeWhisperModel.instances = []
+    transcribe.clear_model_cache()
+    yield
+    transcribe.clear_model_cache()
+
+
+def test_model_loaded_once_across_files(tmp_path):
+    audio = tmp_path / "clip.wav"
+    audio.write_bytes(b"RIFF")
+    first = transcribe.transcribe_audio(str(audio))
+    second = transcribe.transcribe_audio(str(audio))
+    assert first == second == [
+        {"start_s": 0.0, "end_s": 1.5, "text": "hello"},
+        {"start_s": 1.5, "end_s": 3.0, "text": "world"},
+    ]
+    assert len(FakeWhisperModel.instances) == 1
+
+
+def test_warm_up_preloads_configured_model(monkeypatch, tmp_path):
+    monkeypatch.setenv("WHISPER_MODEL", "small")
+    monkeypatch.setenv("WHISPER_CPU_THREADS", "4")
+    assert transcribe.warm_up() is True
+    assert len(FakeWhisperModel.instances) == 1
+    assert FakeWhisperModel.instances[0].name == "small"
+    assert FakeWhisperModel.instances[0].cpu_threads == 4
+
+    audio = tmp_path / "clip.wav"
+    audio.write_bytes(b"RIFF")
+    transcribe.transcribe_audio(str(audio))
+    assert len(FakeWhisperModel.instances) == 1
+
+
+def test_settings_change_loads_new_model(monkeypatch):
+    transcribe.get_whisper_model()
+    monkeypatch.setenv("WHISPER_MODEL", "medium")
+    transcribe.get_whisper_model()
+    assert [m.name for m in FakeWhisperModel.instances] == ["base", "medium"]
+
+
+def test_missing_file_raises():
+    with pytest.raises(FileNotFoundError):
+        transcribe.transcribe_audio("/nonexistent/audio.mp3")
+    assert FakeWhisperModel.instances == []
+
+
+def test_media_task_routed_to_transcribe_queue():
+    from app.workers.celery_app import celery_app, TRANSCRIBE_QUEUE
+    assert celery_app.conf.task_routes["ingest_media"]["queue"] == TRANSCRIBE_QUEUE
+    assert celery_app.conf.task_routes["transcribe_media_chunk"]["queue"] == TRANSCRIBE_QUEUE
+
+
+def test_plan_chunks_cuts_only_in_silence():
+    spans = [(0.5, 3.0), (3.6, 6.5), (7.2, 11.0)]
+    assert transcribe.plan_chunks(spans, max_chunk_s=4) == [(0.3, 3.2), (3.4, 6.7), (7.0, 11.2)]
+    # Everything fits in one chunk
+    assert transcribe.plan_chunks(spans, max_chunk_s=60) == [(0.3, 11.2)]
+
+
+def test_plan_chunks_splits_overlong_speech():
+    chunks = transcribe.plan_chunks([(1.0, 10.0)], max_chunk_s=4, pad_s=0)
+    assert chunks == [(1.0, 5.0), (5.0, 9.0), (9.0, 10.0)]
+    assert transcribe.plan_chunks([], max_chunk_s=4) == []
+
+
+def test_split_media_writes_chunk_wavs(monkeypatch, tmp_path):
+    import wave
+
+    audio_mod = types.ModuleType("faster_whisper.audio")
+    audio_mod.decode_audio = lambda path, sampling_rate: [0.1] * (12 * sampling_rate)
+    vad_mod = types.ModuleType("faster_whisper.vad")
+    vad_mod.VadOptions = lambda **kw: kw
+    vad_mod.get_speech_timestamps = lambda audio, options: [
+        {"start": 8000, "end": 48000}, {"start": 57600, "end": 104000}, {"start": 115200, "end": 176000},
+    ]
+    monkeypatch.setitem(sys.modules, "faster_whisper.audio", audio_mod)
+    monkeypatch.setitem(sys.modules, "faster_whisper.vad", vad_mod)
+
+    media = tmp_path / "talk.mp3"
+    media.write_bytes(b"ID3")
+    chunks = transcribe.split_media(str(media), str(tmp_path / "chunks"), max_chunk_s=4)
+
+    assert [(c["index"], c["start_s"], c["end_s"]) for c in chunks] == [
+        (0, 0.3, 3.2), (1, 3.4, 6.7), (2, 7.0, 11.2),
+    ]
+    with wave.open(chunks[1]["path"]) as wav:
+        assert wav.getframerate() == transcribe.SAMPLE_RATE
+        assert wav.getnframes() == int(6.7 * 16000) - int(3.4 * 16000)
+
+
+def test_transcribe_chunk_offsets_timestamps(tmp_path):
+    audio = tmp_path / "0001.wav"
+    audio.write_bytes(b"RIFF")
+    segments = transcribe.transcribe_chunk(str(audio), 120.25)
+    assert segments == [
+        {"start_s": 120.25, "end_s": 121.75, "text": "hello"},
+        {"start_s": 121.75, "end_s": 123.25, "text": "world"},
+    ]
+    stitched = transcribe.stitch_segments([segments, [{"start_s": 0.5, "end_s": 1.0, "text": "intro"}]])
+    assert [s["text"] for s in stitched] == ["intro", "hello", "world"]
@@ -0,0 +1,97 @@
+"""
+Shared YouTube cache: captions/metadata fetched once per video id across ingests,
+refetched after the TTL, and the table stays within max_entries (LRU). No network.
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.db.session import engine
+from app.extractors.youtube import YouTubeTranscriptProvider, extract_youtube
+from app.extractors.youtube_cache import CachedTranscriptProvider
+from app.models import YouTubeCacheEntry
+from tests.fixtures.youtube import FixtureTranscriptProvider
+
+URL_WITH_CAPTIONS = "https://www.youtube.com/watch?v=6MBq1paspVU"
+URL_WITHOUT_CAPTIONS = "https://www.youtube.com/watch?v=HpMPhOtT3Ow"
+
+
+class CountingProvider:
+    def __init__(self):
+        self.transcript_calls = []
+        self.metadata_calls = []
+
+    def get_transcript(self, video_id):
+        self.transcript_calls.append(video_id)
+        return [{"start": 0.0, "duration": 2.0, "text": f"captions for {video_id}"}]
+
+    def get_metadata(self, video_id):
+        self.metadata_calls.append(video_id)
+        return {"title": f"Video {video_id}", "channel": "Chan"}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    with Session(engine) as db:
+        db.exec(delete(YouTubeCacheEntry))
+        db.commit()
+    yield
+
+
+def test_second_ingest_served_from_cache():
+    inner = CountingProvider()
+    provider = CachedTranscriptProvider(inner, engine=engine)
+    assert isinstance(provider, YouTubeTranscriptProvider)
+
+    first = extract_youtube(URL_WITH_CAPTIONS, transcript_provider=provider)
+    second = extract_youtube("https://youtu.be/6MBq1paspVU?si=x", transcript_provider=CachedTranscriptProvider(inner, engine=engine))
+    assert first == second
+    assert second["title"] == "Video 6MBq1paspVU"
+    assert second["transcript"][0]["text"] == "captions for 6MBq1paspVU"
+    assert inner.transcript_calls == ["6MBq1paspVU"]
+    assert inner.metadata_calls == ["6MBq1paspVU"]
+
+
+def test_expired_entry_is_refetched():
+    inner = CountingProvider()
+    provider = CachedTranscriptProvider(inner, ttl=timedelta(seconds=0), engine=engine)
+    provider.get_transcript("abc")
+    provider.get_transcript("abc")
+    assert inner.transcript_calls == ["abc", "abc"]
+
+
+def test_unavailable_captions_not_cached():
+    provider = CachedTranscriptProvider(FixtureTranscriptProvider(), engine=engine)
+    with patch("app.extractors.youtube.fetch_oembed_metadata", return_value={"title": "", "channel": ""}):
+        out = extract_youtube(URL_WITHOUT_CAPTIONS, transcript_provider=provider)
+    assert out["transcript"] == []
+    with Session(engine) as db:
+        assert db.get(YouTubeCacheEntry, "HpMPhOtT3Ow") is None
+
+
+def test_fixture_provider_without_metadata_falls_back_to_oembed():
+    provider = CachedTranscriptProvider(FixtureTranscriptProvider(), engine=engine)
+    with patch(
+        "app.extractors.youtube_cache.fetch_oembed_metadata",
+        return_value={"title": "Lithium", "channel": "Science"},
+    ) as mock_oembed:
+        extract_youtube(URL_WITH_CAPTIONS, transcript_provider=provider)
+        out = extract_youtube(URL_WITH_CAPTIONS, transcript_provider=provider)
+    assert out["title"] == "Lithium"
+    assert mock_oembed.call_count == 1
+    assert len(out["transcript"]) == 4
+
+
+def test_least_recently_used_entries_evicted():
+    inner = CountingProvider()
+    provider = CachedTranscriptProvider(inner, max_entries=2, engine=engine)
+    provider.get_transcript("a")
+    provider.get_transcript("b")
+    provider.get_transcript("a")  # hit: a becomes most recently used
+    provider.get_transcript("c")
+    with Session(engine) as db:
+        assert sorted(db.exec(select(YouTubeCacheEntry.video_id)).all()) == ["a", "c"]
+    assert inner.transcript_calls == ["a", "b", "c"]
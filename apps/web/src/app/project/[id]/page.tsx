@@ -24,7 +24,7 @@ import { ProjectOverview } from "@/components/ProjectOverview";
 import { OnboardingOverlay, getOnboardingCompleted } from "@/components/OnboardingOverlay";
 import { PhaseIndicator, PhaseStatusLine, PhaseProgressBar } from "@/components/PhaseIndicator";
 import { computeAppPhase, getPhaseCTA, canPerformAction } from "@/lib/phase";
-import { fetchProject, fetchProjectFacts, fetchProjectJobs, ingestUrl, resetProject, synthesizeFacts, Fact, Job, uploadFile, batchUpdateFacts, Output, fetchProjectOutputs, fetchOutput, patchOutput, OutputSummary, updateProjectName, seedDemoProject, seedDemoSources, retrySource, updateFact, dedupFacts, fetchSourcesSummary, fetchWorkspaces, fetchPreferences, putPreference, fetchFactsGroup, fetchOutputEvidenceMap, ingestQuery, type FactsGroupedResponse, type OutputEvidenceMapFact, type SynthesizeFactInput, type QueryIngestResponse } from "@/lib/api";
+import { fetchProject, fetchProjectFacts, fetchProjectJobs, ingestUrl, resetProject, synthesizeFactsStream, Fact, Job, uploadFile, batchUpdateFacts, Output, fetchProjectOutputs, fetchOutput, patchOutput, OutputSummary, updateProjectName, seedDemoProject, seedDemoSources, retrySource, updateFact, dedupFacts, fetchSourcesSummary, fetchWorkspaces, fetchPreferences, putPreference, fetchFactsGroup, fetchOutputEvidenceMap, ingestQuery, type FactsGroupedResponse, type OutputEvidenceMapFact, type SynthesizeFactInput, type QueryIngestResponse } from "@/lib/api";
 import { Input } from "@/components/ui/input";
 import { Button } from "@/components/ui/button";
 import { Loader2, Plus, Layout, Search, Sparkles, X, Home, ChevronRight, Download, UploadCloud, Check, Star, FileText, Video, AlignLeft, Moon, Sun, Clock, CheckCircle2, AlertTriangle, History, List, Activity, Menu, SlidersHorizontal, Share2, FolderOpen } from "lucide-react";
@@ -185,6 +185,8 @@ export default function ProjectPage({ params }: { params: Promise<{ id: string }
     const [synthesisMode, setSynthesisMode] = useState<"paragraph" | "research_brief" | "script_outline" | "split">("paragraph");
     const [showSelectionDrawer, setShowSelectionDrawer] = useState(false);
     const [lastSynthesisError, setLastSynthesisError] = useState<string | null>(null);
+    // Sections of the synthesis being generated, shown as the stream delivers them
+    const [streamedSections, setStreamedSections] = useState<{ index: number; title: string; markdown: string }[]>([]);
     const [lastSynthesisPayload, setLastSynthesisPayload] = useState<{ richFacts: SynthesizeFactInput[]; mode: "paragraph" | "research_brief" | "script_outline" | "split" } | null>(null);
     const [showHistoryDrawer, setShowHistoryDrawer] = useState(false);
     const [showCompareDrawer, setShowCompareDrawer] = useState(false);
@@ -887,6 +889,7 @@ export default function ProjectPage({ params }: { params: Promise<{ id: string }
         setLastSynthesisError(null);
         setLastSynthesisPayload({ richFacts: finalRichFacts, mode });
         setIsSynthesizing(true);
+        setStreamedSections([]);
         setShowSelectionDrawer(false);
         setShowSelectedFactsDrawer(false);
         setOutputOpenedFromHistory(false);
@@ -905,7 +908,23 @@ export default function ProjectPage({ params }: { params: Promise<{ id: string }
 
         try {
             const forceError = searchParams.get("playwright_force_synthesis_error") === "1";
-            const result = await synthesizeFacts(projectId, finalRichFacts, mode, { forceError });
+            let drafted = 0;
+            const result = await synthesizeFactsStream(projectId, finalRichFacts, mode, (event) => {
+                if (event.event === "clusters" && event.data.clusters.length > 0) {
+                    toast.loading(`Generating ${modeLabel} from ${finalRichFacts.length} facts...`, {
+                        id: progressToast,
+                        description: `${event.data.clusters.length} themes found — drafting sections`,
+                    });
+                } else if (event.event === "section") {
+                    const section = event.data;
+                    drafted += 1;
+                    setStreamedSections((prev) => [...prev, section].sort((a, b) => a.index - b.index));
+                    toast.loading(`Generating ${modeLabel} from ${finalRichFacts.length} facts...`, {
+                        id: progressToast,
+                        description: `${drafted} section${drafted === 1 ? "" : "s"} drafted`,
+                    });
+                }
+            }, { forceError });
             
             // Debug logging (dev only)
             if (process.env.NODE_ENV === 'development') {
@@ -936,6 +955,7 @@ export default function ProjectPage({ params }: { params: Promise<{ id: string }
             toast.dismiss(progressToast);
         } finally {
             setIsSynthesizing(false);
+            setStreamedSections([]);
         }
     };
 
@@ -1525,6 +1545,24 @@ export default function ProjectPage({ params }: { params: Promise<{ id: string }
                     </div>
                 </div>
             )}
+            {/* Synthesis sections as they stream in; the Output drawer opens on "done" */}
+            {isSynthesizing && streamedSections.length > 0 && (
+                <div
+                    data-testid="synthesis-stream-preview"
+                    className={`fixed bottom-4 right-4 ${Z.overlay} w-[28rem] max-w-[calc(100vw-2rem)] max-h-[60vh] overflow-y-auto bg-surface border border-border rounded-lg shadow-lg p-4 space-y-3 animate-in slide-in-from-bottom-5`}
+                >
+                    <p className="text-xs font-medium text-muted-foreground uppercase tracking-wider flex items-center gap-2">
+                        <Loader2 className="w-3 h-3 animate-spin" />
+                        Drafting synthesis
+                    </p>
+                    {streamedSections.map((section) => (
+                        <div key={section.index} data-testid="synthesis-stream-section">
+                            <p className="text-sm font-medium text-foreground">{section.title}</p>
+                            <p className="text-xs text-muted-foreground whitespace-pre-wrap mt-1">{section.markdown}</p>
+                        </div>
+                    ))}
+                </div>
+            )}
             {workspaceAccessError && (
                 <div data-testid="workspace-access-error" className="px-6 py-2 bg-destructive/10 border-b border-destructive/30 text-sm text-destructive flex items-center gap-2">
                     <AlertTriangle className="h-4 w-4 shrink-0" />
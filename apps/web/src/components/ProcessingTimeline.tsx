@@ -55,6 +55,8 @@ function errorCodeLabel(code: string): string {
         EMPTY_CONTENT: "Empty content",
         CAPTIONS_UNAVAILABLE: "Captions not available",
         TRANSCRIPT_DISABLED: "Captions not available",
+        TIME_LIMIT: "Timed out",
+        BATCH_FAILED: "Batch extraction failed",
     };
     return labels[code] ?? code;
 }
@@ -63,6 +65,18 @@ function isCaptionsUnavailable(code: string | undefined): boolean {
     return code === "CAPTIONS_UNAVAILABLE" || code === "TRANSCRIPT_DISABLED";
 }
 
+function extractionWarning(job: Job): string | null {
+    const summary = job.result_summary;
+    const skipped = summary?.extract_chunks_skipped ?? 0;
+    if (skipped > 0) {
+        return `The last ${skipped} parts of this long document were over the extraction limit and have no facts.`;
+    }
+    if (summary?.extract_oversize && job.status === "RUNNING") {
+        return `Long document: all ${summary.extract_chunks_total} parts are extracted in a batch, which can take a few hours.`;
+    }
+    return null;
+}
+
 interface ProcessingTimelineProps {
     jobs: Job[];
     onRetry: (canonicalUrl: string, sourceType?: "WEB" | "REDDIT" | "YOUTUBE") => void;
@@ -72,8 +86,9 @@ export function ProcessingTimeline({ jobs, onRetry }: ProcessingTimelineProps) {
     const [tick, setTick] = useState(0);
     // Use 0 for SSR to avoid hydration mismatch (#418); set real value after mount
     const [now, setNow] = useState(0);
-    const activeOrFailed = jobs.filter((j) =>
-        ["PENDING", "RUNNING", "FAILED"].includes(j.status)
+    // Completed jobs stay listed while they carry an extraction warning
+    const activeOrFailed = jobs.filter(
+        (j) => ["PENDING", "RUNNING", "FAILED"].includes(j.status) || (j.result_summary?.extract_chunks_skipped ?? 0) > 0
     );
     const hasPending = activeOrFailed.some((j) => j.status === "PENDING");
     const isDev = process.env.NODE_ENV === "development";
@@ -126,6 +141,7 @@ export function ProcessingTimeline({ jobs, onRetry }: ProcessingTimelineProps) {
                 const isFailed = job.status === "FAILED";
                 const elapsed = elapsedSeconds(job.created_at, now);
                 const pendingMsg = job.status === "PENDING" ? pendingStatusMessage(job, elapsed) : null;
+                const warning = extractionWarning(job);
 
                 return (
                     <div
@@ -199,6 +215,15 @@ export function ProcessingTimeline({ jobs, onRetry }: ProcessingTimelineProps) {
                                         {pendingMsg.hint}
                                     </p>
                                 )}
+                                {warning && (
+                                    <p
+                                        data-testid="processing-extraction-warning"
+                                        className="text-xs text-amber-600 dark:text-amber-500 mt-0.5 flex items-start gap-1"
+                                    >
+                                        <AlertTriangle className="w-3 h-3 mt-0.5 shrink-0" />
+                                        {warning}
+                                    </p>
+                                )}
                             </div>
                             {isDev && (job.status === "PENDING" || job.status === "RUNNING") && (
                                 <button
@@ -25,7 +25,7 @@ export interface Fact {
   review_status: "PENDING" | "APPROVED" | "FLAGGED" | "REJECTED" | "NEEDS_REVIEW";
   is_pinned?: boolean;
   quote_text_raw?: string;
-  /** Optional aliases when mapping to LlmFactInput (e.g. from UI or normalized payloads) */
+  /** Optional aliases (e.g. from UI or normalized payloads) */
   text?: string;
   title?: string;
   url?: string;
@@ -82,6 +82,9 @@ export interface Job {
     error_message?: string;
     is_duplicate?: boolean;
     message?: string;
+    extract_chunks_total?: number;
+    extract_chunks_skipped?: number;
+    extract_oversize?: boolean;
   };
   current_step?: string;
   error_message?: string;
@@ -248,11 +251,27 @@ export async function updateProjectName(
 
 // --- INGESTION ---
 
-export async function ingestUrl(projectId: string, workspaceId: string, url: string) {
+/**
+ * "map_reduce" extracts long documents' chunks in parallel; "batch" queues them for the
+ * provider batch API (cheaper, completes later); omitted = server default.
+ */
+export type ExtractionMode = "standard" | "map_reduce" | "batch";
+
+export async function ingestUrl(
+  projectId: string,
+  workspaceId: string,
+  url: string,
+  extractionMode?: ExtractionMode
+) {
   const res = await fetch(`${API_URL}/ingest`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ project_id: projectId, workspace_id: workspaceId, url }),
+    body: JSON.stringify({
+      project_id: projectId,
+      workspace_id: workspaceId,
+      url,
+      ...(extractionMode ? { extraction_mode: extractionMode } : {}),
+    }),
   });
   
   // Handle 502 Gateway Error
@@ -268,6 +287,37 @@ export async function ingestUrl(projectId: string, workspaceId: string, url: str
   return res.json();
 }
 
+export interface BulkIngestResult {
+  url: string;
+  status: "queued" | "duplicate" | "invalid";
+  canonical_url?: string;
+  source_type?: string;
+  job_id?: string;
+  source_id?: string;
+  message?: string;
+}
+
+/** Queue many URLs in one request; results are per URL, in input order. */
+export async function ingestUrlsBulk(
+  projectId: string,
+  urls: string[],
+  extractionMode?: ExtractionMode
+): Promise<{ queued: number; results: BulkIngestResult[] }> {
+  const res = await fetch(`${API_URL}/projects/${projectId}/ingest/bulk`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      urls,
+      ...(extractionMode ? { extraction_mode: extractionMode } : {}),
+    }),
+  });
+  if (!res.ok) {
+    const errorText = await res.text();
+    throw new Error(`Bulk ingest failed: ${res.status} ${errorText.substring(0, 100)}`);
+  }
+  return res.json();
+}
+
 /** Demo seed: calls test/seed when NEXT_PUBLIC_ENABLE_TEST_SEED is set. Resets project and creates sample facts. */
 export async function seedDemoProject(projectId: string): Promise<{ project_id: string; facts_count: number }> {
   const sourceId = randomUUID();
@@ -325,10 +375,16 @@ export async function retrySource(
   return res.json();
 }
 
-export async function uploadFile(projectId: string, workspaceId: string, file: File) {
+export async function uploadFile(
+  projectId: string,
+  workspaceId: string,
+  file: File,
+  extractionMode?: ExtractionMode
+) {
   const formData = new FormData();
   formData.append("file", file);
   const params = new URLSearchParams({ project_id: projectId, workspace_id: workspaceId });
+  if (extractionMode) params.set("extraction_mode", extractionMode);
 
   const res = await fetch(`${API_URL}/ingest/file?${params}`, {
     method: "POST",
@@ -509,6 +565,38 @@ export interface SourceContent {
   domain: string;           // Domain name
 }
 
+export interface SourceContentSection {
+  index: number;
+  title: string;
+  start: number;
+  end: number;
+}
+
+export interface SourceContentRange {
+  content: string;          // Slice of the requested representation
+  format: "text" | "markdown" | "reader" | "html";
+  start: number;            // Char offset of slice start
+  end: number;              // Char offset of slice end (exclusive)
+  total_length: number;     // Length of the full representation
+  has_more: boolean;
+  next_start: number | null;
+  prev_start: number | null;
+  sections: SourceContentSection[] | null;
+  content_hash: string | null;
+  title: string | null;
+  url: string;
+  domain: string;
+}
+
+export interface SourceContentRangeParams {
+  format?: "text" | "markdown" | "reader" | "html";
+  start?: number;
+  length?: number;
+  around?: number;          // Centre the slice on an evidence offset
+  section?: number;
+  include_sections?: boolean;
+}
+
 export interface EvidenceSource {
   domain: string;
   url: string;
@@ -602,6 +690,26 @@ export async function fetchSourceContent(
   return res.json() as Promise<SourceContent>;
 }
 
+export async function fetchSourceContentRange(
+  projectId: string,
+  url: string,
+  opts: SourceContentRangeParams = {},
+  signal?: AbortSignal
+): Promise<SourceContentRange> {
+  const params = new URLSearchParams({ url, format: opts.format ?? "text" });
+  if (opts.start != null) params.set("start", String(opts.start));
+  if (opts.length != null) params.set("length", String(opts.length));
+  if (opts.around != null) params.set("around", String(opts.around));
+  if (opts.section != null) params.set("section", String(opts.section));
+  if (opts.include_sections) params.set("include_sections", "true");
+  const res = await fetch(`${API_URL}/projects/${projectId}/sources/content/range?${params}`, { signal });
+  if (!res.ok) {
+    const body = await res.json().catch(() => ({}));
+    throw new Error((body.detail as string) || "Failed to fetch source content");
+  }
+  return res.json() as Promise<SourceContentRange>;
+}
+
 export async function deleteJob(projectId: string, jobId: string, deleteFacts: boolean = false) {
   const res = await fetch(`${API_URL}/projects/${projectId}/jobs/${jobId}?delete_facts=${deleteFacts}`, {
     method: "DELETE",
@@ -667,6 +775,8 @@ const SynthesisResponseSchema = z.object({
   synthesis: z.string().min(1),
   output_id: z.string().uuid(),
   clusters: z.array(z.unknown()).optional(),
+  /** True when the backend reused the Output of an identical earlier selection + mode */
+  cached: z.boolean().optional(),
 });
 
 const SynthesisErrorSchema = z.object({
@@ -677,18 +787,8 @@ const SynthesisErrorSchema = z.object({
 export type SynthesisResponse = z.infer<typeof SynthesisResponseSchema>;
 export type SynthesisError = z.infer<typeof SynthesisErrorSchema>;
 
-// ✅ FIX: Only ONE definition of synthesizeFacts, correctly mapping data
-interface LlmFactInput {
-  id: string;
-  text: string;
-  title: string;
-  url?: string;
-  section?: string | null;
-  review_status?: string | null;
-  is_pinned?: boolean;
-}
-
-/** Input for synthesize/analyze: Fact or minimal shape with text/title/url/section (or fact_text/source_domain/etc.) */
+// ✅ FIX: Only ONE definition of synthesizeFacts
+/** Input for synthesize/analyze: Fact or minimal shape; only ids are sent, the backend reads the facts itself */
 export type SynthesizeFactInput = {
   id: string;
   text?: string;
@@ -701,46 +801,56 @@ export type SynthesizeFactInput = {
   section_context?: string | null;
   review_status?: Fact["review_status"];
   is_pinned?: boolean;
+  is_key_claim?: boolean;
+  confidence_score?: number;
 };
 
 export interface SynthesizeOptions {
   /** When true, backend returns 502 EMPTY_SYNTHESIS (E2E error test only) */
   forceError?: boolean;
+  /** false regenerates instead of reusing the cached Output for the same selection + mode */
+  cache?: boolean;
 }
 
-export async function synthesizeFacts(
-  projectId: string,
-  facts: SynthesizeFactInput[],
-  mode: "paragraph" | "research_brief" | "script_outline" | "split" = "paragraph",
-  options?: SynthesizeOptions
-): Promise<SynthesisResponse> {
-  // Map frontend Fact / minimal shape -> Backend LlmFactInput
-  const normalized: LlmFactInput[] = facts.map((f) => ({
-    id: f.id,
-    text: f.text ?? f.fact_text ?? "",
-    title: f.title ?? f.source_domain ?? "Unknown",
-    url: f.url ?? f.source_url ?? "",
-    section: f.section ?? f.section_context ?? null,
-    review_status: f.review_status ?? null,
-    is_pinned: f.is_pinned ?? false,
-  })).filter(f => f.id && f.text);
-
-  const url = `${API_URL}/projects/${projectId}/synthesize`;
-  
-  // Build headers with E2E force-error support
+// Backend hydrates text/source/review fields from these ids (and checks they belong to the project)
+function toFactIds(facts: SynthesizeFactInput[]): string[] {
+  return Array.from(new Set(facts.map((f) => f.id).filter(Boolean)));
+}
+
+function synthesisUrl(projectId: string, params: Record<string, string>): string {
+  const query = new URLSearchParams(params).toString();
+  return `${API_URL}/projects/${projectId}/synthesize${query ? `?${query}` : ""}`;
+}
+
+function synthesisHeaders(accept?: string): Record<string, string> {
   const headers: Record<string, string> = { "Content-Type": "application/json" };
-  
+  if (accept) headers.Accept = accept;
+
   // Check E2E flag for force-error (cleaner than query param or page.route)
   const isE2EMode = process.env.NEXT_PUBLIC_E2E_MODE === "true";
   if (isE2EMode && typeof window !== "undefined" && (window.__e2e as { _shouldForceNextSynthesisError?: () => boolean } | undefined)?._shouldForceNextSynthesisError?.()) {
     headers['x-e2e-force-error'] = 'true';
     console.log('🧪 E2E: Forcing next synthesis to error');
   }
+  return headers;
+}
 
+export async function synthesizeFacts(
+  projectId: string,
+  facts: SynthesizeFactInput[],
+  mode: "paragraph" | "research_brief" | "script_outline" | "split" = "paragraph",
+  options?: SynthesizeOptions
+): Promise<SynthesisResponse> {
+  const factIds = toFactIds(facts);
+
+  const params: Record<string, string> = {};
+  if (options?.cache === false) params.cache = "false";
+  if (options?.forceError) params.force_error = "true";
+  const url = synthesisUrl(projectId, params);
   const res = await fetch(url, {
     method: "POST",
-    headers,
-    body: JSON.stringify({ facts: normalized, mode }),
+    headers: synthesisHeaders(),
+    body: JSON.stringify({ fact_ids: factIds, mode }),
   });
 
   if (res.status === 502) {
@@ -763,8 +873,11 @@ export async function synthesizeFacts(
     throw new Error(err.detail ? JSON.stringify(err.detail) : "Synthesis failed");
   }
 
-  const rawResponse = (await res.json()) as Record<string, unknown>;
+  return toSynthesisResponse((await res.json()) as Record<string, unknown>);
+}
 
+/** Validate a synthesis response (JSON body or the stream's "done" event), hydrating empty text from the Output */
+async function toSynthesisResponse(rawResponse: Record<string, unknown>): Promise<SynthesisResponse> {
   // Log response structure in dev mode
   if (process.env.NODE_ENV === "development") {
     console.log("SYNTHESIS_RAW_RESPONSE:", {
@@ -816,6 +929,60 @@ export async function synthesizeFacts(
   );
 }
 
+/** Server-sent events from POST /synthesize?stream=true */
+export type SynthesisStreamEvent =
+  | { event: "clusters"; data: { clusters: { label: string; count: number }[] } }
+  | { event: "section"; data: { index: number; title: string; fact_ids: string[]; markdown: string } }
+  | { event: "done"; data: SynthesisResponse }
+  | { event: "error"; data: { detail: string; code: string } };
+
+/**
+ * Streaming variant of synthesizeFacts: onEvent sees each section as it is generated.
+ * Resolves with the final response (Output already saved) or throws on an "error" event.
+ */
+export async function synthesizeFactsStream(
+  projectId: string,
+  facts: SynthesizeFactInput[],
+  mode: "paragraph" | "research_brief" | "script_outline" | "split" = "paragraph",
+  onEvent?: (event: SynthesisStreamEvent) => void,
+  options?: SynthesizeOptions
+): Promise<SynthesisResponse> {
+  const params: Record<string, string> = { stream: "true" };
+  if (options?.cache === false) params.cache = "false";
+  if (options?.forceError) params.force_error = "true";
+  const res = await fetch(synthesisUrl(projectId, params), {
+    method: "POST",
+    headers: synthesisHeaders("text/event-stream"),
+    body: JSON.stringify({ fact_ids: toFactIds(facts), mode }),
+  });
+  if (!res.ok || !res.body) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(typeof err?.detail === "string" ? err.detail : "Synthesis failed");
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+    let sep: number;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const block = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      const event = block.match(/^event: (.*)$/m)?.[1];
+      const data = block.match(/^data: (.*)$/m)?.[1];
+      if (!event || data === undefined) continue;
+      const parsed = { event, data: JSON.parse(data) } as SynthesisStreamEvent;
+      onEvent?.(parsed);
+      if (parsed.event === "error") throw new Error(parsed.data.detail || "Synthesis failed");
+      if (parsed.event === "done") return toSynthesisResponse(parsed.data as Record<string, unknown>);
+    }
+    if (done) break;
+  }
+  throw new Error("Synthesis stream ended before completion");
+}
+
 function getOutputId(r: Record<string, unknown>): string | undefined {
   const a = r.output_id ?? r.outputId;
   return typeof a === "string" ? a : undefined;
@@ -939,18 +1106,10 @@ export async function analyzeFacts(
   facts: SynthesizeFactInput[],
   signal?: AbortSignal
 ) {
-  const normalized: LlmFactInput[] = facts.map((f) => ({
-    id: f.id,
-    text: f.text ?? f.fact_text ?? "",
-    title: f.title ?? f.source_domain ?? "Unknown",
-    url: f.url ?? f.source_url ?? "",
-    section: f.section ?? f.section_context ?? null,
-  })).filter(f => f.id && f.text);
-
   const res = await fetch(`${API_URL}/projects/${projectId}/analyze`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ facts: normalized, mode: "paragraph" }),
+    body: JSON.stringify({ fact_ids: toFactIds(facts), mode: "paragraph" }),
     signal
   });
   
@@ -86,13 +86,17 @@ test('empty synthesis response: UI hydrates via fetchOutput and shows content le
     const mockOutputId = 'hydrate-mock-output';
     const mockContent =
       'Sources: example.com\nMode: paragraph\n\nThis is hydrated output content when backend returns empty synthesis but valid output_id. Length must exceed 80 characters.';
-    await page.route(`**/api/v1/projects/${seed.project_id}/synthesize`, async (route) => {
-      await route.fulfill({
-        status: 200,
-        contentType: 'application/json',
-        body: JSON.stringify({ output_id: mockOutputId, synthesis: '', clusters: [] }),
-      });
-    });
+    // The page streams synthesis (?stream=true): answer with just the final "done" event
+    await page.route(
+      (url) => url.pathname === `/api/v1/projects/${seed.project_id}/synthesize`,
+      async (route) => {
+        await route.fulfill({
+          status: 200,
+          contentType: 'text/event-stream',
+          body: `event: done\ndata: ${JSON.stringify({ output_id: mockOutputId, synthesis: '', clusters: [] })}\n\n`,
+        });
+      }
+    );
     await page.route(`**/api/v1/outputs/${mockOutputId}`, async (route) => {
       await route.fulfill({
         status: 200,